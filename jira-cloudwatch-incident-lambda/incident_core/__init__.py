@@ -0,0 +1,17 @@
+"""
+Jira インシデント起票 Lambda（jira_create_issue_lambda.py / jira_create_issue_lambda_cw+sf.py）の共通部分。
+エントリポイントのファイルは「イベントの解釈と流れ」だけを持ち、以下はここを使う。
+
+- clients: urllib3 / boto3 クライアントの遅延生成
+- secrets: Secrets Manager の Secret の取得・キャッシュ、認証ヘッダ
+- adf: ADF(Atlassian Document Format) の組み立て、リクエストボディのエンコード
+- dedup: 重複チェック（summary → 未解決 Issue Key）のキャッシュ
+- coalesce: アラームストーム対策のコメント集約（集約ウィンドウと溜めた発報）
+- idempotency: 処理済みメッセージの台帳（SNS の再配信・Lambda のリトライ対策）
+- jira: Jira REST API の呼び出し（検索・コメント・起票・一括起票・解決）、レート制御
+- issues: チケット操作（重複チェック → 起票 or コメント、復旧時の解決）とキャッシュの記録・破棄
+- metrics: CloudWatch Embedded Metric Format のメトリクス
+- transport: リクエストボディの gzip 圧縮（受け付けないサーバーには非圧縮で送り直す）
+
+boto3 / urllib3 はどのモジュールでも import 時には読み込まない（コールドスタート対策）。
+"""
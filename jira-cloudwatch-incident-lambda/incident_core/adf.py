@@ -0,0 +1,288 @@
+"""
+Jira Cloud が期待する ADF(Atlassian Document Format) の組み立てとリクエストボディのエンコード。
+骨組み（見出しや箇条書きなど固定部分）は import 時に一度だけ JSON にしておき、インシデントごとには値を差し込むだけにする。
+送信する JSON は区切りの空白を入れないコンパクトな形にする。
+"""
+import json
+import re
+
+# 生の SNS メッセージをコードブロックに載せるときの既定の上限文字数（Jira の本文フィールドは 32767 文字まで）
+RAW_MESSAGE_MAX_CHARS = 16000
+
+# コンパクトな JSON の区切り（", " / ": " の空白を入れない）
+_COMPACT = (",", ":")
+
+# 大きすぎる生メッセージを要約するときの、文字列の先頭を残す文字数と配列の要素数
+_SUMMARY_MAX_STRING = 256
+_SUMMARY_MAX_ITEMS = 10
+
+
+class RawJSON:
+    """
+    シリアライズ済みの JSON 断片。encode_json_body() でそのまま埋め込まれる。
+    """
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def to_dict(self):
+        """確認・テスト用（送信時には使わない）"""
+        return json.loads(self.text)
+
+
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+_escape_json_string = json.encoder.encode_basestring  # 非ASCIIはそのまま（UTF-8 で送る）
+
+
+def json_text(value) -> str:
+    """文字列を JSON 文字列リテラルの中身（前後の " なし）にエスケープする"""
+    return _escape_json_string(str(value))[1:-1]
+
+
+class AdfTemplate:
+    """
+    ADF の骨組み（見出しや箇条書きなど固定部分）を一度だけ JSON にしておき、
+    インシデントごとには "{alarm_name}" などのプレースホルダにエスケープ済みの文字列を差し込むだけにする。
+    """
+
+    def __init__(self, skeleton: dict):
+        serialized = json.dumps(skeleton, ensure_ascii=False, separators=_COMPACT)
+        parts = _PLACEHOLDER_RE.split(serialized)
+        # 固定部分の { } は str.format 用にエスケープし、プレースホルダだけ {name} に戻す
+        self._format = "".join(
+            part.replace("{", "{{").replace("}", "}}") if i % 2 == 0 else "{" + part + "}"
+            for i, part in enumerate(parts)
+        )
+        self.fields = tuple(parts[1::2])
+
+    def render(self, **values) -> RawJSON:
+        return RawJSON(self._format.format(**{k: json_text(v) for k, v in values.items()}))
+
+
+def adf_heading(text: str) -> dict:
+    return {"type": "heading", "attrs": {"level": 2}, "content": [{"type": "text", "text": text}]}
+
+
+def adf_bullet_list(lines: list[str]) -> dict:
+    return {
+        "type": "bulletList",
+        "content": [
+            {"type": "listItem", "content": [{"type": "paragraph", "content": [{"type": "text", "text": line}]}]}
+            for line in lines
+        ],
+    }
+
+
+def adf_doc(*nodes: dict) -> dict:
+    return {"type": "doc", "version": 1, "content": list(nodes)}
+
+
+_ADF_PARAGRAPH_HEAD = '{"type":"doc","version":1,"content":[{"type":"paragraph","content":['
+_ADF_PARAGRAPH_TAIL = ']}]}'
+
+
+def adf_paragraph(text_lines: list[str]) -> RawJSON:
+    """
+    行数が可変の「プレーンテキスト1段落」の ADF。各行を text ノードにする。
+    """
+    nodes = ",".join('{"type":"text","text":"' + json_text(line + "\n") + '"}' for line in text_lines)
+    return RawJSON(_ADF_PARAGRAPH_HEAD + nodes + _ADF_PARAGRAPH_TAIL)
+
+
+def encode_json_body(body: dict) -> bytes:
+    """
+    リクエストボディをコンパクトな JSON(UTF-8) にする。RawJSON はシリアライズし直さずにそのまま埋め込む。
+    """
+    fragments = []
+
+    def default(obj):
+        if isinstance(obj, RawJSON):
+            fragments.append(obj.text)
+            return f"\0raw{len(fragments) - 1}\0"
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    text = json.dumps(body, ensure_ascii=False, separators=_COMPACT, default=default)
+    for i, fragment in enumerate(fragments):
+        text = text.replace(f'"\\u0000raw{i}\\u0000"', fragment, 1)
+    return text.encode("utf-8")
+
+
+def summarize_json(value, max_string: int = _SUMMARY_MAX_STRING, max_items: int = _SUMMARY_MAX_ITEMS):
+    """
+    JSON の構造（キー）は残したまま、長い文字列は先頭だけ、長い配列は先頭の要素だけにした要約を返す。
+    """
+    if isinstance(value, str):
+        return value if len(value) <= max_string else value[:max_string] + f"... ({len(value)} chars)"
+    if isinstance(value, dict):
+        return {k: summarize_json(v, max_string, max_items) for k, v in value.items()}
+    if isinstance(value, list):
+        items = [summarize_json(v, max_string, max_items) for v in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"... ({len(value) - max_items} more items)")
+        return items
+    return value
+
+
+def serialize_raw_message(message, max_chars: int = RAW_MESSAGE_MAX_CHARS) -> str:
+    """
+    生の SNS メッセージをコードブロック用の文字列にする。
+    - 小さければ従来どおり indent=2 で整形（チケット上で読むためのもの）
+    - 上限を超える場合は長い文字列・配列を省いた要約にし、元のサイズを添える
+    - 要約でも収まらなければコンパクトな JSON を上限で切り詰める
+      （巨大な EventBridge ペイロードを整形し直す CPU と、リクエストサイズを抑える）
+    """
+    compact = json.dumps(message, ensure_ascii=False, separators=_COMPACT)
+    if len(compact) > max_chars:
+        note = f"\n... (summarized: {len(compact)} chars in total)"
+        summarized = summarize_json(message)
+        summary = json.dumps(summarized, ensure_ascii=False, separators=_COMPACT)
+        if len(summary) + len(note) <= max_chars:
+            pretty = json.dumps(summarized, indent=2, ensure_ascii=False)
+            return (pretty if len(pretty) + len(note) <= max_chars else summary) + note
+        return (summary if len(summary) < len(compact) else compact)[:max_chars] \
+            + f"\n... (truncated: {len(compact)} chars in total)"
+
+    pretty = json.dumps(message, indent=2, ensure_ascii=False)
+    return pretty if len(pretty) <= max_chars else compact
+
+
+# ===== 既存チケットへのコメント用 ADF =====
+COMMENT_TEMPLATE = AdfTemplate({
+    "type": "doc",
+    "version": 1,
+    "content": [
+        {
+            "type": "paragraph",
+            "content": [
+                {"type": "text", "text": line + "\n"}
+                for line in [
+                    "*Alarm Fired Again*",
+                    "- State: {new_state}",
+                    "- Time: {timestamp}",
+                    "- Lambda: {lambda_name}",
+                    "- Metric: {namespace} / {metric_name}",
+                    "- Region: {region}",
+                    "- Reason: {reason}",
+                    "",
+                    "This alarm was triggered again and appended by AWS Lambda.",
+                ]
+            ],
+        }
+    ],
+})
+
+
+def build_comment_adf(
+    new_state: str,
+    reason: str,
+    timestamp: str,
+    namespace: str,
+    metric_name: str,
+    region: str,
+    lambda_name: str,
+) -> RawJSON:
+    """
+    発報タイミング、State、Reason を含むコメント（プレーンテキスト1段落）の ADF。
+    骨組みは COMMENT_TEMPLATE で固定し、値だけ差し込む。
+    """
+    return COMMENT_TEMPLATE.render(
+        new_state=new_state,
+        timestamp=timestamp,
+        lambda_name=lambda_name or "N/A",
+        namespace=namespace,
+        metric_name=metric_name,
+        region=region,
+        reason=reason,
+    )
+
+
+# ===== 復旧（OK への遷移）時のコメント用 ADF =====
+RESOLVED_COMMENT_TEMPLATE = AdfTemplate({
+    "type": "doc",
+    "version": 1,
+    "content": [
+        {
+            "type": "paragraph",
+            "content": [
+                {"type": "text", "text": line + "\n"}
+                for line in [
+                    "*Alarm Recovered*",
+                    "- State: {new_state}",
+                    "- Time: {timestamp}",
+                    "- Reason: {reason}",
+                    "",
+                    "This alarm returned to {new_state} and was resolved by AWS Lambda.",
+                ]
+            ],
+        }
+    ],
+})
+
+
+def build_resolved_comment_adf(new_state: str, reason: str, timestamp: str) -> RawJSON:
+    """
+    アラームが OK に戻ったときのコメント（プレーンテキスト1段落）の ADF。
+    """
+    return RESOLVED_COMMENT_TEMPLATE.render(new_state=new_state, timestamp=timestamp, reason=reason)
+
+
+# ===== Jira チケット本文（Description）用 ADF =====
+DESCRIPTION_TEMPLATE = AdfTemplate(adf_doc(
+    # === Alarm Info ===
+    adf_heading("Alarm Info"),
+    adf_bullet_list([
+        "Name: {alarm_name}",
+        "State: {new_state}",
+        "Reason: {reason}",
+    ]),
+    # === Metric Info ===
+    adf_heading("Metric Info"),
+    adf_bullet_list([
+        "Namespace: {namespace}",
+        "Metric: {metric_name}",
+        "Region: {region}",
+        "Lambda: {lambda_name}",
+    ]),
+    # === Raw SNS Message === 見にくいので必要な部分のみ抜粋するように変更も検討
+    adf_heading("Raw SNS Message"),
+    {
+        "type": "codeBlock",
+        "attrs": {"language": "json"},
+        "content": [{"type": "text", "text": "{raw_message}"}],
+    },
+))
+
+
+def build_adf_description(
+        alarm_name, new_state, reason, region,
+        namespace, metric_name, lambda_name, message,
+        max_chars: int = RAW_MESSAGE_MAX_CHARS,
+        max_bytes: int | None = None,
+) -> RawJSON:
+    """
+    Jiraのdescriptionフィールド用にADF形式で組み立てる
+    - Alarm Info
+    - Metric Info
+    - 生のSNSメッセージ（JSON）をコードブロックで格納（max_chars を超えたら要約・切り詰め）
+    max_bytes を指定した場合は、ADF 全体（UTF-8）がそれに収まるまで生メッセージをさらに縮める。
+    シリアライズ済みの ADF(RawJSON) を返す。中身を dict で見たい場合は .to_dict()
+    """
+    values = {
+        "alarm_name": alarm_name,
+        "new_state": new_state,
+        "reason": reason,
+        "namespace": namespace,
+        "metric_name": metric_name,
+        "region": region,
+        "lambda_name": lambda_name or "N/A",
+    }
+    description = DESCRIPTION_TEMPLATE.render(raw_message=serialize_raw_message(message, max_chars), **values)
+    # マルチバイト文字やエスケープで文字数とバイト数は一致しないので、実際のサイズを見て縮める
+    while max_bytes and max_chars > 0:
+        size = len(description.text.encode("utf-8"))
+        if size <= max_bytes:
+            break
+        max_chars = min(max_chars // 2, int(max_chars * max_bytes / size))
+        description = DESCRIPTION_TEMPLATE.render(raw_message=serialize_raw_message(message, max_chars), **values)
+    return description
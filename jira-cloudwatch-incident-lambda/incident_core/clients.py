@@ -0,0 +1,234 @@
+"""
+HTTP（urllib3）/ boto3 クライアントの遅延生成。
+boto3 / botocore / urllib3 は import だけで数百ms かかるため、実際に使うときに読み込む。
+"""
+import threading
+import time
+
+
+class LazyClient:
+    """
+    factory() で作るクライアントを初回 get() 時に1回だけ作る（スレッドセーフ）。
+    作成済みかどうかは value で確認できる（テストでは value を差し替えてもよい）。
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        value = self.value
+        if value is None:
+            with self._lock:
+                if self.value is None:
+                    self.value = self.factory()
+                value = self.value
+        return value
+
+
+def _keepalive_socket_options(idle_seconds: int) -> list:
+    """
+    TCP keep-alive を有効にするソケットオプション（idle_seconds 無通信でプローブを送り始める）。
+    TCP_KEEPIDLE などがない OS では SO_KEEPALIVE だけを設定する。
+    """
+    import socket
+
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    for name, value in (("TCP_KEEPIDLE", idle_seconds), ("TCP_KEEPINTVL", max(1, idle_seconds // 3)),
+                        ("TCP_KEEPCNT", 3)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+# 新しいコネクションを張ったときに知らせる先（リクエストを送るスレッドごと）
+_connect_listener = threading.local()
+_TIMED_POOL_CLASSES: dict = {}
+
+
+def _timed_pool_classes() -> dict:
+    """
+    コネクションの確立（DNS / TCP / TLS）にかかった時間を、そのスレッドの _connect_listener.callback(ms) で
+    知らせるコネクションプールのクラス。クライアントごとにクラスを作らないよう、最初の1回だけ作って使い回す。
+    """
+    if _TIMED_POOL_CLASSES:
+        return _TIMED_POOL_CLASSES
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def timed(connection_cls):
+        class TimedConnection(connection_cls):
+            def connect(self):
+                start = time.perf_counter()
+                super().connect()
+                callback = getattr(_connect_listener, "callback", None)
+                if callback is not None:
+                    callback((time.perf_counter() - start) * 1000)
+        return TimedConnection
+
+    _TIMED_POOL_CLASSES.update({
+        "http": type("TimedHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": timed(HTTPConnection)}),
+        "https": type("TimedHTTPSConnectionPool", (HTTPSConnectionPool,), {"ConnectionCls": timed(HTTPSConnection)}),
+    })
+    return _TIMED_POOL_CLASSES
+
+
+def create_http_pool(maxsize: int = 1, block: bool = True, tcp_keepalive_seconds: int = 0, timed: bool = False):
+    """
+    Jira 呼び出し用の HTTP クライアント（urllib3.PoolManager）を作る。
+    - tcp_keepalive_seconds > 0 なら TCP keep-alive を有効にする（NAT などに無通信のコネクションを切られにくくする）
+    - timed なら、新しいコネクションの確立時間を _connect_listener に知らせる（HttpClient が使う）
+    """
+    import urllib3
+    from urllib3 import Retry, Timeout
+    from urllib3.connection import HTTPConnection
+
+    kwargs = {}
+    if tcp_keepalive_seconds > 0:
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + _keepalive_socket_options(
+            tcp_keepalive_seconds)
+
+    pool = urllib3.PoolManager(
+        maxsize=maxsize,                            # ホストあたりのコネクション数
+        block=block,                                # True なら上限を超える場合は空きが出るまで待つ（接続数を増やさない）
+        retries=Retry(
+            total=3,
+            backoff_factor=0.5,                     # 0.5s, 1s, 2s... の間隔でリトライ
+            status_forcelist=[500, 502, 503, 504],  # サーバーエラー時にリトライ
+            ),
+        timeout=Timeout(connect=3.0, read=8.0),     # タイムアウト設定（接続3秒、読み取り8秒）
+        **kwargs,
+    )
+    if timed:
+        pool.pool_classes_by_scheme = _timed_pool_classes()
+    return pool
+
+
+# 切れていたコネクションで失敗したときに、送り直してよいメソッド
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+
+
+class HttpClient:
+    """
+    urllib3.PoolManager を包み、Lambda コンテナの中で使い回すコネクションの状態を管理する。
+    - 最後に使ってから max_idle_seconds を超えたら、プールのコネクションを捨ててから送る
+      （Lambda の凍結中や相手のアイドルタイムアウトで、黙って切られていることが多い）
+    - 使い回したコネクションが送信時に切れていた（ProtocolError）場合は、プールを捨てて、冪等なメソッド
+      （GET / HEAD / PUT / DELETE）なら新しいコネクションで1回だけ送り直す
+      （POST は Jira に届いているかもしれないので送り直さない。新しく張ったコネクションでの失敗も送り直さない）
+    - warm_up() で初回のリクエスト前にコネクションを張っておく
+    - コネクションの確立時間は on_connect(ms) で、送り直しは on_reconnect() で知らせる（リクエスト時間とは別に計測する）
+    """
+
+    def __init__(self, maxsize: int = 1, block: bool = True, tcp_keepalive_seconds: int = 0,
+                 max_idle_seconds: float = 0, on_connect=None, on_reconnect=None):
+        self.max_idle_seconds = max_idle_seconds
+        self.on_connect = on_connect
+        self.on_reconnect = on_reconnect
+        self.connects = 0
+        self.connect_ms = 0.0
+        self.idle_resets = 0
+        self.reconnects = 0
+        self.pool = create_http_pool(maxsize, block, tcp_keepalive_seconds, timed=True)
+        self._last_used = None
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs):
+        from urllib3.exceptions import ProtocolError
+
+        self._reset_if_idle()
+        connected = []
+        try:
+            return self._send(connected, method, url, **kwargs)
+        except ProtocolError:
+            if connected:
+                raise
+            # 使い回したコネクションが切れていた。残りも古いので捨てる
+            self.pool.clear()
+            if method.upper() not in _IDEMPOTENT_METHODS:
+                # 起票・コメントの重複を避けるため、呼び出し側のエラー処理（リトライ）に任せる
+                raise
+            with self._lock:
+                self.reconnects += 1
+            if self.on_reconnect is not None:
+                self.on_reconnect()
+            return self._send([], method, url, **kwargs)
+        finally:
+            self._last_used = time.monotonic()
+
+    def warm_up(self, base_url: str) -> float:
+        """
+        base_url のホストにコネクションを張ってプールに入れておき、かかった時間(ms)を返す。
+        認証の要らない /status を GET する（ステータスは問わない。コネクションが張れればよい）。
+        """
+        start = time.perf_counter()
+        resp = self._send([], "GET", base_url.rstrip("/") + "/status", retries=False)
+        resp.drain_conn()
+        self._last_used = time.monotonic()
+        return (time.perf_counter() - start) * 1000
+
+    def clear(self) -> None:
+        self.pool.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "connect_ms": round(self.connect_ms, 3),
+                "idle_resets": self.idle_resets,
+                "reconnects": self.reconnects,
+            }
+
+    def _reset_if_idle(self) -> None:
+        last_used = self._last_used
+        if not self.max_idle_seconds or last_used is None or time.monotonic() - last_used <= self.max_idle_seconds:
+            return
+        with self._lock:
+            self.idle_resets += 1
+        self.pool.clear()
+
+    def _send(self, connected: list, method: str, url: str, **kwargs):
+        """リクエストを送る。この間に張ったコネクションの確立時間を connected に入れる"""
+        def callback(ms: float) -> None:
+            connected.append(ms)
+            self._connected(ms)
+
+        _connect_listener.callback = callback
+        try:
+            return self.pool.request(method, url, **kwargs)
+        finally:
+            _connect_listener.callback = None
+
+    def _connected(self, ms: float) -> None:
+        with self._lock:
+            self.connects += 1
+            self.connect_ms += ms
+        if self.on_connect is not None:
+            self.on_connect(ms)
+
+
+def create_boto3_client(service: str):
+    """boto3 クライアントを作る（boto3 はここで初めて読み込む）"""
+    import boto3
+
+    return boto3.client(service)
+
+
+def http_errors() -> tuple:
+    """
+    urllib3 の送信失敗（接続エラー・リトライ上限など）の例外クラス。
+    """
+    from urllib3.exceptions import HTTPError
+
+    return (HTTPError,)
+
+
+def aws_errors() -> tuple:
+    """
+    boto3 呼び出しで捕捉する例外クラス。
+    except 節の式は例外が起きたときにしか評価されないので、正常系では botocore を import しない。
+    """
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    return BotoCoreError, ClientError
@@ -0,0 +1,251 @@
+"""
+アラームストーム対策のコメント集約（同じ summary への発報をウィンドウの間溜めて、1件のコメントにまとめて送る）。
+"""
+import json
+import logging
+import threading
+import time
+
+from .clients import aws_errors
+
+logger = logging.getLogger(__name__)
+
+# 溜めておく発報の項目（集約コメントに載せるものだけ。生メッセージは持たない）
+OCCURRENCE_FIELDS = ("new_state", "reason", "timestamp", "namespace", "metric_name", "region", "lambda_name")
+
+# ウィンドウが閉じた後も DynamoDB に残しておく時間(秒)。この間に一度も呼ばれなければ TTL で消える
+_RETENTION_SECONDS = 86400
+
+
+def _occurrence(incident: dict) -> dict:
+    return {field: incident.get(field) for field in OCCURRENCE_FIELDS}
+
+
+def _conditional_check_failed(e: Exception) -> bool:
+    return getattr(e, "response", {}).get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+class CoalescingBuffer:
+    """
+    summary → 集約ウィンドウ（Issue Key・開いた時刻・溜まった発報）。
+    - コンテナ内: dict。コンテナはいつ破棄されるか分からないので、溜めた発報は
+      呼び出しを返す前に take_pending() で取り出して送る（durable が False のとき）
+    - table を渡した場合: DynamoDB に溜める。レコードを ack した後にコンテナが破棄されても消えず、
+      ウィンドウが閉じた後にどのコンテナが呼ばれても take_expired() で取り出せる
+      （アイテム: summary / issue_key / opened_at / pending / expires_at。expires_at をテーブルの TTL 属性に設定しておく）
+      take_expired() はテーブルを Scan するので、コンテナごとに flush_interval_seconds に1回までにする
+      （ストーム中は呼び出しのたびに Scan しない）
+    取り出した発報を送れなかったときは restore() で戻す。
+    """
+
+    def __init__(self, window_seconds: int, table=None, flush_interval_seconds: float = 0):
+        self.window_seconds = window_seconds
+        self.table = table
+        self.flush_interval_seconds = flush_interval_seconds
+        self.scans = 0
+        self._last_scan: float | None = None
+        self._windows: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+
+    @property
+    def durable(self) -> bool:
+        return self.table is not None
+
+    def open(self, summary: str, issue_key: str) -> None:
+        """
+        Jira に書き込んだ直後に呼び、以降 window_seconds の間の発報を溜めるようにする。
+        まだ送っていない発報が残っていれば、捨てずに新しいウィンドウに引き継ぐ。
+        """
+        now = int(time.time())
+        if self.table is None:
+            with self._lock:
+                window = self._windows.get(summary)
+                self._windows[summary] = {
+                    "issue_key": issue_key,
+                    "opened_at": now,
+                    "pending": window["pending"] if window else [],
+                }
+            return
+        try:
+            self.table.update_item(
+                Key={"summary": summary},
+                UpdateExpression="SET issue_key = :k, opened_at = :now, expires_at = :exp",
+                ExpressionAttributeValues={
+                    ":k": issue_key, ":now": now, ":exp": now + self.window_seconds + _RETENTION_SECONDS,
+                },
+            )
+        except aws_errors() as e:
+            # 開けなくても、以降の発報が集約されずに毎回コメントされるだけ
+            logger.warning("Failed to open coalescing window for %s: %s", summary, e)
+
+    def add(self, summary: str, issue_key: str, incident: dict) -> list[dict] | None:
+        """
+        issue_key のウィンドウが開いていれば発報を溜めて None を返す。
+        閉じていれば（またはなければ）溜まっていた分と今回分を発報順に返し、新しいウィンドウを開く（呼び出し側が送る）。
+        """
+        occurrence = _occurrence(incident)
+        now = int(time.time())
+        if self.table is None:
+            with self._lock:
+                window = self._windows.get(summary)
+                if window and window["issue_key"] == issue_key and now - window["opened_at"] < self.window_seconds:
+                    window["pending"].append(occurrence)
+                    return None
+                occurrences = (window["pending"] if window else []) + [occurrence]
+                self._windows[summary] = {"issue_key": issue_key, "opened_at": now, "pending": []}
+            return occurrences
+
+        try:
+            self.table.update_item(
+                Key={"summary": summary},
+                UpdateExpression="SET pending = list_append(if_not_exists(pending, :empty), :items)",
+                ConditionExpression="issue_key = :k AND opened_at > :cutoff",
+                ExpressionAttributeValues={
+                    ":k": issue_key,
+                    ":cutoff": now - self.window_seconds,
+                    ":empty": [],
+                    ":items": [json.dumps(occurrence)],
+                },
+            )
+            return None
+        except aws_errors() as e:
+            if not _conditional_check_failed(e):
+                # 溜められなければ今回分だけをそのまま送る
+                logger.warning("Failed to buffer occurrence for %s: %s", summary, e)
+                return [occurrence]
+
+        # 別チケットに切り替わった場合も、古いウィンドウの分は捨てずに一緒に送る
+        taken = self.take(summary)
+        self.open(summary, issue_key)
+        return (taken[1] if taken else []) + [occurrence]
+
+    def take(self, summary: str) -> tuple[str, list[dict]] | None:
+        """summary のウィンドウを閉じて (Issue Key, 溜まっていた発報) を返す"""
+        if self.table is None:
+            with self._lock:
+                window = self._windows.pop(summary, None)
+            return (window["issue_key"], window["pending"]) if window else None
+        try:
+            item = self.table.delete_item(Key={"summary": summary}, ReturnValues="ALL_OLD").get("Attributes")
+        except aws_errors() as e:
+            logger.warning("Failed to close coalescing window for %s: %s", summary, e)
+            return None
+        return self._from_item(item)[1:] if item else None
+
+    def take_expired(self) -> list[tuple[str, str, list[dict]]]:
+        """
+        ウィンドウが閉じたものを閉じて (summary, Issue Key, 溜まっていた発報) を返す（発報が溜まっていないものは返さない）。
+        DynamoDB の場合は開いた時刻を条件に削除するので、同じウィンドウを複数のコンテナが送ることはない。
+        """
+        cutoff = int(time.time()) - self.window_seconds
+        if self.table is None:
+            with self._lock:
+                expired = [s for s, w in self._windows.items() if w["opened_at"] <= cutoff]
+                windows = [(s, self._windows.pop(s)) for s in expired]
+            return [(s, w["issue_key"], w["pending"]) for s, w in windows if w["pending"]]
+
+        with self._lock:
+            now = time.monotonic()
+            if self._last_scan is not None and now - self._last_scan < self.flush_interval_seconds:
+                return []
+            self._last_scan = now
+            self.scans += 1
+
+        taken = []
+        try:
+            for summary, opened_at in self._scan_expired(cutoff):
+                try:
+                    item = self.table.delete_item(
+                        Key={"summary": summary},
+                        ConditionExpression="opened_at = :seen",
+                        ExpressionAttributeValues={":seen": opened_at},
+                        ReturnValues="ALL_OLD",
+                    ).get("Attributes")
+                except aws_errors() as e:
+                    if not _conditional_check_failed(e):
+                        raise
+                    continue  # 他のコンテナが送った、または開き直された
+                if item and item.get("pending"):
+                    taken.append(self._from_item(item))
+        except aws_errors() as e:
+            # 残りは次の呼び出しで送る
+            logger.warning("Failed to flush expired coalescing windows: %s", e)
+        return taken
+
+    def take_pending(self) -> list[tuple[str, str, list[dict]]]:
+        """
+        コンテナ内に溜まっている発報を (summary, Issue Key, 発報) で取り出す（ウィンドウは開いたまま）。
+        DynamoDB の場合はコンテナ内には溜めないので空。
+        """
+        if self.table is not None:
+            return []
+        with self._lock:
+            taken = [(s, w["issue_key"], w["pending"]) for s, w in self._windows.items() if w["pending"]]
+            for summary, _, _ in taken:
+                self._windows[summary]["pending"] = []
+        return taken
+
+    def restore(self, summary: str, issue_key: str, occurrences: list[dict]) -> None:
+        """送れなかった発報を、溜まっている発報の前に戻す（次に取り出したときにまとめて送る）"""
+        if not occurrences:
+            return
+        now = int(time.time())
+        if self.table is None:
+            with self._lock:
+                window = self._windows.setdefault(summary, {"issue_key": issue_key, "opened_at": now, "pending": []})
+                window["pending"][:0] = occurrences
+            return
+        try:
+            self.table.update_item(
+                Key={"summary": summary},
+                UpdateExpression=(
+                    "SET pending = list_append(:items, if_not_exists(pending, :empty)), "
+                    "issue_key = if_not_exists(issue_key, :k), opened_at = if_not_exists(opened_at, :now), "
+                    "expires_at = :exp"
+                ),
+                ExpressionAttributeValues={
+                    ":items": [json.dumps(o) for o in occurrences],
+                    ":empty": [],
+                    ":k": issue_key,
+                    ":now": now,
+                    ":exp": now + self.window_seconds + _RETENTION_SECONDS,
+                },
+            )
+        except aws_errors() as e:
+            logger.error("Lost %d coalesced occurrence(s) for %s: %s", len(occurrences), summary, e)
+
+    def _scan_expired(self, cutoff: int):
+        kwargs = {
+            "ProjectionExpression": "#s, opened_at",
+            "FilterExpression": "opened_at <= :cutoff",
+            "ExpressionAttributeNames": {"#s": "summary"},
+            "ExpressionAttributeValues": {":cutoff": cutoff},
+        }
+        while True:
+            res = self.table.scan(**kwargs)
+            for item in res.get("Items", []):
+                yield item["summary"], item["opened_at"]
+            if "LastEvaluatedKey" not in res:
+                return
+            kwargs["ExclusiveStartKey"] = res["LastEvaluatedKey"]
+
+    @staticmethod
+    def _from_item(item: dict) -> tuple[str, str, list[dict]]:
+        return item["summary"], item.get("issue_key"), [json.loads(o) for o in item.get("pending", [])]
+
+
+def create_coalescing_buffer(window_seconds: int, table_name: str = "",
+                             flush_interval_seconds: float = 0) -> CoalescingBuffer:
+    """
+    CoalescingBuffer を作る。ウィンドウが有効で table_name があれば DynamoDB のテーブルに溜める。
+    """
+    table = None
+    if window_seconds > 0 and table_name:
+        import boto3
+
+        table = boto3.resource("dynamodb").Table(table_name)
+    return CoalescingBuffer(window_seconds, table, flush_interval_seconds)
@@ -0,0 +1,133 @@
+"""
+重複チェック（summary → 未解決 Issue Key）のキャッシュ。
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from .clients import aws_errors
+
+logger = logging.getLogger(__name__)
+
+
+class DedupCache:
+    """
+    summary → 未解決 Issue Key の対応を保持するキャッシュ。
+    - コンテナ内: TTL 付きの LRU（OrderedDict）
+    - table を渡した場合: DynamoDB を共有ストアとして使い、他のコンテナの結果も参照する
+      （アイテム: summary / issue_key / expires_at。expires_at をテーブルの TTL 属性に設定しておく）
+    キャッシュが古くなりうるのは TTL の間だけ。解決済みになった Issue は
+    invalidate() で明示的に消すか、verify_on_hit で確認する。
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int = 1024, table=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, summary: str) -> str | None:
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(summary)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(summary)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[summary]
+
+        shared = self._get_shared(summary, now)
+        with self._lock:
+            if shared:
+                self.hits += 1
+                self.shared_hits += 1
+            else:
+                self.misses += 1
+        if not shared:
+            return None
+        # 共有ストアの期限を引き継ぐ（読んだ時点から TTL を数え直すと、閉じた Issue を最大 2×TTL 使い続ける）
+        issue_key, expires_at = shared
+        self._put_local(summary, issue_key, expires_at)
+        return issue_key
+
+    def put(self, summary: str, issue_key: str) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        self._put_local(summary, issue_key, expires_at)
+        if self.table is not None:
+            try:
+                self.table.put_item(Item={
+                    "summary": summary,
+                    "issue_key": issue_key,
+                    "expires_at": int(expires_at),
+                })
+            except aws_errors() as e:
+                # 共有ストアに書けなくても処理は続ける（次回は Jira 検索になるだけ）
+                logger.warning("Failed to write dedup cache for %s: %s", summary, e)
+
+    def invalidate(self, summary: str) -> None:
+        with self._lock:
+            self._entries.pop(summary, None)
+        if self.enabled and self.table is not None:
+            try:
+                self.table.delete_item(Key={"summary": summary})
+            except aws_errors() as e:
+                logger.warning("Failed to invalidate dedup cache for %s: %s", summary, e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_hits": self.shared_hits,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._entries),
+            }
+
+    def _put_local(self, summary: str, issue_key: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[summary] = (issue_key, expires_at)
+            self._entries.move_to_end(summary)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, summary: str, now: float) -> tuple[str, float] | None:
+        if self.table is None:
+            return None
+        try:
+            item = self.table.get_item(Key={"summary": summary}).get("Item")
+        except aws_errors() as e:
+            logger.warning("Failed to read dedup cache for %s: %s", summary, e)
+            return None
+        # DynamoDB の TTL 削除は遅延があるので、期限切れはここでも弾く
+        expires_at = int(item.get("expires_at", 0)) if item else 0
+        if expires_at <= now or not item.get("issue_key"):
+            return None
+        return item["issue_key"], float(expires_at)
+
+
+def create_dedup_cache(ttl_seconds: int, max_entries: int = 1024, table_name: str = "") -> DedupCache:
+    """
+    DedupCache を作る。TTL が有効で table_name があれば DynamoDB のテーブルを共有ストアにする。
+    """
+    table = None
+    if ttl_seconds > 0 and table_name:
+        import boto3
+
+        table = boto3.resource("dynamodb").Table(table_name)
+    return DedupCache(ttl_seconds, max_entries, table)
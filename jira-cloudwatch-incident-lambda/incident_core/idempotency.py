@@ -0,0 +1,169 @@
+"""
+処理済みメッセージの台帳（SNS の再配信や Lambda のリトライで同じアラーム遷移を二重に処理しない）。
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from .clients import aws_errors
+
+logger = logging.getLogger(__name__)
+
+# BatchGetItem で一度に読めるキーの上限
+_BATCH_GET_MAX_KEYS = 100
+
+
+def idempotency_key(message_id: str | None, state_change_time: str | None) -> str | None:
+    """
+    SNS の MessageId とアラームの遷移時刻（StateChangeTime）から台帳のキーを作る。
+    MessageId がなければ（直接 invoke されたなど）再配信を判定できないので None。
+    """
+    if not message_id:
+        return None
+    return f"{message_id}#{state_change_time or ''}"
+
+
+class IdempotencyLedger:
+    """
+    処理済みのキー → Issue Key を TTL 付きで記録する。
+    - コンテナ内: TTL 付きの LRU（OrderedDict）。同じコンテナへの再配信は DynamoDB も読まない
+    - table を渡した場合: DynamoDB に記録し、他のコンテナで処理済みのものも判定する
+      （アイテム: idempotency_key / issue_key / expires_at。expires_at をテーブルの TTL 属性に設定しておく）
+    記録するのは Jira への送信が成功した後なので、失敗したメッセージのリトライは通常どおり処理される。
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int = 4096, table=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, key: str | None) -> str | None:
+        """処理済みなら記録した Issue Key を返す"""
+        if key is None:
+            return None
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: list[str | None]) -> dict[str, str]:
+        """
+        keys のうち処理済みのものを {キー: Issue Key} で返す。
+        コンテナ内にないものだけを DynamoDB から BatchGetItem でまとめて読む。
+        """
+        if not self.enabled:
+            return {}
+
+        now = time.time()
+        found: dict[str, str] = {}
+        missing = []
+        with self._lock:
+            for key in dict.fromkeys(k for k in keys if k is not None):
+                entry = self._entries.get(key)
+                if entry and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[0]
+                else:
+                    if entry:
+                        del self._entries[key]
+                    missing.append(key)
+
+        shared = self._get_shared(missing, now) if missing else {}
+        for key, (issue_key, expires_at) in shared.items():
+            self._put_local(key, issue_key, expires_at)
+        found.update((key, issue_key) for key, (issue_key, _) in shared.items())
+
+        with self._lock:
+            self.hits += len(found)
+            self.shared_hits += len(shared)
+            self.misses += len(missing) - len(shared)
+        return found
+
+    def put(self, key: str | None, issue_key: str) -> None:
+        self.put_many([(key, issue_key)])
+
+    def put_many(self, items: list[tuple[str | None, str]]) -> None:
+        """処理済みとして記録する（DynamoDB へは batch_writer でまとめて書く）"""
+        items = [(key, issue_key) for key, issue_key in items if key is not None]
+        if not self.enabled or not items:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        for key, issue_key in items:
+            self._put_local(key, issue_key, expires_at)
+        if self.table is None:
+            return
+        try:
+            with self.table.batch_writer(overwrite_by_pkeys=["idempotency_key"]) as batch:
+                for key, issue_key in items:
+                    batch.put_item(Item={
+                        "idempotency_key": key,
+                        "issue_key": issue_key,
+                        "expires_at": int(expires_at),
+                    })
+        except aws_errors() as e:
+            # 書けなくても処理は続ける（他のコンテナへの再配信を弾けないだけ）
+            logger.warning("Failed to write idempotency ledger (%d key(s)): %s", len(items), e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_hits": self.shared_hits,
+                "size": len(self._entries),
+            }
+
+    def _put_local(self, key: str, issue_key: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (issue_key, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(self, keys: list[str], now: float) -> dict[str, tuple[str, float]]:
+        if self.table is None:
+            return {}
+        # Table（resource）の client は値の型変換（{"S": ...} など）を自動でしてくれる
+        client = self.table.meta.client
+        found = {}
+        try:
+            for i in range(0, len(keys), _BATCH_GET_MAX_KEYS):
+                request = {self.table.name: {
+                    "Keys": [{"idempotency_key": key} for key in keys[i:i + _BATCH_GET_MAX_KEYS]],
+                    # リトライは数秒後に来ることもあるので、書いた直後の値を読む
+                    "ConsistentRead": True,
+                }}
+                # 読み残し（UnprocessedKeys）は数回まで読み直す。残ったものは未処理として扱う
+                for _ in range(3):
+                    if not request:
+                        break
+                    res = client.batch_get_item(RequestItems=request)
+                    for item in res.get("Responses", {}).get(self.table.name, []):
+                        # DynamoDB の TTL 削除は遅延があるので、期限切れはここでも弾く
+                        expires_at = int(item.get("expires_at", 0))
+                        if expires_at > now:
+                            found[item["idempotency_key"]] = (item["issue_key"], float(expires_at))
+                    request = res.get("UnprocessedKeys")
+        except aws_errors() as e:
+            # 読めなければ未処理として扱う（最悪でも従来どおり Jira に送るだけ）
+            logger.warning("Failed to read idempotency ledger: %s", e)
+        return found
+
+
+def create_idempotency_ledger(ttl_seconds: int, max_entries: int = 4096, table_name: str = "") -> IdempotencyLedger:
+    """
+    IdempotencyLedger を作る。TTL が有効で table_name があれば DynamoDB のテーブルに記録する。
+    """
+    table = None
+    if ttl_seconds > 0 and table_name:
+        import boto3
+
+        table = boto3.resource("dynamodb").Table(table_name)
+    return IdempotencyLedger(ttl_seconds, max_entries, table)
@@ -0,0 +1,149 @@
+"""
+インシデントのチケット操作（重複チェック・起票・コメント・復旧時の解決）。
+どちらの Lambda もこの実装を使い、summary → チケットの対応（重複チェックキャッシュ・復旧用の対応）の
+記録・破棄はここだけで行う。
+"""
+import logging
+
+from .dedup import DedupCache
+from .jira import (
+    bulk_create_issues,
+    create_issue,
+    is_issue_open,
+    post_comment,
+    resolve_issue,
+    search_open_issue,
+)
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class IssueTracker:
+    """
+    summary ごとの未解決チケットを Jira とキャッシュで追跡する。
+    - request(secret, method, path, body): Jira REST API の呼び出し（Lambda 側の送信・Secret の取り直し）
+    - dedup_cache: 重複チェックキャッシュ（summary → 未解決 Issue Key）
+    - open_issue_cache: アラーム（発報時の summary）→ 発報中チケット。復旧時に検索せずに解決するため
+    - verify_on_hit: キャッシュヒット時に Issue がまだ未解決か GET で確認する
+    - search_on_miss: 復旧時に対応が分からなければ Jira を1回検索する（false なら何もしない）
+    - transition_id: 解決に使うワークフローの遷移 ID。空なら遷移せず解決コメントだけ付ける
+    - metrics: search / create / comment のレイテンシと DedupHits / DedupMisses / Resolved を記録する
+    """
+
+    def __init__(self, request, dedup_cache: DedupCache, open_issue_cache: DedupCache,
+                 verify_on_hit: bool = False, search_on_miss: bool = True, transition_id: str = "",
+                 metrics: Metrics | None = None):
+        self.request = request
+        self.dedup_cache = dedup_cache
+        self.open_issue_cache = open_issue_cache
+        self.verify_on_hit = verify_on_hit
+        self.search_on_miss = search_on_miss
+        self.transition_id = transition_id
+        self.metrics = metrics or Metrics("", enabled=False)
+        self._search = self.metrics.timed("search")(search_open_issue)
+        self._create = self.metrics.timed("create")(create_issue)
+        self._bulk_create = self.metrics.timed("create")(bulk_create_issues)
+        self._post_comment = self.metrics.timed("comment")(post_comment)
+
+    def remember(self, summary: str, issue_key: str) -> None:
+        """起票・検索で分かった summary → 未解決チケットを、重複チェックキャッシュと復旧用の対応に記録する"""
+        self.dedup_cache.put(summary, issue_key)
+        self.open_issue_cache.put(summary, issue_key)
+
+    def forget(self, summary: str) -> None:
+        self.dedup_cache.invalidate(summary)
+        self.open_issue_cache.invalidate(summary)
+
+    def search(self, secret: dict, summary: str) -> str | None:
+        """summary を持つ未解決チケットを Jira で検索する（キャッシュは見ない）"""
+        return self._search(self.request, secret, summary)
+
+    def lookup(self, secret: dict, summary: str) -> str | None:
+        """
+        重複チェック。キャッシュにあればそれを使い、なければ Jira を検索して結果を記録する。
+        キャッシュの期限はヒットしても延ばさない（手で解決された Issue に TTL を超えてコメントし続けないように）。
+        """
+        issue_key = self.dedup_cache.get(summary)
+        if self.dedup_cache.enabled:
+            self.metrics.increment("DedupHits" if issue_key else "DedupMisses")
+        if issue_key:
+            if not self.verify_on_hit or is_issue_open(self.request, secret, issue_key):
+                logger.info("Dedup cache hit: %s -> %s", summary, issue_key)
+                return issue_key
+            # 解決済みになっていたのでキャッシュを捨てて検索し直す
+            logger.info("Cached issue %s is no longer open. Searching again.", issue_key)
+            self.forget(summary)
+
+        issue_key = self.search(secret, summary)
+        if issue_key:
+            self.remember(summary, issue_key)
+        return issue_key
+
+    def create(self, secret: dict, summary: str, fields: dict) -> str:
+        """新規チケットを1件起票して記録し、Issue Key を返す。重複チェックは呼び出し側で済ませておくこと"""
+        issue_key = self._create(self.request, secret, fields)
+        self.remember(summary, issue_key)
+        return issue_key
+
+    def bulk_create(self, secret: dict, fields_list: list[dict]) -> list[tuple[str | None, str | None]]:
+        """
+        一括起票 API でまとめて起票し、入力と同じ順で (Issue Key, エラー) を返す。起票できたものは記録する。
+        リクエスト自体が失敗した場合は JiraApiError を送出する。
+        """
+        results = self._bulk_create(self.request, secret, fields_list)
+        for fields, (issue_key, _) in zip(fields_list, results):
+            if issue_key:
+                self.remember(fields["summary"], issue_key)
+        return results
+
+    def post_comment(self, secret: dict, issue_key: str, comment_adf) -> bool:
+        """組み立て済みの ADF を既存のチケットにコメントとして POST する"""
+        return self._post_comment(self.request, secret, issue_key, comment_adf)
+
+    def create_or_comment(self, secret: dict, summary: str, new_fields, comment) -> tuple[str, str]:
+        """
+        summary の未解決チケットがあれば comment(issue_key) でコメントし、なければ new_fields() で起票する。
+        戻り値は (Issue Key, "commented" / "created")。
+        comment(issue_key) が False を返したら（削除・移動された Issue など）対応を消す。
+        """
+        issue_key = self.lookup(secret, summary)
+        if issue_key:
+            logger.info("Skipping creating new issue. Use existing issue: %s", issue_key)
+            if not comment(issue_key):
+                self.forget(summary)
+            return issue_key, "commented"
+        return self.create(secret, summary, new_fields()), "created"
+
+    def resolve(self, load_secret, firing_summary: str, previous_state: str, comment_adf,
+                before_resolve=None) -> tuple[bool, str | None, str]:
+        """
+        OK に戻ったアラームの発報中チケットを解決する。戻り値は (成功したか, Issue Key, "resolved" / "skipped")。
+        - ALARM 以外からの遷移（INSUFFICIENT_DATA → OK など）や、発報中のチケットがなければ Jira には何も書かない
+        - チケットは復旧用の対応・重複チェックキャッシュから引く。分からなければ1回だけ検索する（search_on_miss）
+        - 解決は1リクエスト（transition_id があれば遷移 + コメント、なければ解決コメント）
+        Secret は Jira に送るときだけ load_secret() で取る。before_resolve(secret, firing_summary) は解決の直前に呼ぶ。
+        """
+        if previous_state and previous_state != "ALARM":
+            logger.info("Skipping recovery of %s: previous state was %s", firing_summary, previous_state)
+            return True, None, "skipped"
+
+        secret = None
+        issue_key = self.open_issue_cache.get(firing_summary) or self.dedup_cache.get(firing_summary)
+        if issue_key is None and self.search_on_miss:
+            secret = load_secret()
+            issue_key = self.search(secret, firing_summary)
+        if issue_key is None:
+            logger.info("Skipping recovery of %s: no open issue", firing_summary)
+            return True, None, "skipped"
+
+        secret = secret or load_secret()
+        if before_resolve is not None:
+            before_resolve(secret, firing_summary)
+        ok = resolve_issue(self.request, secret, issue_key, comment_adf, self.transition_id)
+        if ok:
+            # 解決したチケットを次の発報で使わないように対応を消す
+            # （失敗したときはリトライで同じチケットを解決できるように残しておく）
+            self.forget(firing_summary)
+            self.metrics.increment("Resolved")
+        return ok, issue_key, "resolved"
@@ -0,0 +1,504 @@
+"""
+Jira REST API の呼び出し（検索・起票・コメント）と、過負荷・レート制限への対処。
+API の呼び出しは呼び出し側が渡す request(secret, method, path, body) で送る（Secret の取り直しやボディの圧縮は Lambda 側）。
+レート制御・429 のやり直しは send_rate_limited() にまとめてあり、どちらの Lambda もこれで送る。
+"""
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from .adf import RawJSON, encode_json_body
+from .clients import http_errors
+from .secrets import jira_auth_header
+
+logger = logging.getLogger(__name__)
+
+
+class JiraApiError(Exception):
+    """
+    Jira API がエラーを返した。429 / 5xx（retryable）なら時間をおけば成功する見込みがある。
+    """
+
+    def __init__(self, status: int, retry_after: float | None = None):
+        super().__init__(f"Jira API error: {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status == 429 or self.status >= 500
+
+
+def retry_after_seconds(resp) -> float | None:
+    """Retry-After ヘッダ（秒数形式のみ）を読む"""
+    try:
+        return max(0.0, float(resp.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+def _error_body(resp) -> str:
+    try:
+        return resp.data.decode("utf-8")
+    except Exception:
+        return str(resp.data)
+
+
+def request_with_secret_refresh(send, secret_cache, secret: dict, method: str, path: str,
+                                body: bytes | None = None, on_retry=None):
+    """
+    Jira REST API を1回呼び出してレスポンスを返す（ステータスの判定は呼び出し側）。
+    send(method, url, body, headers) が実際の送信。
+    401 が返った場合はトークンがローテーションされたとみなし、Secret を取り直して1回だけやり直す（on_retry() を呼ぶ）。
+    """
+    url = secret["JIRA_BASE_URL"].rstrip("/") + path
+    resp = send(method, url, body, jira_auth_header(secret))
+    if resp.status != 401:
+        return resp
+
+    # 他のスレッドが既に取り直していればそれを使う。そうでなければ Secrets Manager から取り直す
+    current = secret_cache.get()
+    if current is secret:
+        logger.warning("Jira returned 401. Refreshing secret and retrying once.")
+        try:
+            current = secret_cache.refresh()
+        except Exception:
+            logger.error("Failed to refresh secret after 401", exc_info=True)
+            return resp
+    if jira_auth_header(current) == jira_auth_header(secret):
+        return resp
+
+    url = current["JIRA_BASE_URL"].rstrip("/") + path
+    if on_retry is not None:
+        on_retry()
+    return send(method, url, body, jira_auth_header(current))
+
+
+# ===== 既存チケット検索（重複起票防止） =====
+def search_open_issue(request, secret: dict, summary: str) -> str | None:
+    """
+    指定した summary を持つ未解決の Jira Issue が存在するか検索し、
+    存在すれば Issue Key を返す。なければ None を返す。
+    """
+    project_key = secret["JIRA_PROJECT_KEY"]
+
+    # statusCategory != Done で未解決チケットを絞り込む
+    jql = (
+        f'project = "{project_key}" '
+        f' AND summary ~ "{summary}" '
+        f'AND statusCategory != Done '
+        f' ORDER BY created DESC'
+    )
+
+    payload = {
+        "jql": jql,
+        "maxResults": 1,
+        "fields": ["key"],
+    }
+
+    encoded_body = json.dumps(payload).encode("utf-8")
+
+    logger.info("Searching existing Jira issue with JQL: %s", jql)
+    resp = request(secret, "POST", "/rest/api/3/search/jql", encoded_body)
+
+    if resp.status >= 300:
+        logger.error("Failed to search Jira issues: %s %s", resp.status, _error_body(resp))
+        raise JiraApiError(resp.status, retry_after_seconds(resp))
+
+    data = json.loads(resp.data.decode("utf-8"))
+    issues = data.get("issues", [])
+    if not issues:
+        return None
+
+    return issues[0].get("key")
+
+
+def is_issue_open(request, secret: dict, issue_key: str) -> bool:
+    """
+    Issue がまだ未解決（statusCategory != Done）かを確認する。
+    確認できなかった場合は安全側（キャッシュを使わず検索し直す）に倒して False を返す。
+    """
+    resp = request(secret, "GET", f"/rest/api/3/issue/{issue_key}?fields=status")
+    if resp.status >= 300:
+        logger.warning("Failed to get status of issue %s: %s", issue_key, resp.status)
+        return False
+
+    data = json.loads(resp.data.decode("utf-8"))
+    category = data.get("fields", {}).get("status", {}).get("statusCategory", {}).get("key")
+    return category != "done"
+
+
+# ===== 既存チケットへのコメント追加 =====
+def post_comment(request, secret: dict, issue_key: str, comment_adf: dict | RawJSON) -> bool:
+    """
+    組み立て済みの ADF を既存の Jira 課題(issue_key)にコメントとして POST する。
+    """
+    encoded_body = encode_json_body({"body": comment_adf})
+
+    logger.info("Adding comment to existing issue %s", issue_key)
+    resp = request(secret, "POST", f"/rest/api/3/issue/{issue_key}/comment", encoded_body)
+
+    if resp.status >= 300:
+        logger.error("Failed to add comment to issue %s: %s %s", issue_key, resp.status, _error_body(resp))
+        # コメント失敗しても致命的ではないので、raise はせずログだけ残す
+        return False
+
+    logger.info("Comment added to issue %s", issue_key)
+    return True
+
+
+# ===== 復旧時の解決 =====
+def transition_issue(request, secret: dict, issue_key: str, transition_id: str,
+                     comment_adf: dict | RawJSON | None = None) -> bool:
+    """
+    Issue をワークフローの遷移(transition_id)で進める。comment_adf があれば同じリクエストでコメントも付ける。
+    遷移できなかった場合（既に解決済み・遷移 ID 違いなど）は False を返す。
+    """
+    body = {"transition": {"id": transition_id}}
+    if comment_adf is not None:
+        body["update"] = {"comment": [{"add": {"body": comment_adf}}]}
+
+    logger.info("Transitioning issue %s (transition=%s)", issue_key, transition_id)
+    resp = request(secret, "POST", f"/rest/api/3/issue/{issue_key}/transitions", encode_json_body(body))
+
+    if resp.status >= 300:
+        logger.error("Failed to transition issue %s: %s %s", issue_key, resp.status, _error_body(resp))
+        return False
+
+    logger.info("Issue %s transitioned", issue_key)
+    return True
+
+
+def resolve_issue(request, secret: dict, issue_key: str, comment_adf: dict | RawJSON,
+                  transition_id: str = "") -> bool:
+    """
+    アラームの復旧時に Issue を解決する（どちらも1リクエスト）。
+    - transition_id があれば、遷移と解決コメントを1回の POST で行う
+    - なければ解決コメントだけ付ける（チケットは人が閉じる）
+    """
+    if transition_id:
+        return transition_issue(request, secret, issue_key, transition_id, comment_adf)
+    return post_comment(request, secret, issue_key, comment_adf)
+
+
+# ===== Jira Issue 新規作成 =====
+def issue_fields(secret: dict, summary: str, description_adf: dict | RawJSON, labels: list[str],
+                 priority: dict | None = None) -> dict:
+    """
+    新規チケットの fields を組み立てる。issue type は Secret の id / name どちらでも対応する。
+    """
+    if "JIRA_ISSUE_TYPE_ID" in secret:
+        issuetype = {"id": secret["JIRA_ISSUE_TYPE_ID"]}
+    else:
+        issuetype = {"name": secret.get("JIRA_ISSUE_TYPE", "Incident")}
+
+    fields = {
+        "project": {"key": secret["JIRA_PROJECT_KEY"]},
+        "summary": summary,
+        "issuetype": issuetype,
+        "labels": labels,
+        "description": description_adf,
+    }
+    if priority:
+        fields["priority"] = priority
+    return fields
+
+
+def create_issue(request, secret: dict, fields: dict) -> str:
+    """
+    Jira に新規チケットを1件 POST し、作成された Issue Key を返す。
+    重複チェックは呼び出し側で済ませておくこと。
+    """
+    path = "/rest/api/3/issue"
+    encoded_body = encode_json_body({"fields": fields})
+
+    logger.info("Creating Jira issue at %s with summary=%s", path, fields.get("summary"))
+    resp = request(secret, "POST", path, encoded_body)
+
+    if resp.status >= 300:
+        # 失敗時はレスポンスボディもログに出す
+        logger.error("Failed to create Jira issue: %s %s", resp.status, _error_body(resp))
+        raise JiraApiError(resp.status, retry_after_seconds(resp))
+
+    data = json.loads(resp.data.decode("utf-8"))
+    key = data.get("key")
+    logger.info("Created Jira issue: %s", key)
+    return key
+
+
+def _bulk_error_text(error: dict) -> str:
+    """一括起票のレスポンスの errors[] 1件をエラーメッセージにする"""
+    element = error.get("elementErrors") or {}
+    messages = list(element.get("errorMessages") or [])
+    messages += [f"{field}: {message}" for field, message in (element.get("errors") or {}).items()]
+    status = error.get("status")
+    return f"Jira bulk create failed ({status}): " + ("; ".join(messages) or "unknown error")
+
+
+def bulk_create_issues(request, secret: dict, fields_list: list[dict]) -> list[tuple[str | None, str | None]]:
+    """
+    /rest/api/3/issue/bulk で fields のリストをまとめて起票し、入力と同じ順で (Issue Key, エラー) のリストを返す。
+    - 一部だけ失敗した場合、Jira は issues[]（成功分、入力順）と errors[]（failedElementNumber = 入力の位置）を返す
+    - リクエスト自体が失敗した場合（429 / 5xx / 認証エラーなど）は JiraApiError を送出する
+    """
+    path = "/rest/api/3/issue/bulk"
+    body = {"issueUpdates": [{"fields": fields} for fields in fields_list]}
+
+    logger.info("Creating %d Jira issue(s) at %s", len(fields_list), path)
+    resp = request(secret, "POST", path, encode_json_body(body))
+
+    try:
+        data = json.loads(resp.data.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        data = None
+    if not isinstance(data, dict):
+        data = {}
+    if resp.status >= 300 and not data.get("errors"):
+        logger.error("Failed to bulk create Jira issues: %s %s", resp.status, resp.data[:1000])
+        raise JiraApiError(resp.status, retry_after_seconds(resp))
+
+    failed = {e.get("failedElementNumber"): e for e in data.get("errors") or [] if isinstance(e, dict)}
+    created = iter(data.get("issues") or [])
+    results = []
+    for position, fields in enumerate(fields_list):
+        if position in failed:
+            error = _bulk_error_text(failed[position])
+            logger.error("Failed to create Jira issue (summary=%s): %s", fields.get("summary"), error)
+            results.append((None, error))
+            continue
+        key = (next(created, None) or {}).get("key")
+        if key:
+            logger.info("Created Jira issue: %s", key)
+            results.append((key, None))
+        else:
+            results.append((None, "Jira bulk create response has no issue for this record"))
+    return results
+
+
+# ===== 過負荷・レート制限 =====
+class Backpressure:
+    """
+    Jira が過負荷（429 / 5xx / 接続失敗）を返したことをコンテナ内で記録する。
+    記録してから一定時間（Retry-After または cooldown_seconds）は active になり、
+    sqs_handler は残りのメッセージを Jira に送らずキューへ戻す。
+    """
+
+    def __init__(self, cooldown_seconds: float, max_seconds: float):
+        self.cooldown_seconds = cooldown_seconds
+        self.max_seconds = max_seconds
+        self.trips = 0
+        self._until = 0.0
+        self._lock = threading.Lock()
+
+    def trip(self, retry_after: float | None = None) -> None:
+        delay = min(self.max_seconds, self.cooldown_seconds if retry_after is None else retry_after)
+        with self._lock:
+            self.trips += 1
+            self._until = max(self._until, time.monotonic() + delay)
+
+    def remaining(self) -> float:
+        return max(0.0, self._until - time.monotonic())
+
+    @property
+    def active(self) -> bool:
+        return self.remaining() > 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._until = 0.0
+
+
+def _float_header(headers, name: str) -> float | None:
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Jira 呼び出し全体（検索・起票・コメント）で共有するトークンバケット。
+    レートはレスポンスに合わせて調整する。
+    - X-RateLimit-FillRate / X-RateLimit-Interval-Seconds があれば、そのレートに合わせる（上限にもする）
+      X-RateLimit-Limit / X-RateLimit-Remaining でバケットの容量・残りも Jira 側に揃える
+    - 429 を受けたら Retry-After のあいだは全スレッドの送信を止め、レートのヒントがなければレートを半分にする
+      （同時に返ってきた 429 で何度も下げないよう、下げるのは1秒に1回まで）
+    - 成功したらレートを少しずつ上げる（上限は max_rate か、Jira が示したレート）
+    rate=None は「まだ制限しない」状態。最初の 429 で直前の送信ペースの半分をレートにする。
+    """
+
+    def __init__(self, rate: float | None, burst: int, increase: float = 0.1,
+                 min_rate: float = 0.5, max_rate: float = 100.0):
+        self.rate = rate
+        self.burst = burst
+        self.increase = increase
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.ceiling = max_rate   # Jira が示したレートがあればそちら
+        self.queue_depth = 0      # acquire() で待っているスレッド数
+        self.max_queue_depth = 0  # 前回の take_window() 以降で同時に待っていたスレッド数の最大
+        self.throttled = 0        # 受けた 429 の数
+        self.wait_seconds = 0.0   # acquire() で待った時間の合計
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._recent = deque()    # rate=None のあいだの送信時刻（直前1秒分）
+        self._window = (0, 0.0)   # 前回の take_window() 時点の throttled / wait_seconds
+        self._cond = threading.Condition()
+
+    def acquire(self, max_wait: float) -> float:
+        """
+        トークンを1つ取る。取れるまで最大 max_wait 秒待ち、待った秒数を返す
+        （待ちきれなかった場合もそのまま送らせる。結果が 429 なら呼び出し側の判断に任せる）。
+        """
+        start = time.monotonic()
+        with self._cond:
+            self.queue_depth += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._paused_until - now
+                    if wait <= 0:
+                        self._refill(now)
+                        if self.rate is None:
+                            self._recent.append(now)
+                            while self._recent[0] < now - 1.0:
+                                self._recent.popleft()
+                            break
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            break
+                        wait = (1 - self._tokens) / self.rate
+                    remaining = max_wait - (now - start)
+                    if remaining <= 0:
+                        break
+                    # 待ち行列の長さは実際に待つときに記録する（素通りした呼び出しは数えない）
+                    self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+                    self._cond.wait(min(wait, remaining))
+            finally:
+                self.queue_depth -= 1
+                waited = time.monotonic() - start
+                self.wait_seconds += waited
+        return waited
+
+    def update(self, status: int, headers) -> None:
+        """レスポンスのステータスとヘッダからレートを調整する"""
+        fill_rate = _float_header(headers, "X-RateLimit-FillRate")
+        interval = _float_header(headers, "X-RateLimit-Interval-Seconds") or 1.0
+        remaining = _float_header(headers, "X-RateLimit-Remaining")
+        limit = _float_header(headers, "X-RateLimit-Limit")
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if fill_rate:
+                self.ceiling = min(self.max_rate, fill_rate / interval)
+                if self.rate is None or self.rate > self.ceiling:
+                    self.rate = self.ceiling
+            if limit:
+                self.burst = min(self.burst, max(1, int(limit)))
+            if remaining is not None:
+                self._tokens = min(self._tokens, remaining)
+
+            if status == 429:
+                self.throttled += 1
+                self._tokens = 0.0
+                retry_after = _float_header(headers, "Retry-After")
+                if retry_after:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+                    self._updated = self._paused_until  # 止めているあいだはトークンを貯めない
+                if not fill_rate and now - self._last_decrease >= 1.0:
+                    self._last_decrease = now
+                    self.rate = max(self.min_rate, self._current_rate(now) / 2)
+            elif status < 400 and self.rate is not None:
+                self.rate = min(self.ceiling, self.rate + self.increase)
+
+    def metrics(self) -> dict:
+        with self._cond:
+            return {
+                "rate": self.rate,
+                "queue_depth": self.queue_depth,
+                "throttled": self.throttled,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+    def take_window(self) -> dict:
+        """
+        前回の呼び出し以降の集計（Lambda 呼び出し1回分）を返してリセットする。
+        - rate: 今のレート（まだ制限していなければ None）
+        - max_queue_depth: acquire() で同時に待っていたスレッド数の最大（待っている最中に記録した値）
+        - throttled / wait_seconds: 受けた 429 の数 / acquire() で待った時間の合計
+        """
+        with self._cond:
+            throttled, wait_seconds = self._window
+            window = {
+                "rate": self.rate,
+                "max_queue_depth": self.max_queue_depth,
+                "throttled": self.throttled - throttled,
+                "wait_seconds": round(self.wait_seconds - wait_seconds, 3),
+            }
+            self._window = (self.throttled, self.wait_seconds)
+            self.max_queue_depth = 0
+            return window
+
+    def _current_rate(self, now: float) -> float:
+        if self.rate is not None:
+            return self.rate
+        if not self._recent:
+            return self.min_rate
+        return min(self.max_rate, len(self._recent) / max(now - self._recent[0], 0.1))
+
+    def _refill(self, now: float) -> None:
+        if now <= self._updated:
+            return
+        if self.rate is not None:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+def send_rate_limited(send, method: str, url: str, body: bytes | None, headers: dict,
+                      limiter: RateLimiter | None = None, max_retries: int = 0, max_wait_seconds: float = 0.0,
+                      backpressure: Backpressure | None = None, metrics=None):
+    """
+    send(method, url, body=..., headers=...) で HTTP リクエストを送る。
+    - limiter があれば送信前にトークンを取り、レスポンスでレートを調整する
+      429 で Retry-After が max_wait_seconds 以下なら待ってやり直す（max_retries 回まで）
+    - それでも Jira が過負荷（429 / 5xx / 接続失敗）なら backpressure に記録する
+    - metrics（Metrics）があれば JiraCalls / Retries / BytesSent / Throttled / JiraErrors を数える
+    """
+    def increment(name, value=1):
+        if metrics is not None:
+            metrics.increment(name, value)
+
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire(max_wait_seconds)
+        if attempt:
+            increment("Retries")
+        increment("JiraCalls")
+        increment("BytesSent", len(body) if body else 0)
+        try:
+            resp = send(method, url, body=body, headers=headers)
+        except http_errors():
+            increment("JiraErrors")
+            if backpressure is not None:
+                backpressure.trip()
+            raise
+        if resp.retries is not None and resp.retries.history:
+            # urllib3 の Retry が内部でやり直した分（5xx など）
+            increment("Retries", len(resp.retries.history))
+        if resp.status == 429:
+            increment("Throttled")
+        if limiter is None:
+            break
+        limiter.update(resp.status, resp.headers)
+        retry_after = retry_after_seconds(resp)
+        if resp.status != 429 or attempt == max_retries or (retry_after or 0) > max_wait_seconds:
+            break
+        logger.warning("Jira returned 429 (Retry-After=%s). Retrying %s %s", retry_after, method, url)
+
+    if backpressure is not None and (resp.status == 429 or resp.status >= 500):
+        backpressure.trip(retry_after_seconds(resp))
+    return resp
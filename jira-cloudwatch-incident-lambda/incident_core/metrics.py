@@ -0,0 +1,155 @@
+"""
+メトリクス（CloudWatch Embedded Metric Format で標準出力に出す）。
+"""
+import json
+import sys
+import threading
+import time
+from functools import wraps
+
+# EMF の1メトリクスあたりに載せられる値の数
+_EMF_MAX_VALUES = 100
+
+_METRIC_UNITS = {
+    "Latency": "Milliseconds",
+    "BytesSent": "Bytes",
+    "DedupHitRate": "Percent",
+    "RateLimitRate": "Count/Second",
+    "RateLimitWaitSeconds": "Seconds",
+}
+
+
+class Metrics:
+    """
+    Lambda 呼び出し1回分のメトリクスを貯めて、CloudWatch Embedded Metric Format(EMF) で標準出力に出す。
+    - フェーズ（handler / parse / search / create / comment / connect）ごとのレイテンシ: Phase ディメンション付きの Latency
+    - BytesSent / Retries / JiraCalls / Throttled / DedupHits / DedupMisses などのカウンタ（合計値）
+    - RateLimitRate / RateLimitMaxQueueDepth などのゲージ（最後に set_gauge() した値）
+    無効なとき（JIRA_METRICS_ENABLED=false で import したとき）は timed() が関数をそのまま返し、
+    increment() も enabled を見てすぐ戻るだけなので、計測のコストはほぼない。
+    """
+
+    def __init__(self, namespace: str, enabled: bool):
+        self.namespace = namespace
+        self.enabled = enabled
+        self._timings: dict[str, list[float]] = {}
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def timed(self, phase: str):
+        """関数の実行時間を phase のレイテンシとして記録するデコレータ（無効なら何もしない）"""
+        def decorate(func):
+            if not self.enabled:
+                return func
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.add_timing(phase, (time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorate
+
+    def handler(self, on_finish=None):
+        """
+        Lambda ハンドラのデコレータ。ハンドラ全体の時間を handler フェーズとして記録し、
+        終わったら on_finish()（レートリミッタの状態の記録など）を呼んで EMF を書き出す（どの処理経路でも同じ）
+        """
+        def decorate(func):
+            timed_handler = self.timed("handler")(func)
+
+            @wraps(func)
+            def wrapper(event, context):
+                try:
+                    return timed_handler(event, context)
+                finally:
+                    if on_finish is not None:
+                        on_finish()
+                    if self.enabled:
+                        self.flush(context)
+            return wrapper
+        return decorate
+
+    def add_timing(self, phase: str, ms: float) -> None:
+        with self._lock:
+            self._timings.setdefault(phase, []).append(ms)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._gauges[name] = value
+
+    def record_connect(self, ms: float) -> None:
+        """新しいコネクションの確立時間を connect フェーズとして、リクエストのレイテンシとは別に記録する"""
+        if self.enabled:
+            self.add_timing("connect", ms)
+            self.increment("NewConnections")
+
+    def record_rate_limiter(self, window: dict) -> None:
+        """
+        RateLimiter.take_window() の値（この呼び出しでのレート・待ち行列の最大長・待ち時間）を記録する
+        （429 の数は送信時に Throttled として数えている）
+        """
+        if window["rate"] is not None:
+            self.set_gauge("RateLimitRate", window["rate"])
+        self.set_gauge("RateLimitMaxQueueDepth", window["max_queue_depth"])
+        self.increment("RateLimitWaitSeconds", window["wait_seconds"])
+
+    def flush(self, context=None, stream=None) -> list[dict]:
+        """
+        貯めたメトリクスを EMF のドキュメントにして1行ずつ書き出し、リセットする。
+        """
+        with self._lock:
+            timings, self._timings = self._timings, {}
+            counters, self._counters = self._counters, {}
+            counters.update(self._gauges)
+            self._gauges = {}
+
+        hits, misses = counters.get("DedupHits", 0), counters.get("DedupMisses", 0)
+        if hits + misses:
+            counters["DedupHitRate"] = 100.0 * hits / (hits + misses)
+
+        properties = {}
+        if context is not None:
+            properties["RequestId"] = getattr(context, "aws_request_id", None)
+            properties["FunctionName"] = getattr(context, "function_name", None)
+
+        docs = []
+        for phase, values in timings.items():
+            for i in range(0, len(values), _EMF_MAX_VALUES):
+                docs.append(self._document(
+                    {"Latency": [round(v, 3) for v in values[i:i + _EMF_MAX_VALUES]]},
+                    [["Phase"]], {"Phase": phase, **properties},
+                ))
+        if counters:
+            docs.append(self._document(counters, [[]], properties))
+
+        stream = stream or sys.stdout
+        for doc in docs:
+            stream.write(json.dumps(doc, separators=(",", ":")) + "\n")
+        stream.flush()
+        return docs
+
+    def _document(self, values: dict, dimensions: list, properties: dict) -> dict:
+        return {
+            "_aws": {
+                "Timestamp": int(time.time() * 1000),
+                "CloudWatchMetrics": [{
+                    "Namespace": self.namespace,
+                    "Dimensions": dimensions,
+                    "Metrics": [{"Name": name, "Unit": _METRIC_UNITS.get(name, "Count")} for name in values],
+                }],
+            },
+            **{k: v for k, v in properties.items() if v is not None},
+            **values,
+        }
@@ -0,0 +1,159 @@
+"""
+Jira 設定（Secrets Manager の Secret）の取得・キャッシュと認証ヘッダ。
+"""
+import base64
+import json
+import logging
+import random
+import threading
+import time
+from functools import lru_cache
+
+from .clients import aws_errors
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_SECRET_KEYS = [
+    "JIRA_BASE_URL",
+    "JIRA_EMAIL",
+    "JIRA_API_TOKEN",
+    "JIRA_PROJECT_KEY",
+]
+
+
+class SecretCache:
+    """
+    Secret を TTL 付きでキャッシュする。
+    - 期限切れ: その場で取り直す（失敗したら古い値で続行。値が一度もなければ例外）
+    - 期限の少し前（refresh_ahead + ジッター）: バックグラウンドスレッドで取り直し、呼び出し側は待たない
+    - refresh(): 401 などで明示的に取り直す
+    loader は Secret(dict) を返す関数。テストではスタブを渡せる。
+    """
+
+    def __init__(self, loader, ttl_seconds: int, refresh_ahead_seconds: int = 0, jitter_seconds: int = 0):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        self.jitter_seconds = jitter_seconds
+        self.loads = 0  # 取得回数（テスト・メトリクス用）
+        self._value = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def get(self) -> dict:
+        now = time.monotonic()
+        value = self._value
+        if value is not None and now < self._expires_at:
+            if now >= self._refresh_at:
+                self._start_background_refresh()
+            return value
+        return self.refresh(stale_ok=True)
+
+    def refresh(self, stale_ok: bool = False) -> dict:
+        """
+        同期的に取り直す。stale_ok なら失敗しても前回の値を返す。
+        """
+        with self._lock:
+            try:
+                value = self._load()
+            except Exception:
+                if stale_ok and self._value is not None:
+                    logger.warning("Failed to refresh secret. Using cached value.", exc_info=True)
+                    return self._value
+                raise
+            self._store(value)
+            return value
+
+    def put(self, value: dict) -> None:
+        """取得済みの値を入れる（テストやウォームアップ用）"""
+        with self._lock:
+            self._store(value)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+            self._expires_at = 0.0
+
+    def _load(self) -> dict:
+        value = self.loader()
+        self.loads += 1
+        return value
+
+    def _store(self, value: dict) -> None:
+        now = time.monotonic()
+        self._value = value
+        self._expires_at = now + self.ttl_seconds
+        jitter = random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0.0
+        self._refresh_at = self._expires_at - self.refresh_ahead_seconds - jitter
+
+    def _start_background_refresh(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self) -> None:
+        try:
+            value = self._load()
+            with self._lock:
+                self._store(value)
+            logger.info("Refreshed secret in background")
+        except Exception:
+            # 失敗しても期限までは今の値を使い続ける。次の get() で再度試す
+            logger.warning("Background secret refresh failed", exc_info=True)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+def fetch_secret(client, secret_name: str, required_keys: list[str] = REQUIRED_SECRET_KEYS) -> dict:
+    """
+    Secrets Manager から Jira 設定を取得する（キャッシュはしない。SecretCache の loader から呼ぶ）。
+    期待する Secret の JSON 例:
+
+    {
+      "JIRA_BASE_URL": "https://xxx.atlassian.net",
+      "JIRA_EMAIL": "user@example.com",
+      "JIRA_API_TOKEN": "xxxx...",
+      "JIRA_PROJECT_KEY": "TEST",
+      "JIRA_ISSUE_TYPE": "Incident"          # name 指定版
+      // or "JIRA_ISSUE_TYPE_ID": "10001"    # id 指定版
+    }
+    """
+    try:
+        res = client.get_secret_value(SecretId=secret_name)
+        secret_str = res.get("SecretString", "{}")
+        secret = json.loads(secret_str)
+
+    except aws_errors() as e:
+        logger.error(f"Failed to load secret {secret_name}: {e}")
+        raise RuntimeError(f"Could not retrieve secret {secret_name}") from e
+
+    # 必須キーが揃っているかチェック
+    missing_keys = [key for key in required_keys if key not in secret]
+    if missing_keys:
+        logger.error(f"Missing required keys in secret {secret_name}: {missing_keys}")
+        raise RuntimeError(f"Missing required keys in secret {secret_name}: {missing_keys}")
+
+    logger.info(f"Loaded Jira config from Secrets Manager: {secret_name}")
+    return secret
+
+
+@lru_cache(maxsize=8)
+def basic_auth_value(email: str, api_token: str) -> str:
+    token = f"{email}:{api_token}"
+    return "Basic " + base64.b64encode(token.encode("utf-8")).decode("utf-8")
+
+
+def jira_auth_header(secret: dict) -> dict:
+    """
+    Jira 用の Basic 認証ヘッダを作成
+    （base64 エンコード結果はメールアドレス・トークンの組ごとにキャッシュ）
+    """
+    return {
+        "Authorization": basic_auth_value(secret["JIRA_EMAIL"], secret["JIRA_API_TOKEN"]),
+        "Content-Type": "application/json",
+    }
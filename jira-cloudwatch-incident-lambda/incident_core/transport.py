@@ -0,0 +1,71 @@
+"""
+リクエストボディの gzip 圧縮（サーバーが受け付けない場合は自動で非圧縮に戻す）。
+"""
+import gzip
+import logging
+import threading
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# gzip のボディを受け付けないサーバーが返すステータス（415 Unsupported Media Type / ボディを JSON として読めず 400）
+_REJECTED_STATUSES = (400, 415)
+
+
+class GzipTransport:
+    """
+    min_bytes 以上のボディを gzip にして Content-Encoding: gzip で送る。
+    ホストごとに受け付けるかを覚えておく。
+    - 未確認: gzip で送り、400 / 415 が返ったら同じリクエストを非圧縮で送り直す。
+      非圧縮なら通った場合は「受け付けない」と覚え、以降は最初から非圧縮で送る
+    - 一度 gzip で成功したホストは「受け付ける」と覚え、以降は 400 でも送り直さない（本当の入力エラーとみなす）
+    """
+
+    def __init__(self, enabled: bool, min_bytes: int = 1024, level: int = 6):
+        self.enabled = enabled
+        self.min_bytes = min_bytes
+        self.level = level
+        self.bytes_in = 0    # 圧縮前のバイト数（圧縮したリクエストのみ）
+        self.bytes_out = 0   # 圧縮後のバイト数
+        self.fallbacks = 0
+        self._accepts: dict[str, bool] = {}  # ホスト → gzip を受け付けるか（未確認ならキーなし）
+        self._lock = threading.Lock()
+
+    def send(self, send, method: str, url: str, body: bytes | None, headers: dict):
+        """
+        send(method, url, body, headers) でリクエストを送り、レスポンスを返す。
+        """
+        host = urlsplit(url).netloc
+        if not self.enabled or not body or len(body) < self.min_bytes or self._accepts.get(host) is False:
+            return send(method, url, body, headers)
+
+        compressed = gzip.compress(body, compresslevel=self.level, mtime=0)
+        resp = send(method, url, compressed, {**headers, "Content-Encoding": "gzip"})
+        known = self._accepts.get(host)
+        if resp.status < 300:
+            with self._lock:
+                self.bytes_in += len(body)
+                self.bytes_out += len(compressed)
+                if known is None:
+                    self._accepts[host] = True
+            return resp
+        if known or resp.status not in _REJECTED_STATUSES:
+            return resp
+
+        logger.warning("%s rejected a gzip body (%s). Retrying uncompressed.", host, resp.status)
+        resp = send(method, url, body, headers)
+        with self._lock:
+            self.fallbacks += 1
+            if resp.status < 400:
+                self._accepts[host] = False
+        return resp
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "ratio": self.bytes_out / self.bytes_in if self.bytes_in else 1.0,
+                "fallbacks": self.fallbacks,
+                "hosts": dict(self._accepts),
+            }
@@ -1,12 +1,19 @@
 import json
 import os
-import base64
 import logging
-import urllib3
 
-import boto3
-from botocore.exceptions import BotoCoreError, ClientError
-from urllib3 import Retry, Timeout
+# HTTP クライアント・Secret キャッシュ・ADF・重複チェック・起票 / コメント / 解決・レート制御・メトリクスは
+# jira_create_issue_lambda_cw+sf.py と共通（incident_core パッケージ）
+# boto3 / urllib3 は初回利用時に読み込むので、コールドスタートでは import しない
+from incident_core.adf import build_adf_description, build_comment_adf, build_resolved_comment_adf
+from incident_core.clients import HttpClient, LazyClient, create_boto3_client
+from incident_core.dedup import DedupCache, create_dedup_cache
+from incident_core.idempotency import create_idempotency_ledger, idempotency_key
+from incident_core.issues import IssueTracker
+from incident_core.jira import RateLimiter, issue_fields, request_with_secret_refresh, send_rate_limited
+from incident_core.metrics import Metrics
+from incident_core.secrets import SecretCache, fetch_secret
+from incident_core.transport import GzipTransport
 
 
 logger = logging.getLogger()
@@ -15,380 +22,144 @@ logger.setLevel(logging.INFO)
 # 環境名（dev, staging, prod など）を環境変数から取得　secresmanager のシークレット名に利用するなど
 APP_ENV = os.getenv("APP_ENV", "dev")
 
-
-# ==== HTTP クライアント（Jira呼び出し用）====
-http = urllib3.PoolManager(
-    retries=Retry(
-        total=3,
-        backoff_factor=0.5,                     # 0.5s, 1s, 2s... の間隔でリトライ
-        status_forcelist=[500, 502, 503, 504],  # サーバーエラー時にリトライ
-        ),
-    timeout=Timeout(connect=3.0, read=8.0)      # タイムアウト設定（接続3秒、読み取り8秒）
-)
-
 # ==== Secrets Manager 設定 ====
 # 環境変数から Secret 名を取得（なければデフォルト）
 JIRA_SECRET_NAME = os.getenv("JIRA_SECRET_NAME", "jira/poc")
+# 取得した Secret をコンテナ内でキャッシュする時間（秒）。トークンのローテーションは 401 でも検知して取り直す
+JIRA_SECRET_TTL_SECONDS = int(os.getenv("JIRA_SECRET_TTL_SECONDS", "900"))
+
+# ==== 重複チェック（既存チケット検索）のキャッシュ ====
+# TTL(秒)。0 ならキャッシュしない（毎回 Jira を検索する）
+JIRA_DEDUP_CACHE_TTL_SECONDS = int(os.getenv("JIRA_DEDUP_CACHE_TTL_SECONDS", "0"))
+# キャッシュヒット時に Issue がまだ未解決か GET で確認する（検索よりは軽いが1往復増える）
+JIRA_DEDUP_VERIFY_ON_HIT = os.getenv("JIRA_DEDUP_VERIFY_ON_HIT", "false").lower() == "true"
+
+# ==== 処理済みメッセージの台帳（SNS の再配信・Lambda のリトライ対策）====
+# 記録を残す時間(秒)。0 なら台帳を使わない
+JIRA_IDEMPOTENCY_TTL_SECONDS = int(os.getenv("JIRA_IDEMPOTENCY_TTL_SECONDS", "0"))
+# 全コンテナで共有する場合の DynamoDB テーブル名（パーティションキー: idempotency_key、TTL 属性: expires_at）
+JIRA_IDEMPOTENCY_TABLE_NAME = os.getenv("JIRA_IDEMPOTENCY_TABLE_NAME", "")
+
+# ==== リクエストボディ ====
+# 1チケットの本文（description の ADF, UTF-8）の上限バイト数。超える場合は生メッセージを要約・切り詰めて収める
+JIRA_MAX_PAYLOAD_BYTES = int(os.getenv("JIRA_MAX_PAYLOAD_BYTES", "65536"))
+# true なら JIRA_GZIP_MIN_BYTES 以上のボディを gzip で送る（受け付けないサーバーには自動で非圧縮に戻す）
+JIRA_GZIP_REQUESTS = os.getenv("JIRA_GZIP_REQUESTS", "false").lower() == "true"
+JIRA_GZIP_MIN_BYTES = int(os.getenv("JIRA_GZIP_MIN_BYTES", "1024"))
+
+# ==== 復旧（アラームの OK への遷移）====
+# true なら OK への遷移では起票・コメントせず、発報中のチケットを解決する。false（既定）なら従来どおり起票・コメント
+JIRA_RESOLVE_ON_OK = os.getenv("JIRA_RESOLVE_ON_OK", "false").lower() == "true"
+# 解決に使うワークフローの遷移 ID。空なら遷移せず解決コメントだけ付ける
+JIRA_RESOLVE_TRANSITION_ID = os.getenv("JIRA_RESOLVE_TRANSITION_ID", "")
+# アラーム → 発報中チケットの対応をコンテナ内で覚えておく時間(秒)
+JIRA_OPEN_ISSUE_CACHE_TTL_SECONDS = int(os.getenv("JIRA_OPEN_ISSUE_CACHE_TTL_SECONDS", "86400"))
+# 対応が分からない（コールドスタート直後など）ときに Jira を1回検索する。false なら何もしない
+JIRA_RESOLVE_SEARCH_ON_MISS = os.getenv("JIRA_RESOLVE_SEARCH_ON_MISS", "true").lower() == "true"
+
+# ==== Jira 呼び出しのレート制御（全エンドポイント共通のトークンバケット）====
+JIRA_RATE_LIMIT_ENABLED = os.getenv("JIRA_RATE_LIMIT_ENABLED", "true").lower() == "true"
+# 初期レート(req/s)。0 なら Jira に 429 を返されるか、レート制限ヘッダを受け取るまで制限しない
+JIRA_RATE_LIMIT_PER_SECOND = float(os.getenv("JIRA_RATE_LIMIT_PER_SECOND", "0"))
+JIRA_RATE_LIMIT_BURST = int(os.getenv("JIRA_RATE_LIMIT_BURST", "10"))
+JIRA_RATE_LIMIT_INCREASE = float(os.getenv("JIRA_RATE_LIMIT_INCREASE", "0.1"))
+JIRA_RATE_LIMIT_MIN_PER_SECOND = float(os.getenv("JIRA_RATE_LIMIT_MIN_PER_SECOND", "0.5"))
+JIRA_RATE_LIMIT_MAX_PER_SECOND = float(os.getenv("JIRA_RATE_LIMIT_MAX_PER_SECOND", "100"))
+# 429 を受けたときのやり直し回数と、Retry-After をその場で待つ上限（秒）。超える場合はやり直さない
+JIRA_RATE_LIMIT_MAX_RETRIES = int(os.getenv("JIRA_RATE_LIMIT_MAX_RETRIES", "2"))
+JIRA_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("JIRA_RATE_LIMIT_MAX_WAIT_SECONDS", "10"))
+
+# ==== メトリクス（CloudWatch Embedded Metric Format で標準出力に出す）====
+JIRA_METRICS_ENABLED = os.getenv("JIRA_METRICS_ENABLED", "false").lower() == "true"
+JIRA_METRICS_NAMESPACE = os.getenv("JIRA_METRICS_NAMESPACE", "JiraIncidentLambda")
+
+# ==== Jira へのコネクション ====
+# true なら初期化時に Jira ホストへのコネクションを張っておく（最初のイベントの接続待ちをなくす）
+JIRA_WARMUP_ON_INIT = os.getenv("JIRA_WARMUP_ON_INIT", "false").lower() == "true"
+# TCP keep-alive のプローブを送り始めるまでの無通信時間（秒）。0 なら OS の既定のまま
+JIRA_TCP_KEEPALIVE_SECONDS = int(os.getenv("JIRA_TCP_KEEPALIVE_SECONDS", "0"))
+# 最後のリクエストからこの秒数を超えたら、コネクションを捨てて張り直す（0 なら捨てない）
+JIRA_CONNECTION_MAX_IDLE_SECONDS = float(os.getenv("JIRA_CONNECTION_MAX_IDLE_SECONDS", "55"))
+
+
+emf_metrics = Metrics(JIRA_METRICS_NAMESPACE, JIRA_METRICS_ENABLED)
+
+# ==== HTTP クライアント（Jira呼び出し用）/ Secret ====
+_http_client = LazyClient(lambda: HttpClient(
+    tcp_keepalive_seconds=JIRA_TCP_KEEPALIVE_SECONDS,
+    max_idle_seconds=JIRA_CONNECTION_MAX_IDLE_SECONDS,
+    on_connect=emf_metrics.record_connect,
+    on_reconnect=lambda: emf_metrics.increment("StaleReconnects"),
+))
+_secrets_client = LazyClient(lambda: create_boto3_client("secretsmanager"))
+
+# 一度取得した secret をLambdaコンテナ内でキャッシュ
+jira_secret_cache = SecretCache(
+    lambda: fetch_secret(_secrets_client.get(), JIRA_SECRET_NAME),
+    ttl_seconds=JIRA_SECRET_TTL_SECONDS,
+)
 
-_secrets_client = boto3.client("secretsmanager")
-_secret_cache = None  # 一度取得した secret をLambdaコンテナ内でキャッシュ
-
-
-REQUIRED_SECRET_KEYS = [
-    "JIRA_BASE_URL",
-    "JIRA_EMAIL",
-    "JIRA_API_TOKEN",
-    "JIRA_PROJECT_KEY",
-]
-
-def _load_jira_secret() -> dict:
-    """
-    Secrets Manager から Jira 設定を取得し、プロセス内でキャッシュする。
-    期待する Secret の JSON 例:
-
-    {
-      "JIRA_BASE_URL": "https://xxx.atlassian.net",
-      "JIRA_EMAIL": "user@example.com",
-      "JIRA_API_TOKEN": "xxxx...",
-      "JIRA_PROJECT_KEY": "TEST",
-      "JIRA_ISSUE_TYPE": "Incident"          # name 指定版
-      // or "JIRA_ISSUE_TYPE_ID": "10001"    # id 指定版
-    }
-    """
-    global _secret_cache
-    if _secret_cache is not None:
-        return _secret_cache
-
-    try:
-        res = _secrets_client.get_secret_value(SecretId=JIRA_SECRET_NAME)
-        secret_str = res.get("SecretString", "{}")
-        secret = json.loads(secret_str)
-
-    except (BotoCoreError, ClientError) as e:
-        logger.error(f"Failed to load secret {JIRA_SECRET_NAME}: {e}")
-        raise RuntimeError(f"Could not retrieve secret {JIRA_SECRET_NAME}") from e
-
-    # 必須キーが揃っているかチェック
-    missing_keys = [key for key in REQUIRED_SECRET_KEYS if key not in secret]
-    if missing_keys:
-        logger.error(f"Missing required keys in secret {JIRA_SECRET_NAME}: {missing_keys}")
-        raise RuntimeError(f"Missing required keys in secret {JIRA_SECRET_NAME}: {missing_keys}")
-
-    # キャッシュして返す
-    _secret_cache = secret
-    logger.info(f"Loaded Jira config from Secrets Manager: {JIRA_SECRET_NAME}")
-    return _secret_cache
+jira_gzip = GzipTransport(JIRA_GZIP_REQUESTS, JIRA_GZIP_MIN_BYTES)
 
+jira_rate_limiter = RateLimiter(
+    JIRA_RATE_LIMIT_PER_SECOND or None,
+    JIRA_RATE_LIMIT_BURST,
+    increase=JIRA_RATE_LIMIT_INCREASE,
+    min_rate=JIRA_RATE_LIMIT_MIN_PER_SECOND,
+    max_rate=JIRA_RATE_LIMIT_MAX_PER_SECOND,
+)
 
-def _jira_auth_header(secret: dict) -> dict:
-    """
-    Jira 用の Basic 認証ヘッダを作成
-    """
-    token = f"{secret['JIRA_EMAIL']}:{secret['JIRA_API_TOKEN']}"
-    b64 = base64.b64encode(token.encode("utf-8")).decode("utf-8")
-    return {
-        "Authorization": f"Basic {b64}",
-        "Content-Type": "application/json",
-    }
+idempotency_ledger = create_idempotency_ledger(
+    JIRA_IDEMPOTENCY_TTL_SECONDS, table_name=JIRA_IDEMPOTENCY_TABLE_NAME,
+)
 
 
-# ===== 既存チケット検索（重複起票防止） =====
-def _find_existing_issue_by_summary(secret: dict, summary: str) -> str | None:
-    """
-    指定した summary を持つ未解決の Jira Issue が存在するか検索し、
-    存在すれば Issue Key を返す。なければ None を返す。
-    """
-    base_url = secret["JIRA_BASE_URL"].rstrip("/")
-    project_key = secret["JIRA_PROJECT_KEY"]
-
-    # statusCategory != Done で未解決チケットを絞り込む
-    jql = (
-        f'project = "{project_key}" '
-        f' AND summary ~ "{summary}" '
-        f'AND statusCategory != Done '
-        f' ORDER BY created DESC'
+def _report_rate_limiter() -> None:
+    """この呼び出しでのレート・待ち行列の最大長・待ち時間をログと EMF に出す"""
+    if not JIRA_RATE_LIMIT_ENABLED:
+        return
+    window = jira_rate_limiter.take_window()
+    logger.info("Jira rate limiter: %s", window)
+    emf_metrics.record_rate_limiter(window)
+
+
+def _send(method: str, url: str, body: bytes | None, headers: dict):
+    """送信前に jira_rate_limiter のトークンを取り、429 で Retry-After が短ければ待ってやり直す"""
+    return send_rate_limited(
+        _http_client.get().request, method, url, body, headers,
+        limiter=jira_rate_limiter if JIRA_RATE_LIMIT_ENABLED else None,
+        max_retries=JIRA_RATE_LIMIT_MAX_RETRIES,
+        max_wait_seconds=JIRA_RATE_LIMIT_MAX_WAIT_SECONDS,
+        metrics=emf_metrics,
     )
 
-    url = f"{base_url}/rest/api/3/search/jql"
-    payload = {
-        "jql": jql,
-        "maxResults": 1,
-        "fields": ["key"],
-    }
-
-
-    headers = _jira_auth_header(secret)
-    encoded_body = json.dumps(payload).encode("utf-8")
-
-    logger.info("Searching existing Jira issue with JQL: %s", jql)
-    resp = http.request("POST", url, headers=headers, body=encoded_body)
 
-    if resp.status >= 300:
-        # 重複チェックに失敗しても「起票自体は試みる」ため、ここで例外を投げるのではなくログだけのこしてNoneを返す
-        try:
-            body_str = resp.data.decode("utf-8")
-        except Exception:
-            body_str = str(resp.data)
-        logger.error("Failed to search Jira issues: %s %s", resp.status, body_str)
-        raise Exception(f"Jira API error: {resp.status}")
+def _send_jira(method: str, url: str, body: bytes | None, headers: dict):
+    """ボディを（有効なら）gzip にして送る"""
+    return jira_gzip.send(_send, method, url, body, headers)
 
-    data = json.loads(resp.data.decode("utf-8"))
-    issues = data.get("issues", [])
-    if not issues:
-        return None
-
-    return issues[0].get("key")
-
-
-# ===== 既存チケットへのコメント用 ADF =====
-def _build_comment_adf(
-    summary: str,
-    new_state: str,
-    reason: str,
-    timestamp: str,
-    namespace: str,
-    metric_name: str,
-    region: str,
-    lambda_name: str,
-) -> dict:
-    """
-    Jira Cloud が期待する ADF(Atlassian Document Format) に変換。
-    シンプルに「プレーンテキスト1段落」として送る。
-    発報タイミング、State、Reason を含むコメントを作成
-    """
-    text_lines = [
-        "*Alarm Fired Again*",
-        f"- State: {new_state}",
-        f"- Time: {timestamp}",
-        f"- Lambda: {lambda_name or 'N/A'}",
-        f"- Metric: {namespace} / {metric_name}",
-        f"- Region: {region}",
-        f"- Reason: {reason}",
-        "",
-        "This alarm was triggered again and appended by AWS Lambda.",
-    ]
 
-    # text = f"CloudWatch alarm '{summary}' fired again. Appended by AWS Lambda."
-    # return {
-    #     "type": "doc",
-    #     "version": 1,
-    #     "content": [
-    #         {
-    #             "type": "paragraph",
-    #             "content": [{"type": "text", "text": text}],
-    #         }
-    #     ],
-    # }
-    # ADF の paragraph ノードに変換
-    return {
-        "type": "doc",
-        "version": 1,
-        "content": [
-            {
-                "type": "paragraph",
-                "content": [{"type": "text", "text": line + "\n"} for line in text_lines]
-            }
-        ]
-    }
-
-#===== 既存チケットへのコメント追加 =====
-def _add_comment_to_issue(secret: dict, issue_key: str, summary: str, new_state: str,
-                          reason: str, timestamp: str, namespace: str, metric_name: str,
-                          region: str, lambda_name: str) -> None:
+def _jira_request(secret: dict, method: str, path: str, body: bytes | None = None):
     """
-    既存の Jira 課題(issue_key)にコメントを1件追加する。
+    Jira REST API を1回呼び出す（401 なら Secret を取り直して1回だけやり直す）
     """
-    base_url = secret["JIRA_BASE_URL"].rstrip("/")
-    url = f"{base_url}/rest/api/3/issue/{issue_key}/comment"
-
-    body = {
-        "body": _build_comment_adf(
-            summary, new_state, reason, timestamp,
-            namespace, metric_name, region, lambda_name
-        )
-    }
-
-    headers = _jira_auth_header(secret)
-    encoded_body = json.dumps(body).encode("utf-8")
-
-    logger.info("Adding comment to existing issue %s", issue_key)
-    resp = http.request("POST", url, body=encoded_body, headers=headers)
-
-    if resp.status >= 300:
-        try:
-            body_str = resp.data.decode("utf-8")
-        except Exception:
-            body_str = str(resp.data)
-        logger.error("Failed to add comment to issue %s: %s %s", issue_key, resp.status, body_str)
-        # コメント失敗しても致命的ではないので、raise はせずログだけ残す
-        return
-
-    logger.info("Comment added to issue %s", issue_key)
-
-
-
-
-# def _to_adf(text: str) -> dict:
-#     """
-#     Jira Cloud が期待する ADF(Atlassian Document Format) に変換。
-#     シンプルに「プレーンテキスト1段落」として送る。
-#     """
-#     return {
-#         "type": "doc",
-#         "version": 1,
-#         "content": [
-#             {
-#                 "type": "paragraph",
-#                 "content": [{"type": "text", "text": text}],
-#             }
-#         ],
-#     }
+    return request_with_secret_refresh(
+        _send_jira, jira_secret_cache, secret, method, path, body,
+        on_retry=lambda: emf_metrics.increment("Retries"),
+    )
 
 
-# ===== Jira チケット本文（Description）用 ADF =====
-def build_adf_description(
-        alarm_name, new_state, reason, region,
-        namespace, metric_name, lambda_name, message
-) -> dict:
-    """
-    Jiraのdescriptionフィールド用にADF形式で組み立てる
-    - Alarm Info
-    - Metric Info
-    - 生のSNSメッセージ（JSON）をコードブロックで格納
-    """
-    return {
-        "type": "doc",
-        "version": 1,
-        "content": [
-            
-            # === Alarm Info ===
-            {
-                "type": "heading",
-                "attrs": {"level": 2},
-                "content": [{"type": "text", "text": "Alarm Info"}]
-            },
-            {
-                "type": "bulletList",
-                "content": [
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Name: {alarm_name}"}]
-                            }
-                        ]
-                    },
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"State: {new_state}"}]
-                            }
-                        ]
-                    },
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Reason: {reason}"}]
-                            }
-                        ]
-                    },
-                ]
-            },
-            # === Metric Info ===
-            {
-                "type": "heading",
-                "attrs": {"level": 2},
-                "content": [{"type": "text", "text": "Metric Info"}]
-            },
-            {
-                "type": "bulletList",
-                "content": [
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Namespace: {namespace}"}]
-                            }
-                        ]
-                    },
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Metric: {metric_name}"}]
-                            }
-                        ]
-                    },
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Region: {region}"}]
-                            }
-                        ]
-                    },
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Lambda: {lambda_name or 'N/A'}"}]
-                            }
-                        ]
-                    },
-                ]
-            },
-            # === Raw SNS Message === 見にくいので必要な部分のみ抜粋するように変更も検討
-            {
-                "type": "heading",
-                "attrs": {"level": 2},
-                "content": [{"type": "text", "text": "Raw SNS Message"}]
-            },
-            {
-                "type": "codeBlock",
-                "attrs": {"language": "json"},
-                "content": [
-                    {
-                        "type": "text",
-                        "text": json.dumps(message, indent=2, ensure_ascii=False)
-                    }
-                ]
-            },
-
-        ],
-    }
-
-# def _build_description_text(alarm_name, new_state, reason, region, namespace, metric_name, lambda_name, message):
-
-#     parts = [
-#         "*Alarm Info*",
-#         f" - Name: {alarm_name}",
-#         f" - State: {new_state}",
-#         f" - Reason: {reason}",
-#         "",
-#         "*Metric Info*",
-#         f" - Namespace: {namespace}",
-#         f" - Metric: {metric_name}",
-#         f" - Region: {region}",
-#         f" - Lambda: {lambda_name or 'N/A'}",
-#         "",
-#         "*Raw SNS Message*",
-#         "```json",
-#         json.dumps(message, indent=2, ensure_ascii=False),
-#         "```",
-#         "",
-#         "----",
-#         "This issue was automatically created by AWS Lambda (CloudWatch Alarm → SNS → Lambda → Jira).",
-#     ]
-#     return "\n".join(parts)
+# 重複チェック・起票・コメント・復旧時の解決は cw+sf と同じ実装（incident_core.issues）
+issue_tracker = IssueTracker(
+    _jira_request,
+    create_dedup_cache(JIRA_DEDUP_CACHE_TTL_SECONDS),
+    # アラーム（発報時の summary）→ 発報中チケット。復旧時に検索せずに解決するため
+    DedupCache(JIRA_OPEN_ISSUE_CACHE_TTL_SECONDS),
+    verify_on_hit=JIRA_DEDUP_VERIFY_ON_HIT,
+    search_on_miss=JIRA_RESOLVE_SEARCH_ON_MISS,
+    transition_id=JIRA_RESOLVE_TRANSITION_ID,
+    metrics=emf_metrics,
+)
 
 
 # ===== 優先度決定ロジック =====
@@ -415,7 +186,7 @@ def _decide_priority(alarm_name: str, metric_name: str) -> dict:
 # ===== Jira Issue 作成 or コメント追記のメイン関数 =====
 def _create_jira_issue(
     summary: str,
-    description_adf: dict,
+    description_adf,
     metric_name: str,
     alarm_name: str,
     new_state: str,
@@ -431,97 +202,59 @@ def _create_jira_issue(
     - 存在しない場合：
         - 新規チケットを作成し、その Issue Key を返す。
     """
-    secret = _load_jira_secret()
-
-    # logger.info("Secret JIRA_PROJECT_KEY raw: %r", secret.get("JIRA_PROJECT_KEY"))
-    # logger.info("Secret content keys: %s", list(secret.keys()))
-
-    # 1. 既存の未解決チケットを検索
-    existing_issue_key = _find_existing_issue_by_summary(secret, summary)
-    if existing_issue_key:
-        logger.info("Skipping creating new issue. Use existing issue: %s", existing_issue_key)
-        _add_comment_to_issue(secret, existing_issue_key, summary, 
-                            new_state, reason,
-                            timestamp, namespace,
-                            metric_name, region,
-                            lambda_name)
-        return existing_issue_key
-
-    # 2. 重複なければ新規チケット作成
-    base_url = secret["JIRA_BASE_URL"].rstrip("/")
-    project_key = secret["JIRA_PROJECT_KEY"]
-
-    # issue type は id / name どちらでも対応できるようにする
-    if "JIRA_ISSUE_TYPE_ID" in secret:
-        issuetype = {"id": secret["JIRA_ISSUE_TYPE_ID"]}
-    else:
-        issuetype_name = secret.get("JIRA_ISSUE_TYPE", "Incident")
-        issuetype = {"name": issuetype_name}
-    
+    secret = jira_secret_cache.get()
     labels = [
         "cloudwatch-auto",
         f"env-{APP_ENV}",
     ]
-
-    url = f"{base_url}/rest/api/3/issue"
-    
-
-    priority = _decide_priority(alarm_name, metric_name)
-
-    fields = {
-        "project": {"key": project_key},
-        "summary": summary,
-        "issuetype": issuetype,
-        "labels": labels,
-        "description": description_adf,
-        }
-    
-    if priority:
-        fields["priority"] = priority
-    
-    body = {"fields": fields}
-
-
-    # logger.info("Jira request payload: %s", json.dumps(body, ensure_ascii=False))
-
-    headers = _jira_auth_header(secret)
-    encoded_body = json.dumps(body).encode("utf-8")
-
-    logger.info("Creating Jira issue at %s with summary=%s", url, summary)
-    resp = http.request("POST", url, body=encoded_body, headers=headers)
-
-    if resp.status >= 300:
-        # 失敗時はレスポンスボディもログに出す
-        try:
-            body_str = resp.data.decode("utf-8")
-        except Exception:
-            body_str = str(resp.data)
-        logger.error("Failed to create Jira issue: %s %s", resp.status, body_str)
-        raise Exception(f"Jira API error: {resp.status}")
-
-    data = json.loads(resp.data.decode("utf-8"))
-    key = data.get("key")
-    logger.info("Created Jira issue: %s", key)
+    # 既存の未解決チケットがあればコメント、なければ新規チケット作成（キャッシュにあれば検索しない）
+    key, _ = issue_tracker.create_or_comment(
+        secret, summary,
+        new_fields=lambda: issue_fields(
+            secret, summary, description_adf, labels, _decide_priority(alarm_name, metric_name),
+        ),
+        comment=lambda issue_key: issue_tracker.post_comment(
+            secret, issue_key,
+            build_comment_adf(new_state, reason, timestamp, namespace, metric_name, region, lambda_name),
+        ),
+    )
     return key
 
 
+# ===== 復旧（OK への遷移）=====
+def _resolve_jira_issue(firing_summary: str, old_state: str, reason: str, timestamp: str) -> str | None:
+    """
+    OK に戻ったアラームの発報中チケットを1リクエストで解決し、その Issue Key を返す。
+    - ALARM 以外からの遷移（INSUFFICIENT_DATA → OK など）は発報していないので Jira には何も送らない
+    - チケットは復旧用の対応・重複チェックキャッシュから引き、分からなければ1回だけ検索する（JIRA_RESOLVE_SEARCH_ON_MISS）
+      見つからなければ何もしない
+    - Jira が解決を受け付けなければ例外（Lambda にリトライさせる。対応はリトライのために残す）
+    """
+    comment = build_resolved_comment_adf("OK", reason, timestamp)
+    ok, issue_key, _ = issue_tracker.resolve(jira_secret_cache.get, firing_summary, old_state, comment)
+    if not ok:
+        raise RuntimeError(f"Failed to resolve issue {issue_key}")
+    return issue_key
+
+
 # ===== Lambda ハンドラー =====
+# ハンドラ全体の時間を記録し、終わったらレートリミッタの状態を記録して EMF を書き出す
+@emf_metrics.handler(on_finish=_report_rate_limiter)
 def lambda_handler(event, context):
     """
     エントリポイント
     SNS → CloudWatchアラームのメッセージを受け取り、
     Jiraにインシデントチケットを作成 or コメントを追記する。
     """
-    logger.info("Received event: %s", json.dumps(event))
+    records = event.get("Records", [])
+    logger.info("Received event: %d record(s)", len(records))
 
     # SNSは Records[].Sns.Message に文字列JSONを載せてくる
-    for record in event.get("Records", []):
+    for record in records:
         sns = record.get("Sns", {})
         message_str = sns.get("Message", "{}")
         message = json.loads(message_str)
 
-        # logger.info("=== Raw SNS Message ===\n%s\n====================", message_str)
-
         alarm_name = message.get("AlarmName", "UnknownAlarm")
         new_state = message.get("NewStateValue", "UNKNOWN")
         reason = message.get("NewStateReason", "")
@@ -540,12 +273,28 @@ def lambda_handler(event, context):
          # CloudWatch側の状態変化時刻（なければ SNS メッセージ時刻）
         timestamp = message.get("StateChangeTime") or sns.get("Timestamp", "")
 
+        # 処理済み（SNS の再配信・Lambda のリトライ）なら Jira には送らない
+        key = idempotency_key(sns.get("MessageId"), timestamp)
+        processed_issue_key = idempotency_ledger.get(key)
+        if processed_issue_key:
+            logger.info("Skipping already processed message %s (issue %s)", key, processed_issue_key)
+            continue
+
+        # OK への遷移なら、発報中のチケットを解決するだけ（起票・コメントはしない）
+        if JIRA_RESOLVE_ON_OK and new_state == "OK":
+            firing_summary = f"[CloudWatch Alarm] {alarm_name} is ALARM"
+            issue_key = _resolve_jira_issue(firing_summary, message.get("OldStateValue", ""), reason, timestamp)
+            if issue_key:
+                idempotency_ledger.put(key, issue_key)
+            continue
+
         # Jira の summary と description(ADF) を組み立て
         summary = f"[CloudWatch Alarm] {alarm_name} is {new_state}"
         description_adf = build_adf_description(
-            alarm_name, new_state, reason, region, namespace, metric_name, lambda_name, message
+            alarm_name, new_state, reason, region, namespace, metric_name, lambda_name, message,
+            max_bytes=JIRA_MAX_PAYLOAD_BYTES or None,
         )
-        _create_jira_issue(
+        issue_key = _create_jira_issue(
             summary,
             description_adf,
             metric_name,
@@ -557,8 +306,19 @@ def lambda_handler(event, context):
             region,
             lambda_name,
         )
+        idempotency_ledger.put(key, issue_key)
 
     return {"status": "ok"}
 
 
+def _warm_up_connection() -> None:
+    """Jira ホストへのコネクションを張っておく。失敗してもログに残して初期化は続ける"""
+    try:
+        base_url = jira_secret_cache.get()["JIRA_BASE_URL"]
+        logger.info("Warmed up Jira connection in %.1f ms", _http_client.get().warm_up(base_url))
+    except Exception as e:
+        logger.warning("Jira connection warmup failed: %s", e)
+
 
+if JIRA_WARMUP_ON_INIT:
+    _warm_up_connection()
@@ -1,12 +1,46 @@
 import json
 import os
-import base64
 import logging
-import urllib3
-
-import boto3
-from botocore.exceptions import BotoCoreError, ClientError
-from urllib3 import Retry, Timeout
+import random
+import re
+import time
+from functools import lru_cache
+
+# HTTP クライアント・Secret キャッシュ・ADF・重複チェックキャッシュ・Jira API 呼び出しは
+# jira_create_issue_lambda.py と共通（incident_core パッケージ）
+# boto3 / botocore / urllib3 は import だけで数百ms かかるため、実際に使うときに読み込む（incident_core.clients を参照）
+from incident_core.adf import (
+    RawJSON,
+    adf_paragraph as _adf_paragraph,
+    build_adf_description as _build_adf_description,
+    build_comment_adf,
+    build_resolved_comment_adf,
+    serialize_raw_message,
+)
+from incident_core.coalesce import create_coalescing_buffer
+from incident_core.clients import (
+    LazyClient,
+    aws_errors as _aws_errors,
+    HttpClient,
+    create_boto3_client,
+)
+from incident_core.dedup import DedupCache, create_dedup_cache
+from incident_core.idempotency import create_idempotency_ledger, idempotency_key
+from incident_core.issues import IssueTracker
+from incident_core.jira import (
+    Backpressure,
+    RateLimiter,
+    issue_fields,
+    request_with_secret_refresh,
+    send_rate_limited,
+)
+from incident_core.metrics import Metrics
+from incident_core.transport import GzipTransport
+from incident_core.secrets import (
+    REQUIRED_SECRET_KEYS,
+    SecretCache,
+    fetch_secret,
+)
 
 
 logger = logging.getLogger()
@@ -15,35 +49,141 @@ logger.setLevel(logging.INFO)
 # 環境名（dev, staging, prod など）を環境変数から取得　secresmanager のシークレット名に利用するなど
 APP_ENV = os.getenv("APP_ENV", "dev")
 
+# バッチモード: 1回の呼び出しに含まれる複数レコードを summary 単位でまとめて処理する
+JIRA_BATCH_MODE = os.getenv("JIRA_BATCH_MODE", "false").lower() == "true"
 
-# ==== HTTP クライアント（Jira呼び出し用）====
-http = urllib3.PoolManager(
-    retries=Retry(
-        total=3,
-        backoff_factor=0.5,                     # 0.5s, 1s, 2s... の間隔でリトライ
-        status_forcelist=[500, 502, 503, 504],  # サーバーエラー時にリトライ
-        ),
-    timeout=Timeout(connect=3.0, read=8.0)      # タイムアウト設定（接続3秒、読み取り8秒）
-)
+# 並列ディスパッチ: summary の異なるインシデントを何スレッドで同時に処理するか（1 = 逐次）
+# 2以上を指定した場合はバッチモードの処理経路（summary 単位のグループ化）を使う
+JIRA_MAX_WORKERS = max(1, int(os.getenv("JIRA_MAX_WORKERS", "1")))
+
+# Jira ホストあたりの同時接続数の上限（未指定ならワーカー数と同じ）
+JIRA_MAX_CONNECTIONS_PER_HOST = max(1, int(os.getenv("JIRA_MAX_CONNECTIONS_PER_HOST", str(JIRA_MAX_WORKERS))))
+# true なら上限まで使っているときは空きを待つ。false なら一時的なコネクションを張る（使い終わったら捨てる）
+JIRA_HTTP_POOL_BLOCK = os.getenv("JIRA_HTTP_POOL_BLOCK", "true").lower() == "true"
+
+# 一括起票: 1回の呼び出しで初めて見た summary の起票を /rest/api/3/issue/bulk にまとめる
+# true の場合はバッチモードの処理経路を使う
+JIRA_BULK_CREATE = os.getenv("JIRA_BULK_CREATE", "false").lower() == "true"
+# 一括起票1リクエストあたりの Issue 数（Jira の上限は 50）
+JIRA_BULK_CREATE_CHUNK_SIZE = min(50, max(1, int(os.getenv("JIRA_BULK_CREATE_CHUNK_SIZE", "50"))))
+
+
+# コールドスタート対策: true ならクライアント（Secrets Manager / HTTP）と重いライブラリを初回利用時に作る
+# false なら import 時に作る（Provisioned Concurrency など、初期化が事前に済む環境向け）
+JIRA_LAZY_INIT = os.getenv("JIRA_LAZY_INIT", "true").lower() == "true"
+
+# ==== Jira へのコネクション ====
+# true なら初期化（import）時に Jira ホストへのコネクションを張っておき、最初のイベントの接続待ちをなくす
+# （secret の取得も初期化時に済む。失敗しても初期化は続ける）
+JIRA_WARMUP_ON_INIT = os.getenv("JIRA_WARMUP_ON_INIT", "false").lower() == "true"
+# TCP keep-alive のプローブを送り始めるまでの無通信時間（秒）。0 なら OS の既定のまま
+JIRA_TCP_KEEPALIVE_SECONDS = int(os.getenv("JIRA_TCP_KEEPALIVE_SECONDS", "0"))
+# 最後のリクエストからこの秒数を超えたら、プールのコネクションを捨てて張り直す（0 なら捨てない）
+# Lambda の凍結中にロードバランサーなどのアイドルタイムアウト（多くは 60 秒前後）で切られていることが多い
+JIRA_CONNECTION_MAX_IDLE_SECONDS = float(os.getenv("JIRA_CONNECTION_MAX_IDLE_SECONDS", "55"))
 
 # ==== Secrets Manager 設定 ====
 # 環境変数から Secret 名を取得（なければデフォルト）
 JIRA_SECRET_NAME = os.getenv("JIRA_SECRET_NAME", "jira/poc")
 
-_secrets_client = boto3.client("secretsmanager")
-_secret_cache = None  # 一度取得した secret をLambdaコンテナ内でキャッシュ
+# 取得した secret を Lambda コンテナ内でキャッシュする期間（秒）。ローテーション後もこの時間で追従する
+JIRA_SECRET_TTL_SECONDS = int(os.getenv("JIRA_SECRET_TTL_SECONDS", "900"))
+# 期限のこの秒数前からバックグラウンドで取り直す（リクエスト処理はブロックしない）
+JIRA_SECRET_REFRESH_AHEAD_SECONDS = int(os.getenv("JIRA_SECRET_REFRESH_AHEAD_SECONDS", "120"))
+# 先読みのタイミングをコンテナごとにずらす幅（秒）。全コンテナが同時に Secrets Manager を叩かないように
+JIRA_SECRET_REFRESH_JITTER_SECONDS = int(os.getenv("JIRA_SECRET_REFRESH_JITTER_SECONDS", "60"))
 
 # ===== 必須シークレットキー一覧 =====
-REQUIRED_SECRET_KEYS = [
-    "JIRA_BASE_URL",
-    "JIRA_EMAIL",
-    "JIRA_API_TOKEN",
-    "JIRA_PROJECT_KEY",
-]
+
+# ==== 重複チェック（summary → Issue Key）キャッシュ設定 ====
+# TTL(秒)。0 ならキャッシュしない（毎回 Jira を検索する）
+JIRA_DEDUP_CACHE_TTL_SECONDS = int(os.getenv("JIRA_DEDUP_CACHE_TTL_SECONDS", "0"))
+# コンテナ内で保持する最大件数（超えたら LRU で追い出す）
+JIRA_DEDUP_CACHE_MAX_ENTRIES = int(os.getenv("JIRA_DEDUP_CACHE_MAX_ENTRIES", "1024"))
+# 全コンテナで共有する場合の DynamoDB テーブル名（パーティションキー: summary）
+JIRA_DEDUP_TABLE_NAME = os.getenv("JIRA_DEDUP_TABLE_NAME", "")
+# キャッシュヒット時に Issue がまだ未解決か GET で確認する（検索よりは軽いが1往復増える）
+JIRA_DEDUP_VERIFY_ON_HIT = os.getenv("JIRA_DEDUP_VERIFY_ON_HIT", "false").lower() == "true"
+
+# ==== 処理済みメッセージの台帳（SNS の再配信・Lambda のリトライ対策）====
+# 記録を残す時間(秒)。0 なら台帳を使わない（再配信されたら Jira への処理をやり直す）
+JIRA_IDEMPOTENCY_TTL_SECONDS = int(os.getenv("JIRA_IDEMPOTENCY_TTL_SECONDS", "0"))
+# コンテナ内で保持する最大件数（超えたら LRU で追い出す）
+JIRA_IDEMPOTENCY_MAX_ENTRIES = int(os.getenv("JIRA_IDEMPOTENCY_MAX_ENTRIES", "4096"))
+# 全コンテナで共有する場合の DynamoDB テーブル名（パーティションキー: idempotency_key、TTL 属性: expires_at）
+JIRA_IDEMPOTENCY_TABLE_NAME = os.getenv("JIRA_IDEMPOTENCY_TABLE_NAME", "")
+
+# ==== Jira チケット本文 ====
+# 生の SNS メッセージをコードブロックに載せるときの上限文字数（超えた分は切り詰める）
+# Jira の本文フィールドは 32767 文字まで
+JIRA_RAW_MESSAGE_MAX_CHARS = int(os.getenv("JIRA_RAW_MESSAGE_MAX_CHARS", "16000"))
+# 1チケットの本文（description の ADF, UTF-8）の上限バイト数。超える場合は生メッセージを要約・切り詰めて収める
+# 0 なら JIRA_RAW_MESSAGE_MAX_CHARS だけで制限する
+JIRA_MAX_PAYLOAD_BYTES = int(os.getenv("JIRA_MAX_PAYLOAD_BYTES", "65536"))
+
+# ==== リクエストボディの圧縮 ====
+# true なら JIRA_GZIP_MIN_BYTES 以上のボディを gzip で送る（受け付けないサーバーには自動で非圧縮に戻す）
+JIRA_GZIP_REQUESTS = os.getenv("JIRA_GZIP_REQUESTS", "false").lower() == "true"
+JIRA_GZIP_MIN_BYTES = int(os.getenv("JIRA_GZIP_MIN_BYTES", "1024"))
+
+# ==== アラームストーム対策（コメントの集約）====
+# 同じチケットへのコメントをまとめるウィンドウ(秒)。0 なら集約せず毎回コメントする
+JIRA_COALESCE_WINDOW_SECONDS = int(os.getenv("JIRA_COALESCE_WINDOW_SECONDS", "0"))
+# 溜めた発報を全コンテナで共有して保持する DynamoDB テーブル名（パーティションキー: summary、TTL 属性: expires_at）
+# 空ならコンテナ内に溜めるので、1回の呼び出し（バッチ / SQS モード）の中だけで集約し、返す前に送る
+# ウィンドウが閉じた分は次の呼び出しの先頭で送る。発報が止まっても送られるよう、EventBridge のスケジュールで
+# Records のないイベント（{}）を定期的に送っておくとよい
+JIRA_COALESCE_TABLE_NAME = os.getenv("JIRA_COALESCE_TABLE_NAME", "")
+# ウィンドウが閉じた分を探す（テーブルを Scan する）のは、コンテナごとにこの間隔(秒)に1回まで
+JIRA_COALESCE_FLUSH_INTERVAL_SECONDS = float(os.getenv("JIRA_COALESCE_FLUSH_INTERVAL_SECONDS", "10"))
+
+# ==== 復旧（アラームの OK への遷移）====
+# true なら OK への遷移では起票・コメントせず、発報中のチケットを解決する。false（既定）なら他の状態と同じく起票・コメント
+JIRA_RESOLVE_ON_OK = os.getenv("JIRA_RESOLVE_ON_OK", "false").lower() == "true"
+# 解決に使うワークフローの遷移 ID（例: "31"）。空なら遷移せず解決コメントだけ付ける
+JIRA_RESOLVE_TRANSITION_ID = os.getenv("JIRA_RESOLVE_TRANSITION_ID", "")
+# アラーム → 発報中チケットの対応をコンテナ内で覚えておく時間(秒)
+JIRA_OPEN_ISSUE_CACHE_TTL_SECONDS = int(os.getenv("JIRA_OPEN_ISSUE_CACHE_TTL_SECONDS", "86400"))
+# 対応が分からない（コールドスタート直後など）ときに Jira を1回検索する。false なら何もしない
+JIRA_RESOLVE_SEARCH_ON_MISS = os.getenv("JIRA_RESOLVE_SEARCH_ON_MISS", "true").lower() == "true"
+
+# ==== ログ ====
+# 形式: text（従来どおり）/ json（1行1 JSON の構造化ログ）
+JIRA_LOG_FORMAT = os.getenv("JIRA_LOG_FORMAT", "text").lower()
+# 受信イベントは既定では件数・サイズなどの要約だけを出す。全文を出す割合（0.0〜1.0。DEBUG レベルなら常に出す）
+JIRA_LOG_EVENT_SAMPLE_RATE = float(os.getenv("JIRA_LOG_EVENT_SAMPLE_RATE", "0"))
+# ログに埋め込む1フィールドあたりの最大文字数（超えた分はシリアライズせずに切り詰める。0 なら無制限）
+JIRA_LOG_FIELD_MAX_CHARS = int(os.getenv("JIRA_LOG_FIELD_MAX_CHARS", "4096"))
+
+# ==== メトリクス（CloudWatch Embedded Metric Format で標準出力に出す）====
+JIRA_METRICS_ENABLED = os.getenv("JIRA_METRICS_ENABLED", "false").lower() == "true"
+JIRA_METRICS_NAMESPACE = os.getenv("JIRA_METRICS_NAMESPACE", "JiraIncidentLambda")
+
+# ==== SQS バッファモード（sqs_handler）のバックプレッシャー ====
+# Jira が 429 / 5xx を返したあと、Jira への送信を控える秒数（Retry-After があればそちらを優先）
+JIRA_BACKPRESSURE_SECONDS = int(os.getenv("JIRA_BACKPRESSURE_SECONDS", "30"))
+# Retry-After が大きすぎる場合の上限（秒）
+JIRA_BACKPRESSURE_MAX_SECONDS = int(os.getenv("JIRA_BACKPRESSURE_MAX_SECONDS", "900"))
+# 後回しにしたメッセージの可視性タイムアウトを延ばし、Jira が回復する頃に再配信させる
+JIRA_SQS_DELAY_REDELIVERY = os.getenv("JIRA_SQS_DELAY_REDELIVERY", "true").lower() == "true"
+
+# ==== Jira 呼び出しのレート制御（全エンドポイント共通のトークンバケット）====
+JIRA_RATE_LIMIT_ENABLED = os.getenv("JIRA_RATE_LIMIT_ENABLED", "true").lower() == "true"
+# 初期レート(req/s)。0 なら Jira に 429 を返されるか、レート制限ヘッダを受け取るまで制限しない
+JIRA_RATE_LIMIT_PER_SECOND = float(os.getenv("JIRA_RATE_LIMIT_PER_SECOND", "0"))
+# バケットの容量（連続して送れる件数）
+JIRA_RATE_LIMIT_BURST = int(os.getenv("JIRA_RATE_LIMIT_BURST", "10"))
+# 成功のたびにレートをこれだけ上げる（429 を受けたら半分にする）
+JIRA_RATE_LIMIT_INCREASE = float(os.getenv("JIRA_RATE_LIMIT_INCREASE", "0.1"))
+JIRA_RATE_LIMIT_MIN_PER_SECOND = float(os.getenv("JIRA_RATE_LIMIT_MIN_PER_SECOND", "0.5"))
+JIRA_RATE_LIMIT_MAX_PER_SECOND = float(os.getenv("JIRA_RATE_LIMIT_MAX_PER_SECOND", "100"))
+# 429 を受けたときのやり直し回数と、Retry-After をその場で待つ上限（秒）。超える場合はやり直さない
+JIRA_RATE_LIMIT_MAX_RETRIES = int(os.getenv("JIRA_RATE_LIMIT_MAX_RETRIES", "2"))
+JIRA_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("JIRA_RATE_LIMIT_MAX_WAIT_SECONDS", "10"))
 
 
 # incident = {
-#     "source": "cloudwatch_alarm" or "stepfunctions",
+#     "source": "cloudwatch_alarm" / "cloudwatch_composite_alarm" / "stepfunctions" / "ecs_task" / "batch_job" / "unknown",
 #     "alarm_name": ...,
 #     "new_state": ...,
 #     "reason": ...,
@@ -58,103 +198,283 @@ REQUIRED_SECRET_KEYS = [
 
 # ========= 1. ロガー / HTTP / Secrets =========
 
-def _load_jira_secret() -> dict:
+# 初回利用時に作る（作成済みかどうかは .value で確認できる）
+_http_client = LazyClient(lambda: HttpClient(
+    JIRA_MAX_CONNECTIONS_PER_HOST,
+    block=JIRA_HTTP_POOL_BLOCK,
+    tcp_keepalive_seconds=JIRA_TCP_KEEPALIVE_SECONDS,
+    max_idle_seconds=JIRA_CONNECTION_MAX_IDLE_SECONDS,
+    on_connect=lambda ms: emf_metrics.record_connect(ms),
+    on_reconnect=lambda: emf_metrics.increment("StaleReconnects"),
+))
+_secrets_client = LazyClient(lambda: create_boto3_client("secretsmanager"))
+_sqs_client = LazyClient(lambda: create_boto3_client("sqs"))  # sqs_handler で再配信を遅らせるときだけ使う
+
+_get_http = _http_client.get
+_get_secrets_client = _secrets_client.get
+_get_sqs_client = _sqs_client.get
+
+
+if not JIRA_LAZY_INIT:
+    _get_http()
+    _get_secrets_client()
+
+
+# ===== 構造化ログ =====
+_LOG_ENCODER = json.JSONEncoder(ensure_ascii=False, default=str)
+_TRUNCATED = "...(truncated)"
+
+
+def _truncate(text: str, max_chars: int | None = None) -> str:
+    if max_chars is None:
+        max_chars = JIRA_LOG_FIELD_MAX_CHARS
+    if max_chars and len(text) > max_chars:
+        return text[:max_chars] + _TRUNCATED
+    return text
+
+
+def _json_prefix(value, max_chars: int | None = None) -> tuple[str, bool]:
+    """
+    value を JSON にして (文字列, 切り詰めたか) を返す（max_chars の既定は JIRA_LOG_FIELD_MAX_CHARS）。
+    max_chars を超えた時点でシリアライズをやめるので、大きなイベントでも全体の文字列は作らない。
+    """
+    if max_chars is None:
+        max_chars = JIRA_LOG_FIELD_MAX_CHARS
+    if not max_chars:
+        return _LOG_ENCODER.encode(value), False
+    chunks, size = [], 0
+    for chunk in _LOG_ENCODER.iterencode(value):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size > max_chars:
+            return "".join(chunks)[:max_chars] + _TRUNCATED, True
+    return "".join(chunks), False
+
+
+class LazyJSON:
     """
-    Secrets Manager から Jira 設定を取得し、プロセス内でキャッシュする。
-    期待する Secret の JSON 例:
+    ログの引数に渡すと、実際に出力されるときに初めて JSON にする（レベルで捨てられるなら何もしない）。
+    """
+    __slots__ = ("value", "max_chars")
 
-    {
-      "JIRA_BASE_URL": "https://xxx.atlassian.net",
-      "JIRA_EMAIL": "user@example.com",
-      "JIRA_API_TOKEN": "xxxx...",
-      "JIRA_PROJECT_KEY": "TEST",
-      "JIRA_ISSUE_TYPE": "Incident"          # name 指定版
-      // or "JIRA_ISSUE_TYPE_ID": "10001"    # id 指定版
-    }
+    def __init__(self, value, max_chars: int | None = None):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        return _json_prefix(self.value, self.max_chars)[0]
+
+
+class _LogFields:
+    """text 形式で fields を key=value で出す（出力されるときに初めて文字列にする）"""
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: dict):
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return " ".join(
+            f"{name}={_truncate(value) if isinstance(value, str) else _json_prefix(value)[0]}"
+            for name, value in self.fields.items()
+        )
+
+
+def log_fields(level: int, message: str, **fields) -> None:
     """
-    global _secret_cache
-    if _secret_cache is not None:
-        return _secret_cache
+    メッセージとフィールドを1件のログにする。レベルで捨てられるならフィールドには触れない。
+    JIRA_LOG_FORMAT=json ならフィールドは JSON のトップレベルのキー、text なら message の後ろに key=value で出す。
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, "%s %s", message, _LogFields(fields),
+                   extra={"log_message": message, "log_fields": fields})
 
-    try:
-        res = _secrets_client.get_secret_value(SecretId=JIRA_SECRET_NAME)
-        secret_str = res.get("SecretString", "{}")
-        secret = json.loads(secret_str)
 
-    except (BotoCoreError, ClientError) as e:
-        logger.error(f"Failed to load secret {JIRA_SECRET_NAME}: {e}")
-        raise RuntimeError(f"Could not retrieve secret {JIRA_SECRET_NAME}") from e
+def _log_value(value):
+    """json 形式のログに載せる値（長い文字列・大きい構造は切り詰めた文字列にする）"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return _truncate(value)
+    if isinstance(value, LazyJSON):
+        return str(value)
+    text, truncated = _json_prefix(value)
+    return text if truncated else value
+
+
+class JsonLogFormatter(logging.Formatter):
+    """
+    1行1 JSON の構造化ログにする（JIRA_LOG_FORMAT=json）。
+    log_fields() で渡したフィールドはトップレベルのキーになる。
+    """
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "log_fields", None)
+        doc = {
+            "timestamp": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "message": _truncate(record.log_message if fields is not None else record.getMessage()),
+        }
+        request_id = getattr(record, "aws_request_id", None)
+        if request_id:
+            doc["requestId"] = request_id
+        if fields:
+            for name, value in fields.items():
+                doc.setdefault(name, _log_value(value))
+        if record.exc_info:
+            doc["exception"] = _truncate(self.formatException(record.exc_info))
+        return json.dumps(doc, ensure_ascii=False, default=str, separators=(",", ":"))
 
-    # 必須キーが揃っているかチェック
-    missing_keys = [key for key in REQUIRED_SECRET_KEYS if key not in secret]
-    if missing_keys:
-        logger.error(f"Missing required keys in secret {JIRA_SECRET_NAME}: {missing_keys}")
-        raise RuntimeError(f"Missing required keys in secret {JIRA_SECRET_NAME}: {missing_keys}")
 
-    # キャッシュして返す
-    _secret_cache = secret
-    logger.info(f"Loaded Jira config from Secrets Manager: {JIRA_SECRET_NAME}")
-    return _secret_cache
+if JIRA_LOG_FORMAT == "json":
+    if not logger.handlers:
+        logger.addHandler(logging.StreamHandler())
+    for _handler in logger.handlers:
+        _handler.setFormatter(JsonLogFormatter())
 
 
-def _jira_auth_header(secret: dict) -> dict:
+def _log_received_event(event) -> None:
     """
-    Jira 用の Basic 認証ヘッダを作成
+    受信イベントをログに出す。
+    既定では件数・MessageId・メッセージの合計サイズだけにして、全文は JIRA_LOG_EVENT_SAMPLE_RATE の割合
+    （または DEBUG レベル）のときだけ出す。全文も JIRA_LOG_FIELD_MAX_CHARS で切り詰める。
     """
-    token = f"{secret['JIRA_EMAIL']}:{secret['JIRA_API_TOKEN']}"
-    b64 = base64.b64encode(token.encode("utf-8")).decode("utf-8")
-    return {
-        "Authorization": f"Basic {b64}",
-        "Content-Type": "application/json",
-    }
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    if logger.isEnabledFor(logging.DEBUG) or (
+        JIRA_LOG_EVENT_SAMPLE_RATE > 0 and random.random() < JIRA_LOG_EVENT_SAMPLE_RATE
+    ):
+        logger.info("Received event: %s", LazyJSON(event))
+        return
+    records = event.get("Records") if isinstance(event, dict) else None
+    records = records if isinstance(records, list) else []
+    message_ids, message_chars = [], 0
+    for record in records:
+        sns = record.get("Sns") if isinstance(record, dict) else None
+        if not isinstance(sns, dict):
+            continue
+        message = sns.get("Message")
+        message_chars += len(message) if isinstance(message, str) else 0
+        if len(message_ids) < 10:
+            message_ids.append(sns.get("MessageId"))
+    log_fields(logging.INFO, "Received event", records=len(records),
+               message_ids=message_ids, message_chars=message_chars)
+
+
+# ===== メトリクス（EMF） =====
+emf_metrics = Metrics(JIRA_METRICS_NAMESPACE, JIRA_METRICS_ENABLED)
 
+# ハンドラ全体の時間を handler フェーズとして記録し、終わったらレートリミッタの状態を記録して EMF を書き出す
+_with_metrics = emf_metrics.handler(on_finish=lambda: _report_rate_limiter())
 
-# ===== 既存チケット検索（重複起票防止） =====
-def _find_existing_issue_by_summary(secret: dict, summary: str) -> str | None:
+
+def _fetch_jira_secret(client=None) -> dict:
     """
-    指定した summary を持つ未解決の Jira Issue が存在するか検索し、
-    存在すれば Issue Key を返す。なければ None を返す。
+    Secrets Manager から Jira 設定を取得する（キャッシュはしない。SecretCache の loader）。
     """
-    base_url = secret["JIRA_BASE_URL"].rstrip("/")
-    project_key = secret["JIRA_PROJECT_KEY"]
+    return fetch_secret(client or _get_secrets_client(), JIRA_SECRET_NAME, REQUIRED_SECRET_KEYS)
+
+
+# 一度取得した secret を Lambda コンテナ内でキャッシュ
+jira_secret_cache = SecretCache(
+    _fetch_jira_secret,
+    ttl_seconds=JIRA_SECRET_TTL_SECONDS,
+    refresh_ahead_seconds=JIRA_SECRET_REFRESH_AHEAD_SECONDS,
+    jitter_seconds=JIRA_SECRET_REFRESH_JITTER_SECONDS,
+)
+
 
-    # statusCategory != Done で未解決チケットを絞り込む
-    jql = (
-        f'project = "{project_key}" '
-        f' AND summary ~ "{summary}" '
-        f'AND statusCategory != Done '
-        f' ORDER BY created DESC'
+def _load_jira_secret() -> dict:
+    """
+    Jira 設定（Secret）をキャッシュ経由で取得する。
+    """
+    return jira_secret_cache.get()
+
+
+jira_backpressure = Backpressure(JIRA_BACKPRESSURE_SECONDS, JIRA_BACKPRESSURE_MAX_SECONDS)
+
+
+jira_rate_limiter = RateLimiter(
+    JIRA_RATE_LIMIT_PER_SECOND or None,
+    JIRA_RATE_LIMIT_BURST,
+    increase=JIRA_RATE_LIMIT_INCREASE,
+    min_rate=JIRA_RATE_LIMIT_MIN_PER_SECOND,
+    max_rate=JIRA_RATE_LIMIT_MAX_PER_SECOND,
+)
+
+
+def _report_rate_limiter() -> None:
+    """
+    この呼び出しでのレート・待ち行列の最大長・待ち時間をログと EMF に出す
+    （429 の数は send_rate_limited が Throttled として数えている）
+    """
+    if not JIRA_RATE_LIMIT_ENABLED:
+        return
+    window = jira_rate_limiter.take_window()
+    logger.info("Jira rate limiter: %s", window)
+    emf_metrics.record_rate_limiter(window)
+
+
+def _http_request(method: str, url: str, body: bytes | None, headers: dict):
+    """
+    HTTP リクエストを送る。
+    - 送信前に jira_rate_limiter のトークンを取り、レスポンスでレートを調整する
+    - 429 で Retry-After が短ければ待ってやり直す（JIRA_RATE_LIMIT_MAX_RETRIES 回まで）
+    - それでも Jira が過負荷（429 / 5xx / 接続失敗）なら jira_backpressure に記録する
+    """
+    return send_rate_limited(
+        _get_http().request, method, url, body, headers,
+        limiter=jira_rate_limiter if JIRA_RATE_LIMIT_ENABLED else None,
+        max_retries=JIRA_RATE_LIMIT_MAX_RETRIES,
+        max_wait_seconds=JIRA_RATE_LIMIT_MAX_WAIT_SECONDS,
+        backpressure=jira_backpressure,
+        metrics=emf_metrics,
     )
 
-    url = f"{base_url}/rest/api/3/search/jql"
-    payload = {
-        "jql": jql,
-        "maxResults": 1,
-        "fields": ["key"],
-    }
 
+jira_gzip = GzipTransport(JIRA_GZIP_REQUESTS, JIRA_GZIP_MIN_BYTES)
 
-    headers = _jira_auth_header(secret)
-    encoded_body = json.dumps(payload).encode("utf-8")
 
-    logger.info("Searching existing Jira issue with JQL: %s", jql)
-    resp = http.request("POST", url, headers=headers, body=encoded_body)
+def _send_jira(method: str, url: str, body: bytes | None, headers: dict):
+    """ボディを（有効なら）gzip にして _http_request で送る"""
+    return jira_gzip.send(_http_request, method, url, body, headers)
 
-    if resp.status >= 300:
-        # 重複チェックに失敗しても「起票自体は試みる」ため、ここで例外を投げるのではなくログだけのこしてNoneを返す
-        try:
-            body_str = resp.data.decode("utf-8")
-        except Exception:
-            body_str = str(resp.data)
-        logger.error("Failed to search Jira issues: %s %s", resp.status, body_str)
-        raise Exception(f"Jira API error: {resp.status}")
-
-    data = json.loads(resp.data.decode("utf-8"))
-    issues = data.get("issues", [])
-    if not issues:
-        return None
 
-    return issues[0].get("key")
+def _jira_request(secret: dict, method: str, path: str, body: bytes | None = None):
+    """
+    Jira REST API を1回呼び出してレスポンスを返す（ステータスの判定は呼び出し側）。
+    401 が返った場合はトークンがローテーションされたとみなし、Secret を取り直して1回だけやり直す。
+    """
+    return request_with_secret_refresh(
+        _send_jira, jira_secret_cache, secret, method, path, body,
+        on_retry=lambda: emf_metrics.increment("Retries"),
+    )
+
+
+# ===== 既存チケットの追跡（重複チェック・起票・コメント・解決。incident_core.issues）=====
+issue_tracker = IssueTracker(
+    _jira_request,
+    # 重複チェックキャッシュ（summary → 未解決 Issue Key）
+    create_dedup_cache(JIRA_DEDUP_CACHE_TTL_SECONDS, JIRA_DEDUP_CACHE_MAX_ENTRIES, JIRA_DEDUP_TABLE_NAME),
+    # アラーム（発報時の summary）→ 発報中チケットの対応（復旧時に検索せずに解決するため）
+    DedupCache(JIRA_OPEN_ISSUE_CACHE_TTL_SECONDS, JIRA_DEDUP_CACHE_MAX_ENTRIES),
+    verify_on_hit=JIRA_DEDUP_VERIFY_ON_HIT,
+    search_on_miss=JIRA_RESOLVE_SEARCH_ON_MISS,
+    transition_id=JIRA_RESOLVE_TRANSITION_ID,
+    metrics=emf_metrics,
+)
+
+# ===== 処理済みメッセージの台帳 =====
+idempotency_ledger = create_idempotency_ledger(
+    JIRA_IDEMPOTENCY_TTL_SECONDS, JIRA_IDEMPOTENCY_MAX_ENTRIES, JIRA_IDEMPOTENCY_TABLE_NAME,
+)
+
+
+def _serialize_raw_message(message, max_chars: int | None = None) -> str:
+    """
+    生の SNS メッセージをコードブロック用の文字列にする（既定の上限は JIRA_RAW_MESSAGE_MAX_CHARS）。
+    """
+    return serialize_raw_message(message, JIRA_RAW_MESSAGE_MAX_CHARS if max_chars is None else max_chars)
 
 
 # ===== 既存チケットへのコメント用 ADF =====
@@ -167,23 +487,14 @@ def _build_comment_adf(
     metric_name: str,
     region: str,
     lambda_name: str,
-) -> dict:
+) -> RawJSON:
     """
     Jira Cloud が期待する ADF(Atlassian Document Format) に変換。
     シンプルに「プレーンテキスト1段落」として送る。
     発報タイミング、State、Reason を含むコメントを作成
+    （骨組みは incident_core.adf.COMMENT_TEMPLATE で固定。値だけ差し込む）
     """
-    text_lines = [
-        "*Alarm Fired Again*",
-        f"- State: {new_state}",
-        f"- Time: {timestamp}",
-        f"- Lambda: {lambda_name or 'N/A'}",
-        f"- Metric: {namespace} / {metric_name}",
-        f"- Region: {region}",
-        f"- Reason: {reason}",
-        "",
-        "This alarm was triggered again and appended by AWS Lambda.",
-    ]
+    return build_comment_adf(new_state, reason, timestamp, namespace, metric_name, region, lambda_name)
 
     # text = f"CloudWatch alarm '{summary}' fired again. Appended by AWS Lambda."
     # return {
@@ -196,53 +507,159 @@ def _build_comment_adf(
     #         }
     #     ],
     # }
-    # ADF の paragraph ノードに変換
-    return {
-        "type": "doc",
-        "version": 1,
-        "content": [
-            {
-                "type": "paragraph",
-                "content": [{"type": "text", "text": line + "\n"} for line in text_lines]
-            }
-        ]
-    }
 
 #===== 既存チケットへのコメント追加 =====
 def _add_comment_to_issue(secret: dict, issue_key: str, summary: str, new_state: str,
                           reason: str, timestamp: str, namespace: str, metric_name: str,
-                          region: str, lambda_name: str) -> None:
+                          region: str, lambda_name: str) -> bool:
     """
     既存の Jira 課題(issue_key)にコメントを1件追加する。
+    追加できたかどうかを返す（バッチモードのレコード単位の結果に利用）。
+    """
+    comment_adf = _build_comment_adf(
+        summary, new_state, reason, timestamp,
+        namespace, metric_name, region, lambda_name
+    )
+    return _post_comment(secret, issue_key, comment_adf)
+
+
+def _post_comment(secret: dict, issue_key: str, comment_adf: dict | RawJSON) -> bool:
+    """
+    組み立て済みの ADF を既存の Jira 課題(issue_key)にコメントとして POST する。
+    """
+    return issue_tracker.post_comment(secret, issue_key, comment_adf)
+
+
+# ===== アラームストーム対策：コメントの集約 =====
+def _build_aggregated_comment_adf(summary: str, incidents: list[dict]) -> RawJSON:
+    """
+    ウィンドウ内にまとめた複数回の発報を1件のコメント(ADF)にする。
+    回数・最初/最後の発報時刻・重複を除いた Reason を載せる。
+    """
+    timestamps = sorted(i["timestamp"] for i in incidents if i["timestamp"])
+    reasons = list(dict.fromkeys(i["reason"] for i in incidents if i["reason"]))
+    last = incidents[-1]
+
+    text_lines = [
+        f"*Alarm Fired {len(incidents)} Times*",
+        f"- State: {last['new_state']}",
+        f"- First: {timestamps[0] if timestamps else 'N/A'}",
+        f"- Last: {timestamps[-1] if timestamps else 'N/A'}",
+        f"- Lambda: {last['lambda_name'] or 'N/A'}",
+        f"- Metric: {last['namespace']} / {last['metric_name']}",
+        f"- Region: {last['region']}",
+        f"- Reasons ({len(reasons)} distinct):",
+        *[f"  - {r}" for r in reasons],
+        "",
+        "These occurrences were coalesced into one comment by AWS Lambda.",
+    ]
+
+    return _adf_paragraph(text_lines)
+
+
+coalescing_buffer = create_coalescing_buffer(
+    JIRA_COALESCE_WINDOW_SECONDS, JIRA_COALESCE_TABLE_NAME, JIRA_COALESCE_FLUSH_INTERVAL_SECONDS,
+)
+
+
+def _post_occurrences(secret: dict, issue_key: str, summary: str, occurrences: list[dict]) -> bool:
+    """
+    溜まっていた発報をチケットに1件のコメントとして送る（1件だけなら通常のコメント）。
+    """
+    if len(occurrences) == 1:
+        o = occurrences[0]
+        return _add_comment_to_issue(
+            secret, issue_key, summary,
+            o["new_state"], o["reason"], o["timestamp"],
+            o["namespace"], o["metric_name"], o["region"], o["lambda_name"],
+        )
+    return _post_comment(secret, issue_key, _build_aggregated_comment_adf(summary, occurrences))
+
+
+def _open_coalescing_window(summary: str, issue_key: str) -> None:
+    """
+    Jira に書き込んだ直後に呼び、以降 JIRA_COALESCE_WINDOW_SECONDS の間の発報を溜めるようにする。
     """
-    base_url = secret["JIRA_BASE_URL"].rstrip("/")
-    url = f"{base_url}/rest/api/3/issue/{issue_key}/comment"
+    if coalescing_buffer.enabled:
+        coalescing_buffer.open(summary, issue_key)
 
-    body = {
-        "body": _build_comment_adf(
-            summary, new_state, reason, timestamp,
-            namespace, metric_name, region, lambda_name
+
+def _comment_or_coalesce(secret: dict, issue_key: str, summary: str, incident: dict,
+                         flush_before_return: bool = False) -> tuple[bool, str]:
+    """
+    既存チケットへの発報を1件処理する。戻り値は (成功したか, "commented" / "coalesced")。
+    - 集約ウィンドウが開いていれば溜めるだけで Jira には書かない
+    - ウィンドウが閉じていれば、溜まっていた分と今回分をまとめて1件のコメントにする
+    - ウィンドウがなければ通常どおり1件コメントし、ウィンドウを開く
+    溜めたレコードも成功として ack・台帳に記録されるので、溜めるのは共有ストア（JIRA_COALESCE_TABLE_NAME）がある場合か、
+    呼び出し側が返す前に _flush_pending_occurrences() で送る場合（flush_before_return=True）だけ。
+    """
+    if not coalescing_buffer.enabled or not (coalescing_buffer.durable or flush_before_return):
+        ok = _add_comment_to_issue(
+            secret, issue_key, summary,
+            incident["new_state"], incident["reason"],
+            incident["timestamp"], incident["namespace"],
+            incident["metric_name"], incident["region"],
+            incident["lambda_name"],
         )
-    }
+        return ok, "commented"
 
-    headers = _jira_auth_header(secret)
-    encoded_body = json.dumps(body).encode("utf-8")
+    occurrences = coalescing_buffer.add(summary, issue_key, incident)
+    if occurrences is None:
+        logger.info("Coalesced occurrence into issue %s", issue_key)
+        return True, "coalesced"
 
-    logger.info("Adding comment to existing issue %s", issue_key)
-    resp = http.request("POST", url, body=encoded_body, headers=headers)
+    ok = _post_occurrences(secret, issue_key, summary, occurrences)
+    if not ok:
+        # 今回分は失敗として返してリトライさせる。溜まっていた分は戻して後でまとめて送る
+        coalescing_buffer.restore(summary, issue_key, occurrences[:-1])
+    return ok, "commented"
 
-    if resp.status >= 300:
-        try:
-            body_str = resp.data.decode("utf-8")
-        except Exception:
-            body_str = str(resp.data)
-        logger.error("Failed to add comment to issue %s: %s %s", issue_key, resp.status, body_str)
-        # コメント失敗しても致命的ではないので、raise はせずログだけ残す
-        return
 
-    logger.info("Comment added to issue %s", issue_key)
+def _flush_expired_coalescing_windows(secret: dict | None = None) -> int:
+    """
+    ウィンドウが閉じたのにまだ送っていない発報を、チケットごとに1件のコメントにまとめて送る。
+    ハンドラーの先頭で呼び、ストームが収まった summary の溜まり分を取りこぼさないようにする。
+    送れなかった分は戻して次の呼び出しで送り直す。戻り値は送ったコメント数。
+    """
+    if not coalescing_buffer.enabled:
+        return 0
+
+    sent = 0
+    for summary, issue_key, occurrences in coalescing_buffer.take_expired():
+        secret = secret or _load_jira_secret()
+        if _post_occurrences(secret, issue_key, summary, occurrences):
+            sent += 1
+        else:
+            coalescing_buffer.restore(summary, issue_key, occurrences)
+    return sent
 
 
+def _flush_pending_occurrences(secret: dict | None = None) -> set[str]:
+    """
+    コンテナ内に溜めた発報（共有ストアがない場合）を、呼び出しを返す前にチケットごとに1件のコメントにまとめて送る。
+    送れなかった summary を返す（呼び出し側はその summary の "coalesced" のレコードを失敗にしてリトライさせる）。
+    """
+    if not coalescing_buffer.enabled:
+        return set()
+
+    unsent = set()
+    for summary, issue_key, occurrences in coalescing_buffer.take_pending():
+        secret = secret or _load_jira_secret()
+        if not _post_occurrences(secret, issue_key, summary, occurrences):
+            unsent.add(summary)
+    return unsent
+
+
+def _close_coalescing_window(secret: dict, summary: str) -> None:
+    """
+    summary の集約ウィンドウを閉じる。溜まっていた発報があれば、チケットを解決する前にまとめて送る。
+    """
+    if not coalescing_buffer.enabled:
+        return
+    taken = coalescing_buffer.take(summary)
+    if taken and taken[1] and not _post_occurrences(secret, taken[0], summary, taken[1]):
+        coalescing_buffer.restore(summary, taken[0], taken[1])
 
 
 # def _to_adf(text: str) -> dict:
@@ -265,30 +682,48 @@ def _add_comment_to_issue(secret: dict, issue_key: str, summary: str, new_state:
 
 # ========= 2. 共通インシデント変換レイヤー =========
 
-# ===== CloudWatch アラームインシデント変換レイヤー =====
-def _build_incident_from_cloudwatch(message: dict, sns: dict) -> dict:
+# ===== インシデント種別ごとのパーサー登録 =====
+# (EventBridge の source, detail-type) → パーサー関数 (message, sns) -> incident
+# detail-type を None で登録したものは、その source の既定パーサーになる
+_INCIDENT_PARSERS: dict = {}
+
+# SNS 経由の CloudWatch アラーム通知は source / detail-type を持たないので、擬似的な detail-type で登録する
+CLOUDWATCH_ALARM_NOTIFICATION = ("aws.cloudwatch", "CloudWatch Alarm Notification")
+CLOUDWATCH_COMPOSITE_ALARM_NOTIFICATION = ("aws.cloudwatch", "CloudWatch Composite Alarm Notification")
+
+
+def incident_parser(source: str, detail_type: str | None = None):
     """
-    CloudWatch アラームの SNS メッセージから共通インシデント情報を組み立てる
+    インシデント種別のパーサーを登録するデコレータ。
+    新しい種別を増やすときは、パーサー関数を書いてこれを付けるだけでよい（_build_incident の変更は不要）。
     """
-    alarm_name = message.get("AlarmName", "UnknownAlarm")
-    new_state = message.get("NewStateValue", "UNKNOWN")
-    reason = message.get("NewStateReason", "")
-    region = message.get("Region", "unknown")
-    trigger = message.get("Trigger", {})
+    def register(func):
+        _INCIDENT_PARSERS[(source, detail_type)] = func
+        return func
+    return register
 
-    metric_name = trigger.get("MetricName", "Errors")
-    namespace = trigger.get("Namespace", "AWS/Lambda")
-    dimensions = trigger.get("Dimensions", [])
 
-    lambda_name = None
-    for d in dimensions:
-        if d.get("name") == "FunctionName":
-            lambda_name = d.get("value")
+def _as_dict(value) -> dict:
+    """型が想定と違うフィールドで落ちないよう、dict 以外は空 dict として扱う"""
+    return value if isinstance(value, dict) else {}
+
+
+def _as_list(value) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _text(value, default: str = "") -> str:
+    """文字列フィールドを取り出す（欠損・null は default、数値などは文字列化）"""
+    if value is None or value == "":
+        return default
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
 
-    timestamp = message.get("StateChangeTime") or sns.get("Timestamp", "")
 
+def _incident(source: str, alarm_name: str, new_state: str, reason: str, region: str,
+              namespace: str, metric_name: str, lambda_name: str | None, timestamp: str,
+              message) -> dict:
     return {
-        "source": "cloudwatch_alarm",
+        "source": source,
         "alarm_name": alarm_name,
         "new_state": new_state,
         "reason": reason,
@@ -297,205 +732,274 @@ def _build_incident_from_cloudwatch(message: dict, sns: dict) -> dict:
         "metric_name": metric_name,
         "lambda_name": lambda_name,
         "timestamp": timestamp,
-        "raw_message": message,
-    }    
+        "raw_message": message,  # 元のJSONそのまま
+    }
+
+
+# ===== CloudWatch アラームインシデント変換レイヤー =====
+@incident_parser(*CLOUDWATCH_ALARM_NOTIFICATION)
+def _build_incident_from_cloudwatch(message: dict, sns: dict) -> dict:
+    """
+    CloudWatch アラームの SNS メッセージから共通インシデント情報を組み立てる
+    """
+    trigger = _as_dict(message.get("Trigger"))
+
+    lambda_name = None
+    for d in _as_list(trigger.get("Dimensions")):
+        d = _as_dict(d)
+        if d.get("name") == "FunctionName":
+            lambda_name = _text(d.get("value")) or None
+
+    return _incident(
+        "cloudwatch_alarm",
+        alarm_name=_text(message.get("AlarmName"), "UnknownAlarm"),
+        new_state=_text(message.get("NewStateValue"), "UNKNOWN"),
+        reason=_text(message.get("NewStateReason")),
+        region=_text(message.get("Region"), "unknown"),
+        namespace=_text(trigger.get("Namespace"), "AWS/Lambda"),
+        metric_name=_text(trigger.get("MetricName"), "Errors"),
+        lambda_name=lambda_name,
+        timestamp=_text(message.get("StateChangeTime")) or _text(sns.get("Timestamp")),
+        message=message,
+    )
+
+
+@incident_parser(*CLOUDWATCH_COMPOSITE_ALARM_NOTIFICATION)
+def _build_incident_from_composite_alarm(message: dict, sns: dict) -> dict:
+    """
+    CloudWatch 複合アラーム（Composite Alarm）の SNS メッセージから共通インシデント情報を組み立てる。
+    メトリクスを持たないので、アラームルールと発火した子アラームを reason に載せる。
+    """
+    reason = _text(message.get("NewStateReason"))
+    children = [
+        _text(_as_dict(c).get("Arn")).rsplit(":", 1)[-1]
+        for c in _as_list(message.get("TriggeringChildren"))
+    ]
+    if children and not reason:
+        reason = "Triggered by: " + ", ".join(c for c in children if c)
+    rule = _text(message.get("AlarmRule"))
+    if rule:
+        reason = f"{reason}\nRule: {rule}" if reason else f"Rule: {rule}"
+
+    return _incident(
+        "cloudwatch_composite_alarm",
+        alarm_name=_text(message.get("AlarmName"), "UnknownAlarm"),
+        new_state=_text(message.get("NewStateValue"), "UNKNOWN"),
+        reason=reason,
+        region=_text(message.get("Region"), "unknown"),
+        namespace="AWS/CloudWatch",
+        metric_name="CompositeAlarm",
+        lambda_name=None,
+        timestamp=_text(message.get("StateChangeTime")) or _text(sns.get("Timestamp")),
+        message=message,
+    )
+
+
+@incident_parser("aws.cloudwatch", "CloudWatch Alarm State Change")
+def _build_incident_from_cloudwatch_event(message: dict, sns: dict) -> dict:
+    """
+    EventBridge 経由の CloudWatch Alarm State Change（メトリクスアラーム・複合アラーム共通）
+    """
+    detail = _as_dict(message.get("detail"))
+    state = _as_dict(detail.get("state"))
+    configuration = _as_dict(detail.get("configuration"))
+    common = {
+        "alarm_name": _text(detail.get("alarmName"), "UnknownAlarm"),
+        "new_state": _text(state.get("value"), "UNKNOWN"),
+        "region": _text(message.get("region"), "unknown"),
+        "timestamp": _text(state.get("timestamp")) or _text(message.get("time")) or _text(sns.get("Timestamp")),
+        "message": message,
+    }
+
+    rule = _text(configuration.get("alarmRule"))
+    if rule:
+        reason = _text(state.get("reason"))
+        return _incident(
+            "cloudwatch_composite_alarm",
+            reason=f"{reason}\nRule: {rule}" if reason else f"Rule: {rule}",
+            namespace="AWS/CloudWatch",
+            metric_name="CompositeAlarm",
+            lambda_name=None,
+            **common,
+        )
+
+    metrics = _as_list(configuration.get("metrics"))
+    metric = _as_dict(_as_dict(_as_dict(metrics[0] if metrics else None).get("metricStat")).get("metric"))
+    return _incident(
+        "cloudwatch_alarm",
+        reason=_text(state.get("reason")),
+        namespace=_text(metric.get("namespace"), "AWS/Lambda"),
+        metric_name=_text(metric.get("name"), "Errors"),
+        lambda_name=_text(_as_dict(metric.get("dimensions")).get("FunctionName")) or None,
+        **common,
+    )
+
 
 # ===== Step Functions インシデント変換レイヤー =====
+@incident_parser("aws.states")
 def _build_incident_from_stepfunctions(message: dict, sns: dict) -> dict:
     """
     Step Functions の Execution Status Change イベントから共通インシデント情報を組み立てる。
     """
-    detail = message.get("detail", {})
+    detail = _as_dict(message.get("detail"))
 
     # 代表的なフィールド
-    state_machine_name = detail.get("name", "UnknownStateMachine")
-    status = detail.get("status", "UNKNOWN")  # FAILED / RUNNING / SUCCEEDED ...
-    error = detail.get("error") or detail.get("cause", "")
-
-    region = message.get("region", "unknown")
-    timestamp = message.get("time", "") or sns.get("Timestamp", "")
+    status = _text(detail.get("status"), "UNKNOWN")  # FAILED / RUNNING / SUCCEEDED ...
+
+    # CloudWatch用のフィールドに寄せる（lambda_name はステートマシンなので空）
+    return _incident(
+        "stepfunctions",
+        alarm_name=_text(detail.get("name"), "UnknownStateMachine"),
+        new_state=status,
+        reason=_text(detail.get("error")) or _text(detail.get("cause")),
+        region=_text(message.get("region"), "unknown"),
+        namespace="AWS/States",
+        metric_name="ExecutionFailed" if status == "FAILED" else "ExecutionStatus",
+        lambda_name=None,
+        timestamp=_text(message.get("time")) or _text(sns.get("Timestamp")),
+        message=message,
+    )
 
-    # CloudWatch用のフィールドに寄せる
-    alarm_name = state_machine_name
-    new_state = status
-    reason = error
-    namespace = "AWS/States"
-    metric_name = "ExecutionFailed" if status == "FAILED" else "ExecutionStatus"
-    lambda_name = None  # ここはステートマシンなので空
 
-    return {
-        "source": "stepfunctions",
-        "alarm_name": alarm_name,
-        "new_state": new_state,
-        "reason": reason,
-        "region": region,
-        "namespace": namespace,
-        "metric_name": metric_name,
-        "lambda_name": lambda_name,
-        "timestamp": timestamp,
-        "raw_message": message,
-    }
+# ===== ECS インシデント変換レイヤー =====
+@incident_parser("aws.ecs", "ECS Task State Change")
+def _build_incident_from_ecs_task(message: dict, sns: dict) -> dict:
+    """
+    ECS Task State Change（主に STOPPED）から共通インシデント情報を組み立てる。
+    alarm_name は「クラスター名/サービス名（なければタスク定義名）」にする。
+    """
+    detail = _as_dict(message.get("detail"))
+    status = _text(detail.get("lastStatus"), "UNKNOWN")
+    cluster = _text(detail.get("clusterArn"), "unknown").rsplit("/", 1)[-1]
+    group = _text(detail.get("group"))  # "service:order-api" / "family:batch-task"
+    name = group.split(":", 1)[-1] or _text(detail.get("taskDefinitionArn"), "UnknownTask").rsplit("/", 1)[-1]
+
+    reasons = [_text(detail.get("stoppedReason"))]
+    for container in _as_list(detail.get("containers")):
+        container = _as_dict(container)
+        exit_code = container.get("exitCode")
+        if exit_code not in (None, 0) or container.get("reason"):
+            reasons.append(
+                f"{_text(container.get('name'), 'container')}: exitCode={_text(exit_code, '-')} "
+                f"{_text(container.get('reason'))}".rstrip()
+            )
+
+    return _incident(
+        "ecs_task",
+        alarm_name=f"{cluster}/{name}",
+        new_state=status,
+        reason="\n".join(r for r in reasons if r),
+        region=_text(message.get("region"), "unknown"),
+        namespace="AWS/ECS",
+        metric_name="TaskStopped" if status == "STOPPED" else "TaskStatus",
+        lambda_name=None,
+        timestamp=_text(detail.get("stoppedAt")) or _text(message.get("time")) or _text(sns.get("Timestamp")),
+        message=message,
+    )
 
 
-def _build_incident(message: dict, sns: dict) -> dict:
+# ===== AWS Batch インシデント変換レイヤー =====
+@incident_parser("aws.batch", "Batch Job State Change")
+def _build_incident_from_batch_job(message: dict, sns: dict) -> dict:
     """
-    SNS メッセージの中身から「どの種別のイベントか」を判定し、
-    共通インシデント情報(dict)に変換する。
-    将来的に ECS / Batch 等の種別を増やす場合はここに分岐を足す。
+    AWS Batch の Job State Change（主に FAILED）から共通インシデント情報を組み立てる。
     """
-    # CloudWatch Alarm 判定：AlarmName/NewStateValue があればほぼ確実にこれ
-    if "AlarmName" in message and "NewStateValue" in message:
-        return _build_incident_from_cloudwatch(message, sns)
+    detail = _as_dict(message.get("detail"))
+    status = _text(detail.get("status"), "UNKNOWN")
+    container = _as_dict(detail.get("container"))
+
+    reasons = [_text(detail.get("statusReason"))]
+    if container.get("exitCode") not in (None, 0) or container.get("reason"):
+        reasons.append(f"exitCode={_text(container.get('exitCode'), '-')} {_text(container.get('reason'))}".rstrip())
+
+    return _incident(
+        "batch_job",
+        alarm_name=_text(detail.get("jobName"), "UnknownJob"),
+        new_state=status,
+        reason="\n".join(r for r in reasons if r),
+        region=_text(message.get("region"), "unknown"),
+        namespace="AWS/Batch",
+        metric_name="JobFailed" if status == "FAILED" else "JobStatus",
+        lambda_name=None,
+        timestamp=_text(message.get("time")) or _text(sns.get("Timestamp")),
+        message=message,
+    )
 
-    # Step Functions 判定：source/detail-type で判定
-    source = message.get("source", "")
-    detail_type = message.get("detail-type", "")
 
-    if source == "aws.states" or "Step Functions Execution Status Change" in detail_type:
-        return _build_incident_from_stepfunctions(message, sns)
+def _build_generic_incident(message, sns: dict) -> dict:
+    """
+    どのパーサーにも当てはまらなかったメッセージを汎用的な形で入れておく
+    """
+    event = _as_dict(message)
+    return _incident(
+        "unknown",
+        alarm_name=_text(event.get("detail-type"), "UnknownEvent"),
+        new_state=_text(_as_dict(event.get("detail")).get("status"), "UNKNOWN"),
+        reason="",
+        region=_text(event.get("region"), "unknown"),
+        namespace="Generic",
+        metric_name="GenericEvent",
+        lambda_name=None,
+        timestamp=_text(event.get("time")) or _text(sns.get("Timestamp")),
+        message=message,
+    )
 
-    # どれにも当てはまらなかった場合は汎用的な形で入れておく（必要に応じて拡張）
-    logger.warning("Unknown event type. Treat as generic incident. message=%s", message)
 
-    region = message.get("region", "unknown")
-    timestamp = message.get("time", "") or sns.get("Timestamp", "")
+def _incident_source_key(message) -> tuple:
+    """
+    メッセージから (source, detail-type) を取り出す（パーサー検索用のキー）
+    """
+    if not isinstance(message, dict):
+        return None, None
+    source = message.get("source")
+    if source is not None:
+        return source, message.get("detail-type")
+    # SNS 経由の CloudWatch アラーム：AlarmName/NewStateValue があればほぼ確実にこれ
+    if "AlarmName" in message and "NewStateValue" in message:
+        return CLOUDWATCH_COMPOSITE_ALARM_NOTIFICATION if "AlarmRule" in message else CLOUDWATCH_ALARM_NOTIFICATION
+    return None, None
 
-    return {
-        "source": "unknown",
-        "alarm_name": message.get("detail-type", "UnknownEvent"),
-        "new_state": message.get("detail", {}).get("status", "UNKNOWN"),
-        "reason": "",
-        "region": region,
-        "namespace": "Generic",
-        "metric_name": "GenericEvent",
-        "lambda_name": None,
-        "timestamp": timestamp,
-        "raw_message": message,
-    }
 
+@emf_metrics.timed("parse")
+def _build_incident(message: dict, sns: dict) -> dict:
+    """
+    SNS メッセージの中身から「どの種別のイベントか」を判定し、
+    共通インシデント情報(dict)に変換する。
+    種別の判定は (source, detail-type) → source の順に辞書を引くだけなので、種別が増えても遅くならない。
+    """
+    key = _incident_source_key(message)
+    try:
+        parser = _INCIDENT_PARSERS.get(key) or _INCIDENT_PARSERS.get((key[0], None))
+    except TypeError:
+        parser = None  # source / detail-type が文字列でない（ハッシュできない）
+    if parser is not None:
+        return parser(message, sns)
 
+    # 本文は大きいことがあるので、警告には種別だけ出す（本文は DEBUG のときだけ、切り詰めて出す）
+    logger.warning("Unknown event type %s. Treat as generic incident.", LazyJSON(key, 256))
+    logger.debug("Unknown event message=%s", LazyJSON(message))
+    return _build_generic_incident(message, sns)
 
 
 # ===== Jira チケット本文（Description）用 ADF =====
 def build_adf_description(
         alarm_name, new_state, reason, region,
         namespace, metric_name, lambda_name, message
-) -> dict:
+) -> RawJSON:
     """
     Jiraのdescriptionフィールド用にADF形式で組み立てる
     - Alarm Info
     - Metric Info
     - 生のSNSメッセージ（JSON）をコードブロックで格納
+      （JIRA_RAW_MESSAGE_MAX_CHARS / JIRA_MAX_PAYLOAD_BYTES を超える分は要約・切り詰め）
+    シリアライズ済みの ADF(RawJSON) を返す。中身を dict で見たい場合は .to_dict()
+    （骨組みは incident_core.adf.DESCRIPTION_TEMPLATE で、コールドスタート時に一度だけ JSON にしてある）
     """
-    return {
-        "type": "doc",
-        "version": 1,
-        "content": [
-            
-            # === Alarm Info ===
-            {
-                "type": "heading",
-                "attrs": {"level": 2},
-                "content": [{"type": "text", "text": "Alarm Info"}]
-            },
-            {
-                "type": "bulletList",
-                "content": [
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Name: {alarm_name}"}]
-                            }
-                        ]
-                    },
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"State: {new_state}"}]
-                            }
-                        ]
-                    },
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Reason: {reason}"}]
-                            }
-                        ]
-                    },
-                ]
-            },
-            # === Metric Info ===
-            {
-                "type": "heading",
-                "attrs": {"level": 2},
-                "content": [{"type": "text", "text": "Metric Info"}]
-            },
-            {
-                "type": "bulletList",
-                "content": [
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Namespace: {namespace}"}]
-                            }
-                        ]
-                    },
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Metric: {metric_name}"}]
-                            }
-                        ]
-                    },
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Region: {region}"}]
-                            }
-                        ]
-                    },
-                    {
-                        "type": "listItem",
-                        "content": [
-                            {
-                                "type": "paragraph",
-                                "content": [{"type": "text", "text": f"Lambda: {lambda_name or 'N/A'}"}]
-                            }
-                        ]
-                    },
-                ]
-            },
-            # === Raw SNS Message === 見にくいので必要な部分のみ抜粋するように変更も検討
-            {
-                "type": "heading",
-                "attrs": {"level": 2},
-                "content": [{"type": "text", "text": "Raw SNS Message"}]
-            },
-            {
-                "type": "codeBlock",
-                "attrs": {"language": "json"},
-                "content": [
-                    {
-                        "type": "text",
-                        "text": json.dumps(message, indent=2, ensure_ascii=False)
-                    }
-                ]
-            },
-
-        ],
-    }
+    return _build_adf_description(
+        alarm_name, new_state, reason, region, namespace, metric_name, lambda_name, message,
+        max_chars=JIRA_RAW_MESSAGE_MAX_CHARS,
+        max_bytes=JIRA_MAX_PAYLOAD_BYTES or None,
+    )
 
 # def _build_description_text(alarm_name, new_state, reason, region, namespace, metric_name, lambda_name, message):
 
@@ -523,63 +1027,257 @@ def build_adf_description(
 
 
 # ===== 優先度決定ロジック =====
+# 既定のルール。Secret の JIRA_PRIORITY_RULES か JIRA_PRIORITY_RULES_FILE(JSON) で上書きできる。
+# - tiers: 上から順に評価し、最初にしきい値を超えた tier の priority を使う
+# - field_weights: どのフィールドでキーワードが見つかったら何点か（0 ならそのフィールドは見ない）
+# - threshold: tier ごとの合格点（省略時 1 = どれか1フィールドでヒットすれば採用）
+# 実運用では適宜、キーワードは調整する。
+DEFAULT_PRIORITY_RULES = {
+    "tiers": [
+        {
+            "priority": "High",
+            "keywords": [
+                "critical", "prod", "5xx",
+                "production", "billing", "database",
+                "failed", # 検証用に追加
+            ],
+        },
+        {
+            "priority": "Medium",
+            "keywords": [
+                "staging", "beta", "retry",
+                "warning", "latency", "throttle",
+            ],
+        },
+    ],
+    "field_weights": {
+        "alarm_name": 1,
+        "metric_name": 1,
+        "reason": 1,
+        "namespace": 1,
+        # "new_state": 0,
+    },
+    # どれにもマッチしなければデフォルトは Medium
+    "default": "Medium",
+}
+
+JIRA_PRIORITY_RULES_FILE = os.getenv("JIRA_PRIORITY_RULES_FILE", "")
+
+# キーワード数がこれ未満の tier は正規表現にせず、タプルに対する `in` で判定する
+# （数十件までは str の部分一致検索の方が速い。tests/bench_priority_rules.py 参照）
+_PRIORITY_REGEX_MIN_KEYWORDS = 32
+
+
+def _keywords_to_regex(keywords: list[str]) -> str:
+    """
+    キーワード群をトライ木の形の正規表現にする。
+    例: ["prod", "production", "proxy"] -> "pro(?:d(?:uction)?|xy)"
+    単純な "a|b|c" だと各位置で全キーワードを試すが、トライ形なら先頭文字で枝が絞られる。
+    """
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # 終端
+
+    def to_regex(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + to_regex(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        body = "|".join(branches) if len(branches) > 1 else branches[0]
+        body = f"(?:{body})" if len(branches) > 1 or terminal else body
+        return body + "?" if terminal else body
+
+    return to_regex(trie)
+
+
+def _substring_matcher(keywords: tuple):
+    def matches(text: str) -> bool:
+        return any(k in text for k in keywords)
+    return matches
+
+
+class PriorityRuleEngine:
+    """
+    キーワードルールを一度だけコンパイルしておき、アラームごとの判定ではスキャンだけ行う。
+    tier ごとに全キーワードをトライ形の正規表現1本にまとめるので、
+    キーワード数が増えても判定はフィールドあたり tier 数回の走査で済む。
+    （キーワードが少ない tier は事前に作ったタプルへの `in` で判定する）
+    キーワードは従来どおり大文字小文字を区別しない部分一致。
+    """
+
+    def __init__(self, tiers: list[dict], field_weights: dict, default: str | None = "Medium"):
+        self.field_weights = {f: w for f, w in field_weights.items() if w}
+        self.default = {"name": default} if default else None
+        self.tiers = []
+        for tier in tiers:
+            keywords = {k.lower() for k in tier.get("keywords", []) if k}
+            if not keywords:
+                continue
+            if len(keywords) >= _PRIORITY_REGEX_MIN_KEYWORDS:
+                matcher = re.compile(_keywords_to_regex(sorted(keywords))).search
+            else:
+                matcher = _substring_matcher(tuple(sorted(keywords)))
+            threshold = tier.get("threshold", 1)
+            # どのフィールドでも1回ヒットすれば合格なら、フィールドを連結した文字列を1回走査するだけでよい
+            any_hit_wins = all(w >= threshold for w in self.field_weights.values())
+            self.tiers.append(({"name": tier["priority"]}, matcher, threshold, any_hit_wins))
+
+    @classmethod
+    def from_config(cls, config: dict) -> "PriorityRuleEngine":
+        return cls(
+            tiers=config.get("tiers", DEFAULT_PRIORITY_RULES["tiers"]),
+            field_weights=config.get("field_weights", DEFAULT_PRIORITY_RULES["field_weights"]),
+            default=config.get("default", DEFAULT_PRIORITY_RULES["default"]),
+        )
+
+    def decide(self, fields: dict) -> dict | None:
+        blob = None
+        texts = None
+        for priority, matches, threshold, any_hit_wins in self.tiers:
+            if any_hit_wins:
+                # キーワードに改行は含まれないので、フィールドをまたいでヒットすることはない
+                if blob is None:
+                    blob = "\n".join([fields.get(f) or "" for f in self.field_weights]).lower()
+                if matches(blob):
+                    return priority
+                continue
+
+            if texts is None:
+                texts = [
+                    (field_text.lower(), weight)
+                    for field, weight in self.field_weights.items()
+                    if (field_text := fields.get(field))
+                ]
+            score = 0
+            for text, weight in texts:
+                if matches(text):
+                    score += weight
+                    if score >= threshold:
+                        return priority
+        return self.default
+
+
+def _load_priority_rules_file() -> dict:
+    if not JIRA_PRIORITY_RULES_FILE:
+        return DEFAULT_PRIORITY_RULES
+    with open(JIRA_PRIORITY_RULES_FILE, encoding="utf-8") as f:
+        rules = json.load(f)
+    logger.info("Loaded priority rules from %s", JIRA_PRIORITY_RULES_FILE)
+    return rules
+
+
+# コールドスタート時に一度だけコンパイルする
+_priority_engine = PriorityRuleEngine.from_config(_load_priority_rules_file())
+_secret_priority_rules = None  # Secret 由来のルール（生の値）。変わったときだけコンパイルし直す
+
+
+def _get_priority_engine(secret: dict | None = None) -> PriorityRuleEngine:
+    """
+    Secret に JIRA_PRIORITY_RULES（JSON 文字列 or オブジェクト）があればそれを優先する。
+    """
+    global _priority_engine, _secret_priority_rules
+    rules = (secret or {}).get("JIRA_PRIORITY_RULES")
+    if rules is None or rules == _secret_priority_rules:
+        return _priority_engine
+
+    config = json.loads(rules) if isinstance(rules, str) else rules
+    _priority_engine = PriorityRuleEngine.from_config(config)
+    _secret_priority_rules = rules
+    logger.info("Compiled priority rules from secret %s", JIRA_SECRET_NAME)
+    return _priority_engine
+
+
 def _decide_priority(
     alarm_name: str,
     metric_name: str,
     reason: str | None = None,
     namespace: str | None = None,
     # new_state: str | None = None,
-) -> dict:
+    secret: dict | None = None,
+) -> dict | None:
     """
     アラーム名/メトリクス名/理由などのテキストに含まれるキーワードから
     Jiraの優先度をざっくり決定する。
     - CloudWatch Alarm / Step Functions などの種別は見ない
-    実運用では適宜、キーワードは調整する。
-    """
-    text_blob = " ".join(
-        s for s in[
-            alarm_name or "",
-            metric_name or "",
-            reason or "",
-            namespace or "",
-            # new_state or "",
-        ]
-        if s
-    ).lower()
-
-    high_keywords  =  [
-        "critical", "prod", "5xx",
-        "production", "billing", "database",
-        "failed", # 検証用に追加
-    ]
+    - ルールはコンパイル済みのものを使う（PriorityRuleEngine）
+    """
+    return _get_priority_engine(secret).decide({
+        "alarm_name": alarm_name,
+        "metric_name": metric_name,
+        "reason": reason,
+        "namespace": namespace,
+    })
 
-    medium_keywords  = [
-        "staging", "beta", "retry",
-        "warning", "latency", "throttle"
+# ===== Jira Issue 新規作成 =====
+def _issue_fields(
+    secret: dict,
+    summary: str,
+    description_adf: dict | RawJSON,
+    metric_name: str,
+    alarm_name: str,
+    reason: str,
+    namespace: str,
+) -> dict:
+    """
+    新規チケットの fields を組み立てる（単発の起票と一括起票で共通）。
+    """
+    labels = [
+        "cloudwatch-auto",
+        f"env-{APP_ENV}",
     ]
 
+    priority = _decide_priority(
+        alarm_name=alarm_name,
+        metric_name=metric_name,
+        reason=reason,
+        namespace=namespace,
+        secret=secret,
+    )
+    return issue_fields(secret, summary, description_adf, labels, priority)
 
-    # 重要度に応じてpriorityフィールドを追加する
-    # alarm_lower = (alarm_name or "").lower()
-    # metric_lower = (metric_name or "").lower()
 
-    # high_keywords_in_alarm =  ["critical", "prod", "5xx"]
-    # high_keywords_in_metric =  ["errors", "5xx_error_rate"] #一時的に""errors"を追加
+def _incident_issue_fields(secret: dict, summary: str, incident: dict) -> dict:
+    return _issue_fields(
+        secret, summary, _build_description(incident),
+        incident["metric_name"], incident["alarm_name"],
+        incident["reason"], incident["namespace"],
+    )
 
 
-    if any(k in text_blob for k in high_keywords):
-        return {"name": "High"}
+def _create_issues_in_bulk(secret: dict, items: list[tuple[str, dict]]) -> list[tuple[str | None, str | None]]:
+    """
+    (summary, インシデント) を JIRA_BULK_CREATE_CHUNK_SIZE 件ずつ一括起票し、入力と同じ順で (Issue Key, エラー) を返す。
+    1件だけなら通常の起票 API を使う。チャンクは JIRA_MAX_WORKERS に応じて並列に送る。
+    """
+    if len(items) == 1:
+        summary, incident = items[0]
+        try:
+            return [(issue_tracker.create(secret, summary, _incident_issue_fields(secret, summary, incident)), None)]
+        except Exception as e:
+            return [(None, str(e))]
 
-    if any(k in text_blob for k in medium_keywords):
-        return {"name": "Medium"}
+    def post(chunk):
+        try:
+            return issue_tracker.bulk_create(
+                secret, [_incident_issue_fields(secret, summary, incident) for summary, incident in chunk],
+            )
+        except Exception as e:
+            return [(None, str(e))] * len(chunk)
+
+    size = JIRA_BULK_CREATE_CHUNK_SIZE
+    chunks = [(items[i:i + size],) for i in range(0, len(items), size)]
+    return [result for chunk_results in _run_concurrently(post, chunks) for result in chunk_results]
 
-    # どれにもマッチしなければデフォルトは Medium
-    return {"name": "Medium"}
 
 # ===== Jira Issue 作成 or コメント追記のメイン関数 =====
 def _create_jira_issue(
     summary: str,
-    description_adf: dict,
+    description_adf: dict | RawJSON,
     metric_name: str,
     alarm_name: str,
     new_state: str,
@@ -600,141 +1298,591 @@ def _create_jira_issue(
     # logger.info("Secret JIRA_PROJECT_KEY raw: %r", secret.get("JIRA_PROJECT_KEY"))
     # logger.info("Secret content keys: %s", list(secret.keys()))
 
-    # 1. 既存の未解決チケットを検索
-    existing_issue_key = _find_existing_issue_by_summary(secret, summary)
-    if existing_issue_key:
-        logger.info("Skipping creating new issue. Use existing issue: %s", existing_issue_key)
-        _add_comment_to_issue(secret, existing_issue_key, summary, 
-                            new_state, reason,
-                            timestamp, namespace,
-                            metric_name, region,
-                            lambda_name)
-        return existing_issue_key
-
-    # 2. 重複なければ新規チケット作成
-    base_url = secret["JIRA_BASE_URL"].rstrip("/")
-    project_key = secret["JIRA_PROJECT_KEY"]
-
-    # issue type は id / name どちらでも対応できるようにする
-    if "JIRA_ISSUE_TYPE_ID" in secret:
-        issuetype = {"id": secret["JIRA_ISSUE_TYPE_ID"]}
+    incident = {
+        "new_state": new_state,
+        "reason": reason,
+        "timestamp": timestamp,
+        "namespace": namespace,
+        "metric_name": metric_name,
+        "region": region,
+        "lambda_name": lambda_name,
+    }
+    # 既存の未解決チケットがあればコメント（集約ウィンドウ中なら溜めるだけ）、なければ新規チケット作成
+    key, action = issue_tracker.create_or_comment(
+        secret, summary,
+        new_fields=lambda: _issue_fields(secret, summary, description_adf, metric_name, alarm_name, reason, namespace),
+        comment=lambda issue_key: _comment_or_coalesce(secret, issue_key, summary, incident)[0],
+    )
+    if action == "created":
+        _open_coalescing_window(summary, key)
+    return key
+
+
+# ========= 3. SNS レコード → インシデント =========
+
+def _incident_from_record(record: dict) -> dict:
+    """
+    SNS レコード1件を共通インシデント情報に変換する。
+    """
+    # SNSは Records[].Sns.Message に文字列JSONを載せてくる
+    sns = record.get("Sns", {})
+    message_str = sns.get("Message", "{}")
+    message = json.loads(message_str)
+
+    # logger.info("=== Raw SNS Message ===\n%s\n====================", message_str)
+
+    return _build_incident(message, sns)
+
+
+def _record_idempotency_key(record: dict, incident: dict) -> str | None:
+    """
+    台帳のキー（SNS の MessageId + アラームの遷移時刻）。
+    incident["timestamp"] は StateChangeTime（なければイベント・SNS メッセージの時刻）。
+    """
+    return idempotency_key(record.get("Sns", {}).get("MessageId"), incident["timestamp"])
+
+
+# インシデントの source → summary の書式
+_SUMMARY_FORMATS = {
+    "stepfunctions": "[StepFunctions] {alarm_name} status is {new_state}",
+    "ecs_task": "[ECS] {alarm_name} task is {new_state}",
+    "batch_job": "[Batch] {alarm_name} job is {new_state}",
+}
+
+
+def _build_summary(incident: dict) -> str:
+    """
+    インシデントから Jira の summary を組み立てる。
+    summary は重複チェック（既存チケット検索）のキーにもなる。
+    """
+    # source 種別ごとの書式（なければ CloudWatch 風 summary）
+    template = _SUMMARY_FORMATS.get(incident["source"], "[CloudWatch Alarm] {alarm_name} is {new_state}")
+    return template.format(alarm_name=incident["alarm_name"], new_state=incident["new_state"])
+
+
+def _build_description(incident: dict) -> RawJSON:
+    """
+    インシデントから Jira の description(ADF) を組み立てる。
+    """
+    return build_adf_description(
+        incident["alarm_name"],
+        incident["new_state"],
+        incident["reason"],
+        incident["region"],
+        incident["namespace"],
+        incident["metric_name"],
+        incident["lambda_name"],
+        incident["raw_message"],
+    )
+
+
+# ===== 復旧（OK への遷移）=====
+# OK に戻る状態を持つインシデント種別
+_RECOVERABLE_SOURCES = ("cloudwatch_alarm", "cloudwatch_composite_alarm")
+
+
+def _firing_summary(incident: dict) -> str | None:
+    """
+    復旧（OK への遷移）なら、解決する発報中チケットの summary（ALARM 時の summary）を返す。それ以外は None。
+    """
+    if not JIRA_RESOLVE_ON_OK or incident["new_state"] != "OK" or incident["source"] not in _RECOVERABLE_SOURCES:
+        return None
+    return _build_summary({**incident, "new_state": "ALARM"})
+
+
+def _previous_state(incident: dict) -> str:
+    """遷移前の状態（SNS 通知の OldStateValue / EventBridge の previousState）。分からなければ空文字"""
+    message = _as_dict(incident["raw_message"])
+    if "OldStateValue" in message:
+        return _text(message.get("OldStateValue"))
+    return _text(_as_dict(_as_dict(message.get("detail")).get("previousState")).get("value"))
+
+
+def _resolve_incident(firing_summary: str, incident: dict) -> tuple[bool, str | None, str]:
+    """
+    OK に戻ったアラームの発報中チケットを解決する。戻り値は (成功したか, Issue Key, "resolved" / "skipped")。
+    判定・チケットの引き当て・解決は issue_tracker.resolve()（逐次・バッチモードとも同じ）。
+    溜まっていた発報は解決する前にまとめて送る。
+    """
+    comment = build_resolved_comment_adf(incident["new_state"], incident["reason"], incident["timestamp"])
+    return issue_tracker.resolve(
+        _load_jira_secret, firing_summary, _previous_state(incident), comment,
+        before_resolve=_close_coalescing_window,
+    )
+
+
+# ========= 4. バッチモード =========
+
+class BatchProcessingError(RuntimeError):
+    """
+    バッチモードで失敗したレコードがあったときに送出する。
+    SNS からの非同期呼び出しでは戻り値は捨てられるので、逐次処理と同じく例外にして Lambda にリトライ（DLQ）させる。
+    成功したレコードは送出前に台帳に記録しているので、リトライでは失敗した分だけを送り直す。
+    results にレコード単位の結果を持つ。
+    """
+
+    def __init__(self, results: list[dict]):
+        failed = [r for r in results if r["status"] == "failed"]
+        super().__init__(f"{len(failed)} of {len(results)} record(s) failed: {failed[0]['error']}")
+        self.results = results
+
+
+def _record_result(index: int, record: dict, summary: str | None = None,
+                   issue_key: str | None = None, action: str | None = None,
+                   error: str | None = None) -> dict:
+    """
+    バッチモードでのレコード単位の処理結果
+    """
+    return {
+        "index": index,
+        "message_id": record.get("Sns", {}).get("MessageId"),
+        "summary": summary,
+        "issue_key": issue_key,
+        "action": action,  # "created" / "commented" / "coalesced" / "resolved" / "skipped" / "duplicate"
+        "status": "failed" if error else "succeeded",
+        "error": error,
+    }
+
+
+def _process_summary_group(secret: dict, summary: str, members: list[tuple[int, dict]],
+                           records: list) -> list[dict]:
+    """
+    同じ summary を持つインシデント群を処理し、レコード単位の結果を返す。
+    - JQL 検索は1回だけ
+    - 未解決チケットがなければ先頭のインシデントで1件起票し、残りはそのチケットへのコメントにする
+    - コメントはグループ内で逐次送るので、同じチケットへのコメント順は発報順のまま
+    """
+    # 1. summary ごとに1回だけ既存チケットを検索（キャッシュにあれば検索しない）
+    try:
+        issue_key = issue_tracker.lookup(secret, summary)
+    except Exception as e:
+        return [_record_result(index, records[index], summary, error=str(e)) for index, _ in members]
+
+    results = []
+
+    # 2. 既存チケットがなければ先頭のインシデントで起票
+    pending = members
+    if issue_key is None:
+        index, incident = members[0]
+        try:
+            issue_key = issue_tracker.create(secret, summary, _incident_issue_fields(secret, summary, incident))
+        except Exception as e:
+            return [_record_result(index, records[index], summary, error=str(e)) for index, _ in members]
+        results.append(_record_created(summary, issue_key, members, records))
+        pending = members[1:]
     else:
-        issuetype_name = secret.get("JIRA_ISSUE_TYPE", "Incident")
-        issuetype = {"name": issuetype_name}
-    
-    labels = [
-        "cloudwatch-auto",
-        f"env-{APP_ENV}",
+        logger.info("Skipping creating new issue. Use existing issue: %s", issue_key)
+
+    # 3. 残りは同じチケットへのコメント（発報順を保つ。集約ウィンドウ中なら溜めるだけ）
+    results.extend(_comment_summary_group(secret, summary, issue_key, pending, records))
+    return results
+
+
+def _record_created(summary: str, issue_key: str, members: list[tuple[int, dict]], records: list) -> dict:
+    """
+    グループの先頭のインシデントで起票できたときの後処理（集約ウィンドウ開始）をして結果を返す。
+    キャッシュへの登録は issue_tracker が起票時に済ませている。
+    """
+    _open_coalescing_window(summary, issue_key)
+    index, _ = members[0]
+    return _record_result(index, records[index], summary, issue_key, "created")
+
+
+def _comment_summary_group(secret: dict, summary: str, issue_key: str,
+                           pending: list[tuple[int, dict]], records: list) -> list[dict]:
+    """
+    既存（または起票したばかり）のチケットにインシデントを発報順でコメントし、レコード単位の結果を返す。
+    """
+    results = []
+    for index, incident in pending:
+        ok, action = _comment_or_coalesce(secret, issue_key, summary, incident, flush_before_return=True)
+        if not ok:
+            issue_tracker.forget(summary)
+        results.append(_record_result(
+            index, records[index], summary, issue_key, action,
+            error=None if ok else f"Failed to add comment to issue {issue_key}",
+        ))
+    return results
+
+
+def _process_groups_with_bulk_create(secret: dict, groups: dict[str, list[tuple[int, dict]]], records: list,
+                                     defer_on_backpressure: bool = False) -> list[list[dict]]:
+    """
+    初出の summary の起票を一括起票 API にまとめて、summary グループごとの結果を返す（groups と同じ順）。
+    1. summary ごとに既存チケットを検索（キャッシュにあれば検索しない）
+    2. 未解決チケットのない summary は、先頭のインシデントを JIRA_BULK_CREATE_CHUNK_SIZE 件ずつまとめて起票
+       一部だけ失敗した場合は、そのレコードのグループだけを失敗にする
+    3. 残りのインシデントは各チケットへのコメント（グループ内は発報順に逐次）
+    """
+    items = list(groups.items())
+    group_results: dict[str, list[dict]] = {}
+    issue_keys: dict[str, str] = {}
+    new_groups = []
+
+    def lookup(summary, members):
+        try:
+            return issue_tracker.lookup(secret, summary), None
+        except Exception as e:
+            return None, str(e)
+
+    # 1. 既存チケットの検索
+    for (summary, members), (issue_key, error) in zip(items, _run_concurrently(lookup, items)):
+        if error:
+            group_results[summary] = [_record_result(i, records[i], summary, error=error) for i, _ in members]
+        elif issue_key is None:
+            new_groups.append((summary, members))
+        else:
+            logger.info("Skipping creating new issue. Use existing issue: %s", issue_key)
+            issue_keys[summary] = issue_key
+
+    # 2. 初出の summary をまとめて起票
+    if new_groups and defer_on_backpressure and jira_backpressure.active:
+        for summary, members in new_groups:
+            group_results[summary] = _defer_summary_group(summary, members, records)
+        new_groups = []
+    created = _create_issues_in_bulk(secret, [(summary, members[0][1]) for summary, members in new_groups])
+    for (summary, members), (issue_key, error) in zip(new_groups, created):
+        if error:
+            group_results[summary] = [_record_result(i, records[i], summary, error=error) for i, _ in members]
+            continue
+        issue_keys[summary] = issue_key
+        group_results[summary] = [_record_created(summary, issue_key, members, records)]
+
+    # 3. 残りはコメント
+    def comment(summary, pending):
+        if defer_on_backpressure and jira_backpressure.active:
+            return _defer_summary_group(summary, pending, records)
+        return _comment_summary_group(secret, summary, issue_keys[summary], pending, records)
+
+    pending = [
+        (summary, members[1:] if summary in group_results else members)
+        for summary, members in items
+        if summary in issue_keys
     ]
+    for (summary, _), results in zip(pending, _run_concurrently(comment, pending)):
+        group_results.setdefault(summary, []).extend(results)
 
-    url = f"{base_url}/rest/api/3/issue"
-    
+    return [group_results[summary] for summary, _ in items]
 
-    priority = _decide_priority(
-    alarm_name=alarm_name,
-    metric_name=metric_name,
-    reason=reason,
-    namespace=namespace,
-)
 
-    fields = {
-        "project": {"key": project_key},
-        "summary": summary,
-        "issuetype": issuetype,
-        "labels": labels,
-        "description": description_adf,
-        }
-    
-    if priority:
-        fields["priority"] = priority
-    
-    body = {"fields": fields}
+def _run_concurrently(func, items: list[tuple]) -> list:
+    """
+    func(*item) を items ごとに実行し、結果を入力順で返す。
+    JIRA_MAX_WORKERS > 1 ならスレッドプールで並列に実行する。
+    """
+    if JIRA_MAX_WORKERS > 1 and len(items) > 1:
+        from concurrent.futures import ThreadPoolExecutor
 
+        with ThreadPoolExecutor(max_workers=min(JIRA_MAX_WORKERS, len(items))) as executor:
+            futures = [executor.submit(func, *item) for item in items]
+            return [f.result() for f in futures]
+    return [func(*item) for item in items]
 
-    # logger.info("Jira request payload: %s", json.dumps(body, ensure_ascii=False))
 
-    headers = _jira_auth_header(secret)
-    encoded_body = json.dumps(body).encode("utf-8")
+def _defer_summary_group(summary: str, members: list[tuple[int, dict]], records: list) -> list[dict]:
+    """
+    Jira が過負荷のあいだは送らずに失敗扱い（action="deferred"）にする。SQS が後で再配信する。
+    """
+    return [
+        _record_result(index, records[index], summary, action="deferred", error="Deferred: Jira is overloaded")
+        for index, _ in members
+    ]
 
-    logger.info("Creating Jira issue at %s with summary=%s", url, summary)
-    resp = http.request("POST", url, body=encoded_body, headers=headers)
 
-    if resp.status >= 300:
-        # 失敗時はレスポンスボディもログに出す
+def _process_records_in_batch(records: list, defer_on_backpressure: bool = False) -> list[dict]:
+    """
+    1回の呼び出しに含まれる複数レコードを summary 単位でまとめて処理する。
+    - まず全レコードをインシデントに変換し、summary ごとにグループ化する
+    - summary の異なるグループは互いに独立なので、JIRA_MAX_WORKERS > 1 ならスレッドプールで並列に処理する
+    - 1レコードの失敗で他のレコードを巻き込まないよう、結果はレコード単位で返す（入力順）
+    - defer_on_backpressure=True なら、Jira が 429 / 5xx を返した時点で残りのグループは送らずに後回しにする
+    - JIRA_BULK_CREATE=true なら、初出の summary の起票を一括起票 API にまとめる
+    """
+    results: list[dict | None] = [None] * len(records)
+
+    # 1. インシデント変換
+    incidents: list[tuple[int, dict]] = []
+    for index, record in enumerate(records):
         try:
-            body_str = resp.data.decode("utf-8")
-        except Exception:
-            body_str = str(resp.data)
-        logger.error("Failed to create Jira issue: %s %s", resp.status, body_str)
-        raise Exception(f"Jira API error: {resp.status}")
-
-    data = json.loads(resp.data.decode("utf-8"))
-    key = data.get("key")
-    logger.info("Created Jira issue: %s", key)
-    return key
+            incident = _incident_from_record(record)
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.error("Failed to parse SNS record #%d: %s", index, e)
+            results[index] = _record_result(index, record, error=f"Invalid SNS message: {e}")
+            continue
+        incidents.append((index, incident))
+
+    # 2. 処理済み（再配信・リトライ）のものは Jira に送らない & summary ごとにグループ化（挿入順 = 最初に出現した順）
+    keys = {index: _record_idempotency_key(records[index], incident) for index, incident in incidents}
+    processed = idempotency_ledger.get_many(list(keys.values()))
+    # 復旧（OK への遷移）は発報とは別に、発報の処理の後で解決する
+    groups: dict[str, list[tuple[int, dict]]] = {}
+    recoveries: list[tuple[str, int, dict]] = []
+    for index, incident in incidents:
+        summary = _build_summary(incident)
+        issue_key = processed.get(keys[index])
+        if issue_key:
+            results[index] = _record_result(index, records[index], summary, issue_key, "duplicate")
+            continue
+        firing_summary = _firing_summary(incident)
+        if firing_summary:
+            recoveries.append((firing_summary, index, incident))
+            continue
+        groups.setdefault(summary, []).append((index, incident))
+
+    if processed:
+        logger.info("Batch mode: skipped %d already processed record(s)", len(processed))
+    if not groups and not recoveries:
+        return results
+
+    logger.info("Batch mode: %d record(s) grouped into %d summary(ies), workers=%d",
+                len(records), len(groups), JIRA_MAX_WORKERS)
+
+    if defer_on_backpressure and jira_backpressure.active:
+        group_results = [_defer_summary_group(summary, members, records) for summary, members in groups.items()]
+        group_results.extend(
+            _defer_summary_group(firing_summary, [(index, incident)], records)
+            for firing_summary, index, incident in recoveries
+        )
+        for group in group_results:
+            for result in group:
+                results[result["index"]] = result
+        return results
+
+    secret = _load_jira_secret() if groups else None
+
+    def process(summary, members):
+        if defer_on_backpressure and jira_backpressure.active:
+            return _defer_summary_group(summary, members, records)
+        return _process_summary_group(secret, summary, members, records)
+
+    def resolve(firing_summary, index, incident):
+        if defer_on_backpressure and jira_backpressure.active:
+            return _defer_summary_group(firing_summary, [(index, incident)], records)
+        try:
+            ok, issue_key, action = _resolve_incident(firing_summary, incident)
+        except Exception as e:
+            return [_record_result(index, records[index], firing_summary, error=str(e))]
+        return [_record_result(
+            index, records[index], firing_summary, issue_key, action,
+            error=None if ok else f"Failed to resolve issue {issue_key}",
+        )]
+
+    # 3. summary グループ単位で Jira に送る
+    if JIRA_BULK_CREATE and len(groups) > 1:
+        group_results = _process_groups_with_bulk_create(secret, groups, records, defer_on_backpressure)
+    else:
+        group_results = _run_concurrently(process, list(groups.items()))
+    # 同じバッチの発報で起票したチケットも解決できるように、復旧は最後に処理する
+    group_results.extend(_run_concurrently(resolve, recoveries))
+
+    for group in group_results:
+        for result in group:
+            results[result["index"]] = result
+
+    # 4. コンテナ内に溜めた発報はここで送る（送れなかった summary の "coalesced" は失敗にしてリトライさせる）
+    unsent = _flush_pending_occurrences(secret)
+    for r in results:
+        if r["action"] == "coalesced" and r["summary"] in unsent:
+            results[r["index"]] = _record_result(
+                r["index"], records[r["index"]], r["summary"], r["issue_key"], r["action"],
+                error=f"Failed to add coalesced comment to issue {r['issue_key']}",
+            )
+
+    # 5. 送れたものを台帳に記録（失敗・後回しにしたものはリトライで処理し直す）
+    idempotency_ledger.put_many([
+        (keys[r["index"]], r["issue_key"])
+        for r in results
+        if r["status"] == "succeeded" and r["action"] != "duplicate" and r["issue_key"] and r["index"] in keys
+    ])
+
+    return results
 
 
 # ===== Lambda ハンドラー =====
+@_with_metrics
 def lambda_handler(event, context):
     """
     エントリポイント
     SNS → CloudWatchアラームのメッセージを受け取り、
     Jiraにインシデントチケットを作成 or コメントを追記する。
+    JIRA_BATCH_MODE=true（または JIRA_MAX_WORKERS > 1 / JIRA_BULK_CREATE=true）の場合はレコードをまとめて処理し、
+    レコード単位の結果を返す。失敗したレコードがあれば BatchProcessingError を送出して Lambda にリトライさせる。
     """
-    logger.info("Received event: %s", json.dumps(event))
-
-    # SNSは Records[].Sns.Message に文字列JSONを載せてくる
-    for record in event.get("Records", []):
-        sns = record.get("Sns", {})
-        message_str = sns.get("Message", "{}")
-        message = json.loads(message_str)
+    _log_received_event(event)
+
+    records = event.get("Records", [])
+
+    # ストームが収まった summary の溜まり分を先に送っておく
+    _flush_expired_coalescing_windows()
+
+    # 並列ディスパッチもグループ単位で行うため、バッチモードの処理経路を使う
+    if JIRA_BATCH_MODE or JIRA_MAX_WORKERS > 1 or JIRA_BULK_CREATE:
+        results = _process_records_in_batch(records)
+        failed = [r for r in results if r["status"] == "failed"]
+        if issue_tracker.dedup_cache.enabled:
+            logger.info("Dedup cache stats: %s", issue_tracker.dedup_cache.stats())
+        if idempotency_ledger.enabled:
+            logger.info("Idempotency ledger stats: %s", idempotency_ledger.stats())
+        if failed:
+            logger.error("Batch mode: %d of %d record(s) failed", len(failed), len(results))
+            raise BatchProcessingError(results)
+        return {
+            "status": "ok",
+            "results": results,
+        }
 
+    for record in records:
         # 1. 共通インシデント情報に変換
-        incident = _build_incident(message, sns)
-
-        # logger.info("=== Raw SNS Message ===\n%s\n====================", message_str)
-
-        # 2. インシデントから Jira 用の summary / description を組み立て
-        alarm_name = incident["alarm_name"]
-        new_state = incident["new_state"]
-        reason = incident["reason"]
-        region = incident["region"]
-        namespace = incident["namespace"]
-        metric_name = incident["metric_name"]
-        lambda_name = incident["lambda_name"]
-        timestamp = incident["timestamp"]
-        raw_message = incident["raw_message"]
-
-        # source 種別に応じて summary を少し変えたい場合はここで分岐
-        if incident["source"] == "stepfunctions":
-            summary = f"[StepFunctions] {alarm_name} status is {new_state}"
-        else:
-            # デフォルトは CloudWatch 風 summary
-            summary = f"[CloudWatch Alarm] {alarm_name} is {new_state}"
-
-        description_adf = build_adf_description(
-            alarm_name,
-            new_state,
-            reason,
-            region,
-            namespace,
-            metric_name,
-            lambda_name,
-            raw_message,
-        )
-
-        # 3. 既存チケットの重複チェック → コメント追記 or 新規作成
-        _create_jira_issue(
+        incident = _incident_from_record(record)
+
+        # 2. 処理済み（SNS の再配信・Lambda のリトライ）なら Jira には送らない
+        key = _record_idempotency_key(record, incident)
+        processed_issue_key = idempotency_ledger.get(key)
+        if processed_issue_key:
+            logger.info("Skipping already processed message %s (issue %s)", key, processed_issue_key)
+            continue
+
+        # 3. OK への遷移なら発報中のチケットを解決するだけ（起票・コメントはしない）
+        firing_summary = _firing_summary(incident)
+        if firing_summary:
+            ok, issue_key, _ = _resolve_incident(firing_summary, incident)
+            if not ok:
+                # 起票の失敗と同じく例外にして Lambda にリトライさせる（処理済みのレコードは台帳で飛ばす）
+                raise RuntimeError(f"Failed to resolve issue {issue_key}")
+            if issue_key:
+                idempotency_ledger.put(key, issue_key)
+            continue
+
+        # 4. インシデントから Jira 用の summary / description を組み立て
+        summary = _build_summary(incident)
+        description_adf = _build_description(incident)
+
+        # 5. 既存チケットの重複チェック → コメント追記 or 新規作成
+        issue_key = _create_jira_issue(
             summary,
             description_adf,
-            metric_name,
-            alarm_name,
-            new_state,
-            reason,
-            timestamp,
-            namespace,
-            region,
-            lambda_name,
+            incident["metric_name"],
+            incident["alarm_name"],
+            incident["new_state"],
+            incident["reason"],
+            incident["timestamp"],
+            incident["namespace"],
+            incident["region"],
+            incident["lambda_name"],
         )
+        # 途中のレコードで例外になって Lambda がリトライしても、ここまでのレコードはやり直さない
+        idempotency_ledger.put(key, issue_key)
+
+    if issue_tracker.dedup_cache.enabled:
+        logger.info("Dedup cache stats: %s", issue_tracker.dedup_cache.stats())
+    if idempotency_ledger.enabled:
+        logger.info("Idempotency ledger stats: %s", idempotency_ledger.stats())
+
+    return {"status": "ok"}
+
+
+# ===== SQS バッファモード =====
+def _sns_record_from_sqs(record: dict) -> dict:
+    """
+    SQS のレコードを SNS のレコードと同じ形にする。
+    SNS → SQS の購読は raw message delivery の有無で body の形が変わるので両方受け付ける。
+    """
+    body = record.get("body", "")
+    try:
+        envelope = json.loads(body)
+    except ValueError:
+        envelope = None
+    if isinstance(envelope, dict) and envelope.get("Type") == "Notification" and "Message" in envelope:
+        return {"Sns": {
+            "MessageId": envelope.get("MessageId", record.get("messageId")),
+            "Timestamp": envelope.get("Timestamp", ""),
+            "Message": envelope["Message"],
+        }}
+    return {"Sns": {"MessageId": record.get("messageId"), "Timestamp": "", "Message": body}}
+
+
+@lru_cache(maxsize=8)
+def _queue_url(event_source_arn: str) -> str:
+    # arn:aws:sqs:<region>:<account>:<queue name>
+    _, _, _, _, account, name = event_source_arn.split(":", 5)
+    return _get_sqs_client().get_queue_url(QueueName=name, QueueOwnerAWSAccountId=account)["QueueUrl"]
+
+
+def _delay_redelivery(records: list[dict], seconds: float) -> None:
+    """
+    後回しにしたメッセージの可視性タイムアウトを延ばす。
+    全メッセージが同時に戻ってこないよう、メッセージごとに最大 20% ずらす。
+    """
+    by_queue: dict[str, list[dict]] = {}
+    for record in records:
+        if record.get("eventSourceARN") and record.get("receiptHandle"):
+            by_queue.setdefault(record["eventSourceARN"], []).append(record)
+
+    for arn, queue_records in by_queue.items():
+        try:
+            queue_url = _queue_url(arn)
+            for i in range(0, len(queue_records), 10):
+                _get_sqs_client().change_message_visibility_batch(QueueUrl=queue_url, Entries=[
+                    {
+                        "Id": str(n),
+                        "ReceiptHandle": r["receiptHandle"],
+                        "VisibilityTimeout": min(43200, int(seconds * random.uniform(1.0, 1.2)) + 1),
+                    }
+                    for n, r in enumerate(queue_records[i:i + 10])
+                ])
+        except _aws_errors() as e:
+            # 延ばせなくてもキューの既定の可視性タイムアウトで再配信されるだけ
+            logger.warning("Failed to delay redelivery on %s: %s", arn, e)
+
+
+@_with_metrics
+def sqs_handler(event, context):
+    """
+    SQS バッファ経由のエントリポイント（SNS → SQS → Lambda、ReportBatchItemFailures を有効にする）。
+    - レコードはバッチモードと同じく summary 単位でまとめて処理する
+    - Jira が 429 / 5xx を返したら残りは送らず、失敗したメッセージだけ batchItemFailures で返す
+      （後回しにしたメッセージは Retry-After まで再配信を遅らせる）
+    - FIFO キューでは、最初に失敗したメッセージ以降をすべて失敗として返し順序を保つ
+      （処理済みのメッセージも再配信されるので、コメントが重複することはある）
+    """
+    records = event.get("Records", [])
+    logger.info("Received %d SQS record(s)", len(records))
+
+    if not jira_backpressure.active:
+        _flush_expired_coalescing_windows()
+
+    results = _process_records_in_batch(
+        [_sns_record_from_sqs(r) for r in records], defer_on_backpressure=True,
+    )
+
+    failed = [i for i, r in enumerate(results) if r["status"] == "failed"]
+    if failed and any(r.get("eventSourceARN", "").endswith(".fifo") for r in records):
+        failed = list(range(failed[0], len(records)))
+
+    # 過負荷で失敗・後回しにしたものは、Jira が回復する頃まで再配信を遅らせる
+    if failed and jira_backpressure.active:
+        logger.warning("Jira is overloaded. Deferred %d of %d record(s) for %.0fs",
+                       len(failed), len(records), jira_backpressure.remaining())
+        if JIRA_SQS_DELAY_REDELIVERY:
+            _delay_redelivery([records[i] for i in failed], jira_backpressure.remaining())
+
+    if failed:
+        logger.error("SQS mode: %d of %d record(s) failed", len(failed), len(records))
+    return {"batchItemFailures": [{"itemIdentifier": records[i]["messageId"]} for i in failed]}
+
+
+def _warm_up_connection() -> None:
+    """
+    Jira ホストへのコネクションを張っておく（JIRA_WARMUP_ON_INIT）。
+    失敗しても最初のイベントで張り直すだけなので、ログに残して続ける。
+    """
+    try:
+        base_url = _load_jira_secret()["JIRA_BASE_URL"]
+        elapsed_ms = _get_http().warm_up(base_url)
+        logger.info("Warmed up Jira connection to %s in %.1f ms", base_url, elapsed_ms)
+    except Exception as e:
+        logger.warning("Jira connection warmup failed: %s", e)
+
 
-    return {"status": "ok"}
\ No newline at end of file
+if JIRA_WARMUP_ON_INIT:
+    _warm_up_connection()
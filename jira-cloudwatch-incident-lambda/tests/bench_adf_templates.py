@@ -0,0 +1,95 @@
+"""
+チケット本文(ADF)の組み立て + リクエストボディのシリアライズにかかる時間とバイト数を、
+変更前のビルダー（毎回 dict を組み立てて json.dumps(indent=2) する）と比較するベンチマーク。
+
+    python tests/bench_adf_templates.py --iterations 2000
+"""
+import argparse
+import json
+import time
+
+from lambda_loader import load_lambda_module
+from incident_core.adf import encode_json_body  # lambda_loader の import で sys.path が通る
+from sample_events import cloudwatch_message
+
+
+def legacy_build_adf_description(alarm_name, new_state, reason, region,
+                                 namespace, metric_name, lambda_name, message) -> dict:
+    """変更前の build_adf_description と同じ構造"""
+    def item(text):
+        return {"type": "listItem", "content": [{"type": "paragraph", "content": [{"type": "text", "text": text}]}]}
+
+    def heading(text):
+        return {"type": "heading", "attrs": {"level": 2}, "content": [{"type": "text", "text": text}]}
+
+    return {
+        "type": "doc",
+        "version": 1,
+        "content": [
+            heading("Alarm Info"),
+            {"type": "bulletList", "content": [
+                item(f"Name: {alarm_name}"), item(f"State: {new_state}"), item(f"Reason: {reason}"),
+            ]},
+            heading("Metric Info"),
+            {"type": "bulletList", "content": [
+                item(f"Namespace: {namespace}"), item(f"Metric: {metric_name}"),
+                item(f"Region: {region}"), item(f"Lambda: {lambda_name or 'N/A'}"),
+            ]},
+            heading("Raw SNS Message"),
+            {"type": "codeBlock", "attrs": {"language": "json"}, "content": [
+                {"type": "text", "text": json.dumps(message, indent=2, ensure_ascii=False)},
+            ]},
+        ],
+    }
+
+
+def eventbridge_message(size_kb: int) -> dict:
+    """巨大な detail を持つ EventBridge イベント（ECS のタスク定義など）"""
+    containers = [
+        {"name": f"container-{i}", "image": f"123456789012.dkr.ecr.ap-northeast-1.amazonaws.com/app:{i}",
+         "environment": [{"name": f"ENV_{j}", "value": "v" * 20} for j in range(10)]}
+        for i in range(size_kb)
+    ]
+    return {
+        "version": "0", "source": "aws.ecs", "detail-type": "ECS Task State Change",
+        "region": "ap-northeast-1", "time": "2026-10-18T00:00:00Z",
+        "detail": {"lastStatus": "STOPPED", "stoppedReason": "Essential container exited", "containers": containers},
+    }
+
+
+def legacy_encode(body: dict) -> bytes:
+    """変更前のリクエストボディのエンコード"""
+    return json.dumps(body).encode("utf-8")
+
+
+def measure(build, encode, args, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        body = encode({"fields": {"summary": "summary", "description": build(*args)}})
+    return (time.perf_counter() - start) / iterations, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    module = load_lambda_module()
+
+    cases = {
+        "cloudwatch alarm": cloudwatch_message(),
+        "eventbridge 64KB": eventbridge_message(64),
+        "eventbridge 256KB": eventbridge_message(256),
+    }
+    for label, message in cases.items():
+        build_args = ("prod-api-5xx", "ALARM", "Threshold Crossed", "ap-northeast-1",
+                      "AWS/Lambda", "Errors", "order-api", message)
+        iterations = args.iterations if label == "cloudwatch alarm" else max(1, args.iterations // 50)
+        legacy_s, legacy_bytes = measure(legacy_build_adf_description, legacy_encode, build_args, iterations)
+        new_s, new_bytes = measure(module.build_adf_description, encode_json_body, build_args, iterations)
+        print(f"{label:>18}: legacy={legacy_s * 1e6:9.1f}us {legacy_bytes:8d}B  "
+              f"template={new_s * 1e6:9.1f}us {new_bytes:8d}B  ({legacy_s / new_s:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
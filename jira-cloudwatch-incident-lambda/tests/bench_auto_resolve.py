@@ -0,0 +1,68 @@
+"""
+復旧（OK への遷移）通知の Jira 呼び出し回数を、従来（OK も起票・コメント）と自動解決（コメント / 遷移）で比較するベンチマーク。
+各アラームは作成直後に INSUFFICIENT_DATA → OK になり、その後 ALARM → OK を --cycles 回くり返す想定。
+SNS から1レコードずつ呼ばれる（= 同じウォームコンテナへの連続呼び出し）。
+
+    python tests/bench_auto_resolve.py --alarms 20 --cycles 3
+"""
+import argparse
+import logging
+import os
+import time
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+# モードごとの環境変数（import 時に読まれる）
+MODES = {
+    "legacy": {"JIRA_RESOLVE_ON_OK": "false", "JIRA_RESOLVE_TRANSITION_ID": ""},
+    "comment": {"JIRA_RESOLVE_ON_OK": "true", "JIRA_RESOLVE_TRANSITION_ID": ""},
+    "transition": {"JIRA_RESOLVE_ON_OK": "true", "JIRA_RESOLVE_TRANSITION_ID": "31"},
+}
+
+
+def _events(alarms: int, cycles: int) -> list[dict]:
+    events = []
+    for a in range(alarms):
+        name = f"flapping-alarm-{a}"
+        events.append(cloudwatch_message(name, state="OK", old_state="INSUFFICIENT_DATA"))
+        for c in range(cycles):
+            events.append(cloudwatch_message(name, state="ALARM", old_state="OK", time=f"2026-10-18T0{c}:00:00.000+0000"))
+            events.append(cloudwatch_message(name, state="OK", old_state="ALARM", time=f"2026-10-18T0{c}:30:00.000+0000"))
+    return events
+
+
+def run(mode: str, alarms: int, cycles: int, latency: float) -> tuple[dict, float, int]:
+    with FakeJiraServer(FakeJira(latency=latency)) as server:
+        os.environ.update(MODES[mode])
+        module = load_lambda_module()
+        module.jira_secret_cache.put(server.secret())
+
+        events = _events(alarms, cycles)
+        start = time.perf_counter()
+        for message in events:
+            module.lambda_handler(sns_event(message), None)
+        elapsed = time.perf_counter() - start
+        open_issues = sum(not issue["done"] for issue in server.jira.issues.values())
+        return dict(server.jira.calls), elapsed, open_issues
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alarms", type=int, default=20)
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake Jira の擬似レイテンシ（秒）")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"alarms={args.alarms} cycles={args.cycles} latency={args.latency}s")
+    for mode in MODES:
+        calls, elapsed, open_issues = run(mode, args.alarms, args.cycles, args.latency)
+        detail = " ".join(f"{name}={count}" for name, count in sorted(calls.items()))
+        print(f"{mode:>10}: total={sum(calls.values()):4d} ({detail}) open_issues={open_issues} "
+              f"elapsed={elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
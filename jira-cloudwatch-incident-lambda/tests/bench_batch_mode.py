@@ -0,0 +1,41 @@
+"""
+逐次モードとバッチモードの Jira ラウンドトリップ数・処理時間を比較するベンチマーク。
+
+    python tests/bench_batch_mode.py --records 50 --alarms 5 --latency 0.02
+"""
+import argparse
+import time
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+
+def run(batch_mode: bool, records: int, alarms: int, latency: float) -> tuple[dict, float]:
+    with FakeJiraServer(FakeJira(latency=latency)) as server:
+        module = load_lambda_module()
+        module.jira_secret_cache.put(server.secret())
+        module.JIRA_BATCH_MODE = batch_mode
+
+        event = sns_event(*[cloudwatch_message(f"storm-alarm-{i % alarms}") for i in range(records)])
+        start = time.perf_counter()
+        module.lambda_handler(event, None)
+        elapsed = time.perf_counter() - start
+        return dict(server.jira.calls), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=50)
+    parser.add_argument("--alarms", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake Jira の擬似レイテンシ（秒）")
+    args = parser.parse_args()
+
+    print(f"records={args.records} alarms={args.alarms} latency={args.latency}s")
+    for label, batch_mode in (("sequential", False), ("batch", True)):
+        calls, elapsed = run(batch_mode, args.records, args.alarms, args.latency)
+        print(f"{label:>10}: round_trips={sum(calls.values()):4d} {calls}  elapsed={elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+初出アラームの一斉発報（リージョン障害など）で、1件ずつの起票と一括起票（JIRA_BULK_CREATE）を比較するベンチマーク。
+Fake Jira に擬似レイテンシを入れて、ラウンドトリップ数と処理時間（Issue/秒）を出す。
+
+    python tests/bench_bulk_create.py --alarms 50 200 --latency 0.05 --workers 1 4
+"""
+import argparse
+import os
+import time
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+
+def run(alarms: int, latency: float, workers: int, bulk: bool) -> tuple[dict, float]:
+    with FakeJiraServer(FakeJira(latency=latency)) as server:
+        os.environ["JIRA_BATCH_MODE"] = "true"
+        os.environ["JIRA_MAX_WORKERS"] = str(workers)
+        os.environ["JIRA_BULK_CREATE"] = "true" if bulk else "false"
+        module = load_lambda_module()
+        module.logger.disabled = True
+        module.jira_secret_cache.put(server.secret())
+
+        event = sns_event(*[cloudwatch_message(f"region-outage-{i}") for i in range(alarms)])
+        start = time.perf_counter()
+        result = module.lambda_handler(event, None)
+        elapsed = time.perf_counter() - start
+        assert result["status"] == "ok", result
+        assert len(server.jira.issues) == alarms
+        return dict(server.jira.calls), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alarms", type=int, nargs="+", default=[50, 200], help="summary の異なるアラーム数")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake Jira の擬似レイテンシ（秒）")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    print(f"latency={args.latency}s")
+    for alarms in args.alarms:
+        for workers in args.workers:
+            baseline = None
+            for bulk in (False, True):
+                calls, elapsed = run(alarms, args.latency, workers, bulk)
+                baseline = baseline or elapsed
+                print(f"alarms={alarms:4d} workers={workers:2d} {'bulk' if bulk else 'single':6}: "
+                      f"create_calls={calls.get('create', 0) + calls.get('bulk_create', 0):4d} "
+                      f"round_trips={sum(calls.values()):4d} elapsed={elapsed * 1000:8.1f}ms "
+                      f"issues/s={alarms / elapsed:7.1f} speedup={baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
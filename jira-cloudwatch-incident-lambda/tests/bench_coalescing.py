@@ -0,0 +1,56 @@
+"""
+フラッピングするアラームを想定し、コメント集約あり/なしで Jira への書き込み回数と処理時間を比較するベンチマーク。
+1回の呼び出しに1レコード（SNS の既定）なので、集約ありは溜めた発報を DynamoDB（moto）に置く。
+
+    python tests/bench_coalescing.py --invocations 200 --window 60
+"""
+import argparse
+import time
+
+import boto3
+from moto import mock_aws
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from incident_core.coalesce import CoalescingBuffer  # lambda_loader の import で sys.path が通る
+from sample_events import cloudwatch_message, sns_event
+
+
+def run(window: int, invocations: int, latency: float) -> tuple[dict, float]:
+    with FakeJiraServer(FakeJira(latency=latency)) as server, mock_aws():
+        module = load_lambda_module()
+        module.jira_secret_cache.put(server.secret())
+        module.issue_tracker.dedup_cache = module.DedupCache(ttl_seconds=300)
+        table = boto3.resource("dynamodb", region_name="ap-northeast-1").create_table(
+            TableName="jira-coalesce",
+            KeySchema=[{"AttributeName": "summary", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "summary", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        module.coalescing_buffer = CoalescingBuffer(window, table)
+
+        start = time.perf_counter()
+        for i in range(invocations):
+            message = cloudwatch_message("flapping-alarm", reason=f"Threshold Crossed: {i % 3} datapoints")
+            module.lambda_handler(sns_event(message), None)
+        elapsed = time.perf_counter() - start
+        return dict(server.jira.calls), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--invocations", type=int, default=200)
+    parser.add_argument("--window", type=int, default=60, help="集約ウィンドウ（秒）")
+    parser.add_argument("--latency", type=float, default=0.01, help="Fake Jira の擬似レイテンシ（秒）")
+    args = parser.parse_args()
+
+    print(f"invocations={args.invocations} window={args.window}s latency={args.latency}s")
+    for label, window in (("per-event", 0), ("coalesced", args.window)):
+        calls, elapsed = run(window, args.invocations, args.latency)
+        writes = calls.get("create", 0) + calls.get("comment", 0)
+        print(f"{label:>10}: jira_writes={writes:4d} total_calls={sum(calls.values()):4d} "
+              f"elapsed={elapsed * 1000:.1f}ms ({elapsed * 1000 / args.invocations:.2f}ms/invocation)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+並列ディスパッチ（JIRA_MAX_WORKERS）ごとの処理時間を比較するベンチマーク。
+Fake Jira に擬似レイテンシを入れて、壁時計時間がワーカー数にほぼ比例して縮むことを確認する。
+
+    python tests/bench_concurrency.py --alarms 32 --latency 0.05 --workers 1 2 4 8 16
+"""
+import argparse
+import os
+import time
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+
+def run(workers: int, alarms: int, per_alarm: int, latency: float) -> tuple[dict, float]:
+    with FakeJiraServer(FakeJira(latency=latency)) as server:
+        # PoolManager の maxsize は import 時に決まるので環境変数で渡す
+        os.environ["JIRA_BATCH_MODE"] = "true"
+        os.environ["JIRA_MAX_WORKERS"] = str(workers)
+        module = load_lambda_module()
+        module.jira_secret_cache.put(server.secret())
+
+        messages = [cloudwatch_message(f"alarm-{i}") for _ in range(per_alarm) for i in range(alarms)]
+        start = time.perf_counter()
+        module.lambda_handler(sns_event(*messages), None)
+        elapsed = time.perf_counter() - start
+        return dict(server.jira.calls), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alarms", type=int, default=32, help="summary の異なるアラーム数")
+    parser.add_argument("--per-alarm", type=int, default=2, help="アラームあたりのレコード数")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake Jira の擬似レイテンシ（秒）")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"alarms={args.alarms} per_alarm={args.per_alarm} latency={args.latency}s")
+    baseline = None
+    for workers in args.workers:
+        calls, elapsed = run(workers, args.alarms, args.per_alarm, args.latency)
+        baseline = baseline or elapsed
+        print(f"workers={workers:3d}: round_trips={sum(calls.values()):4d} "
+              f"elapsed={elapsed * 1000:8.1f}ms speedup={baseline / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
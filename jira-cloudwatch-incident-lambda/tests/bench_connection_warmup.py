@@ -0,0 +1,67 @@
+"""
+コールドスタート直後の1件目のイベントのレイテンシを、ウォームアップなし / あり（JIRA_WARMUP_ON_INIT）で比較するベンチマーク。
+Fake Jira は新しいコネクションの最初の応答を --connect-latency 秒遅らせる（TLS ハンドシェイクなどの代わり）。
+ウォームアップありでは、その分が初期化（import）に移り、1件目のイベントは張ってあるコネクションを使う。
+最後に、最大アイドル時間を超えた後のイベント（コネクションを張り直す）も計測する。
+
+    python tests/bench_connection_warmup.py --containers 10 --connect-latency 0.05
+"""
+import argparse
+import logging
+import statistics
+import time
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+
+def _event_ms(module, alarm: str) -> float:
+    start = time.perf_counter()
+    module.lambda_handler(sns_event(cloudwatch_message(alarm)), None)
+    return (time.perf_counter() - start) * 1000
+
+
+def run(warmup: bool, containers: int, connect_latency: float, latency: float) -> dict:
+    jira = FakeJira(latency=latency)
+    jira.connect_latency = connect_latency
+    samples = {"init": [], "first": [], "second": [], "after_idle": []}
+    with FakeJiraServer(jira) as server:
+        for c in range(containers):
+            start = time.perf_counter()
+            module = load_lambda_module()
+            module.jira_secret_cache.put(server.secret())
+            if warmup:
+                # JIRA_WARMUP_ON_INIT=true なら import の最後に呼ばれる（Secret はここでは取得済み）
+                module._warm_up_connection()
+            samples["init"].append((time.perf_counter() - start) * 1000)
+            samples["first"].append(_event_ms(module, f"alarm-{c}-a"))
+            samples["second"].append(_event_ms(module, f"alarm-{c}-b"))
+
+            module._http_client.value.max_idle_seconds = 0.01
+            time.sleep(0.02)
+            samples["after_idle"].append(_event_ms(module, f"alarm-{c}-c"))
+        connections = jira.connections
+    result = {name: statistics.median(values) for name, values in samples.items()}
+    result["connections"] = connections
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--containers", type=int, default=10)
+    parser.add_argument("--connect-latency", type=float, default=0.05, help="コネクション確立の擬似コスト（秒）")
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake Jira の擬似レイテンシ（秒）")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"containers={args.containers} connect_latency={args.connect_latency}s latency={args.latency}s (median ms)")
+    print(f"{'mode':<8} {'init':>8} {'1st event':>10} {'2nd event':>10} {'after idle':>11} {'connections':>12}")
+    for warmup in (False, True):
+        r = run(warmup, args.containers, args.connect_latency, args.latency)
+        print(f"{'warmup' if warmup else 'cold':<8} {r['init']:>8.1f} {r['first']:>10.1f} {r['second']:>10.1f} "
+              f"{r['after_idle']:>11.1f} {r['connections']:>12}")
+
+
+if __name__ == "__main__":
+    main()
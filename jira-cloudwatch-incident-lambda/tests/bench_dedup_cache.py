@@ -0,0 +1,43 @@
+"""
+アラームストーム時の Jira 検索回数を、重複チェックキャッシュあり/なしで比較するベンチマーク。
+SNS から1レコードずつ呼ばれる（= 同じウォームコンテナへの連続呼び出し）想定。
+
+    python tests/bench_dedup_cache.py --invocations 200 --alarms 5
+"""
+import argparse
+import time
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+
+def run(ttl_seconds: int, invocations: int, alarms: int, latency: float) -> tuple[dict, dict, float]:
+    with FakeJiraServer(FakeJira(latency=latency)) as server:
+        module = load_lambda_module()
+        module.jira_secret_cache.put(server.secret())
+        module.issue_tracker.dedup_cache = module.DedupCache(ttl_seconds=ttl_seconds)
+
+        start = time.perf_counter()
+        for i in range(invocations):
+            module.lambda_handler(sns_event(cloudwatch_message(f"storm-alarm-{i % alarms}")), None)
+        elapsed = time.perf_counter() - start
+        return dict(server.jira.calls), module.issue_tracker.dedup_cache.stats(), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--invocations", type=int, default=200)
+    parser.add_argument("--alarms", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.01, help="Fake Jira の擬似レイテンシ（秒）")
+    args = parser.parse_args()
+
+    print(f"invocations={args.invocations} alarms={args.alarms} latency={args.latency}s")
+    for label, ttl in (("no cache", 0), ("cache", 300)):
+        calls, stats, elapsed = run(ttl, args.invocations, args.alarms, args.latency)
+        print(f"{label:>9}: search={calls.get('search', 0):4d} total={sum(calls.values()):4d} "
+              f"elapsed={elapsed * 1000:.1f}ms hits={stats['hits']} misses={stats['misses']}")
+
+
+if __name__ == "__main__":
+    main()
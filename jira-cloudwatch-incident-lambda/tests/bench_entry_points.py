@@ -0,0 +1,46 @@
+"""
+2つの Jira Lambda（jira_create_issue_lambda.py / jira_create_issue_lambda_cw+sf.py）の
+コールドスタート（モジュール初期化）と1イベントあたりの処理時間を比較するベンチマーク。
+処理時間は Fake Jira（レイテンシ0）に対して、同じ summary のアラームを流したときの1レコードあたり（初回の起票を含む）。
+
+    python tests/bench_entry_points.py --runs 5 --events 200
+"""
+import argparse
+import statistics
+import time
+
+from fake_jira import FakeJiraServer
+from import_profile import profile_import
+from lambda_loader import CW_SF_LAMBDA, PLAIN_LAMBDA, load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+
+def per_event_us(filename: str, server: FakeJiraServer, events: int) -> float:
+    module = load_lambda_module(filename)
+    module.logger.disabled = True
+    module.jira_secret_cache.put(server.secret())
+    event = sns_event(cloudwatch_message("prod-api-5xx"))
+    module.lambda_handler(event, None)  # 初回の起票と接続確立は除く
+    start = time.perf_counter()
+    for _ in range(events):
+        module.lambda_handler(event, None)
+    return (time.perf_counter() - start) * 1e6 / events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    with FakeJiraServer() as server:
+        for filename in (PLAIN_LAMBDA, CW_SF_LAMBDA):
+            results = [profile_import(filename) for _ in range(args.runs)]
+            init_ms = statistics.median(r["init_ms"] for r in results)
+            us = statistics.median(per_event_us(filename, server, args.events) for _ in range(3))
+            print(f"{filename:36}: init median={init_ms:7.1f}ms heavy modules={len(results[-1]['heavy_modules']):4d} "
+                  f"per event={us:8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Lambda のリトライ・SNS の再配信があったときの Jira 呼び出し回数を、処理済みメッセージの台帳なし/あり
+（コンテナ内のみ / DynamoDB(moto)）で比較するベンチマーク。
+各イベントは --records 件のレコードを持ち、1回目は最後のレコードの起票が失敗して Lambda がリトライする。
+成功後に SNS が同じイベントを --redeliveries 回再配信する想定。
+
+    python tests/bench_idempotency.py --events 50 --records 5 --redeliveries 1
+"""
+import argparse
+import logging
+import time
+
+import boto3
+from moto import mock_aws
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from incident_core.idempotency import IdempotencyLedger  # lambda_loader の import で sys.path が通る
+from incident_core.jira import JiraApiError
+from sample_events import cloudwatch_message, sns_event
+
+
+def _create_table():
+    return boto3.resource("dynamodb", region_name="ap-northeast-1").create_table(
+        TableName="jira-idempotency",
+        KeySchema=[{"AttributeName": "idempotency_key", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "idempotency_key", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def run(mode: str, events: int, records: int, redeliveries: int, latency: float) -> tuple[dict, float]:
+    with FakeJiraServer(FakeJira(latency=latency)) as server, mock_aws():
+        module = load_lambda_module()
+        module.jira_secret_cache.put(server.secret())
+        if mode != "off":
+            table = _create_table() if mode == "dynamodb" else None
+            module.idempotency_ledger = IdempotencyLedger(ttl_seconds=300, table=table)
+
+        start = time.perf_counter()
+        for i in range(events):
+            alarms = [f"event-{i}-alarm-{j}" for j in range(records)]
+            event = sns_event(*(cloudwatch_message(a) for a in alarms),
+                              message_ids={j: f"event-{i}-msg-{j}" for j in range(records)})
+
+            # 1回目: 最後のレコードで失敗 → Lambda がイベントごとリトライ
+            server.jira.rejected_summaries = {f"[CloudWatch Alarm] {alarms[-1]} is ALARM"}
+            try:
+                module.lambda_handler(event, None)
+            except JiraApiError:
+                pass
+            server.jira.rejected_summaries = set()
+            module.lambda_handler(event, None)
+
+            # SNS の再配信
+            for _ in range(redeliveries):
+                module.lambda_handler(event, None)
+        elapsed = time.perf_counter() - start
+        return dict(server.jira.calls), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--records", type=int, default=5)
+    parser.add_argument("--redeliveries", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake Jira の擬似レイテンシ（秒）")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"events={args.events} records={args.records} redeliveries={args.redeliveries} latency={args.latency}s")
+    baseline = None
+    for mode in ("off", "memory", "dynamodb"):
+        calls, elapsed = run(mode, args.events, args.records, args.redeliveries, args.latency)
+        total = sum(calls.values())
+        baseline = baseline or total
+        print(f"{mode:>9}: search={calls.get('search', 0):4d} create={calls.get('create', 0):4d} "
+              f"comment={calls.get('comment', 0):4d} total={total:4d} "
+              f"saved={1 - total / baseline:6.1%} elapsed={elapsed * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
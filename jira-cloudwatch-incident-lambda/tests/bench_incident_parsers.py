@@ -0,0 +1,58 @@
+"""
+インシデント種別パーサーのマイクロベンチマーク。
+種別ごとの変換コストと、登録済みパーサーの数を増やしても振り分けのコストが変わらないことを確認する。
+
+    python tests/bench_incident_parsers.py --events 20000 --registry 0 100 1000 10000
+"""
+import argparse
+import time
+
+from lambda_loader import load_lambda_module
+from sample_events import (
+    batch_job_failed_event, cloudwatch_alarm_event, cloudwatch_message, composite_alarm_message,
+    ecs_task_stopped_event, stepfunctions_event,
+)
+
+SNS = {"Timestamp": "2026-10-18T00:00:00.000Z"}
+SAMPLES = {
+    "cloudwatch (sns)": cloudwatch_message(),
+    "composite (sns)": composite_alarm_message(),
+    "cloudwatch (eventbridge)": cloudwatch_alarm_event(),
+    "stepfunctions": stepfunctions_event(),
+    "ecs task": ecs_task_stopped_event(),
+    "batch job": batch_job_failed_event(),
+    "unknown": {"source": "aws.health", "detail-type": "AWS Health Event", "detail": {}},
+}
+
+
+def per_event_us(module, message, events):
+    build = module._build_incident
+    start = time.perf_counter()
+    for _ in range(events):
+        build(message, SNS)
+    return (time.perf_counter() - start) * 1e6 / events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--registry", type=int, nargs="+", default=[0, 100, 1000, 10000],
+                        help="追加で登録するダミーパーサーの数")
+    args = parser.parse_args()
+
+    module = load_lambda_module()
+    module.logger.disabled = True  # unknown の警告ログは計測から外す
+    base = dict(module._INCIDENT_PARSERS)
+
+    print(f"events={args.events}")
+    for extra in args.registry:
+        module._INCIDENT_PARSERS = dict(base)
+        for i in range(extra):
+            module._INCIDENT_PARSERS[(f"custom.source{i}", f"Custom Event {i}")] = module._build_generic_incident
+        timings = "  ".join(f"{name}={per_event_us(module, message, args.events):5.2f}us"
+                            for name, message in SAMPLES.items())
+        print(f"parsers={len(module._INCIDENT_PARSERS):6d}: {timings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+受信イベントのログ出力コストを比較するベンチマーク（既定: 10レコード・合計 256KB のイベント）。
+- legacy: 変更前の logger.info("Received event: %s", json.dumps(event))
+- summary: 既定の要約ログ（件数・MessageId・サイズ）
+- sampled: JIRA_LOG_EVENT_SAMPLE_RATE=1 で全文を出す場合（JIRA_LOG_FIELD_MAX_CHARS で切り詰め）
+1回あたりの CPU 時間と、CloudWatch Logs に送られるバイト数を出す。
+
+    python tests/bench_logging.py --records 10 --event-kb 256 --iterations 500
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import time
+
+from lambda_loader import load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+
+def large_event(records: int, event_kb: int) -> dict:
+    reason = "x" * (event_kb * 1024 // records)
+    return sns_event(*[cloudwatch_message(f"alarm-{i}", reason=reason) for i in range(records)])
+
+
+def legacy(module, event):
+    module.logger.info("Received event: %s", json.dumps(event))
+
+
+def current(module, event):
+    module._log_received_event(event)
+
+
+def bench(module, func, event, iterations: int, level: int) -> tuple[float, int]:
+    sink = io.StringIO()
+    handler = logging.StreamHandler(sink)
+    if module.JIRA_LOG_FORMAT == "json":
+        handler.setFormatter(module.JsonLogFormatter())
+    saved_handlers, saved_level = module.logger.handlers[:], module.logger.level
+    module.logger.handlers[:] = [handler]
+    module.logger.setLevel(level)
+    try:
+        start = time.process_time()
+        for _ in range(iterations):
+            func(module, event)
+        elapsed = time.process_time() - start
+    finally:
+        module.logger.handlers[:] = saved_handlers
+        module.logger.setLevel(saved_level)
+    return elapsed * 1e6 / iterations, len(sink.getvalue().encode("utf-8")) // iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=10)
+    parser.add_argument("--event-kb", type=int, default=256)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    event = large_event(args.records, args.event_kb)
+    print(f"records={args.records} event={len(json.dumps(event)) / 1024:.0f}KB")
+    for log_format in ("text", "json"):
+        os.environ["JIRA_LOG_FORMAT"] = log_format
+        module = load_lambda_module()
+        sampled = load_lambda_module()
+        sampled.JIRA_LOG_EVENT_SAMPLE_RATE = 1.0
+        cases = [("legacy", module, legacy), ("summary", module, current), ("sampled", sampled, current)]
+        for level in (logging.INFO, logging.WARNING):
+            for label, target, func in cases:
+                if label == "legacy" and log_format == "json":
+                    continue
+                us, size = bench(target, func, event, args.iterations, level)
+                print(f"format={log_format:4} level={logging.getLevelName(level):7} {label:7}: "
+                      f"{us:9.1f}us/invocation {size:8d} bytes logged")
+
+
+if __name__ == "__main__":
+    main()
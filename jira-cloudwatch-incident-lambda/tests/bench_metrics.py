@@ -0,0 +1,65 @@
+"""
+EMF メトリクスのオーバーヘッドを測る（JIRA_METRICS_ENABLED=false / true で読み込んだモジュールを比較）。
+- 計測ポイント単体: _build_incident 1回あたり
+- ハンドラ全体: Fake Jira（レイテンシ0）に対する1イベントあたりの処理時間
+
+    python tests/bench_metrics.py --calls 100000 --events 300
+"""
+import argparse
+import contextlib
+import io
+import os
+import time
+
+from fake_jira import FakeJiraServer
+from lambda_loader import load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+SNS = {"Timestamp": "2026-10-18T00:00:00.000Z"}
+
+
+def load(enabled: bool):
+    os.environ["JIRA_METRICS_ENABLED"] = "true" if enabled else "false"
+    module = load_lambda_module()
+    module.logger.disabled = True
+    return module
+
+
+def per_call_ns(module, calls):
+    build, message = module._build_incident, cloudwatch_message()
+    start = time.perf_counter()
+    for _ in range(calls):
+        build(message, SNS)
+    elapsed = time.perf_counter() - start
+    module.emf_metrics.flush(stream=io.StringIO())
+    return elapsed * 1e9 / calls
+
+
+def handler_us_per_event(module, server, events):
+    module.jira_secret_cache.put(server.secret())
+    event = sns_event(*[cloudwatch_message(f"alarm-{i % 20}") for i in range(events)])
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        start = time.perf_counter()
+        module.lambda_handler(event, None)
+        elapsed = time.perf_counter() - start
+    return elapsed * 1e6 / events, len(out.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--events", type=int, default=300)
+    args = parser.parse_args()
+
+    modules = {"off": load(False), "on": load(True)}
+    for label, module in modules.items():
+        print(f"metrics={label:3}: _build_incident={per_call_ns(module, args.calls):6.0f}ns/call")
+
+    with FakeJiraServer() as server:
+        for label in ("off", "on", "off", "on"):
+            us, emf_bytes = handler_us_per_event(modules[label], server, args.events)
+            print(f"metrics={label:3}: handler={us:8.1f}us/event (EMF {emf_bytes} bytes)")
+
+
+if __name__ == "__main__":
+    main()
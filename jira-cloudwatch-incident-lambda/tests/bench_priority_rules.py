@@ -0,0 +1,105 @@
+"""
+優先度判定のマイクロベンチマーク。
+従来の実装（毎回 text_blob とキーワードリストを作り直して `in` で走査）と
+コンパイル済みルール（PriorityRuleEngine）を、合成したアラーム文字列で比較する。
+
+    python tests/bench_priority_rules.py --texts 5000 --keywords 13 100 300 1000
+"""
+import argparse
+import random
+import string
+import time
+
+from lambda_loader import load_lambda_module
+
+SERVICES = ["order", "payment", "billing", "inventory", "search", "auth", "notify", "report"]
+ENVS = ["dev", "stg", "prod", "qa"]
+METRICS = ["Errors", "Throttles", "Duration", "5XXError", "ExecutionsFailed", "ConcurrentExecutions"]
+NAMESPACES = ["AWS/Lambda", "AWS/States", "AWS/ApiGateway", "AWS/SQS"]
+REASON = (
+    "Threshold Crossed: {n} out of the last {m} datapoints [{v} (18/10/26 00:00:00)] was greater than "
+    "or equal to the threshold (1.0) (minimum 1 datapoint for OK -> ALARM transition)."
+)
+
+
+def legacy_decide_priority(alarm_name, metric_name, reason=None, namespace=None,
+                           high_keywords=(), medium_keywords=()):
+    """変更前の _decide_priority と同じ処理（キーワードリストは毎回作り直す）"""
+    text_blob = " ".join(
+        s for s in [alarm_name or "", metric_name or "", reason or "", namespace or ""] if s
+    ).lower()
+    high_keywords = list(high_keywords)
+    medium_keywords = list(medium_keywords)
+    if any(k in text_blob for k in high_keywords):
+        return {"name": "High"}
+    if any(k in text_blob for k in medium_keywords):
+        return {"name": "Medium"}
+    return {"name": "Medium"}
+
+
+def synthetic_alarms(rng, count):
+    return [
+        (
+            f"{rng.choice(ENVS)}-{rng.choice(SERVICES)}-api-{rng.choice(METRICS).lower()}",
+            rng.choice(METRICS),
+            REASON.format(n=rng.randint(1, 5), m=5, v=round(rng.random() * 10, 1)),
+            rng.choice(NAMESPACES),
+        )
+        for _ in range(count)
+    ]
+
+
+def synthetic_keywords(rng, count, default_keywords):
+    keywords = list(default_keywords)
+    while len(keywords) < count:
+        keywords.append("".join(rng.choices(string.ascii_lowercase + "-_", k=rng.randint(4, 12))))
+    return keywords[:count]
+
+
+def bench(module, alarms, high, medium):
+    start = time.perf_counter()
+    engine = module.PriorityRuleEngine.from_config({
+        "tiers": [{"priority": "High", "keywords": high}, {"priority": "Medium", "keywords": medium}],
+    })
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    legacy = [legacy_decide_priority(*a, high_keywords=high, medium_keywords=medium) for a in alarms]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = [
+        engine.decide({"alarm_name": a[0], "metric_name": a[1], "reason": a[2], "namespace": a[3]})
+        for a in alarms
+    ]
+    compiled_s = time.perf_counter() - start
+
+    assert legacy == compiled, "判定結果が従来実装と一致しない"
+    return compile_ms, legacy_s, compiled_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--keywords", type=int, nargs="+", default=[13, 100, 300, 1000],
+                        help="tier あたりのキーワード数（先頭は既定ルールのキーワード）")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    module = load_lambda_module()
+    default_high, default_medium = (t["keywords"] for t in module.DEFAULT_PRIORITY_RULES["tiers"])
+    alarms = synthetic_alarms(rng, args.texts)
+
+    print(f"texts={args.texts}")
+    for count in args.keywords:
+        high = synthetic_keywords(rng, count, default_high)
+        medium = synthetic_keywords(rng, count, default_medium)
+        compile_ms, legacy_s, compiled_s = bench(module, alarms, high, medium)
+        print(f"keywords/tier={count:5d}: legacy={legacy_s * 1e6 / args.texts:7.2f}us/alarm "
+              f"compiled={compiled_s * 1e6 / args.texts:7.2f}us/alarm "
+              f"speedup={legacy_s / compiled_s:5.1f}x (compile {compile_ms:.1f}ms once)")
+
+
+if __name__ == "__main__":
+    main()
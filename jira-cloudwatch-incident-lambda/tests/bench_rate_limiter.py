@@ -0,0 +1,67 @@
+"""
+クォータ付きの Fake Jira に対してアラームストームを流し、レート制御の有無で
+スループット・429 の回数・取りこぼし（失敗したレコード）を比較する。
+
+    python tests/bench_rate_limiter.py --alarms 200 --quota 50 --burst 10 --workers 8
+"""
+import argparse
+import logging
+import time
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+
+def run(limiter: bool, quota_headers: bool, args) -> dict:
+    jira = FakeJira(latency=args.latency)
+    jira.set_quota(args.quota, args.burst)
+    jira.quota_headers = quota_headers
+    with FakeJiraServer(jira) as server:
+        module = load_lambda_module()
+        module.jira_secret_cache.put(server.secret())
+        module.JIRA_MAX_WORKERS = args.workers
+        module.JIRA_RATE_LIMIT_ENABLED = limiter
+
+        event = sns_event(*[cloudwatch_message(f"storm-{i}") for i in range(args.alarms)])
+        start = time.perf_counter()
+        try:
+            results = module.lambda_handler(event, None)["results"]
+        except module.BatchProcessingError as e:
+            # 取りこぼしがあれば Lambda にリトライさせるため例外になる
+            results = e.results
+        elapsed = time.perf_counter() - start
+
+    accepted = sum(v for k, v in jira.calls.items() if k != "throttled")
+    return {
+        "elapsed": elapsed,
+        "throughput": accepted / elapsed,
+        "throttled": jira.calls["throttled"],
+        "failed": sum(r["status"] == "failed" for r in results),
+        "limiter": module.jira_rate_limiter.metrics() if limiter else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--alarms", type=int, default=200)
+    parser.add_argument("--quota", type=float, default=50, help="Fake Jira のクォータ(req/s)")
+    parser.add_argument("--burst", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"alarms={args.alarms} quota={args.quota}/s burst={args.burst} workers={args.workers}")
+    for label, limiter, quota_headers in (
+        ("no limiter", False, True),
+        ("limiter (429 only)", True, False),
+        ("limiter (headers)", True, True),
+    ):
+        r = run(limiter, quota_headers, args)
+        print(f"{label:>20}: elapsed={r['elapsed']:6.2f}s accepted={r['throughput']:6.1f}req/s "
+              f"throttled={r['throttled']:4d} failed_records={r['failed']:4d} limiter={r['limiter']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Jira に送るリクエストボディのバイト数（bytes-on-wire）と処理時間を比較するベンチマーク。
+- legacy: 以前の形式（区切りに空白入りの JSON、非圧縮）に直した場合のサイズ（送ったボディから再計算）
+- compact: コンパクトな JSON（非圧縮）
+- gzip: コンパクトな JSON を gzip で送る（JIRA_GZIP_REQUESTS=true）
+起票 → コメントが交互になるよう、同じアラームを --events 回送る。
+
+    python tests/bench_request_body.py --events 200 --payload-kb 40
+"""
+import argparse
+import gzip
+import json
+import logging
+import time
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+
+def _message(payload_kb: int) -> dict:
+    message = cloudwatch_message(reason="Threshold Crossed: 1 datapoint [12.0 (18/10/26 00:00:00)] was greater than 5.0")
+    if payload_kb:
+        # 大きい EventBridge ペイロード相当（タグやリソースの一覧）
+        message["Resources"] = [
+            {"arn": f"arn:aws:lambda:ap-northeast-1:123456789012:function:order-api-{i}", "tags": {"team": "orders"}}
+            for i in range(payload_kb * 1024 // 100)
+        ]
+    return message
+
+
+def run(mode: str, events: int, payload_kb: int, latency: float) -> dict:
+    with FakeJiraServer(FakeJira(latency=latency)) as server:
+        module = load_lambda_module()
+        module.jira_secret_cache.put(server.secret())
+        module.jira_gzip = module.GzipTransport(mode == "gzip", min_bytes=1024)
+
+        legacy_bytes = 0
+        send = module._http_request
+
+        def recording_send(method, url, body, headers):
+            # 送ったボディを以前の形式（json.dumps の既定の区切り）で数え直す
+            nonlocal legacy_bytes
+            if body:
+                raw = gzip.decompress(body) if headers.get("Content-Encoding") == "gzip" else body
+                legacy_bytes += len(json.dumps(json.loads(raw), ensure_ascii=False).encode("utf-8"))
+            return send(method, url, body, headers)
+
+        module._http_request = recording_send
+        message = _message(payload_kb)
+
+        start = time.perf_counter()
+        for i in range(events):
+            module.lambda_handler(sns_event(message, message_ids={0: f"msg-{i}"}), None)
+            if i % 2 == 1:
+                # 次のイベントで起票されるように解決しておく
+                for key in list(server.jira.issues):
+                    server.jira.resolve(key)
+        elapsed = time.perf_counter() - start
+        return {
+            "wire": server.jira.bytes_received,
+            "legacy": legacy_bytes,
+            "us_per_event": elapsed / events * 1e6,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--payload-kb", type=int, default=40, help="生メッセージに足す大きさ（KB）。0 なら通常のアラーム")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake Jira の擬似レイテンシ（秒）")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print(f"events={args.events} payload={args.payload_kb}KB latency={args.latency}s")
+    for mode in ("compact", "gzip"):
+        result = run(mode, args.events, args.payload_kb, args.latency)
+        if mode == "compact":
+            print(f"{'legacy':>8}: bytes={result['legacy']:9d}")
+        print(f"{mode:>8}: bytes={result['wire']:9d} ({result['wire'] / result['legacy']:6.1%} of legacy) "
+              f"{result['us_per_event']:8.1f}us/event")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import pytest
+
+from fake_jira import FakeJiraServer
+from lambda_loader import load_lambda_module
+
+
+@pytest.fixture()
+def fake_jira():
+    """ローカルの Fake Jira サーバー"""
+    with FakeJiraServer() as server:
+        yield server
+
+
+@pytest.fixture()
+def lambda_module(fake_jira):
+    """Fake Jira を向いた Secret をキャッシュ済みの状態で Lambda モジュールを読み込む"""
+    module = load_lambda_module()
+    module.jira_secret_cache.put(fake_jira.secret())
+    return module
@@ -0,0 +1,349 @@
+"""
+ローカル検証・ベンチマーク用の簡易 Jira Cloud REST API サーバー。
+
+Lambda 本体の http(PoolManager) から実際に HTTP で叩けるように、
+スレッドで ThreadingHTTPServer を起動する。
+呼び出し回数（ラウンドトリップ数）をエンドポイント別に数えるのが主目的。
+"""
+import base64
+import gzip
+import json
+import math
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_SUMMARY_RE = re.compile(r'summary ~ "((?:[^"\\]|\\.)*)"')
+_COMMENT_PATH_RE = re.compile(r"^/rest/api/3/issue/([A-Z0-9]+-\d+)/comment$")
+_TRANSITION_PATH_RE = re.compile(r"^/rest/api/3/issue/([A-Z0-9]+-\d+)/transitions$")
+_ISSUE_PATH_RE = re.compile(r"^/rest/api/3/issue/([A-Z0-9]+-\d+)(?:\?.*)?$")
+
+
+class FakeJira:
+    """
+    Jira の状態（Issue / コメント）と呼び出し回数を保持する。
+    """
+
+    def __init__(self, project_key: str = "TEST", latency: float = 0.0):
+        self.project_key = project_key
+        self.latency = latency  # 1リクエストあたりの擬似レイテンシ（秒）
+        self.issues: dict[str, dict] = {}
+        self.comments: dict[str, list] = {}
+        self.calls: Counter = Counter()
+        self.api_token: str | None = None  # 設定するとこのトークン以外は 401 を返す（ローテーションの再現用）
+        self.error_status: int | None = None  # 設定すると全リクエストにこのステータスを返す（429 / 503 などの再現用）
+        self.retry_after: int | None = None  # error_status と一緒に返す Retry-After（秒）
+        self.quota: tuple[float, int] | None = None  # (req/s, バースト) を超えたら 429 を返す
+        self.quota_headers = True  # X-RateLimit-* ヘッダでクォータを知らせる（False なら 429 と Retry-After だけ）
+        self.rejected_summaries: set[str] = set()  # この summary の起票は 400 で失敗させる（一括起票の部分失敗の再現用）
+        self.accept_gzip = True  # False なら Content-Encoding: gzip のボディに 415 を返す
+        self.bytes_received = 0  # 受け取ったリクエストボディの合計バイト数（圧縮されていれば圧縮後）
+        self.gzip_requests = 0
+        # 新しいコネクションの最初の応答をこの秒数だけ遅らせる（TLS ハンドシェイクなど確立コストの代わり）
+        self.connect_latency = 0.0
+        self.connections = 0
+        self._quota_tokens = 0.0
+        self._quota_updated = 0.0
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    # ===== テスト用ヘルパー =====
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+
+    def reset_calls(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def resolve(self, key: str) -> None:
+        """Issue を Done 扱いにする（検索にヒットしなくなる）"""
+        with self._lock:
+            self.issues[key]["done"] = True
+
+    def open_issue_keys(self, summary: str) -> list[str]:
+        return [
+            key for key, issue in self.issues.items()
+            if issue["summary"] == summary and not issue["done"]
+        ]
+
+    # ===== API 実装 =====
+    def search(self, payload: dict) -> tuple[int, dict]:
+        m = _SUMMARY_RE.search(payload.get("jql", ""))
+        if not m:
+            return 400, {"errorMessages": ["summary clause not found"]}
+        summary = m.group(1).replace('\\"', '"')
+        with self._lock:
+            keys = self.open_issue_keys(summary)
+        # ORDER BY created DESC
+        keys.sort(key=lambda k: self.issues[k]["seq"], reverse=True)
+        max_results = payload.get("maxResults", 50)
+        return 200, {"issues": [{"key": k} for k in keys[:max_results]]}
+
+    def create_issue(self, payload: dict) -> tuple[int, dict]:
+        fields = payload.get("fields", {})
+        if "summary" not in fields:
+            return 400, {"errors": {"summary": "Summary is required."}}
+        if fields["summary"] in self.rejected_summaries:
+            return 400, {"errors": {"summary": "Summary is rejected."}}
+        with self._lock:
+            self._seq += 1
+            key = f"{self.project_key}-{self._seq}"
+            self.issues[key] = {
+                "summary": fields["summary"],
+                "fields": fields,
+                "done": False,
+                "seq": self._seq,
+            }
+            self.comments[key] = []
+        return 201, {"id": str(10000 + self._seq), "key": key}
+
+    def bulk_create_issues(self, payload: dict) -> tuple[int, dict]:
+        """
+        Jira の /rest/api/3/issue/bulk と同じ形で返す。
+        成功分は issues[]（入力順）、失敗分は errors[]（failedElementNumber = 入力の位置）。1件でも失敗すれば 400
+        """
+        issues, errors = [], []
+        for position, update in enumerate(payload.get("issueUpdates", [])):
+            status, body = self.create_issue(update)
+            if status == 201:
+                issues.append(body)
+            else:
+                errors.append({
+                    "status": status,
+                    "elementErrors": {"errorMessages": [], "errors": body.get("errors", {})},
+                    "failedElementNumber": position,
+                })
+        return (400 if errors else 201), {"issues": issues, "errors": errors}
+
+    def add_comment(self, key: str, payload: dict) -> tuple[int, dict]:
+        with self._lock:
+            if key not in self.issues:
+                return 404, {"errorMessages": ["Issue does not exist"]}
+            self.comments[key].append(payload.get("body"))
+        return 201, {"id": str(len(self.comments[key]))}
+
+    def transition_issue(self, key: str, payload: dict) -> tuple[int, dict]:
+        """遷移は ID を問わず Done 扱いにする。update.comment があればコメントも追加する"""
+        with self._lock:
+            issue = self.issues.get(key)
+            if issue is None:
+                return 404, {"errorMessages": ["Issue does not exist"]}
+            if issue["done"]:
+                return 400, {"errorMessages": ["Transition is not valid for the current status"]}
+            issue["done"] = True
+            for update in payload.get("update", {}).get("comment", []):
+                self.comments[key].append(update["add"]["body"])
+        return 204, {}
+
+    def get_issue(self, key: str) -> tuple[int, dict]:
+        with self._lock:
+            issue = self.issues.get(key)
+        if issue is None:
+            return 404, {"errorMessages": ["Issue does not exist"]}
+        category = "done" if issue["done"] else "indeterminate"
+        return 200, {"key": key, "fields": {"status": {"statusCategory": {"key": category}}}}
+
+    def authorized(self, authorization: str | None) -> bool:
+        if self.api_token is None:
+            return True
+        try:
+            _, token = base64.b64decode((authorization or "").split(" ", 1)[1]).decode("utf-8").split(":", 1)
+        except (IndexError, ValueError):
+            return False
+        return token == self.api_token
+
+    def set_quota(self, rate: float, burst: int) -> None:
+        with self._lock:
+            self.quota = (rate, burst)
+            self._quota_tokens = float(burst)
+            self._quota_updated = time.monotonic()
+
+    def _take_quota(self) -> tuple[bool, dict]:
+        """クォータ（トークンバケット）から1つ取る。取れたかどうかと、返すヘッダを返す"""
+        rate, burst = self.quota
+        with self._lock:
+            now = time.monotonic()
+            self._quota_tokens = min(burst, self._quota_tokens + (now - self._quota_updated) * rate)
+            self._quota_updated = now
+            allowed = self._quota_tokens >= 1
+            if allowed:
+                self._quota_tokens -= 1
+            tokens = self._quota_tokens
+        headers = {}
+        if self.quota_headers:
+            headers = {
+                "X-RateLimit-Limit": str(burst),
+                "X-RateLimit-Remaining": str(int(tokens)),
+                "X-RateLimit-FillRate": str(rate),
+                "X-RateLimit-Interval-Seconds": "1",
+            }
+        if not allowed:
+            headers["Retry-After"] = str(max(1, math.ceil((1 - tokens) / rate)))
+        return allowed, headers
+
+    def dispatch(self, method: str, path: str, payload: dict,
+                 authorization: str | None = None) -> tuple[int, dict, dict]:
+        """リクエストを処理して (ステータス, ボディ, 追加のレスポンスヘッダ) を返す"""
+        if method == "GET" and path == "/status":
+            # 死活確認（Jira と同じく認証なし）。コネクションのウォームアップに使われる
+            with self._lock:
+                self.calls["status"] += 1
+            return 200, {"state": "RUNNING"}, {}
+        if not self.authorized(authorization):
+            with self._lock:
+                self.calls["unauthorized"] += 1
+            return 401, {"errorMessages": ["Unauthorized"]}, {}
+        if self.error_status is not None:
+            with self._lock:
+                self.calls[f"error {self.error_status}"] += 1
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+            return self.error_status, {"errorMessages": ["Simulated error"]}, headers
+        headers = {}
+        if self.quota is not None:
+            allowed, headers = self._take_quota()
+            if not allowed:
+                with self._lock:
+                    self.calls["throttled"] += 1
+                return 429, {"errorMessages": ["Rate limit exceeded"]}, headers
+        with self._lock:
+            self.calls[self._endpoint_name(method, path)] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return (*self._route(method, path, payload), headers)
+
+    def _route(self, method: str, path: str, payload: dict) -> tuple[int, dict]:
+
+        if method == "POST" and path == "/rest/api/3/search/jql":
+            return self.search(payload)
+        if method == "POST" and path == "/rest/api/3/issue":
+            return self.create_issue(payload)
+        if method == "POST" and path == "/rest/api/3/issue/bulk":
+            return self.bulk_create_issues(payload)
+        m = _COMMENT_PATH_RE.match(path)
+        if method == "POST" and m:
+            return self.add_comment(m.group(1), payload)
+        m = _TRANSITION_PATH_RE.match(path)
+        if method == "POST" and m:
+            return self.transition_issue(m.group(1), payload)
+        m = _ISSUE_PATH_RE.match(path)
+        if method == "GET" and m:
+            return self.get_issue(m.group(1))
+        return 404, {"errorMessages": [f"No route for {method} {path}"]}
+
+    @staticmethod
+    def _endpoint_name(method: str, path: str) -> str:
+        if path.endswith("/comment"):
+            return "comment"
+        if path.endswith("/transitions"):
+            return "transition"
+        if path.endswith("/search/jql"):
+            return "search"
+        if path == "/rest/api/3/issue" and method == "POST":
+            return "create"
+        if path == "/rest/api/3/issue/bulk" and method == "POST":
+            return "bulk_create"
+        if method == "GET" and _ISSUE_PATH_RE.match(path):
+            return "get_issue"
+        return f"{method} {path}"
+
+
+class FakeJiraServer:
+    """
+    FakeJira をローカルの HTTP サーバーとして公開する。
+
+        with FakeJiraServer() as server:
+            secret = server.secret()
+            ...
+    """
+
+    def __init__(self, jira: FakeJira | None = None):
+        self.jira = jira or FakeJira()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True,
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def secret(self, **overrides) -> dict:
+        secret = {
+            "JIRA_BASE_URL": self.base_url,
+            "JIRA_EMAIL": "bot@example.com",
+            "JIRA_API_TOKEN": "dummy-token",
+            "JIRA_PROJECT_KEY": self.jira.project_key,
+            "JIRA_ISSUE_TYPE": "Incident",
+        }
+        secret.update(overrides)
+        return secret
+
+    def start(self) -> "FakeJiraServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeJiraServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _make_handler(self):
+        jira = self.jira
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # ヘッダとボディの分割送信で遅延 ACK 待ちにならないように
+
+            def setup(self):
+                super().setup()
+                with jira._lock:
+                    jira.connections += 1
+                if jira.connect_latency:
+                    time.sleep(jira.connect_latency)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b"{}"
+                with jira._lock:
+                    jira.bytes_received += length
+                if self.headers.get("Content-Encoding") == "gzip":
+                    if not jira.accept_gzip:
+                        self._send(415, {"errorMessages": ["Unsupported Content-Encoding"]})
+                        return
+                    with jira._lock:
+                        jira.gzip_requests += 1
+                    raw = gzip.decompress(raw)
+                try:
+                    payload = json.loads(raw.decode("utf-8"))
+                except ValueError:
+                    self._send(400, {"errorMessages": ["Invalid JSON"]})
+                    return
+                self._send(*jira.dispatch("POST", self.path, payload, self.headers.get("Authorization")))
+
+            def do_GET(self):
+                self._send(*jira.dispatch("GET", self.path, {}, self.headers.get("Authorization")))
+
+            def _send(self, status: int, body: dict, headers: dict | None = None):
+                data = json.dumps(body).encode("utf-8") if status != 204 else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
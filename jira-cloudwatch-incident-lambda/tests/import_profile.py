@@ -0,0 +1,97 @@
+"""
+Lambda 本体のコールドスタート（モジュール初期化）コストを `python -X importtime` で計測する。
+新しいプロセスでハンドラのファイルを読み込み、初期化時間の合計とトップレベルのモジュールごとの import 時間を出す。
+--budget-ms を超えた場合は終了コード 1 で終わるので、CI で回帰を検出できる。
+.pyc が無い（または書けない）場合は初期化時間にバイトコードのコンパイルも含まれる。
+Lambda の /var/task は書き込めないので、デプロイパッケージには compileall 済みの .pyc を含めておくとよい。
+
+    python tests/import_profile.py --runs 5 --budget-ms 60
+    python tests/import_profile.py --eager      # JIRA_LAZY_INIT=false と比較する
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from lambda_loader import CW_SF_LAMBDA
+
+TESTS_DIR = Path(__file__).resolve().parent
+MARKER = "-- handler init --"
+
+# ハンドラの読み込み前後に目印を出し、lambda_loader 自身の import は集計から外す
+_PROBE = f"""
+import sys, time
+sys.path.insert(0, {str(TESTS_DIR)!r})
+from lambda_loader import load_lambda_module
+sys.stderr.write({MARKER!r} + "\\n")
+start = time.perf_counter()
+load_lambda_module({{filename!r}})
+print((time.perf_counter() - start) * 1000)
+print(",".join(sorted(m for m in sys.modules if m.split(".")[0] in ("boto3", "botocore", "urllib3"))))
+"""
+
+
+def profile_import(filename: str = CW_SF_LAMBDA, lazy: bool = True) -> dict:
+    """
+    新しいインタプリタでハンドラを1回読み込み、以下を返す。
+    - init_ms: モジュール初期化にかかった時間（ms）
+    - modules: {トップレベルで import されたモジュール名: 累積 import 時間(ms)}
+    - heavy_modules: 初期化後に読み込まれていた boto3 / botocore / urllib3 のモジュール
+    """
+    env = dict(os.environ, JIRA_LAZY_INIT="true" if lazy else "false")
+    env.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(filename=filename)],
+        capture_output=True, text=True, env=env, check=True,
+    )
+
+    modules = {}
+    lines = proc.stderr.split(MARKER, 1)[1].splitlines()
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # 見出し行
+        entries.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative)))
+    if entries:
+        top = min(depth for depth, _, _ in entries)
+        modules = {name: us / 1000 for depth, name, us in entries if depth == top}
+
+    init_ms, heavy = proc.stdout.split("\n")[:2]
+    return {
+        "init_ms": float(init_ms),
+        "modules": modules,
+        "heavy_modules": [m for m in heavy.split(",") if m],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="表示するモジュール数")
+    parser.add_argument("--budget-ms", type=float, default=None, help="初期化時間（中央値）の上限")
+    parser.add_argument("--eager", action="store_true", help="JIRA_LAZY_INIT=false でも計測して比較する")
+    args = parser.parse_args()
+
+    over_budget = False
+    for lazy in (True, False) if args.eager else (True,):
+        results = [profile_import(lazy=lazy) for _ in range(args.runs)]
+        init_ms = statistics.median(r["init_ms"] for r in results)
+        label = "lazy" if lazy else "eager"
+        print(f"{label}: init median={init_ms:.1f}ms (runs={args.runs}) "
+              f"heavy modules loaded={len(results[-1]['heavy_modules'])}")
+        for name, ms in sorted(results[-1]["modules"].items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"    {ms:8.2f}ms  {name}")
+        if lazy and args.budget_ms is not None and init_ms > args.budget_ms:
+            print(f"over budget: {init_ms:.1f}ms > {args.budget_ms:.1f}ms")
+            over_budget = True
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+ファイル名に "+" を含む Lambda 本体をテスト・ベンチマークから import するためのヘルパー。
+"""
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+LAMBDA_DIR = Path(__file__).resolve().parent.parent
+CW_SF_LAMBDA = "jira_create_issue_lambda_cw+sf.py"
+PLAIN_LAMBDA = "jira_create_issue_lambda.py"
+
+# Lambda では /var/task（ハンドラと同じ場所）が sys.path に入っていて incident_core を import できる
+# テスト・ベンチマークからも incident_core を直接 import できるようにしておく
+if str(LAMBDA_DIR) not in sys.path:
+    sys.path.insert(0, str(LAMBDA_DIR))
+
+
+def load_lambda_module(filename: str = CW_SF_LAMBDA, module_name: str | None = None):
+    """
+    Lambda のソースファイルを新しいモジュールとして読み込む。
+    呼び出しごとに別インスタンスになるので、グローバルキャッシュもリセットされる。
+    """
+    # boto3 クライアント生成にリージョンが必要
+    os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-1")
+
+    module_name = module_name or Path(filename).stem.replace("+", "_")
+    spec = importlib.util.spec_from_file_location(module_name, LAMBDA_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,265 @@
+"""
+インシデント Lambda のオフライン再生・負荷試験ハーネス。
+SNS / EventBridge のイベントを生成（または記録したファイルから読み込み）して、
+プロセス内の Fake Jira と moto の Secrets Manager に対して lambda_handler / sqs_handler を指定したレートで呼び出し、
+スループット・レイテンシのパーセンタイル・Jira の呼び出し回数を出す。
+
+    python tests/replay.py --invocations 200 --rate 50 --batch-size 5 --mix cloudwatch=6,stepfunctions=2,unknown=1
+    python tests/replay.py --events recorded.jsonl --concurrency 4 --latency 0.02 --json
+
+--events のファイルは1行1 JSON（または JSON 配列）で、各要素は以下のどちらか。
+- Lambda の event そのもの（"Records" を持つ）: そのまま再生する
+- SNS の Message の中身（CloudWatch アラーム / EventBridge イベントなど）: --batch-size 件ずつ SNS event に包んで再生する
+"""
+import argparse
+import json
+import os
+import queue
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+from fake_jira import FakeJira, FakeJiraServer
+from lambda_loader import load_lambda_module
+from sample_events import (
+    batch_job_failed_event,
+    cloudwatch_alarm_event,
+    cloudwatch_message,
+    composite_alarm_message,
+    ecs_task_stopped_event,
+    sns_event,
+    sqs_event,
+    stepfunctions_event,
+)
+
+SECRET_NAME = "jira/replay"
+
+
+def _unknown_event(name: str) -> dict:
+    return {
+        "version": "0",
+        "source": "aws.health",
+        "detail-type": "AWS Health Event",
+        "region": "ap-northeast-1",
+        "time": "2026-10-18T00:00:00Z",
+        "detail": {"service": name, "status": "open"},
+    }
+
+
+# --mix で指定できるイベントの種類 → (名前) から SNS の Message の中身を作る関数
+GENERATORS = {
+    "cloudwatch": lambda name: cloudwatch_message(name),
+    "composite": lambda name: composite_alarm_message(name),
+    "eventbridge_alarm": lambda name: cloudwatch_alarm_event(name),
+    "stepfunctions": lambda name: stepfunctions_event(name),
+    "ecs": lambda name: ecs_task_stopped_event(name),
+    "batch": lambda name: batch_job_failed_event(name),
+    "unknown": _unknown_event,
+}
+
+
+def parse_mix(text: str) -> dict[str, int]:
+    """"cloudwatch=6,stepfunctions=2" → {"cloudwatch": 6, "stepfunctions": 2}"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in GENERATORS:
+            raise ValueError(f"unknown event type {name!r} (choose from {', '.join(GENERATORS)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def generate_messages(count: int, mix: dict[str, int], alarms: int, seed: int = 42) -> list[dict]:
+    """
+    mix の重みで種類を選び、count 件のメッセージを作る。
+    名前は種類ごとに alarms 通りなので、同じ名前の再発（既存チケットへのコメント）も混ざる。
+    """
+    rng = random.Random(seed)
+    kinds, weights = zip(*mix.items())
+    return [
+        GENERATORS[kind](f"replay-{kind}-{rng.randrange(alarms)}")
+        for kind in rng.choices(kinds, weights=weights, k=count)
+    ]
+
+
+def load_recorded(path: str) -> tuple[list[dict], list[dict]]:
+    """記録したファイルを読み、(Lambda event のリスト, Message のリスト) を返す"""
+    text = Path(path).read_text(encoding="utf-8").strip()
+    items = json.loads(text) if text.startswith("[") else [json.loads(line) for line in text.splitlines() if line]
+    events = [item for item in items if isinstance(item, dict) and "Records" in item]
+    messages = [item for item in items if not (isinstance(item, dict) and "Records" in item)]
+    return events, messages
+
+
+def build_events(messages: list[dict], batch_size: int, handler: str) -> list[dict]:
+    """Message を batch_size 件ずつ SNS（または SNS → SQS）の event に包む。MessageId は全体で一意にする"""
+    events = []
+    for start in range(0, len(messages), batch_size):
+        chunk = messages[start:start + batch_size]
+        if handler == "sqs":
+            event = sqs_event(*chunk)
+            for i, record in enumerate(event["Records"]):
+                record["messageId"] = f"replay-{start + i}"
+        else:
+            event = sns_event(*chunk, message_ids={i: f"replay-{start + i}" for i in range(len(chunk))})
+        events.append(event)
+    return events
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def replay(events: list[dict], rate: float = 0.0, concurrency: int = 1, latency: float = 0.0,
+           handler: str = "sns", env: dict | None = None) -> dict:
+    """
+    events を rate（呼び出し/秒。0 なら待たない）で handler に流し、結果をまとめて返す。
+    呼び出しは予定時刻どおりに投入する（前の呼び出しが遅れても後ろを詰めない）。
+    concurrency 個の実行環境（モジュールを別々に読み込んだもの）を用意し、空いている環境で1回ずつ処理する。
+    Lambda と同じく、1つの実行環境が同時に処理する呼び出しは1つだけ。
+    """
+    with mock_aws(), FakeJiraServer(FakeJira(latency=latency)) as server:
+        saved = dict(os.environ)
+        os.environ.update({
+            "AWS_DEFAULT_REGION": "ap-northeast-1",
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "JIRA_SECRET_NAME": SECRET_NAME,
+            **(env or {}),
+        })
+        try:
+            boto3.client("secretsmanager", region_name="ap-northeast-1").create_secret(
+                Name=SECRET_NAME, SecretString=json.dumps(server.secret()),
+            )
+            containers = queue.Queue()
+            init_ms = []
+            for _ in range(concurrency):
+                start = time.perf_counter()
+                module = load_lambda_module()
+                init_ms.append((time.perf_counter() - start) * 1000)
+                module.logger.disabled = True
+                containers.put(module.sqs_handler if handler == "sqs" else module.lambda_handler)
+            report = _drive(containers, events, rate, concurrency, server.jira)
+            report["init_ms_mean"] = round(statistics.fmean(init_ms), 2)
+            return report
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+
+
+def _drive(containers: queue.Queue, events: list[dict], rate: float, concurrency: int, jira: FakeJira) -> dict:
+    latencies: list[float] = []
+    lags: list[float] = []
+    failures = {"invocations": 0, "records": 0}
+    lock = threading.Lock()
+
+    def invoke(event, scheduled):
+        entry = containers.get()
+        started = time.perf_counter()
+        try:
+            result = entry(event, None)
+            failed_records = _failed_records(result)
+            error = False
+        except Exception as e:
+            # バッチモードは失敗したレコードの結果を例外に載せてくる
+            results = getattr(e, "results", None)
+            failed_records = _failed_records({"results": results}) if results else len(event.get("Records", []))
+            error = True
+        finally:
+            containers.put(entry)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed * 1000)
+            lags.append(max(0.0, started - scheduled) * 1000)
+            failures["invocations"] += error
+            failures["records"] += failed_records
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i, event in enumerate(events):
+            scheduled = start + (i / rate if rate > 0 else 0.0)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(invoke, event, scheduled)
+    wall = time.perf_counter() - start
+
+    records = sum(len(e.get("Records", [])) for e in events)
+    return {
+        "invocations": len(events),
+        "records": records,
+        "wall_seconds": round(wall, 3),
+        "invocations_per_second": round(len(events) / wall, 1) if wall else 0.0,
+        "records_per_second": round(records / wall, 1) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p90": round(percentile(latencies, 90), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(max(latencies, default=0.0), 2),
+            "mean": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        },
+        "schedule_lag_ms_p99": round(percentile(lags, 99), 2),
+        "failed_invocations": failures["invocations"],
+        "failed_records": failures["records"],
+        "jira_calls": dict(sorted(jira.calls.items())),
+        "issues_created": len(jira.issues),
+    }
+
+
+def _failed_records(result) -> int:
+    if not isinstance(result, dict):
+        return 0
+    if "batchItemFailures" in result:
+        return len(result["batchItemFailures"])
+    return sum(1 for r in result.get("results") or [] if r.get("status") == "failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", help="記録したイベントのファイル（省略時は生成する）")
+    parser.add_argument("--invocations", type=int, default=100, help="生成する場合の呼び出し回数")
+    parser.add_argument("--batch-size", type=int, default=1, help="1回の呼び出しに含めるレコード数")
+    parser.add_argument("--mix", default="cloudwatch=6,eventbridge_alarm=1,stepfunctions=2,unknown=1",
+                        help=f"生成するイベントの種類と重み（{', '.join(GENERATORS)}）")
+    parser.add_argument("--alarms", type=int, default=20, help="種類ごとのアラーム名の数")
+    parser.add_argument("--rate", type=float, default=0.0, help="呼び出し/秒（0 なら待たずに投入する）")
+    parser.add_argument("--concurrency", type=int, default=1, help="同時に実行する呼び出し数")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake Jira の擬似レイテンシ（秒）")
+    parser.add_argument("--handler", choices=["sns", "sqs"], default="sns")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Lambda に渡す環境変数（例: JIRA_BATCH_MODE=true）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出す")
+    args = parser.parse_args()
+
+    events, messages = load_recorded(args.events) if args.events else ([], [])
+    if not args.events:
+        messages = generate_messages(args.invocations * args.batch_size, parse_mix(args.mix), args.alarms, args.seed)
+    events += build_events(messages, args.batch_size, args.handler)
+    env = dict(item.split("=", 1) for item in args.env)
+
+    report = replay(events, args.rate, args.concurrency, args.latency, args.handler, env)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    latency = report["latency_ms"]
+    print(f"invocations={report['invocations']} records={report['records']} wall={report['wall_seconds']}s")
+    print(f"throughput: {report['invocations_per_second']} invocations/s, {report['records_per_second']} records/s")
+    print(f"latency ms: p50={latency['p50']} p90={latency['p90']} p99={latency['p99']} "
+          f"max={latency['max']} mean={latency['mean']} (schedule lag p99={report['schedule_lag_ms_p99']})")
+    print(f"containers={args.concurrency} (init mean={report['init_ms_mean']}ms)")
+    print(f"failures: invocations={report['failed_invocations']} records={report['failed_records']}")
+    print(f"jira calls: {report['jira_calls']} issues created={report['issues_created']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+テスト・ベンチマーク用の SNS イベント生成ヘルパー。
+"""
+import json
+
+
+def cloudwatch_message(alarm_name="prod-api-5xx", state="ALARM", reason="Threshold Crossed",
+                       function_name="order-api", time="2026-10-18T00:00:00.000+0000", old_state=None):
+    message = {
+        "AlarmName": alarm_name,
+        "NewStateValue": state,
+        "NewStateReason": reason,
+        "StateChangeTime": time,
+        "Region": "Asia Pacific (Tokyo)",
+        "Trigger": {
+            "MetricName": "Errors",
+            "Namespace": "AWS/Lambda",
+            "Dimensions": [{"name": "FunctionName", "value": function_name}],
+        },
+    }
+    if old_state is not None:
+        message["OldStateValue"] = old_state
+    return message
+
+
+def sns_event(*messages, message_ids=None):
+    """SNS → Lambda の event を組み立てる"""
+    records = []
+    for i, message in enumerate(messages):
+        records.append({
+            "EventSource": "aws:sns",
+            "Sns": {
+                "MessageId": (message_ids or {}).get(i, f"msg-{i}"),
+                "Timestamp": "2026-10-18T00:00:00.000Z",
+                "Message": json.dumps(message),
+            },
+        })
+    return {"Records": records}
+
+
+def composite_alarm_message(alarm_name="prod-order-composite", state="ALARM"):
+    return {
+        "AlarmName": alarm_name,
+        "NewStateValue": state,
+        "NewStateReason": "arn:aws:cloudwatch:ap-northeast-1:123456789012:alarm:prod-api-5xx transitioned to ALARM",
+        "StateChangeTime": "2026-10-18T00:00:00.000+0000",
+        "Region": "Asia Pacific (Tokyo)",
+        "AlarmRule": 'ALARM("prod-api-5xx") OR ALARM("prod-api-latency")',
+        "TriggeringChildren": [
+            {
+                "Arn": "arn:aws:cloudwatch:ap-northeast-1:123456789012:alarm:prod-api-5xx",
+                "State": {"Value": "ALARM", "Timestamp": "2026-10-18T00:00:00.000+0000"},
+            },
+        ],
+    }
+
+
+def _eventbridge(source, detail_type, detail):
+    return {
+        "version": "0",
+        "id": "6a7e8feb-b491-4cf7-a9f1-bf3703467718",
+        "detail-type": detail_type,
+        "source": source,
+        "account": "123456789012",
+        "time": "2026-10-18T00:00:00Z",
+        "region": "ap-northeast-1",
+        "resources": [],
+        "detail": detail,
+    }
+
+
+def cloudwatch_alarm_event(alarm_name="prod-api-5xx", state="ALARM", alarm_rule=None, previous_state="OK"):
+    configuration = {"alarmRule": alarm_rule} if alarm_rule else {
+        "metrics": [{
+            "id": "m1",
+            "metricStat": {
+                "metric": {
+                    "namespace": "AWS/Lambda",
+                    "name": "Errors",
+                    "dimensions": {"FunctionName": "order-api"},
+                },
+                "period": 60,
+                "stat": "Sum",
+            },
+        }],
+    }
+    return _eventbridge("aws.cloudwatch", "CloudWatch Alarm State Change", {
+        "alarmName": alarm_name,
+        "state": {"value": state, "reason": "Threshold Crossed", "timestamp": "2026-10-18T00:00:00.000+0000"},
+        "previousState": {"value": previous_state},
+        "configuration": configuration,
+    })
+
+
+def stepfunctions_event(name="order-workflow", status="FAILED"):
+    return _eventbridge("aws.states", "Step Functions Execution Status Change", {
+        "executionArn": f"arn:aws:states:ap-northeast-1:123456789012:execution:{name}:exec-1",
+        "name": name,
+        "status": status,
+        "error": "States.TaskFailed",
+        "cause": "Lambda function failed",
+    })
+
+
+def ecs_task_stopped_event(service="order-api", cluster="prod-cluster", exit_code=137):
+    return _eventbridge("aws.ecs", "ECS Task State Change", {
+        "clusterArn": f"arn:aws:ecs:ap-northeast-1:123456789012:cluster/{cluster}",
+        "taskArn": f"arn:aws:ecs:ap-northeast-1:123456789012:task/{cluster}/0123456789abcdef",
+        "taskDefinitionArn": f"arn:aws:ecs:ap-northeast-1:123456789012:task-definition/{service}:42",
+        "group": f"service:{service}",
+        "lastStatus": "STOPPED",
+        "desiredStatus": "STOPPED",
+        "stopCode": "EssentialContainerExited",
+        "stoppedReason": "Essential container in task exited",
+        "stoppedAt": "2026-10-18T00:00:00.000Z",
+        "containers": [
+            {"name": "app", "exitCode": exit_code, "reason": "OutOfMemoryError: Container killed due to memory usage"},
+            {"name": "log-router", "exitCode": 0},
+        ],
+    })
+
+
+def batch_job_failed_event(job_name="nightly-report", status="FAILED"):
+    return _eventbridge("aws.batch", "Batch Job State Change", {
+        "jobName": job_name,
+        "jobId": "4c7599ae-0a82-49aa-ba5a-4727fcce14a8",
+        "jobQueue": "arn:aws:batch:ap-northeast-1:123456789012:job-queue/default",
+        "status": status,
+        "statusReason": "Essential container in task exited",
+        "attempts": [{"container": {"exitCode": 1}, "statusReason": "Essential container in task exited"}],
+        "container": {"image": "report:latest", "exitCode": 1, "logStreamName": "report/default/abc"},
+    })
+
+
+def sqs_event(*messages, queue_arn="arn:aws:sqs:ap-northeast-1:123456789012:jira-incidents",
+              receipt_handles=None, raw=False):
+    """
+    SNS → SQS → Lambda の event を組み立てる。
+    raw=True なら raw message delivery（body がメッセージそのもの）
+    """
+    records = []
+    for i, message in enumerate(messages):
+        body = json.dumps(message)
+        if not raw:
+            body = json.dumps({
+                "Type": "Notification",
+                "MessageId": f"sns-{i}",
+                "Timestamp": "2026-10-18T00:00:00.000Z",
+                "Message": body,
+            })
+        records.append({
+            "messageId": f"sqs-{i}",
+            "receiptHandle": (receipt_handles or {}).get(i, f"handle-{i}"),
+            "body": body,
+            "eventSource": "aws:sqs",
+            "eventSourceARN": queue_arn,
+        })
+    return {"Records": records}
@@ -0,0 +1,40 @@
+import json
+
+from incident_core.adf import encode_json_body
+from sample_events import cloudwatch_message
+
+
+def test_description_template_escapes_values(lambda_module):
+    message = cloudwatch_message(reason='Threshold "crossed"\n{1 datapoint} 閾値超過')
+
+    description = lambda_module.build_adf_description(
+        "prod-api-5xx", "ALARM", message["NewStateReason"], "ap-northeast-1",
+        "AWS/Lambda", "Errors", None, message,
+    ).to_dict()
+
+    alarm_info = [item["content"][0]["content"][0]["text"] for item in description["content"][1]["content"]]
+    metric_info = [item["content"][0]["content"][0]["text"] for item in description["content"][3]["content"]]
+    assert alarm_info == ["Name: prod-api-5xx", "State: ALARM", f"Reason: {message['NewStateReason']}"]
+    assert metric_info[-1] == "Lambda: N/A"
+    assert json.loads(description["content"][5]["content"][0]["text"]) == message
+
+
+def test_raw_message_is_truncated_over_limit(lambda_module):
+    message = {"detail": {"payload": "x" * 1000}}
+
+    text = lambda_module._serialize_raw_message(message, max_chars=100)
+
+    assert text.startswith('{"detail":{"payload":"xxx')
+    assert text.endswith(f"... (truncated: {len(json.dumps(message, separators=(',', ':')))} chars in total)")
+
+
+def test_encoded_body_embeds_prerendered_adf(lambda_module):
+    comment = lambda_module._build_comment_adf(
+        "summary", "ALARM", "reason", "2026-10-18T00:00:00Z", "AWS/Lambda", "Errors", "ap-northeast-1", "fn",
+    )
+
+    body = json.loads(encode_json_body({"body": comment, "note": "ü"}).decode("utf-8"))
+
+    assert body["body"] == comment.to_dict()
+    assert body["body"]["content"][0]["content"][1]["text"] == "- State: ALARM\n"
+    assert body["note"] == "ü"
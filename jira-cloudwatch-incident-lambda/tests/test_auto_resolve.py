@@ -0,0 +1,184 @@
+import pytest
+
+from lambda_loader import CW_SF_LAMBDA, PLAIN_LAMBDA, load_lambda_module
+from sample_events import cloudwatch_alarm_event, cloudwatch_message, sns_event
+
+FIRING_SUMMARY = "[CloudWatch Alarm] prod-api-5xx is ALARM"
+
+
+@pytest.fixture(autouse=True)
+def resolve_on_ok(monkeypatch):
+    """自動解決は既定では無効なので、このファイルのテストでは有効にしてから読み込む"""
+    monkeypatch.setenv("JIRA_RESOLVE_ON_OK", "true")
+
+
+def _fire_and_recover(module, old_state="ALARM"):
+    module.lambda_handler(sns_event(cloudwatch_message()), None)
+    module.lambda_handler(sns_event(cloudwatch_message(state="OK", old_state=old_state),
+                                    message_ids={0: "msg-ok"}), None)
+
+
+def test_recovery_comments_on_cached_issue_without_search(lambda_module, fake_jira):
+    _fire_and_recover(lambda_module)
+
+    assert fake_jira.jira.calls == {"search": 1, "create": 1, "comment": 1}
+    [key] = fake_jira.jira.open_issue_keys(FIRING_SUMMARY)
+    [comment] = fake_jira.jira.comments[key]
+    assert comment["content"][0]["content"][0]["text"] == "*Alarm Recovered*\n"
+
+
+def test_recovery_transitions_issue_in_one_call(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module.issue_tracker, "transition_id", "31")
+
+    _fire_and_recover(lambda_module)
+
+    assert fake_jira.jira.calls == {"search": 1, "create": 1, "transition": 1}
+    assert fake_jira.jira.open_issue_keys(FIRING_SUMMARY) == []
+    [key] = fake_jira.jira.issues
+    assert len(fake_jira.jira.comments[key]) == 1
+
+
+def test_next_alarm_after_resolution_creates_new_issue(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module.issue_tracker, "transition_id", "31")
+    monkeypatch.setattr(lambda_module.issue_tracker, "dedup_cache", lambda_module.DedupCache(ttl_seconds=300))
+    _fire_and_recover(lambda_module)
+
+    lambda_module.lambda_handler(sns_event(cloudwatch_message(time="2026-10-18T01:00:00.000+0000")), None)
+
+    assert len(fake_jira.jira.issues) == 2
+    assert len(fake_jira.jira.open_issue_keys(FIRING_SUMMARY)) == 1
+
+
+@pytest.mark.parametrize("event", [
+    sns_event(cloudwatch_message(state="OK", old_state="INSUFFICIENT_DATA")),
+    sns_event(cloudwatch_alarm_event(state="OK", previous_state="INSUFFICIENT_DATA")),
+])
+def test_recovery_from_non_alarm_state_skips_jira(lambda_module, fake_jira, event):
+    lambda_module.lambda_handler(event, None)
+
+    assert fake_jira.jira.total_calls == 0
+
+
+def test_recovery_without_open_issue_only_searches(lambda_module, fake_jira):
+    lambda_module.lambda_handler(sns_event(cloudwatch_message(state="OK", old_state="ALARM")), None)
+
+    assert fake_jira.jira.calls == {"search": 1}
+    assert fake_jira.jira.issues == {}
+
+
+def test_recovery_trusts_cache_when_search_on_miss_is_disabled(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module.issue_tracker, "search_on_miss", False)
+
+    lambda_module.lambda_handler(sns_event(cloudwatch_message(state="OK", old_state="ALARM")), None)
+
+    assert fake_jira.jira.total_calls == 0
+
+
+def test_recovery_can_be_disabled(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_RESOLVE_ON_OK", False)
+
+    _fire_and_recover(lambda_module)
+
+    assert fake_jira.jira.calls == {"search": 2, "create": 2}
+
+
+def test_batch_resolves_after_firing_in_same_batch(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_BATCH_MODE", True)
+    monkeypatch.setattr(lambda_module.issue_tracker, "transition_id", "31")
+    event = sns_event(
+        cloudwatch_message(state="OK", old_state="ALARM"),
+        cloudwatch_message("alarm-b", state="OK", old_state="INSUFFICIENT_DATA"),
+        cloudwatch_message(),
+    )
+
+    result = lambda_module.lambda_handler(event, None)
+
+    assert [r["action"] for r in result["results"]] == ["resolved", "skipped", "created"]
+    assert result["results"][0]["issue_key"] == result["results"][2]["issue_key"]
+    assert fake_jira.jira.calls == {"search": 1, "create": 1, "transition": 1}
+
+
+def test_failed_transition_is_reported(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_BATCH_MODE", True)
+    monkeypatch.setattr(lambda_module.issue_tracker, "transition_id", "31")
+    lambda_module.lambda_handler(sns_event(cloudwatch_message()), None)
+    [key] = fake_jira.jira.issues
+    fake_jira.jira.resolve(key)
+
+    with pytest.raises(lambda_module.BatchProcessingError) as exc_info:
+        lambda_module.lambda_handler(sns_event(cloudwatch_message(state="OK", old_state="ALARM")), None)
+
+    assert exc_info.value.results[0]["error"] == f"Failed to resolve issue {key}"
+    # リトライで同じチケットを解決できるように対応は残す
+    assert lambda_module.issue_tracker.open_issue_cache.get(FIRING_SUMMARY) == key
+
+
+def test_failed_resolve_raises_and_succeeds_on_retry(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module.issue_tracker, "transition_id", "31")
+    lambda_module.lambda_handler(sns_event(cloudwatch_message()), None)
+    [key] = fake_jira.jira.issues
+    recovery = sns_event(cloudwatch_message(state="OK", old_state="ALARM"), message_ids={0: "msg-ok"})
+    fake_jira.jira.error_status = 400
+
+    with pytest.raises(RuntimeError, match=f"Failed to resolve issue {key}"):
+        lambda_module.lambda_handler(recovery, None)
+
+    fake_jira.jira.error_status = None
+    fake_jira.jira.reset_calls()
+    lambda_module.lambda_handler(recovery, None)
+    assert fake_jira.jira.calls == {"transition": 1}
+    assert fake_jira.jira.open_issue_keys(FIRING_SUMMARY) == []
+
+
+def test_resolve_is_disabled_by_default(fake_jira, monkeypatch):
+    monkeypatch.delenv("JIRA_RESOLVE_ON_OK")
+    for filename in (CW_SF_LAMBDA, PLAIN_LAMBDA):
+        module = load_lambda_module(filename)
+        assert module.JIRA_RESOLVE_ON_OK is False
+
+
+def test_plain_lambda_resolves_open_issue(fake_jira, monkeypatch):
+    module = load_lambda_module(PLAIN_LAMBDA)
+    module.jira_secret_cache.put(fake_jira.secret())
+    monkeypatch.setattr(module.issue_tracker, "transition_id", "31")
+
+    _fire_and_recover(module)
+    module.lambda_handler(sns_event(cloudwatch_message(state="OK", old_state="INSUFFICIENT_DATA")), None)
+
+    assert fake_jira.jira.calls == {"search": 1, "create": 1, "transition": 1}
+    assert fake_jira.jira.open_issue_keys(FIRING_SUMMARY) == []
+
+
+def test_plain_lambda_keeps_mapping_when_resolve_fails(fake_jira, monkeypatch):
+    module = load_lambda_module(PLAIN_LAMBDA)
+    module.jira_secret_cache.put(fake_jira.secret())
+    monkeypatch.setattr(module.issue_tracker, "transition_id", "31")
+    module.lambda_handler(sns_event(cloudwatch_message()), None)
+    [key] = fake_jira.jira.issues
+    fake_jira.jira.error_status = 400
+
+    with pytest.raises(RuntimeError, match=f"Failed to resolve issue {key}"):
+        module.lambda_handler(sns_event(cloudwatch_message(state="OK", old_state="ALARM")), None)
+
+    assert module.issue_tracker.open_issue_cache.get(FIRING_SUMMARY) == key
+
+
+def test_plain_lambda_honours_search_on_miss_and_dedup_cache(fake_jira, monkeypatch):
+    module = load_lambda_module(PLAIN_LAMBDA)
+    module.jira_secret_cache.put(fake_jira.secret())
+    monkeypatch.setattr(module.issue_tracker, "search_on_miss", False)
+    recovery = sns_event(cloudwatch_message(state="OK", old_state="ALARM"), message_ids={0: "msg-ok"})
+
+    module.lambda_handler(recovery, None)
+    assert fake_jira.jira.total_calls == 0
+
+    # 復旧用の対応がなくても、重複チェックキャッシュにあれば検索せずに解決する
+    monkeypatch.setattr(module.issue_tracker.dedup_cache, "ttl_seconds", 300)
+    module.lambda_handler(sns_event(cloudwatch_message()), None)
+    module.issue_tracker.open_issue_cache.invalidate(FIRING_SUMMARY)
+    fake_jira.jira.reset_calls()
+
+    module.lambda_handler(recovery, None)
+
+    assert fake_jira.jira.calls == {"comment": 1}
+    assert module.issue_tracker.dedup_cache.get(FIRING_SUMMARY) is None
@@ -0,0 +1,70 @@
+import pytest
+
+from sample_events import cloudwatch_message, sns_event
+
+
+@pytest.fixture()
+def bulk_module(lambda_module, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_BULK_CREATE", True)
+    return lambda_module
+
+
+def test_first_seen_summaries_are_created_in_chunks(bulk_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(bulk_module, "JIRA_BULK_CREATE_CHUNK_SIZE", 2)
+    messages = [cloudwatch_message(f"alarm-{i}") for i in range(5)] + [cloudwatch_message("alarm-0")]
+
+    result = bulk_module.lambda_handler(sns_event(*messages), None)
+
+    assert result["status"] == "ok"
+    assert fake_jira.jira.calls == {"search": 5, "bulk_create": 3, "comment": 1}
+    assert [r["action"] for r in result["results"]] == ["created"] * 5 + ["commented"]
+    for i, record in enumerate(result["results"][:5]):
+        assert fake_jira.jira.issues[record["issue_key"]]["summary"] == f"[CloudWatch Alarm] alarm-{i} is ALARM"
+    assert result["results"][5]["issue_key"] == result["results"][0]["issue_key"]
+
+
+def test_partial_bulk_errors_fail_only_their_records(bulk_module, fake_jira):
+    fake_jira.jira.rejected_summaries.add("[CloudWatch Alarm] alarm-1 is ALARM")
+    messages = [cloudwatch_message(f"alarm-{i}") for i in range(3)] + [cloudwatch_message("alarm-1")]
+
+    with pytest.raises(bulk_module.BatchProcessingError) as exc_info:
+        bulk_module.lambda_handler(sns_event(*messages), None)
+
+    results = exc_info.value.results
+    assert [r["status"] for r in results] == ["succeeded", "failed", "succeeded", "failed"]
+    assert "summary: Summary is rejected." in results[1]["error"]
+    assert fake_jira.jira.issues[results[2]["issue_key"]]["summary"] == "[CloudWatch Alarm] alarm-2 is ALARM"
+    assert fake_jira.jira.calls == {"search": 3, "bulk_create": 1}
+
+
+def test_existing_issues_are_commented_not_recreated(bulk_module, fake_jira):
+    bulk_module.lambda_handler(sns_event(cloudwatch_message("alarm-0")), None)
+    fake_jira.jira.reset_calls()
+
+    result = bulk_module.lambda_handler(
+        sns_event(cloudwatch_message("alarm-0"), cloudwatch_message("alarm-1"), cloudwatch_message("alarm-2")), None,
+    )
+
+    assert [r["action"] for r in result["results"]] == ["commented", "created", "created"]
+    assert fake_jira.jira.calls == {"search": 3, "bulk_create": 1, "comment": 1}
+
+
+def test_failed_bulk_request_fails_the_whole_chunk(bulk_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(bulk_module, "JIRA_BULK_CREATE_CHUNK_SIZE", 2)
+    monkeypatch.setattr(bulk_module, "JIRA_RATE_LIMIT_MAX_RETRIES", 0)
+    messages = [cloudwatch_message(f"alarm-{i}") for i in range(3)]
+    original = fake_jira.jira.bulk_create_issues
+
+    def fail_first_chunk(payload):
+        if len(payload["issueUpdates"]) == 2:
+            return 503, {"errorMessages": ["Service unavailable"]}
+        return original(payload)
+
+    monkeypatch.setattr(fake_jira.jira, "bulk_create_issues", fail_first_chunk)
+
+    with pytest.raises(bulk_module.BatchProcessingError) as exc_info:
+        bulk_module.lambda_handler(sns_event(*messages), None)
+
+    results = exc_info.value.results
+    assert [r["status"] for r in results] == ["failed", "failed", "succeeded"]
+    assert "503" in results[0]["error"]
@@ -0,0 +1,145 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from incident_core.coalesce import CoalescingBuffer
+from incident_core.idempotency import IdempotencyLedger
+from sample_events import cloudwatch_message, sns_event
+
+SUMMARY = "[CloudWatch Alarm] prod-api-5xx is ALARM"
+
+
+@pytest.fixture()
+def coalescing_module(lambda_module, monkeypatch):
+    monkeypatch.setattr(lambda_module, "coalescing_buffer", CoalescingBuffer(60))
+    return lambda_module
+
+
+@pytest.fixture()
+def coalesce_table():
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="ap-northeast-1")
+        yield dynamodb.create_table(
+            TableName="jira-coalesce",
+            KeySchema=[{"AttributeName": "summary", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "summary", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+
+@pytest.fixture()
+def shared_module(lambda_module, coalesce_table, monkeypatch):
+    monkeypatch.setattr(lambda_module, "coalescing_buffer", CoalescingBuffer(60, table=coalesce_table))
+    return lambda_module
+
+
+def _comment_lines(comment):
+    return [c["text"].rstrip("\n") for c in comment["content"][0]["content"]]
+
+
+def _close_window(table, seconds=61):
+    table.update_item(Key={"summary": SUMMARY}, UpdateExpression="SET opened_at = opened_at - :s",
+                      ExpressionAttributeValues={":s": seconds})
+
+
+def test_batch_mode_posts_coalesced_occurrences_before_returning(coalescing_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(coalescing_module, "JIRA_BATCH_MODE", True)
+    messages = [cloudwatch_message(reason=r) for r in ("reason-a", "reason-a", "reason-b", "reason-a")]
+
+    result = coalescing_module.lambda_handler(sns_event(*messages), None)
+
+    assert [r["action"] for r in result["results"]] == ["created", "coalesced", "coalesced", "coalesced"]
+    assert fake_jira.jira.calls == {"search": 1, "create": 1, "comment": 1}
+    [key] = fake_jira.jira.open_issue_keys(SUMMARY)
+    [comment] = fake_jira.jira.comments[key]
+    lines = _comment_lines(comment)
+    assert lines[0] == "*Alarm Fired 3 Times*"
+    assert [line for line in lines if line.startswith("  - ")] == ["  - reason-a", "  - reason-b"]
+    # コンテナ内には何も残さない
+    assert coalescing_module.coalescing_buffer.take_pending() == []
+
+
+def test_unsent_coalesced_records_fail_and_are_not_ledgered(coalescing_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(coalescing_module, "JIRA_BATCH_MODE", True)
+    monkeypatch.setattr(coalescing_module, "idempotency_ledger", IdempotencyLedger(ttl_seconds=300))
+    monkeypatch.setattr(coalescing_module, "_post_comment", lambda *args: False)
+
+    with pytest.raises(coalescing_module.BatchProcessingError) as exc_info:
+        coalescing_module.lambda_handler(sns_event(*[cloudwatch_message()] * 3), None)
+
+    assert [r["status"] for r in exc_info.value.results] == ["succeeded", "failed", "failed"]
+    assert coalescing_module.idempotency_ledger.get_many(["msg-0#2026-10-18T00:00:00.000+0000"])
+    assert not coalescing_module.idempotency_ledger.get_many(["msg-1#2026-10-18T00:00:00.000+0000"])
+
+
+def test_sequential_mode_without_shared_table_does_not_hold_occurrences(coalescing_module, fake_jira):
+    for reason in ("reason-a", "reason-b", "reason-a"):
+        coalescing_module.lambda_handler(sns_event(cloudwatch_message(reason=reason)), None)
+
+    assert fake_jira.jira.calls["create"] == 1
+    assert fake_jira.jira.calls["comment"] == 2
+    assert coalescing_module.coalescing_buffer.take_pending() == []
+
+
+def test_shared_table_keeps_occurrences_across_containers(shared_module, fake_jira, coalesce_table, monkeypatch):
+    for i, reason in enumerate(("reason-a", "reason-b", "reason-a")):
+        message = cloudwatch_message(reason=reason, time=f"2026-10-18T00:00:0{i}.000+0000")
+        shared_module.lambda_handler(sns_event(message), None)
+
+    assert fake_jira.jira.calls["create"] == 1
+    assert "comment" not in fake_jira.jira.calls
+    assert len(coalesce_table.get_item(Key={"summary": SUMMARY})["Item"]["pending"]) == 2
+
+    # コンテナが入れ替わっても、ウィンドウが閉じた後の呼び出しで送る
+    _close_window(coalesce_table)
+    monkeypatch.setattr(shared_module, "coalescing_buffer", CoalescingBuffer(60, table=coalesce_table))
+    shared_module.lambda_handler({}, None)
+
+    [key] = fake_jira.jira.open_issue_keys(SUMMARY)
+    [comment] = fake_jira.jira.comments[key]
+    lines = _comment_lines(comment)
+    assert lines[0] == "*Alarm Fired 2 Times*"
+    assert "- First: 2026-10-18T00:00:01.000+0000" in lines
+    assert "- Last: 2026-10-18T00:00:02.000+0000" in lines
+    assert [line for line in lines if line.startswith("  - ")] == ["  - reason-b", "  - reason-a"]
+    assert "Item" not in coalesce_table.get_item(Key={"summary": SUMMARY})
+
+
+def test_shared_table_keeps_occurrences_when_flush_fails(shared_module, fake_jira, coalesce_table, monkeypatch):
+    for _ in range(3):
+        shared_module.lambda_handler(sns_event(cloudwatch_message()), None)
+    _close_window(coalesce_table)
+
+    with monkeypatch.context() as m:
+        m.setattr(shared_module, "_post_comment", lambda *args: False)
+        assert shared_module._flush_expired_coalescing_windows() == 0
+    # 送れなかった分はテーブルに戻っている
+    _close_window(coalesce_table)
+
+    assert shared_module._flush_expired_coalescing_windows() == 1
+    [key] = fake_jira.jira.open_issue_keys(SUMMARY)
+    assert _comment_lines(fake_jira.jira.comments[key][0])[0] == "*Alarm Fired 2 Times*"
+
+
+def test_batch_mode_with_shared_table_reports_coalesced_records(shared_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(shared_module, "JIRA_BATCH_MODE", True)
+
+    result = shared_module.lambda_handler(sns_event(*[cloudwatch_message()] * 4), None)
+
+    assert [r["action"] for r in result["results"]] == ["created", "coalesced", "coalesced", "coalesced"]
+    assert fake_jira.jira.calls == {"search": 1, "create": 1}
+
+
+def test_expired_windows_are_scanned_at_most_once_per_interval(shared_module, fake_jira, coalesce_table, monkeypatch):
+    buffer = CoalescingBuffer(60, table=coalesce_table, flush_interval_seconds=30)
+    monkeypatch.setattr(shared_module, "coalescing_buffer", buffer)
+
+    # ストーム中は呼び出しのたびに Scan しない
+    for _ in range(5):
+        shared_module.lambda_handler(sns_event(cloudwatch_message()), None)
+    assert buffer.scans == 1
+
+    _close_window(coalesce_table)
+    monkeypatch.setattr(buffer, "_last_scan", buffer._last_scan - 30)
+    assert shared_module._flush_expired_coalescing_windows() == 1
+    assert buffer.scans == 2
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from import_profile import profile_import
+from sample_events import cloudwatch_message, sns_event
+
+# 遅延初期化時の初期化時間の上限（ms）。マシンや .pyc の有無で変わるので、設定したときだけ確認する
+# （普段の確認は python tests/import_profile.py --budget-ms 60 で行う）
+INIT_BUDGET_MS = os.getenv("JIRA_INIT_BUDGET_MS")
+
+
+def test_lazy_init_does_not_import_heavy_modules():
+    result = profile_import(lazy=True)
+
+    assert result["heavy_modules"] == []
+
+
+@pytest.mark.skipif(not INIT_BUDGET_MS, reason="JIRA_INIT_BUDGET_MS is not set")
+def test_lazy_init_stays_within_budget():
+    result = profile_import(lazy=True)
+
+    assert result["init_ms"] <= float(INIT_BUDGET_MS), result["modules"]
+
+
+def test_eager_init_creates_clients_at_import():
+    result = profile_import(lazy=False)
+
+    assert "boto3" in result["heavy_modules"]
+    assert "urllib3" in result["heavy_modules"]
+
+
+def test_clients_are_created_on_first_use(lambda_module, fake_jira):
+    assert lambda_module._http_client.value is None
+    assert lambda_module._secrets_client.value is None
+
+    lambda_module.lambda_handler(sns_event(cloudwatch_message()), None)
+
+    # Secret はキャッシュ済みなので Secrets Manager クライアントは作られない
+    assert lambda_module._http_client.value is not None
+    assert lambda_module._secrets_client.value is None
@@ -0,0 +1,151 @@
+import json
+import socket
+import threading
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from incident_core.clients import http_errors
+from lambda_loader import PLAIN_LAMBDA, load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+
+class DroppingServer:
+    """
+    同じコネクションの2つ目のリクエストには応答せずに切るサーバー。
+    アイドルタイムアウトで黙って切られたコネクションを使い回したときの再現用。
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        self._sock = socket.create_server(("127.0.0.1", 0))
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._sock.getsockname()[:2]
+        return f"http://{host}:{port}/rest/api/3/issue"
+
+    def __enter__(self) -> "DroppingServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._sock.close()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn, conn.makefile("rb") as reader:
+            reader.readline()
+            self.requests += 1
+            length = 0
+            for line in iter(reader.readline, b"\r\n"):
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            reader.read(length)
+            body = b'{"key":"TEST-1"}'
+            conn.sendall(b"HTTP/1.1 201 Created\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+            # 2つ目のリクエストは処理せずに切る
+            if reader.readline():
+                self.requests += 1
+
+
+def test_dropped_keep_alive_connection_is_reconnected_transparently(lambda_module):
+    client = lambda_module.HttpClient()
+    with DroppingServer() as server:
+        # urllib3 のリトライ（冪等なメソッドは読み取りエラーでも送り直す）に頼らずに確かめる
+        first = client.request("PUT", server.url, body=b"{}", retries=False)
+        second = client.request("PUT", server.url, body=b"{}", retries=False)
+
+    assert (first.status, second.status) == (201, 201)
+    assert server.connections == 2
+    assert client.stats()["reconnects"] == 1
+
+
+def test_post_on_dropped_connection_is_not_resent(lambda_module):
+    client = lambda_module.HttpClient()
+    with DroppingServer() as server:
+        client.request("POST", server.url, body=b"{}")
+        with pytest.raises(http_errors()):
+            client.request("POST", server.url, body=b"{}")
+        # 切れたコネクションは捨てているので、次の送信は新しいコネクションで成功する
+        third = client.request("POST", server.url, body=b"{}")
+
+    assert third.status == 201
+    assert server.requests == 3
+    assert server.connections == 2
+    assert client.stats()["reconnects"] == 0
+
+
+def test_new_connection_failure_is_not_retried(lambda_module):
+    client = lambda_module.HttpClient()
+    with socket.create_server(("127.0.0.1", 0)) as sock:
+        host, port = sock.getsockname()[:2]
+        threading.Thread(target=lambda: sock.accept()[0].close(), daemon=True).start()
+
+        with pytest.raises(http_errors()):
+            client.request("POST", f"http://{host}:{port}/rest/api/3/issue", body=b"{}")
+
+    assert client.stats()["reconnects"] == 0
+
+
+def test_idle_connections_are_dropped_before_use(lambda_module, fake_jira):
+    client = lambda_module.HttpClient(max_idle_seconds=0.05)
+    url = fake_jira.base_url + "/status"
+
+    client.request("GET", url)
+    client.request("GET", url)
+    time.sleep(0.1)
+    client.request("GET", url)
+
+    assert client.stats()["connects"] == 2
+    assert client.stats()["idle_resets"] == 1
+
+
+def test_tcp_keepalive_is_set_on_new_connections(lambda_module, fake_jira):
+    client = lambda_module.HttpClient(tcp_keepalive_seconds=30)
+    client.request("GET", fake_jira.base_url + "/status")
+
+    pool = client.pool.connection_from_url(fake_jira.base_url)
+    conn = pool.pool.get_nowait()
+    assert conn.sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE) == 1
+
+
+@pytest.mark.parametrize("filename", [None, PLAIN_LAMBDA])
+def test_warmup_on_init_opens_connection_before_first_event(fake_jira, monkeypatch, filename):
+    monkeypatch.setenv("JIRA_WARMUP_ON_INIT", "true")
+    with mock_aws():
+        boto3.client("secretsmanager", region_name="ap-northeast-1").create_secret(
+            Name="jira/poc", SecretString=json.dumps(fake_jira.secret()),
+        )
+        module = load_lambda_module(*([filename] if filename else []))
+
+    assert fake_jira.jira.calls["status"] == 1
+    assert module._http_client.value.stats()["connects"] == 1
+
+    module.lambda_handler(sns_event(cloudwatch_message()), None)
+
+    # ウォームアップで張ったコネクションをそのまま使う
+    assert module._http_client.value.stats()["connects"] == 1
+
+
+def test_warmup_failure_does_not_break_init(monkeypatch):
+    monkeypatch.setenv("JIRA_WARMUP_ON_INIT", "true")
+    with mock_aws():
+        # Secret がない
+        module = load_lambda_module()
+
+    assert module._http_client.value is None or module._http_client.value.stats()["connects"] == 0
@@ -0,0 +1,93 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from sample_events import cloudwatch_message, sns_event
+
+SUMMARY = "[CloudWatch Alarm] prod-api-5xx is ALARM"
+
+
+@pytest.fixture()
+def cached_module(lambda_module, monkeypatch):
+    monkeypatch.setattr(lambda_module.issue_tracker, "dedup_cache", lambda_module.DedupCache(ttl_seconds=300))
+    return lambda_module
+
+
+def test_cache_hit_skips_search_on_next_invocation(cached_module, fake_jira):
+    cached_module.lambda_handler(sns_event(cloudwatch_message()), None)
+    cached_module.lambda_handler(sns_event(cloudwatch_message()), None)
+    cached_module.lambda_handler(sns_event(cloudwatch_message()), None)
+
+    assert fake_jira.jira.calls == {"search": 1, "create": 1, "comment": 2}
+    assert cached_module.issue_tracker.dedup_cache.stats()["hits"] == 2
+    assert cached_module.issue_tracker.dedup_cache.stats()["misses"] == 1
+
+
+def test_resolved_issue_is_not_reused_when_verifying(cached_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(cached_module.issue_tracker, "verify_on_hit", True)
+    cached_module.lambda_handler(sns_event(cloudwatch_message()), None)
+    [first_key] = fake_jira.jira.open_issue_keys(SUMMARY)
+    fake_jira.jira.resolve(first_key)
+
+    cached_module.lambda_handler(sns_event(cloudwatch_message()), None)
+
+    [second_key] = fake_jira.jira.open_issue_keys(SUMMARY)
+    assert second_key != first_key
+    assert fake_jira.jira.comments[first_key] == []
+    assert cached_module.issue_tracker.dedup_cache.get(SUMMARY) == second_key
+
+
+def test_lru_evicts_least_recently_used(lambda_module):
+    cache = lambda_module.DedupCache(ttl_seconds=300, max_entries=2)
+    cache.put("a", "TEST-1")
+    cache.put("b", "TEST-2")
+    cache.get("a")
+    cache.put("c", "TEST-3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "TEST-1"
+    assert cache.get("c") == "TEST-3"
+
+
+@mock_aws
+def test_dynamodb_store_is_shared_between_containers(lambda_module):
+    dynamodb = boto3.resource("dynamodb", region_name="ap-northeast-1")
+    table = dynamodb.create_table(
+        TableName="jira-dedup",
+        KeySchema=[{"AttributeName": "summary", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "summary", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    container_a = lambda_module.DedupCache(ttl_seconds=300, table=table)
+    container_b = lambda_module.DedupCache(ttl_seconds=300, table=table)
+
+    container_a.put(SUMMARY, "TEST-1")
+    assert container_b.get(SUMMARY) == "TEST-1"
+    assert container_b.stats()["shared_hits"] == 1
+
+    container_b.invalidate(SUMMARY)
+    assert lambda_module.DedupCache(ttl_seconds=300, table=table).get(SUMMARY) is None
+
+
+@mock_aws
+def test_shared_hit_keeps_the_item_expiry(lambda_module, monkeypatch):
+    dynamodb = boto3.resource("dynamodb", region_name="ap-northeast-1")
+    table = dynamodb.create_table(
+        TableName="jira-dedup",
+        KeySchema=[{"AttributeName": "summary", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "summary", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    written_at = 1_000_000.0
+    monkeypatch.setattr("incident_core.dedup.time.time", lambda: written_at)
+    lambda_module.DedupCache(ttl_seconds=300, table=table).put(SUMMARY, "TEST-1")
+
+    # 書かれてから 290 秒後に別のコンテナが読む
+    monkeypatch.setattr("incident_core.dedup.time.time", lambda: written_at + 290)
+    container_b = lambda_module.DedupCache(ttl_seconds=300, table=table)
+    assert container_b.get(SUMMARY) == "TEST-1"
+
+    # 共有ストアの期限（書かれてから 300 秒）を過ぎたらコンテナ内でも使わない
+    monkeypatch.setattr("incident_core.dedup.time.time", lambda: written_at + 301)
+    table.delete_item(Key={"summary": SUMMARY})
+    assert container_b.get(SUMMARY) is None
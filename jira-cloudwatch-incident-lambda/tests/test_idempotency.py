@@ -0,0 +1,137 @@
+import time
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from incident_core.idempotency import IdempotencyLedger
+from incident_core.jira import JiraApiError
+from sample_events import cloudwatch_message, sns_event
+
+
+@pytest.fixture()
+def ledger_module(lambda_module, monkeypatch):
+    monkeypatch.setattr(lambda_module, "idempotency_ledger", IdempotencyLedger(ttl_seconds=300))
+    return lambda_module
+
+
+def _alarm_event(*alarms):
+    return sns_event(*(cloudwatch_message(alarm) for alarm in alarms))
+
+
+def test_redelivered_event_skips_jira(ledger_module, fake_jira):
+    event = _alarm_event("alarm-a", "alarm-b")
+    ledger_module.lambda_handler(event, None)
+    fake_jira.jira.reset_calls()
+
+    ledger_module.lambda_handler(event, None)
+
+    assert fake_jira.jira.total_calls == 0
+    assert ledger_module.idempotency_ledger.stats()["hits"] == 2
+
+
+def test_lambda_retry_resumes_after_failed_record(ledger_module, fake_jira):
+    event = _alarm_event("alarm-a", "alarm-b", "alarm-c")
+    fake_jira.jira.rejected_summaries = {"[CloudWatch Alarm] alarm-b is ALARM"}
+    with pytest.raises(JiraApiError):
+        ledger_module.lambda_handler(event, None)
+    fake_jira.jira.rejected_summaries = set()
+    fake_jira.jira.reset_calls()
+
+    ledger_module.lambda_handler(event, None)
+
+    # alarm-a は処理済みなので、alarm-b / alarm-c の検索・起票だけ
+    assert fake_jira.jira.calls == {"search": 2, "create": 2}
+    assert len(fake_jira.jira.issues) == 3
+
+
+def test_new_transition_of_same_alarm_is_processed(ledger_module, fake_jira):
+    ledger_module.lambda_handler(sns_event(cloudwatch_message(time="2026-10-18T00:00:00.000+0000")), None)
+    ledger_module.lambda_handler(sns_event(cloudwatch_message(time="2026-10-18T00:05:00.000+0000"),
+                                           message_ids={0: "msg-1"}), None)
+
+    assert fake_jira.jira.calls == {"search": 2, "create": 1, "comment": 1}
+
+
+def test_batch_mode_reports_duplicates(ledger_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(ledger_module, "JIRA_BATCH_MODE", True)
+    first = ledger_module.lambda_handler(_alarm_event("alarm-a", "alarm-b"), None)
+    fake_jira.jira.reset_calls()
+
+    event = _alarm_event("alarm-a", "alarm-b")
+    event["Records"].append(sns_event(cloudwatch_message("alarm-c"), message_ids={0: "msg-2"})["Records"][0])
+    result = ledger_module.lambda_handler(event, None)
+
+    assert [r["action"] for r in result["results"]] == ["duplicate", "duplicate", "created"]
+    assert result["results"][0]["issue_key"] == first["results"][0]["issue_key"]
+    assert fake_jira.jira.calls == {"search": 1, "create": 1}
+
+
+def test_failed_records_are_not_recorded(ledger_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(ledger_module, "JIRA_BATCH_MODE", True)
+    fake_jira.jira.rejected_summaries = {"[CloudWatch Alarm] alarm-b is ALARM"}
+    event = _alarm_event("alarm-a", "alarm-b")
+    with pytest.raises(ledger_module.BatchProcessingError):
+        ledger_module.lambda_handler(event, None)
+    fake_jira.jira.rejected_summaries = set()
+
+    result = ledger_module.lambda_handler(event, None)
+
+    assert [r["action"] for r in result["results"]] == ["duplicate", "created"]
+
+
+@pytest.fixture()
+def ledger_table():
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="ap-northeast-1")
+        yield dynamodb.create_table(
+            TableName="jira-idempotency",
+            KeySchema=[{"AttributeName": "idempotency_key", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "idempotency_key", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+
+def test_dynamodb_ledger_is_shared_between_containers(lambda_module, ledger_table):
+    container_a = IdempotencyLedger(ttl_seconds=300, table=ledger_table)
+    container_b = IdempotencyLedger(ttl_seconds=300, table=ledger_table)
+
+    container_a.put_many([("msg-0#t0", "TEST-1"), ("msg-1#t0", "TEST-2")])
+
+    assert container_b.get_many(["msg-0#t0", "msg-1#t0", "msg-2#t0"]) == {"msg-0#t0": "TEST-1", "msg-1#t0": "TEST-2"}
+    assert container_b.stats() == {"hits": 2, "misses": 1, "shared_hits": 2, "size": 2}
+    # 2回目はコンテナ内の記録で判定する
+    assert container_b.get("msg-0#t0") == "TEST-1"
+    assert container_b.stats()["shared_hits"] == 2
+
+
+def test_dynamodb_ledger_ignores_expired_items(lambda_module, ledger_table):
+    ledger_table.put_item(Item={"idempotency_key": "msg-0#t0", "issue_key": "TEST-1",
+                                "expires_at": int(time.time()) - 1})
+
+    assert IdempotencyLedger(ttl_seconds=300, table=ledger_table).get("msg-0#t0") is None
+
+
+def test_dynamodb_ledger_reads_more_than_one_batch(lambda_module, ledger_table):
+    keys = [f"msg-{i}#t0" for i in range(150)]
+    IdempotencyLedger(ttl_seconds=300, table=ledger_table).put_many([(k, "TEST-1") for k in keys])
+
+    assert len(IdempotencyLedger(ttl_seconds=300, table=ledger_table).get_many(keys)) == 150
+
+
+def test_redelivery_to_another_container_skips_jira(fake_jira, ledger_table):
+    from lambda_loader import load_lambda_module
+
+    containers = []
+    for _ in range(2):
+        module = load_lambda_module()
+        module.jira_secret_cache.put(fake_jira.secret())
+        module.idempotency_ledger = IdempotencyLedger(ttl_seconds=300, table=ledger_table)
+        containers.append(module)
+    event = _alarm_event("alarm-a")
+
+    containers[0].lambda_handler(event, None)
+    fake_jira.jira.reset_calls()
+    containers[1].lambda_handler(event, None)
+
+    assert fake_jira.jira.total_calls == 0
@@ -0,0 +1,123 @@
+import json
+import random
+
+import pytest
+
+from sample_events import (
+    batch_job_failed_event, cloudwatch_alarm_event, cloudwatch_message, composite_alarm_message,
+    ecs_task_stopped_event, sns_event, stepfunctions_event,
+)
+
+SNS = {"Timestamp": "2026-10-18T00:00:00.000Z"}
+INCIDENT_KEYS = {
+    "source", "alarm_name", "new_state", "reason", "region", "namespace",
+    "metric_name", "lambda_name", "timestamp", "raw_message",
+}
+SAMPLES = {
+    "cloudwatch_alarm": cloudwatch_message,
+    "cloudwatch_composite_alarm": composite_alarm_message,
+    "cloudwatch_alarm_event": cloudwatch_alarm_event,
+    "stepfunctions": stepfunctions_event,
+    "ecs_task": ecs_task_stopped_event,
+    "batch_job": batch_job_failed_event,
+}
+
+
+@pytest.mark.parametrize("message, source, summary", [
+    (cloudwatch_message(), "cloudwatch_alarm", "[CloudWatch Alarm] prod-api-5xx is ALARM"),
+    (composite_alarm_message(), "cloudwatch_composite_alarm", "[CloudWatch Alarm] prod-order-composite is ALARM"),
+    (cloudwatch_alarm_event(), "cloudwatch_alarm", "[CloudWatch Alarm] prod-api-5xx is ALARM"),
+    (cloudwatch_alarm_event("prod-order-composite", alarm_rule='ALARM("a")'),
+     "cloudwatch_composite_alarm", "[CloudWatch Alarm] prod-order-composite is ALARM"),
+    (stepfunctions_event(), "stepfunctions", "[StepFunctions] order-workflow status is FAILED"),
+    (ecs_task_stopped_event(), "ecs_task", "[ECS] prod-cluster/order-api task is STOPPED"),
+    (batch_job_failed_event(), "batch_job", "[Batch] nightly-report job is FAILED"),
+    ({"source": "aws.health", "detail-type": "AWS Health Event"}, "unknown", "[CloudWatch Alarm] AWS Health Event is UNKNOWN"),
+])
+def test_registry_dispatches_by_source_and_detail_type(lambda_module, message, source, summary):
+    incident = lambda_module._build_incident(message, SNS)
+
+    assert incident["source"] == source
+    assert lambda_module._build_summary(incident) == summary
+
+
+def test_parsers_extract_failure_reasons(lambda_module):
+    ecs = lambda_module._build_incident(ecs_task_stopped_event(), SNS)
+    batch = lambda_module._build_incident(batch_job_failed_event(), SNS)
+    composite = lambda_module._build_incident(composite_alarm_message(), SNS)
+    metric = lambda_module._build_incident(cloudwatch_alarm_event(), SNS)
+
+    assert ecs["reason"].splitlines() == [
+        "Essential container in task exited",
+        "app: exitCode=137 OutOfMemoryError: Container killed due to memory usage",
+    ]
+    assert ecs["metric_name"] == "TaskStopped"
+    assert batch["reason"] == "Essential container in task exited\nexitCode=1"
+    assert composite["reason"].endswith('Rule: ALARM("prod-api-5xx") OR ALARM("prod-api-latency")')
+    assert (metric["namespace"], metric["metric_name"], metric["lambda_name"]) == ("AWS/Lambda", "Errors", "order-api")
+
+
+def test_new_parsers_can_be_registered(lambda_module, monkeypatch):
+    monkeypatch.setattr(lambda_module, "_INCIDENT_PARSERS", dict(lambda_module._INCIDENT_PARSERS))
+
+    @lambda_module.incident_parser("custom.app")
+    def parse(message, sns):
+        return {"source": "custom", "detail_type": message["detail-type"]}
+
+    assert lambda_module._build_incident({"source": "custom.app", "detail-type": "X"}, SNS) == {
+        "source": "custom", "detail_type": "X",
+    }
+
+
+def _paths(value, path=()):
+    yield path
+    if isinstance(value, dict):
+        for k, v in value.items():
+            yield from _paths(v, path + (k,))
+    elif isinstance(value, list):
+        for i, v in enumerate(value):
+            yield from _paths(v, path + (i,))
+
+
+def _mutate(message, rng):
+    """ランダムなフィールドを削除するか、別の型の値に差し替える"""
+    message = json.loads(json.dumps(message))
+    for path in rng.sample(list(_paths(message))[1:], k=3):
+        parent = message
+        try:
+            for p in path[:-1]:
+                parent = parent[p]
+            if isinstance(parent, dict) and rng.random() < 0.3:
+                parent.pop(path[-1], None)
+            else:
+                parent[path[-1]] = rng.choice([None, "", 0, -1.5, True, [], {}, ["x"], {"k": "v"}, "ü" * 50])
+        except (KeyError, IndexError, TypeError):
+            continue  # 先に親が差し替えられている
+    return message
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLES))
+def test_parsers_survive_fuzzed_messages(lambda_module, name):
+    rng = random.Random(name)
+    for _ in range(300):
+        message = _mutate(SAMPLES[name](), rng)
+
+        incident = lambda_module._build_incident(message, SNS)
+
+        assert set(incident) == INCIDENT_KEYS
+        for key in INCIDENT_KEYS - {"lambda_name", "raw_message"}:
+            assert isinstance(incident[key], str), (key, message)
+        lambda_module._build_summary(incident)
+        lambda_module._build_description(incident).to_dict()
+
+
+@pytest.mark.parametrize("message", [[], 42, "text", None, {"source": ["list"]}, {"AlarmName": "a"}])
+def test_non_event_payloads_fall_back_to_generic(lambda_module, message):
+    assert lambda_module._build_incident(message, SNS)["source"] == "unknown"
+
+
+def test_ecs_event_end_to_end(lambda_module, fake_jira):
+    lambda_module.lambda_handler(sns_event(ecs_task_stopped_event(), ecs_task_stopped_event()), None)
+
+    assert fake_jira.jira.open_issue_keys("[ECS] prod-cluster/order-api task is STOPPED")
+    assert fake_jira.jira.calls == {"search": 2, "create": 1, "comment": 1}
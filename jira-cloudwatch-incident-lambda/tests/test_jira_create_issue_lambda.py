@@ -0,0 +1,88 @@
+import pytest
+
+from import_profile import profile_import
+from lambda_loader import PLAIN_LAMBDA, load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+SUMMARY = "[CloudWatch Alarm] prod-api-5xx is ALARM"
+
+
+@pytest.fixture()
+def plain_module(fake_jira):
+    module = load_lambda_module(PLAIN_LAMBDA)
+    module.jira_secret_cache.put(fake_jira.secret())
+    return module
+
+
+def test_import_does_not_load_heavy_modules():
+    assert profile_import(PLAIN_LAMBDA)["heavy_modules"] == []
+
+
+def test_creates_then_comments(plain_module, fake_jira):
+    event = sns_event(cloudwatch_message(), cloudwatch_message())
+
+    assert plain_module.lambda_handler(event, None) == {"status": "ok"}
+
+    assert fake_jira.jira.calls == {"search": 2, "create": 1, "comment": 1}
+    [key] = fake_jira.jira.open_issue_keys(SUMMARY)
+    issue = fake_jira.jira.issues[key]
+    assert issue["fields"]["priority"] == {"name": "High"}
+    assert issue["fields"]["labels"] == ["cloudwatch-auto", "env-dev"]
+    assert len(fake_jira.jira.comments[key]) == 1
+
+
+def test_dedup_cache_skips_search(plain_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(plain_module.issue_tracker.dedup_cache, "ttl_seconds", 300)
+    event = sns_event(cloudwatch_message(), cloudwatch_message(), cloudwatch_message())
+
+    plain_module.lambda_handler(event, None)
+
+    assert fake_jira.jira.calls == {"search": 1, "create": 1, "comment": 2}
+
+
+def test_dedup_cache_hit_keeps_original_expiry(plain_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(plain_module.issue_tracker.dedup_cache, "ttl_seconds", 300)
+    plain_module.lambda_handler(sns_event(cloudwatch_message()), None)
+    _, expires_at = plain_module.issue_tracker.dedup_cache._entries[SUMMARY]
+
+    plain_module.lambda_handler(sns_event(cloudwatch_message(), cloudwatch_message()), None)
+
+    # 鳴り続けても TTL は延びない（手で解決された Issue は TTL が切れれば検索し直す）
+    assert plain_module.issue_tracker.dedup_cache._entries[SUMMARY][1] == expires_at
+
+
+def test_resolved_issue_is_not_reused_when_verifying(plain_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(plain_module.issue_tracker.dedup_cache, "ttl_seconds", 300)
+    monkeypatch.setattr(plain_module.issue_tracker, "verify_on_hit", True)
+    plain_module.lambda_handler(sns_event(cloudwatch_message()), None)
+    [first_key] = fake_jira.jira.open_issue_keys(SUMMARY)
+    fake_jira.jira.resolve(first_key)
+
+    plain_module.lambda_handler(sns_event(cloudwatch_message()), None)
+
+    [second_key] = fake_jira.jira.open_issue_keys(SUMMARY)
+    assert second_key != first_key
+    assert fake_jira.jira.comments[first_key] == []
+    assert plain_module.issue_tracker.dedup_cache.get(SUMMARY) == second_key
+
+
+def test_retries_once_with_refreshed_secret_on_401(plain_module, fake_jira):
+    rotated = fake_jira.secret(JIRA_API_TOKEN="rotated")
+    plain_module.jira_secret_cache.loader = lambda: rotated
+    fake_jira.jira.api_token = "rotated"
+
+    plain_module.lambda_handler(sns_event(cloudwatch_message()), None)
+
+    assert plain_module.jira_secret_cache.get() is rotated
+    assert fake_jira.jira.open_issue_keys(SUMMARY)
+
+
+def test_redelivered_event_skips_jira(plain_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(plain_module.idempotency_ledger, "ttl_seconds", 300)
+    event = sns_event(cloudwatch_message())
+    plain_module.lambda_handler(event, None)
+    fake_jira.jira.reset_calls()
+
+    plain_module.lambda_handler(event, None)
+
+    assert fake_jira.jira.total_calls == 0
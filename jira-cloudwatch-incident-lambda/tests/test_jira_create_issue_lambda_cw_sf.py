@@ -0,0 +1,91 @@
+import pytest
+
+from incident_core.idempotency import IdempotencyLedger
+from sample_events import cloudwatch_message, sns_event
+
+
+def test_sequential_mode_creates_then_comments(lambda_module, fake_jira):
+    event = sns_event(cloudwatch_message(), cloudwatch_message())
+
+    assert lambda_module.lambda_handler(event, None) == {"status": "ok"}
+
+    assert fake_jira.jira.calls == {"search": 2, "create": 1, "comment": 1}
+    [key] = fake_jira.jira.open_issue_keys("[CloudWatch Alarm] prod-api-5xx is ALARM")
+    assert len(fake_jira.jira.comments[key]) == 1
+
+
+def test_batch_mode_searches_once_per_summary(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_BATCH_MODE", True)
+    event = sns_event(
+        cloudwatch_message("alarm-a"),
+        cloudwatch_message("alarm-b"),
+        cloudwatch_message("alarm-a"),
+        cloudwatch_message("alarm-a"),
+    )
+
+    result = lambda_module.lambda_handler(event, None)
+
+    assert result["status"] == "ok"
+    assert fake_jira.jira.calls == {"search": 2, "create": 2, "comment": 2}
+    assert [r["action"] for r in result["results"]] == ["created", "created", "commented", "commented"]
+    assert result["results"][2]["issue_key"] == result["results"][0]["issue_key"]
+
+
+def test_batch_mode_reports_per_record_failures(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_BATCH_MODE", True)
+    event = sns_event(cloudwatch_message("alarm-a"), cloudwatch_message("alarm-b"))
+    event["Records"][1]["Sns"]["Message"] = "not json"
+
+    with pytest.raises(lambda_module.BatchProcessingError) as exc_info:
+        lambda_module.lambda_handler(event, None)
+
+    results = exc_info.value.results
+    assert [r["status"] for r in results] == ["succeeded", "failed"]
+    assert results[1]["message_id"] == "msg-1"
+    assert fake_jira.jira.calls == {"search": 1, "create": 1}
+
+
+def test_failed_concurrent_batch_raises_and_retries_only_failed_records(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_MAX_WORKERS", 2)
+    monkeypatch.setattr(lambda_module, "idempotency_ledger", IdempotencyLedger(ttl_seconds=300))
+    original = fake_jira.jira.create_issue
+
+    def reject_alarm_b(payload):
+        if payload["fields"]["summary"] == "[CloudWatch Alarm] alarm-b is ALARM":
+            return 400, {"errorMessages": ["Bad request"]}
+        return original(payload)
+
+    monkeypatch.setattr(fake_jira.jira, "create_issue", reject_alarm_b)
+    event = sns_event(cloudwatch_message("alarm-a"), cloudwatch_message("alarm-b"))
+
+    # 戻り値は SNS に捨てられるので、例外にして Lambda にリトライさせる
+    with pytest.raises(lambda_module.BatchProcessingError, match="1 of 2 record"):
+        lambda_module.lambda_handler(event, None)
+
+    # リトライでは失敗したレコードだけを送る
+    monkeypatch.setattr(fake_jira.jira, "create_issue", original)
+    fake_jira.jira.reset_calls()
+    result = lambda_module.lambda_handler(event, None)
+
+    assert [r["action"] for r in result["results"]] == ["duplicate", "created"]
+    assert fake_jira.jira.calls == {"search": 1, "create": 1}
+
+
+def test_concurrent_dispatch_keeps_comment_order_per_issue(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_MAX_WORKERS", 4)
+    messages = []
+    for i in range(5):
+        for alarm in ("alarm-a", "alarm-b", "alarm-c"):
+            messages.append(cloudwatch_message(alarm, time=f"2026-10-18T00:00:0{i}.000+0000"))
+
+    result = lambda_module.lambda_handler(sns_event(*messages), None)
+
+    assert result["status"] == "ok"
+    assert fake_jira.jira.calls == {"search": 3, "create": 3, "comment": 12}
+    for alarm in ("alarm-a", "alarm-b", "alarm-c"):
+        [key] = fake_jira.jira.open_issue_keys(f"[CloudWatch Alarm] {alarm} is ALARM")
+        times = [
+            next(c["text"] for c in comment["content"][0]["content"] if c["text"].startswith("- Time:"))
+            for comment in fake_jira.jira.comments[key]
+        ]
+        assert times == [f"- Time: 2026-10-18T00:00:0{i}.000+0000\n" for i in range(1, 5)]
@@ -0,0 +1,77 @@
+import json
+import logging
+
+from sample_events import cloudwatch_message, sns_event
+
+
+def _messages(caplog):
+    return [r.getMessage() for r in caplog.records]
+
+
+def test_received_event_is_summarized_by_default(lambda_module, fake_jira, caplog):
+    event = sns_event(cloudwatch_message("alarm-a"), cloudwatch_message("alarm-b"))
+
+    with caplog.at_level(logging.INFO):
+        lambda_module.lambda_handler(event, None)
+
+    [line] = [m for m in _messages(caplog) if m.startswith("Received event")]
+    assert "records=2" in line
+    assert '"msg-0", "msg-1"' in line
+    assert "alarm-a" not in line
+
+
+def test_sampled_event_is_logged_in_full_but_truncated(lambda_module, fake_jira, caplog, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_LOG_EVENT_SAMPLE_RATE", 1.0)
+    event = sns_event(*[cloudwatch_message(f"alarm-{i}") for i in range(50)])
+
+    with caplog.at_level(logging.INFO):
+        lambda_module._log_received_event(event)
+
+    [line] = _messages(caplog)
+    assert line.startswith('Received event: {"Records": [')
+    assert line.endswith("...(truncated)")
+    assert len(line) < lambda_module.JIRA_LOG_FIELD_MAX_CHARS + 100
+
+
+def test_lazy_json_is_not_serialized_when_level_is_disabled(lambda_module, caplog):
+    rendered = []
+
+    class Probe:
+        def __str__(self):
+            rendered.append(True)
+            return "probe"
+
+    with caplog.at_level(logging.INFO):
+        lambda_module.logger.debug("message=%s", lambda_module.LazyJSON({"value": Probe()}))
+        lambda_module.log_fields(logging.DEBUG, "fields", value=Probe())
+    assert rendered == []
+
+    with caplog.at_level(logging.DEBUG):
+        lambda_module.logger.debug("message=%s", lambda_module.LazyJSON({"value": Probe()}))
+    assert rendered
+    assert _messages(caplog)[-1] == 'message={"value": "probe"}'
+
+
+def test_json_prefix_stops_serializing_at_the_limit(lambda_module):
+    text, truncated = lambda_module._json_prefix(list(range(1_000_000)), 100)
+
+    assert truncated
+    assert text == json.dumps(list(range(1_000_000)))[:100] + "...(truncated)"
+    assert lambda_module._json_prefix({"a": 1}, 100) == ('{"a": 1}', False)
+
+
+def test_json_formatter_puts_fields_at_top_level(lambda_module, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_LOG_FIELD_MAX_CHARS", 20)
+    record = logging.LogRecord("root", logging.INFO, __file__, 1, "%s %s", None, None)
+    record.log_message = "Received event"
+    record.log_fields = {"records": 2, "message_ids": ["msg-0"], "note": "x" * 100}
+    record.aws_request_id = "req-1"
+    doc = json.loads(lambda_module.JsonLogFormatter().format(record))
+
+    assert doc["level"] == "INFO"
+    assert doc["message"] == "Received event"
+    assert doc["requestId"] == "req-1"
+    assert doc["records"] == 2
+    assert doc["message_ids"] == ["msg-0"]
+    assert doc["note"] == "x" * 20 + "...(truncated)"
+    assert doc["timestamp"].endswith("Z")
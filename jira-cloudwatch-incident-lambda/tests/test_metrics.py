@@ -0,0 +1,119 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from lambda_loader import PLAIN_LAMBDA, load_lambda_module
+from sample_events import cloudwatch_message, sns_event
+
+CONTEXT = SimpleNamespace(aws_request_id="req-1", function_name="jira-incident")
+
+
+@pytest.fixture()
+def metrics_module(fake_jira, monkeypatch):
+    # 有効・無効は import 時に決まる
+    monkeypatch.setenv("JIRA_METRICS_ENABLED", "true")
+    module = load_lambda_module()
+    module.jira_secret_cache.put(fake_jira.secret())
+    return module
+
+
+def _emf_docs(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def _latencies(docs):
+    return {doc["Phase"]: doc["Latency"] for doc in docs if "Phase" in doc}
+
+
+def test_handler_emits_emf_per_phase(metrics_module, fake_jira, capsys):
+    metrics_module.lambda_handler(sns_event(cloudwatch_message(), cloudwatch_message()), CONTEXT)
+
+    docs = _emf_docs(capsys)
+    latencies = _latencies(docs)
+    assert set(latencies) == {"handler", "parse", "search", "create", "comment", "connect"}
+    assert [len(latencies[p]) for p in ("handler", "parse", "search", "create", "comment")] == [1, 2, 2, 1, 1]
+    # コネクションの確立は最初の1回だけ（以降は使い回す）
+    assert len(latencies["connect"]) == 1
+
+    [counters] = [doc for doc in docs if "Phase" not in doc]
+    assert counters["JiraCalls"] == 4
+    assert counters["NewConnections"] == 1
+    assert counters["BytesSent"] > 0
+    assert counters["RequestId"] == "req-1"
+    for doc in docs:
+        [directive] = doc["_aws"]["CloudWatchMetrics"]
+        assert directive["Namespace"] == "JiraIncidentLambda"
+        assert {m["Name"] for m in directive["Metrics"]} <= set(doc)
+
+
+def test_dedup_hit_rate_and_retries(metrics_module, fake_jira, capsys, monkeypatch):
+    monkeypatch.setattr(metrics_module.issue_tracker, "dedup_cache", metrics_module.DedupCache(ttl_seconds=60))
+    # トークンがローテーションされていて、最初の1回は 401 → Secret を取り直してやり直す
+    fake_jira.jira.api_token = "rotated"
+    rotated = fake_jira.secret(JIRA_API_TOKEN="rotated")
+    monkeypatch.setattr(metrics_module, "jira_secret_cache", metrics_module.SecretCache(lambda: rotated, 900))
+    metrics_module.jira_secret_cache.put(fake_jira.secret())
+
+    metrics_module.lambda_handler(sns_event(*[cloudwatch_message()] * 4), CONTEXT)
+
+    [counters] = [doc for doc in _emf_docs(capsys) if "Phase" not in doc]
+    assert counters["DedupHits"] == 3
+    assert counters["DedupHitRate"] == 75.0
+    # 検索と起票がそれぞれ古いトークンで 401 になり、1回ずつやり直す
+    assert counters["Retries"] == 2
+
+
+def test_latency_arrays_are_split_at_100_values(metrics_module, capsys):
+    for _ in range(250):
+        metrics_module.emf_metrics.add_timing("parse", 1.0)
+
+    metrics_module.emf_metrics.flush()
+
+    assert [len(doc["Latency"]) for doc in _emf_docs(capsys)] == [100, 100, 50]
+
+
+def test_nothing_is_written_when_disabled(lambda_module, fake_jira, capsys):
+    lambda_module.lambda_handler(sns_event(cloudwatch_message()), CONTEXT)
+
+    assert capsys.readouterr().out == ""
+    assert not hasattr(lambda_module._build_incident, "__wrapped__")
+
+
+def test_rate_limiter_is_reported_on_sequential_path(metrics_module, fake_jira, capsys):
+    metrics_module.lambda_handler(sns_event(cloudwatch_message()), CONTEXT)
+
+    [counters] = [doc for doc in _emf_docs(capsys) if "Phase" not in doc]
+    assert counters["RateLimitMaxQueueDepth"] == 0
+    assert counters["RateLimitWaitSeconds"] == 0
+
+
+def test_rate_limiter_queue_and_throttling_are_reported_in_storm(metrics_module, fake_jira, capsys, monkeypatch):
+    monkeypatch.setattr(metrics_module, "JIRA_MAX_WORKERS", 8)
+    fake_jira.jira.set_quota(50, burst=5)
+
+    metrics_module.lambda_handler(sns_event(*[cloudwatch_message(f"storm-{i}") for i in range(30)]), CONTEXT)
+
+    [counters] = [doc for doc in _emf_docs(capsys) if "Phase" not in doc]
+    assert counters["Throttled"] == fake_jira.jira.calls["throttled"] > 0
+    assert counters["RateLimitRate"] == 50
+    assert counters["RateLimitMaxQueueDepth"] >= 2
+    assert counters["RateLimitWaitSeconds"] > 0
+
+
+def test_plain_lambda_emits_emf_and_follows_rate_limit(fake_jira, capsys, monkeypatch):
+    monkeypatch.setenv("JIRA_METRICS_ENABLED", "true")
+    module = load_lambda_module(PLAIN_LAMBDA)
+    module.jira_secret_cache.put(fake_jira.secret())
+    fake_jira.jira.set_quota(20, burst=2)
+
+    module.lambda_handler(sns_event(*[cloudwatch_message()] * 4), CONTEXT)
+
+    assert fake_jira.jira.calls["create"] == 1
+    assert fake_jira.jira.calls["comment"] == 3
+    docs = _emf_docs(capsys)
+    assert set(_latencies(docs)) == {"handler", "search", "create", "comment", "connect"}
+    [counters] = [doc for doc in docs if "Phase" not in doc]
+    assert counters["RateLimitRate"] == 20
+    assert counters["JiraCalls"] == 8 + fake_jira.jira.calls["throttled"]
+    assert counters["RequestId"] == "req-1"
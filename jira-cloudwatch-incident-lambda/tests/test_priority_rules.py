@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize("alarm_name, metric_name, reason, namespace, expected", [
+    ("prod-api-5xx", "Errors", "", "AWS/Lambda", "High"),
+    ("orders", "Errors", "Execution FAILED", "AWS/States", "High"),
+    ("staging-api", "Latency", "", "AWS/ApiGateway", "Medium"),
+    ("batch-job", "Invocations", "", "AWS/Lambda", "Medium"),
+])
+def test_default_rules_match_keyword_lists(lambda_module, alarm_name, metric_name, reason, namespace, expected):
+    priority = lambda_module._decide_priority(alarm_name, metric_name, reason=reason, namespace=namespace)
+
+    assert priority == {"name": expected}
+
+
+def test_field_weights_and_thresholds(lambda_module):
+    engine = lambda_module.PriorityRuleEngine.from_config({
+        "tiers": [
+            {"priority": "Highest", "keywords": ["payment"], "threshold": 3},
+            {"priority": "High", "keywords": ["payment", "timeout"], "threshold": 2},
+        ],
+        "field_weights": {"alarm_name": 2, "reason": 1, "namespace": 0},
+        "default": "Low",
+    })
+
+    assert engine.decide({"alarm_name": "payment-api", "reason": "payment timeout"}) == {"name": "Highest"}
+    assert engine.decide({"alarm_name": "Payment-API", "reason": "ok"}) == {"name": "High"}
+    assert engine.decide({"reason": "timeout", "namespace": "payment"}) == {"name": "Low"}
+
+
+def test_rules_from_secret_override_defaults(lambda_module, fake_jira):
+    rules = {"tiers": [{"priority": "Highest", "keywords": ["order-api"]}], "default": "Low"}
+    secret = fake_jira.secret(JIRA_PRIORITY_RULES=json.dumps(rules))
+
+    assert lambda_module._decide_priority("order-api-errors", "Errors", secret=secret) == {"name": "Highest"}
+    assert lambda_module._decide_priority("prod-5xx", "Errors", secret=secret) == {"name": "Low"}
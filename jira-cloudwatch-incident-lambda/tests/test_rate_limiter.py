@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from sample_events import cloudwatch_message, sns_event
+
+
+def test_rate_follows_jira_rate_limit_headers(lambda_module):
+    limiter = lambda_module.RateLimiter(None, burst=5)
+
+    limiter.update(200, {})
+    assert limiter.rate is None
+
+    limiter.update(200, {"X-RateLimit-FillRate": "20", "X-RateLimit-Interval-Seconds": "2"})
+    assert limiter.rate == 10
+
+    # 成功しても Jira が示したレートは超えない
+    limiter.update(200, {})
+    assert limiter.rate == 10
+
+
+def test_429_halves_rate_and_pauses_all_callers(lambda_module):
+    limiter = lambda_module.RateLimiter(8.0, burst=5, increase=0.5)
+
+    limiter.update(429, {"Retry-After": "0.2"})
+    assert limiter.rate == 4.0
+    assert limiter.acquire(max_wait=1.0) >= 0.19
+
+    limiter.update(200, {})
+    assert limiter.rate == 4.5
+    assert limiter.metrics()["throttled"] == 1
+
+
+def test_acquire_spaces_requests_at_the_current_rate(lambda_module):
+    limiter = lambda_module.RateLimiter(50.0, burst=1)
+
+    start = time.monotonic()
+    for _ in range(11):
+        limiter.acquire(max_wait=1.0)
+
+    assert time.monotonic() - start >= 0.19
+    assert limiter.metrics()["queue_depth"] == 0
+
+
+def _storm(module, alarms):
+    event = sns_event(*[cloudwatch_message(f"storm-{i}") for i in range(alarms)])
+    return module.lambda_handler(event, None)
+
+
+@pytest.mark.parametrize("quota_headers", [True, False])
+def test_storm_against_quota_is_not_dropped(lambda_module, fake_jira, monkeypatch, quota_headers):
+    monkeypatch.setattr(lambda_module, "JIRA_MAX_WORKERS", 8)
+    fake_jira.jira.set_quota(50, burst=5)
+    fake_jira.jira.quota_headers = quota_headers
+
+    result = _storm(lambda_module, 30)
+
+    assert result["status"] == "ok"
+    assert fake_jira.jira.calls["search"] == fake_jira.jira.calls["create"] == 30
+    # 最初の同時送信でクォータを超えた分だけで、あとは 429 を受けない
+    assert fake_jira.jira.calls["throttled"] <= 8
+    if quota_headers:
+        assert lambda_module.jira_rate_limiter.rate == 50
+
+
+def test_storm_without_limiter_gets_throttled(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_MAX_WORKERS", 8)
+    monkeypatch.setattr(lambda_module, "JIRA_RATE_LIMIT_ENABLED", False)
+    fake_jira.jira.set_quota(50, burst=5)
+
+    with pytest.raises(lambda_module.BatchProcessingError):
+        _storm(lambda_module, 30)
+
+    assert fake_jira.jira.calls["throttled"] > 0
+
+
+def test_window_records_peak_queue_depth_while_waiting(lambda_module):
+    limiter = lambda_module.RateLimiter(20.0, burst=1)
+    threads = [threading.Thread(target=limiter.acquire, args=(1.0,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    window = limiter.take_window()
+    assert window["rate"] == 20.0
+    assert window["max_queue_depth"] >= 2
+    assert window["wait_seconds"] >= 0.1
+    # 次の呼び出しの集計は 0 から
+    assert limiter.take_window() == {"rate": 20.0, "max_queue_depth": 0, "throttled": 0, "wait_seconds": 0.0}
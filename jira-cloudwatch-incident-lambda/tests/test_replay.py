@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+import replay
+from sample_events import cloudwatch_message, sns_event
+
+
+def test_generated_mix_is_replayed_against_fake_jira_and_moto():
+    messages = replay.generate_messages(30, replay.parse_mix("cloudwatch=3,stepfunctions=1,unknown=1"), alarms=4)
+    events = replay.build_events(messages, batch_size=3, handler="sns")
+
+    report = replay.replay(events, concurrency=2)
+
+    assert report["invocations"] == 10
+    assert report["records"] == 30
+    assert report["failed_invocations"] == report["failed_records"] == 0
+    # 作成 + コメント = レコード数（同じ summary の再発はコメントになる）
+    assert report["jira_calls"]["create"] + report["jira_calls"]["comment"] == 30
+    assert report["issues_created"] == report["jira_calls"]["create"]
+    assert 0 < report["latency_ms"]["p50"] <= report["latency_ms"]["p99"] <= report["latency_ms"]["max"]
+
+
+def test_sqs_handler_replay_reports_batch_item_failures():
+    events = replay.build_events([cloudwatch_message("alarm-a"), cloudwatch_message("alarm-b")], 2, "sqs")
+    events[0]["Records"][1]["body"] = "not json"
+
+    report = replay.replay(events, handler="sqs")
+
+    assert report["failed_records"] == 1
+    assert report["jira_calls"] == {"search": 1, "create": 1}
+
+
+def test_recorded_events_and_messages_are_loaded(tmp_path):
+    path = tmp_path / "recorded.jsonl"
+    lines = [sns_event(cloudwatch_message("alarm-a")), cloudwatch_message("alarm-b")]
+    path.write_text("\n".join(json.dumps(line) for line in lines), encoding="utf-8")
+
+    events, messages = replay.load_recorded(str(path))
+
+    assert events == [lines[0]]
+    assert messages == [lines[1]]
+
+
+def test_unknown_mix_name_is_rejected():
+    with pytest.raises(ValueError):
+        replay.parse_mix("cloudwatch=1,nope=2")
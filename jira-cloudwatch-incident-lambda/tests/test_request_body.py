@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+import lambda_loader  # noqa: F401  incident_core を import できるようにする
+from incident_core.adf import encode_json_body, summarize_json
+from incident_core.transport import GzipTransport
+from sample_events import cloudwatch_message, sns_event
+
+SUMMARY = "[CloudWatch Alarm] prod-api-5xx is ALARM"
+
+
+def _large_message():
+    message = cloudwatch_message(reason="閾値超過 " * 2000)
+    message["Trigger"]["Dimensions"] = [{"name": f"dim-{i}", "value": "v" * 50} for i in range(200)]
+    return message
+
+
+@pytest.fixture()
+def gzip_module(lambda_module, monkeypatch):
+    monkeypatch.setattr(lambda_module, "jira_gzip", GzipTransport(True, min_bytes=256))
+    return lambda_module
+
+
+def test_body_is_compact_json(lambda_module):
+    comment = lambda_module._build_comment_adf(
+        "summary", "ALARM", "reason", "2026-10-18T00:00:00Z", "AWS/Lambda", "Errors", "ap-northeast-1", "fn",
+    )
+
+    body = encode_json_body({"body": comment, "labels": ["a", "b"]})
+
+    assert b", " not in body and b'": ' not in body
+    assert json.loads(body)["labels"] == ["a", "b"]
+
+
+def test_gzip_body_is_accepted(gzip_module, fake_jira):
+    gzip_module.lambda_handler(sns_event(cloudwatch_message()), None)
+
+    assert fake_jira.jira.open_issue_keys(SUMMARY)
+    assert fake_jira.jira.gzip_requests == 1  # 起票のボディだけが min_bytes を超える
+    stats = gzip_module.jira_gzip.stats()
+    assert stats["ratio"] < 1.0
+    assert list(stats["hosts"].values()) == [True]
+
+
+def test_gzip_falls_back_when_server_rejects_it(gzip_module, fake_jira):
+    fake_jira.jira.accept_gzip = False
+
+    gzip_module.lambda_handler(sns_event(cloudwatch_message("alarm-a"), cloudwatch_message("alarm-b")), None)
+
+    assert len(fake_jira.jira.issues) == 2
+    stats = gzip_module.jira_gzip.stats()
+    assert stats["fallbacks"] == 1  # 2件目からは最初から非圧縮で送る
+    assert list(stats["hosts"].values()) == [False]
+
+
+class _Response:
+    def __init__(self, status):
+        self.status = status
+
+
+def test_gzip_does_not_resend_errors_once_accepted():
+    sent = []
+
+    def send(method, url, body, headers):
+        sent.append(headers.get("Content-Encoding"))
+        return _Response(201 if len(sent) == 1 else 400)
+
+    transport = GzipTransport(True, min_bytes=1)
+    transport.send(send, "POST", "https://jira.example.com/rest/api/3/issue", b"{}" * 10, {})
+    resp = transport.send(send, "POST", "https://jira.example.com/rest/api/3/issue", b"{}" * 10, {})
+
+    assert resp.status == 400
+    assert sent == ["gzip", "gzip"]
+
+
+def test_small_bodies_are_not_compressed():
+    sent = []
+    transport = GzipTransport(True, min_bytes=1024)
+
+    transport.send(lambda m, u, body, headers: sent.append(body) or _Response(200),
+                   "POST", "https://jira.example.com/x", b"{}", {})
+
+    assert sent == [b"{}"]
+
+
+def test_payload_ceiling_summarizes_raw_message(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_MAX_PAYLOAD_BYTES", 8000)
+    message = _large_message()
+
+    description = lambda_module.build_adf_description(
+        "prod-api-5xx", "ALARM", "reason", "ap-northeast-1", "AWS/Lambda", "Errors", None, message,
+    )
+
+    assert len(description.text.encode("utf-8")) <= 8000
+    raw = description.to_dict()["content"][5]["content"][0]["text"]
+    assert "chars in total)" in raw
+
+
+def test_summarize_json_keeps_keys_and_shortens_values():
+    summary = summarize_json({"a": "x" * 300, "b": list(range(15)), "c": {"d": 1}}, max_string=10, max_items=3)
+
+    assert summary == {"a": "x" * 10 + "... (300 chars)", "b": [0, 1, 2, "... (12 more items)"], "c": {"d": 1}}
+
+
+def test_oversize_message_is_summarized_before_truncating(lambda_module):
+    message = {"detail": {"payload": "x" * 5000, "items": list(range(100))}}
+
+    text = lambda_module._serialize_raw_message(message, max_chars=1000)
+
+    assert text.endswith(f"... (summarized: {len(json.dumps(message, separators=(',', ':')))} chars in total)")
+    assert '"items"' in text
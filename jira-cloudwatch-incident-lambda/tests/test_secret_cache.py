@@ -0,0 +1,85 @@
+import json
+import threading
+
+import boto3
+from moto import mock_aws
+
+from incident_core import secrets
+from sample_events import cloudwatch_message, sns_event
+
+
+@mock_aws
+def test_secret_is_cached_and_refreshed_from_secrets_manager(lambda_module, fake_jira):
+    client = boto3.client("secretsmanager", region_name="ap-northeast-1")
+    client.create_secret(Name=lambda_module.JIRA_SECRET_NAME, SecretString=json.dumps(fake_jira.secret()))
+    cache = lambda_module.SecretCache(lambda: lambda_module._fetch_jira_secret(client), ttl_seconds=900)
+
+    assert cache.get()["JIRA_API_TOKEN"] == "dummy-token"
+    assert cache.get()["JIRA_API_TOKEN"] == "dummy-token"
+    assert cache.loads == 1
+
+    client.put_secret_value(SecretId=lambda_module.JIRA_SECRET_NAME,
+                            SecretString=json.dumps(fake_jira.secret(JIRA_API_TOKEN="rotated")))
+    assert cache.refresh()["JIRA_API_TOKEN"] == "rotated"
+    assert cache.loads == 2
+
+
+def test_expired_secret_falls_back_to_stale_value_on_error(lambda_module):
+    values = iter([{"v": 1}])
+    cache = lambda_module.SecretCache(lambda: next(values), ttl_seconds=900)
+    cache.get()
+    cache._expires_at = 0
+
+    assert cache.get() == {"v": 1}
+
+
+def test_refresh_ahead_runs_in_background(lambda_module):
+    release = threading.Event()
+    loaded = threading.Event()
+
+    def loader():
+        if cache.loads:
+            release.wait(5)
+            loaded.set()
+        return {"v": cache.loads + 1}
+
+    cache = lambda_module.SecretCache(loader, ttl_seconds=900, refresh_ahead_seconds=900)
+    assert cache.get() == {"v": 1}
+
+    # 先読み中でも待たされずに今の値が返る
+    assert cache.get() == {"v": 1}
+    release.set()
+    assert loaded.wait(5)
+    # refresh_ahead = ttl なので get() のたびに次の先読みが始まる。最初に入れ替わった値を確認する
+    for _ in range(100):
+        value = cache.get()
+        if value != {"v": 1}:
+            break
+        threading.Event().wait(0.01)
+    assert value == {"v": 2}
+
+
+def test_401_forces_secret_refresh_and_retries(lambda_module, fake_jira, monkeypatch):
+    fake_jira.jira.api_token = "rotated"
+    rotated = fake_jira.secret(JIRA_API_TOKEN="rotated")
+    cache = lambda_module.SecretCache(lambda: rotated, ttl_seconds=900)
+    cache.put(fake_jira.secret())
+    monkeypatch.setattr(lambda_module, "jira_secret_cache", cache)
+
+    lambda_module.lambda_handler(sns_event(cloudwatch_message()), None)
+    lambda_module.lambda_handler(sns_event(cloudwatch_message()), None)
+
+    # 1回目の起動中は古い secret を握ったままなので検索・起票でそれぞれ 401 になるが、
+    # Secrets Manager の取り直しは1回だけで、2回目の起動からは新しいトークンで通る
+    assert cache.loads == 1
+    assert fake_jira.jira.calls == {"unauthorized": 2, "search": 2, "create": 1, "comment": 1}
+
+
+def test_auth_header_is_encoded_once_per_credentials(lambda_module, fake_jira):
+    secrets.basic_auth_value.cache_clear()
+    secret = fake_jira.secret()
+
+    for _ in range(3):
+        secrets.jira_auth_header(secret)
+
+    assert secrets.basic_auth_value.cache_info().misses == 1
@@ -0,0 +1,98 @@
+import boto3
+import urllib3
+from moto import mock_aws
+
+from sample_events import cloudwatch_message, sqs_event
+
+
+def _failed_ids(result):
+    return [f["itemIdentifier"] for f in result["batchItemFailures"]]
+
+
+def test_sqs_batch_is_processed_like_batch_mode(lambda_module, fake_jira):
+    event = sqs_event(cloudwatch_message("alarm-a"), cloudwatch_message("alarm-b"), cloudwatch_message("alarm-a"))
+
+    assert lambda_module.sqs_handler(event, None) == {"batchItemFailures": []}
+    assert fake_jira.jira.calls == {"search": 2, "create": 2, "comment": 1}
+
+
+def test_raw_message_delivery_and_per_message_failures(lambda_module, fake_jira):
+    event = sqs_event(cloudwatch_message("alarm-a"), cloudwatch_message("alarm-b"), raw=True)
+    event["Records"][1]["body"] = "not json"
+
+    result = lambda_module.sqs_handler(event, None)
+
+    assert _failed_ids(result) == ["sqs-1"]
+    assert fake_jira.jira.calls == {"search": 1, "create": 1}
+
+
+def test_fifo_queue_fails_everything_after_first_failure(lambda_module, fake_jira):
+    event = sqs_event(
+        cloudwatch_message("alarm-a"), cloudwatch_message("alarm-b"), cloudwatch_message("alarm-c"),
+        queue_arn="arn:aws:sqs:ap-northeast-1:123456789012:jira-incidents.fifo",
+    )
+    event["Records"][1]["body"] = "not json"
+
+    assert _failed_ids(lambda_module.sqs_handler(event, None)) == ["sqs-1", "sqs-2"]
+
+
+def test_throttling_defers_rest_of_batch(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_SQS_DELAY_REDELIVERY", False)
+    fake_jira.jira.error_status = 429
+    fake_jira.jira.retry_after = 30
+    event = sqs_event(*[cloudwatch_message(f"alarm-{i}") for i in range(5)])
+
+    result = lambda_module.sqs_handler(event, None)
+
+    # 最初の検索で 429 を受けたら残り4グループは Jira に送らない
+    assert _failed_ids(result) == [f"sqs-{i}" for i in range(5)]
+    assert fake_jira.jira.calls == {"error 429": 1}
+    assert 29 < lambda_module.jira_backpressure.remaining() <= 30
+
+    # クールダウン中は Jira を呼ばずにすぐ返す
+    fake_jira.jira.error_status = None
+    assert len(lambda_module.sqs_handler(event, None)["batchItemFailures"]) == 5
+    assert fake_jira.jira.calls == {"error 429": 1}
+
+    # クールダウン明け（レート制御の一時停止も解けた状態）を再現する
+    lambda_module.jira_backpressure.reset()
+    monkeypatch.setattr(lambda_module, "jira_rate_limiter", lambda_module.RateLimiter(None, burst=10))
+    assert lambda_module.sqs_handler(event, None) == {"batchItemFailures": []}
+
+
+def test_server_errors_trip_backpressure(lambda_module, fake_jira, monkeypatch):
+    monkeypatch.setattr(lambda_module, "JIRA_SQS_DELAY_REDELIVERY", False)
+    monkeypatch.setattr(lambda_module._http_client, "value", urllib3.PoolManager(retries=False))
+    fake_jira.jira.error_status = 503
+
+    result = lambda_module.sqs_handler(sqs_event(cloudwatch_message("alarm-a"), cloudwatch_message("alarm-b")), None)
+
+    assert len(result["batchItemFailures"]) == 2
+    assert lambda_module.jira_backpressure.remaining() > lambda_module.JIRA_BACKPRESSURE_SECONDS - 1
+
+
+@mock_aws
+def test_deferred_messages_stay_invisible_until_retry_after(lambda_module, fake_jira):
+    sqs = boto3.client("sqs", region_name="ap-northeast-1")
+    queue_url = sqs.create_queue(QueueName="jira-incidents")["QueueUrl"]
+    queue_arn = sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=["QueueArn"])["Attributes"]["QueueArn"]
+    messages = [cloudwatch_message(f"alarm-{i}") for i in range(12)]
+    for message in sqs_event(*messages)["Records"]:
+        sqs.send_message(QueueUrl=queue_url, MessageBody=message["body"])
+
+    handles = []
+    while len(handles) < len(messages):
+        handles += [m["ReceiptHandle"] for m in sqs.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10)["Messages"]]
+    # 受信直後に見える状態へ戻しておく（延長しなければすぐ再受信できる）
+    for handle in handles:
+        sqs.change_message_visibility(QueueUrl=queue_url, ReceiptHandle=handle, VisibilityTimeout=0)
+    event = sqs_event(*messages, queue_arn=queue_arn, receipt_handles=dict(enumerate(handles)))
+    fake_jira.jira.error_status = 429
+    fake_jira.jira.retry_after = 60
+
+    result = lambda_module.sqs_handler(event, None)
+
+    assert len(result["batchItemFailures"]) == 12
+    attributes = sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=["All"])["Attributes"]
+    assert attributes["ApproximateNumberOfMessages"] == "0"
+    assert attributes["ApproximateNumberOfMessagesNotVisible"] == "12"
@@ -1,13 +1,57 @@
 // URLは適宜変更してください
 const API_BASE_URL = "https://e6pv868gzj.execute-api.ap-northeast-1.amazonaws.com/Prod";
 
-let allReservations = []; // 全件を保持
+let allReservations = []; // 全件を保持（リソース名を指定しないときの一覧表示用）
+let searchNextToken = null; // 検索結果の続きを取得するためのトークン
+let exactResourceName = null; // 「このリソース名で検索」で確定したリソース名（サーバー側で検索する）
 
-// 予約一覧取得関数
+// 1回で取得する件数（APIの上限は1000件）
+const PAGE_SIZE = 500;
+// 検索結果を1回に表示する件数
+const SEARCH_PAGE_SIZE = 50;
+
+// 予約一覧取得関数（nextTokenがなくなるまでページをたどる）
 async function fetchReservations() {
-  const res = await fetch(`${API_BASE_URL}/reservations`);
-  const data = await res.json();
-  return data;
+  const reservations = [];
+  let nextToken = null;
+  do {
+    const params = new URLSearchParams({ limit: PAGE_SIZE });
+    if (nextToken) params.set('nextToken', nextToken);
+    const res = await fetch(`${API_BASE_URL}/reservations?${params}`);
+    const data = await res.json();
+    reservations.push(...data.items);
+    nextToken = data.nextToken;
+  } while (nextToken);
+  return reservations;
+}
+
+// リソース名・日時で検索（サーバー側でインデックスを使って絞り込み・並び替え）
+async function searchReservations(resourceName, from, to, order, nextToken) {
+  const params = new URLSearchParams({ resourceName, order, limit: SEARCH_PAGE_SIZE });
+  if (from) params.set('from', from);
+  if (to) params.set('to', to);
+  if (nextToken) params.set('nextToken', nextToken);
+  const res = await fetch(`${API_BASE_URL}/reservations/search?${params}`);
+  return await res.json();
+}
+
+// 予約1件分の表示
+function appendReservation(container, item) {
+  const div = document.createElement('div');
+  div.className = 'reservation-item';
+  div.innerHTML = `
+    <strong>ID:</strong> ${item.reservationId}<br>
+    <strong>リソース名：</strong> ${item.resourceName}<br>
+    <strong>日時：</strong> ${item.time}<br>
+    <button onclick="deleteReservation('${item.reservationId}', ${item.version ?? null})">削除</button>
+    <button onclick="startEditReservation('${item.reservationId}', '${item.resourceName}', '${item.time}', ${item.version ?? null})">更新</button>
+  `;
+  container.appendChild(div);
+}
+
+// 検索結果の続きがあれば「もっと見る」を表示
+function updateMoreButton() {
+  document.getElementById('more-button').style.display = searchNextToken ? '' : 'none';
 }
 
 // フィルタ・ソートして描画
@@ -15,17 +59,38 @@ async function renderReservations() {
   const container = document.getElementById('reservations-container');
   container.innerHTML = '読み込み中...';
 
+  const searchText = document.getElementById('search').value.trim();
+  const from = document.getElementById('from').value;
+  const to = document.getElementById('to').value;
+  const sortOption = document.getElementById('sort').value;
+
+  // リソース名を確定して検索したときだけサーバー側で検索する（完全一致。全件は取得しない）
+  if (exactResourceName !== null && exactResourceName === searchText) {
+    const data = await searchReservations(exactResourceName, from, to, sortOption === 'timeDesc' ? 'desc' : 'asc', null);
+    searchNextToken = data.nextToken;
+    updateMoreButton();
+    if (!data.items || data.items.length === 0) {
+      container.innerHTML = `<p>${data.error || '予約が見つかりません'}</p>`;
+      return;
+    }
+    container.innerHTML = '';
+    data.items.forEach(item => appendReservation(container, item));
+    return;
+  }
+
+  searchNextToken = null;
+  updateMoreButton();
+
   // allReservationsが未取得なら取得
   if (allReservations.length === 0) {
     allReservations = await fetchReservations();
   }
 
-  const searchText = document.getElementById('search').value.toLowerCase();
-  const sortOption = document.getElementById('sort').value;
-
-  // 検索フィルタ適用
+  // 入力途中のリソース名は部分一致で絞り込み、日時の範囲フィルタも適用
+  const lowerText = searchText.toLowerCase();
   let filtered = allReservations.filter(item =>
-    item.resourceName.toLowerCase().includes(searchText)
+    item.resourceName.toLowerCase().includes(lowerText) &&
+    (!from || item.time >= from) && (!to || item.time <= to)
   );
 
   // ソート適用
@@ -45,45 +110,58 @@ async function renderReservations() {
   }
 
   container.innerHTML = '';
-  filtered.forEach(item => {
-    const div = document.createElement('div');
-    div.className = 'reservation-item';
-    div.innerHTML = `
-      <strong>ID:</strong> ${item.reservationId}<br>
-      <strong>リソース名：</strong> ${item.resourceName}<br>
-      <strong>日時：</strong> ${item.time}<br>
-      <button onclick="deleteReservation('${item.reservationId}')">削除</button>
-      <button onclick="startEditReservation('${item.reservationId}', '${item.resourceName}', '${item.time}')">更新</button>
-    `;
-    container.appendChild(div);
-  });
+  filtered.forEach(item => appendReservation(container, item));
+}
+
+// 検索結果の続きを取得して追加表示
+async function loadMoreReservations() {
+  const container = document.getElementById('reservations-container');
+  const data = await searchReservations(
+    exactResourceName,
+    document.getElementById('from').value,
+    document.getElementById('to').value,
+    document.getElementById('sort').value === 'timeDesc' ? 'desc' : 'asc',
+    searchNextToken
+  );
+  (data.items || []).forEach(item => appendReservation(container, item));
+  searchNextToken = data.nextToken;
+  updateMoreButton();
+}
+
+// 版番号がわかっていれば If-Match に付ける（その間にほかの人が変更していたら 409 になる）
+function versionHeaders(version) {
+  return version ? { 'If-Match': String(version) } : {};
 }
 
 // 予約削除
-async function deleteReservation(id) {
-  await fetch(`${API_BASE_URL}/reservations/${id}`, {
-    method: 'DELETE'
+async function deleteReservation(id, version) {
+  const res = await fetch(`${API_BASE_URL}/reservations/${id}`, {
+    method: 'DELETE',
+    headers: versionHeaders(version)
   });
+  if (res.status === 409) {
+    alert('ほかの人が予約を変更しました。一覧を読み込み直します');
+  }
   // 削除後はallReservationsをクリアして再取得
   allReservations = [];
   await renderReservations();
 }
 
 // 編集開始（更新用）
-function startEditReservation(id, currentResource, currentTime) {
+function startEditReservation(id, currentResource, currentTime, version) {
   const newResource = prompt("新しいリソース名を入力してください：", currentResource);
   if (newResource === null) return;
   const newTime = prompt("新しい日時(YYYY-MM-DDTHH:MM)を入力してください：", currentTime);
   if (newTime === null) return;
 
-  updateReservation(id, newResource, newTime);
+  updateReservation(id, newResource, newTime, version);
 }
 
 // 予約更新
-async function updateReservation(id, resourceName, time) {
+async function updateReservation(id, resourceName, time, version) {
   const res = await fetch(`${API_BASE_URL}/reservations/${id}`, {
     method: 'PUT',
-    headers: { 'Content-Type': 'application/json' },
+    headers: { 'Content-Type': 'application/json', ...versionHeaders(version) },
     body: JSON.stringify({ resourceName, time })
   });
 
@@ -91,6 +169,10 @@ async function updateReservation(id, resourceName, time) {
     alert('予約が更新されました！');
     allReservations = [];
     await renderReservations();
+  } else if (res.status === 409 || res.status === 404) {
+    alert(res.status === 409 ? 'ほかの人が予約を変更しました。一覧を読み込み直します' : '予約が見つかりません');
+    allReservations = [];
+    await renderReservations();
   } else {
     alert('予約の更新に失敗しました');
   }
@@ -122,9 +204,25 @@ document.getElementById('create-form').addEventListener('submit', async (e) => {
   }
 });
 
-// 検索・ソートイベントハンドラ
-document.getElementById('search').addEventListener('input', renderReservations);
+// 入力中は取得済みの一覧を部分一致で絞り込む（APIは呼ばない）
+document.getElementById('search').addEventListener('input', () => {
+  exactResourceName = null;
+  renderReservations();
+});
+// 「このリソース名で検索」またはEnterで、リソース名の完全一致でサーバー側の検索を行う
+function searchExactResourceName() {
+  const searchText = document.getElementById('search').value.trim();
+  exactResourceName = searchText || null;
+  renderReservations();
+}
+document.getElementById('search-button').addEventListener('click', searchExactResourceName);
+document.getElementById('search').addEventListener('keydown', (e) => {
+  if (e.key === 'Enter') searchExactResourceName();
+});
+document.getElementById('from').addEventListener('change', renderReservations);
+document.getElementById('to').addEventListener('change', renderReservations);
 document.getElementById('sort').addEventListener('change', renderReservations);
+document.getElementById('more-button').addEventListener('click', loadMoreReservations);
 
 // 初期表示
 renderReservations();
@@ -52,17 +52,21 @@
 #     }
 
 
-import os
 import json
 import uuid
-import boto3
 from botocore.exceptions import ClientError
 
-TABLE_NAME = os.environ.get("TABLE_NAME")  # template.yamlで設定 or Lambdaの環境変数設定
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table(TABLE_NAME)
+import reservations_db
 
 def lambda_handler(event, context):
+    # 環境変数チェック（TABLE_NAMEはtemplate.yamlで設定 or Lambdaの環境変数設定）
+    if not reservations_db.table_name():
+        return {
+            "statusCode": 500,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": "TABLE_NAME environment variable is not set"})
+        }
+
     try:
         body = json.loads(event.get("body", "{}"))
     except json.JSONDecodeError:
@@ -81,9 +85,11 @@ def lambda_handler(event, context):
 
     reservation_id = str(uuid.uuid4())
     body["reservationId"] = reservation_id
+    # 楽観ロック用の版番号（更新のたびに増える）
+    body[reservations_db.VERSION_ATTRIBUTE] = 1
 
     try:
-        table.put_item(Item=body)
+        reservations_db.put_reservation(body)
     except ClientError as e:
         return {
             "statusCode": 500,
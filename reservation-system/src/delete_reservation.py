@@ -1,21 +1,17 @@
-import os
 import json
-import boto3
 from botocore.exceptions import ClientError
 
+import reservations_db
+
 def lambda_handler(event, context):
     # 環境変数チェック
-    TABLE_NAME = os.environ.get("TABLE_NAME")
-    if not TABLE_NAME:
+    if not reservations_db.table_name():
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
             "body": json.dumps({"error": "TABLE_NAME environment variable is not set"})
         }
 
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(TABLE_NAME)
-
     # pathParametersの存在確認
     if "pathParameters" not in event or "id" not in event["pathParameters"]:
         return {
@@ -26,28 +22,28 @@ def lambda_handler(event, context):
 
     reservation_id = event["pathParameters"]["id"]
 
-    # 削除対象のアイテムが存在するか確認
+    # If-Match があれば版番号が一致するときだけ消す
     try:
-        resp = table.get_item(Key={"reservationId": reservation_id})
-    except ClientError as e:
+        version = reservations_db.expected_version(event)
+    except ValueError as e:
         return {
-            "statusCode": 500,
+            "statusCode": 400,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Failed to access DynamoDB", "details": str(e)})
+            "body": json.dumps({"error": str(e)})
         }
 
-    item = resp.get("Item")
-    if not item:
+    # 存在確認と削除を条件付きの削除1回で行う（確認してから消すまでの間に変わることがない）
+    try:
+        item = reservations_db.delete_reservation(reservation_id, version)
+    except reservations_db.ReservationNotFound:
         # 対象アイテムが存在しない場合
         return {
             "statusCode": 404,
-            "headers": {"Content-Type": "application/json"},
+            "headers": {"Content-Type": "application/json", "Access-Control-Allow-Origin": "*"},
             "body": json.dumps({"message": "Reservation not found"})
         }
-
-    # アイテムが存在する場合、削除実行
-    try:
-        table.delete_item(Key={"reservationId": reservation_id})
+    except reservations_db.VersionConflict as e:
+        return reservations_db.conflict_response(e)
     except ClientError as e:
         # DynamoDB操作失敗時
         return {
@@ -56,12 +52,13 @@ def lambda_handler(event, context):
             "body": json.dumps({"error": "Failed to delete reservation", "details": str(e)})
         }
 
-    # 正常終了
+    # 正常終了（消した予約も返す）
     return {
         "statusCode": 200,
         "headers": {
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*"
         },
-        "body": json.dumps({"message": "Reservation deleted"})
+        "body": json.dumps({"message": "Reservation deleted", "reservation": item},
+                           default=reservations_db.json_default)
     }
@@ -0,0 +1,158 @@
+"""
+予約テーブルを並列スキャン（Segment / TotalSegments）でファイルに書き出す（分析・バックアップ用）。
+
+    python src/export_reservations.py --table ReservationsTable --out ./export --segments 8 --gzip
+
+- セグメントごとに1ファイル（segment-00000.ndjson / .ndjson.gz）。1行1件の JSON
+- 1ページ読むたびにチェックポイント（_checkpoint.json）を書く。途中で止まっても、同じコマンドを
+  もう一度実行すれば、終わっていないセグメントの続きから再開する
+- 終わったら manifest.json（ファイルごとの件数）を書き、チェックポイントを消す
+"""
+import os
+import json
+import gzip
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+
+from reservations_db import json_default
+
+CHECKPOINT_FILE = "_checkpoint.json"
+MANIFEST_FILE = "manifest.json"
+
+_ENCODER = json.JSONEncoder(default=json_default, ensure_ascii=False, separators=(",", ":"))
+
+# boto3 の resource はスレッド間で共有できないので、ワーカーごとに作る
+_local = threading.local()
+
+
+def _get_table(table_name, endpoint_url=None):
+    if getattr(_local, "table", None) is None or _local.table.name != table_name:
+        dynamodb = boto3.session.Session().resource("dynamodb", endpoint_url=endpoint_url)
+        _local.table = dynamodb.Table(table_name)
+    return _local.table
+
+
+def _scan_page(table, scan_kwargs):
+    """1ページ分スキャンする（ベンチマークやテストで差し替えられるように分けておく）"""
+    return table.scan(**scan_kwargs)
+
+
+def segment_file_name(segment, compress):
+    return f"segment-{segment:05d}.ndjson" + (".gz" if compress else "")
+
+
+class Checkpoint:
+    """
+    セグメントごとの進み具合（書き込んだバイト数・件数・次に読むキー・完了したか）を保存する。
+    ファイルは一時ファイルに書いてから置き換えるので、書き込み中に止まっても壊れない。
+    """
+
+    def __init__(self, path, params, segments):
+        self.path = path
+        self.params = params
+        self.segments = segments
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load_or_create(cls, path, params):
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved["params"] != params:
+                raise ValueError(f"Checkpoint {path} was created with different options: {saved['params']}")
+            return cls(path, params, {int(k): v for k, v in saved["segments"].items()})
+        segments = {s: {"offset": 0, "items": 0, "last_key": None, "done": False}
+                    for s in range(params["segments"])}
+        return cls(path, params, segments)
+
+    def update(self, segment, **state):
+        with self._lock:
+            self.segments[segment].update(state)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(_ENCODER.encode({"params": self.params, "segments": self.segments}))
+            os.replace(tmp, self.path)
+
+
+def _export_segment(table_name, out_dir, segment, checkpoint, page_size, endpoint_url):
+    """1セグメント分をファイルに書き出し、件数を返す"""
+    state = checkpoint.segments[segment]
+    if state["done"]:
+        return state["items"]
+
+    compress = checkpoint.params["compress"]
+    path = os.path.join(out_dir, segment_file_name(segment, compress))
+    table = _get_table(table_name, endpoint_url)
+    scan_kwargs = {"Segment": segment, "TotalSegments": checkpoint.params["segments"]}
+    if page_size:
+        scan_kwargs["Limit"] = page_size
+    if state["last_key"]:
+        scan_kwargs["ExclusiveStartKey"] = state["last_key"]
+
+    offset, items = state["offset"], state["items"]
+    with open(path, "r+b" if offset else "wb") as f:
+        # チェックポイントより後に書いた分（止まる直前のページ）は捨てて、そのページから読み直す
+        f.truncate(offset)
+        f.seek(offset)
+        while True:
+            resp = _scan_page(table, scan_kwargs)
+            page = "".join(_ENCODER.encode(item) + "\n" for item in resp.get("Items", [])).encode("utf-8")
+            # gzip はページごとに別メンバーにする（連結した gzip もそのまま展開できる）
+            f.write(gzip.compress(page) if compress else page)
+            f.flush()
+            offset = f.tell()
+            items += len(resp.get("Items", []))
+            last_key = resp.get("LastEvaluatedKey")
+            checkpoint.update(segment, offset=offset, items=items, last_key=last_key, done=last_key is None)
+            if last_key is None:
+                return items
+            scan_kwargs["ExclusiveStartKey"] = last_key
+
+
+def export_table(table_name, out_dir, segments=4, workers=None, compress=False, page_size=None,
+                 endpoint_url=None):
+    """
+    テーブルを segments 個に分けて workers スレッドで並列にスキャンし、out_dir に書き出す。
+    out_dir にチェックポイントがあれば続きから再開する（segments / compress は前回と同じにすること）。
+    書き出した件数などを返す。
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    params = {"table": table_name, "segments": segments, "compress": compress}
+    checkpoint = Checkpoint.load_or_create(os.path.join(out_dir, CHECKPOINT_FILE), params)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers or segments) as pool:
+        futures = [pool.submit(_export_segment, table_name, out_dir, s, checkpoint, page_size, endpoint_url)
+                   for s in range(segments)]
+        counts = [future.result() for future in futures]
+
+    files = [{"file": segment_file_name(s, compress), "items": counts[s]} for s in range(segments)]
+    manifest = {"table": table_name, "segments": segments, "compress": compress,
+                "items": sum(counts), "files": files}
+    with open(os.path.join(out_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.remove(checkpoint.path)
+    return {**manifest, "elapsed_seconds": time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="予約テーブルを並列スキャンで NDJSON に書き出す")
+    parser.add_argument("--table", default=os.environ.get("TABLE_NAME", "ReservationsTable"))
+    parser.add_argument("--out", required=True, help="出力先ディレクトリ（チェックポイントもここに置く）")
+    parser.add_argument("--segments", type=int, default=4)
+    parser.add_argument("--workers", type=int, help="並列数（既定はセグメント数と同じ）")
+    parser.add_argument("--gzip", action="store_true", help="gzip で圧縮する")
+    parser.add_argument("--page-size", type=int, help="1回のスキャンで読む件数の上限（既定は 1MB 分）")
+    parser.add_argument("--endpoint-url", help="DynamoDB Local などのエンドポイント")
+    args = parser.parse_args()
+
+    result = export_table(args.table, args.out, args.segments, args.workers, args.gzip, args.page_size,
+                          args.endpoint_url)
+    print(f"Exported {result['items']} item(s) to {args.out} in {result['elapsed_seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,17 @@
-import os
 import json
-import boto3
 from botocore.exceptions import ClientError
 
+import reservations_db
+
 def lambda_handler(event, context):
     # TABLE_NAME環境変数が設定されているかチェック
-    TABLE_NAME = os.environ.get("TABLE_NAME")
-    if not TABLE_NAME:
+    if not reservations_db.table_name():
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
             "body": json.dumps({"error": "TABLE_NAME environment variable is not set"})
         }
 
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(TABLE_NAME)
-
     # pathParametersの確認
     if "pathParameters" not in event or "id" not in event["pathParameters"]:
         return {
@@ -28,7 +24,7 @@ def lambda_handler(event, context):
 
     # DynamoDBアクセス時のエラーハンドリング
     try:
-        resp = table.get_item(Key={"reservationId": reservation_id})
+        item = reservations_db.get_reservation(reservation_id)
     except ClientError as e:
         # DynamoDBアクセスエラー時には500エラーを返す
         return {
@@ -37,8 +33,6 @@ def lambda_handler(event, context):
             "body": json.dumps({"error": "Failed to access DynamoDB", "details": str(e)})
         }
 
-    item = resp.get("Item")
-
     if not item:
         # アイテムが存在しない場合は404
         return {
@@ -54,5 +48,5 @@ def lambda_handler(event, context):
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*"
         },
-        "body": json.dumps(item)
+        "body": json.dumps(item, default=reservations_db.json_default)
     }
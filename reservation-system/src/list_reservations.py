@@ -1,41 +1,104 @@
 import os
 import json
-import boto3
+import base64
+import binascii
 from botocore.exceptions import ClientError
 
+import reservations_db
+
+# 1ページの件数（queryStringParameters の limit）の既定値と上限
+DEFAULT_LIMIT = int(os.environ.get("LIST_DEFAULT_LIMIT", "100"))
+MAX_LIMIT = int(os.environ.get("LIST_MAX_LIMIT", "1000"))
+
+# 一覧で返す属性（画面で使うものと、更新・削除の If-Match に使う版番号だけ読む）。time は DynamoDB の予約語なので名前を置き換えて指定する
+PROJECTED_ATTRIBUTES = ["reservationId", "resourceName", "time", reservations_db.VERSION_ATTRIBUTE]
+
+# テーブルのキー（Scan の LastEvaluatedKey / ExclusiveStartKey に入る属性。すべて文字列）
+TABLE_KEY_ATTRIBUTES = ("reservationId",)
+
+
+_ENCODER = json.JSONEncoder(default=reservations_db.json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_token(last_evaluated_key):
+    """LastEvaluatedKey を URL に載せられる nextToken にする"""
+    raw = _ENCODER.encode(last_evaluated_key).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_token(token, key_attributes=TABLE_KEY_ATTRIBUTES):
+    """
+    nextToken を ExclusiveStartKey に戻す。壊れていれば ValueError。
+    改ざんされたキーを DynamoDB に渡さない（500 になる）よう、key_attributes をちょうど文字列で持つかも確かめる。
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        key = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid nextToken") from e
+    if (not isinstance(key, dict) or set(key) != set(key_attributes)
+            or not all(isinstance(key[name], str) and key[name] for name in key_attributes)):
+        raise ValueError("Invalid nextToken")
+    return key
+
+
+def page_json(items, next_token):
+    """
+    1ページ分のレスポンス {"items": [...], "nextToken": ...} を JSON にする。
+    ページの件数は limit で抑えているので、メモリもその分で済む。
+    """
+    return _ENCODER.encode({"items": items, "nextToken": next_token})
+
+
+def _error(status_code, body):
+    return {
+        "statusCode": status_code,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(body)
+    }
+
+
 def lambda_handler(event, context):
     # 環境変数チェック
-    TABLE_NAME = os.environ.get("TABLE_NAME")
-    if not TABLE_NAME:
-        return {
-            "statusCode": 500,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "TABLE_NAME environment variable is not set"})
-        }
-
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(TABLE_NAME)
-
-    # 全レコードスキャン（サンプル用途）
+    if not reservations_db.table_name():
+        return _error(500, {"error": "TABLE_NAME environment variable is not set"})
+
+    # ページングのパラメータ（?limit=100&nextToken=...）
+    params = event.get("queryStringParameters") or {}
     try:
-        resp = table.scan()
+        limit = int(params.get("limit") or DEFAULT_LIMIT)
+    except ValueError:
+        return _error(400, {"error": "limit must be an integer"})
+    if not 1 <= limit <= MAX_LIMIT:
+        return _error(400, {"error": f"limit must be between 1 and {MAX_LIMIT}"})
+
+    scan_kwargs = {
+        "Limit": limit,
+        "ProjectionExpression": ", ".join(f"#a{i}" for i in range(len(PROJECTED_ATTRIBUTES))),
+        "ExpressionAttributeNames": {f"#a{i}": name for i, name in enumerate(PROJECTED_ATTRIBUTES)},
+    }
+    if params.get("nextToken"):
+        try:
+            scan_kwargs["ExclusiveStartKey"] = decode_token(params["nextToken"])
+        except ValueError as e:
+            return _error(400, {"error": str(e)})
+
+    # 1ページ分だけスキャン（続きは nextToken で取得する）
+    try:
+        resp = reservations_db.get_table().scan(**scan_kwargs)
     except ClientError as e:
         # DynamoDBアクセスエラー時
-        return {
-            "statusCode": 500,
-            "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Failed to retrieve reservations", "details": str(e)})
-        }
+        return _error(500, {"error": "Failed to retrieve reservations", "details": str(e)})
 
-    items = resp.get("Items", [])
+    last_key = resp.get("LastEvaluatedKey")
+    next_token = encode_token(last_key) if last_key else None
 
     # 正常終了
-
     return {
         "statusCode": 200,
         "headers": {
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*"
         },
-        "body": json.dumps(items)
-    }
\ No newline at end of file
+        "body": page_json(resp.get("Items", []), next_token)
+    }
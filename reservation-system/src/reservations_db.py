@@ -0,0 +1,211 @@
+"""
+予約テーブルへのアクセスをまとめたモジュール（各 Lambda から共通で使う）。
+
+boto3 の client / resource は作るたびに数十ms かかる（128MB の Lambda では特に遅い）ので、
+初めて使うときに作ってモジュールに保持し、ウォームスタートでは使い回す。
+- 1件の読み書き（get / put / update / delete）は低レベルの client を使う（resource を作らずに済む）
+- 更新・削除は条件付きの書き込み1回で行い、予約がなければ ReservationNotFound、
+  版番号（version）が合わなければ VersionConflict を投げる
+- スキャン・クエリは条件式の組み立てや型変換が楽な resource の Table を使う
+"""
+import os
+import json
+import threading
+from decimal import Decimal
+import boto3
+from botocore.exceptions import ClientError
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+# 楽観ロック用の版番号（作成時に 1、更新のたびに 1 増える）
+VERSION_ATTRIBUTE = "version"
+
+_client = None
+_dynamodb = None
+_tables = {}
+_lock = threading.Lock()
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def table_name():
+    """テーブル名（template.yaml の Globals で TABLE_NAME に設定）。未設定なら None"""
+    return os.environ.get("TABLE_NAME")
+
+
+def get_client():
+    """DynamoDB の低レベル client（初回だけ作る）"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = boto3.client("dynamodb")
+    return _client
+
+
+def get_table(name=None):
+    """resource の Table（初回だけ作る）"""
+    global _dynamodb
+    name = name or table_name()
+    table = _tables.get(name)
+    if table is None:
+        with _lock:
+            if _dynamodb is None:
+                _dynamodb = boto3.resource("dynamodb")
+            table = _tables.setdefault(name, _dynamodb.Table(name))
+    return table
+
+
+def reset():
+    """作成済みの client / resource を捨てる（テスト用）"""
+    global _client, _dynamodb
+    with _lock:
+        _client = None
+        _dynamodb = None
+        _tables.clear()
+
+
+def serialize(item):
+    """Python の dict を DynamoDB の型付き表現（{"S": ...} など）にする"""
+    return {k: _serializer.serialize(v) for k, v in item.items()}
+
+
+def deserialize(item):
+    """DynamoDB の型付き表現を Python の dict に戻す（数値は Decimal）"""
+    return {k: _deserializer.deserialize(v) for k, v in item.items()}
+
+
+def json_default(value):
+    """json.dumps の default。DynamoDB の数値（Decimal）を int / float にする"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ReservationNotFound(Exception):
+    """条件付きの更新・削除で、対象の予約がなかった"""
+
+
+class VersionConflict(Exception):
+    """条件付きの更新・削除で、予約の版番号が指定と違った（current は今の予約）"""
+
+    def __init__(self, current):
+        super().__init__(f"Version conflict: current version is {current.get(VERSION_ATTRIBUTE)}")
+        self.current = current
+
+
+def expected_version(event, body=None):
+    """
+    楽観ロックの版番号を If-Match ヘッダー（または本文の version）から取り出す。
+    指定がなければ None、数値でなければ ValueError
+    """
+    headers = {k.lower(): v for k, v in (event.get("headers") or {}).items()}
+    value = headers.get("if-match")
+    if value is None and body is not None:
+        value = body.get(VERSION_ATTRIBUTE)
+    if value is None:
+        return None
+    try:
+        version = int(str(value).strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise ValueError("If-Match / version must be an integer") from None
+    if version < 1:
+        raise ValueError("If-Match / version must be a positive integer")
+    return version
+
+
+def conflict_response(e):
+    """版番号が合わなかったときの 409（今の版番号を返す）"""
+    return {
+        "statusCode": 409,
+        # 画面から状態を見て読み込み直せるように、409 にも CORS ヘッダーを付ける
+        "headers": {"Content-Type": "application/json", "Access-Control-Allow-Origin": "*"},
+        "body": json.dumps({
+            "error": "Reservation was modified by someone else",
+            "currentVersion": e.current.get(VERSION_ATTRIBUTE),
+        }, default=json_default)
+    }
+
+
+def _key(reservation_id):
+    return {"reservationId": {"S": reservation_id}}
+
+
+def get_reservation(reservation_id):
+    """予約を1件読む。なければ None"""
+    resp = get_client().get_item(TableName=table_name(), Key=_key(reservation_id))
+    item = resp.get("Item")
+    return deserialize(item) if item else None
+
+
+def put_reservation(item):
+    """予約を1件書く（同じ reservationId があれば置き換える）"""
+    get_client().put_item(TableName=table_name(), Item=serialize(item))
+
+
+def _write_condition(expected_version, names, values):
+    """予約があること（と、指定があれば版番号が一致すること）を条件にする"""
+    condition = "attribute_exists(reservationId)"
+    if expected_version is not None:
+        names["#version"] = VERSION_ATTRIBUTE
+        values[":expected"] = _serializer.serialize(expected_version)
+        condition += " AND #version = :expected"
+    return condition
+
+
+def _conditional_write(operation, **kwargs):
+    """
+    条件付きの書き込みを1回だけ呼ぶ。条件に合わなければ、失敗時に返ってくる今の予約を見て
+    なければ ReservationNotFound、あれば VersionConflict にする（読み直しはしない）
+    """
+    try:
+        return operation(TableName=table_name(), ReturnValuesOnConditionCheckFailure="ALL_OLD", **kwargs)
+    except ClientError as e:
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+        current = e.response.get("Item")
+        if not current:
+            raise ReservationNotFound(kwargs["Key"]["reservationId"]["S"]) from e
+        raise VersionConflict(deserialize(current)) from e
+
+
+def update_reservation(reservation_id, attributes, expected_version=None):
+    """
+    予約の attributes に含まれる属性だけを書き換え、版番号を 1 増やす。更新後の予約を返す。
+    expected_version を渡すと、今の版番号が同じときだけ更新する。
+    """
+    names, values, assignments = {"#version": VERSION_ATTRIBUTE}, {":one": {"N": "1"}}, []
+    for i, (name, value) in enumerate(attributes.items()):
+        names[f"#a{i}"] = name
+        values[f":a{i}"] = _serializer.serialize(value)
+        assignments.append(f"#a{i} = :a{i}")
+    # 版番号のない古い予約でも ADD なら 1 から始まる
+    expression = ("SET " + ", ".join(assignments) + " " if assignments else "") + "ADD #version :one"
+    resp = _conditional_write(
+        get_client().update_item,
+        Key=_key(reservation_id),
+        UpdateExpression=expression,
+        ConditionExpression=_write_condition(expected_version, names, values),
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values,
+        ReturnValues="ALL_NEW",
+    )
+    return deserialize(resp["Attributes"])
+
+
+def delete_reservation(reservation_id, expected_version=None):
+    """
+    予約を1件消し、消した予約を返す。
+    expected_version を渡すと、今の版番号が同じときだけ消す。
+    """
+    names, values = {}, {}
+    condition = _write_condition(expected_version, names, values)
+    kwargs = {"ExpressionAttributeNames": names, "ExpressionAttributeValues": values} if names else {}
+    resp = _conditional_write(
+        get_client().delete_item,
+        Key=_key(reservation_id),
+        ConditionExpression=condition,
+        ReturnValues="ALL_OLD",
+        **kwargs,
+    )
+    return deserialize(resp["Attributes"])
@@ -0,0 +1,104 @@
+import os
+import json
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from list_reservations import DEFAULT_LIMIT, MAX_LIMIT, decode_token, encode_token, page_json
+import reservations_db
+
+# resourceName（パーティションキー）+ time（ソートキー）のグローバルセカンダリインデックス（template.yaml で定義）
+INDEX_NAME = os.environ.get("RESOURCE_TIME_INDEX", "ResourceTimeIndex")
+# インデックスの LastEvaluatedKey に入る属性（インデックスのキー + テーブルのキー）
+INDEX_KEY_ATTRIBUTES = ("resourceName", "time", "reservationId")
+
+
+def _error(status_code, body):
+    return {
+        "statusCode": status_code,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(body)
+    }
+
+
+def build_key_condition(params):
+    """
+    検索条件を Query のキー条件にする。条件がおかしければ ValueError。
+    - resourceName: 必須（完全一致）
+    - timePrefix: 日時の前方一致（例: 2024-12 / 2024-12-11）
+    - from / to: 日時の範囲（両端を含む。片方だけでもよい）
+    """
+    resource_name = params.get("resourceName")
+    if not resource_name:
+        raise ValueError("Missing required query parameter: resourceName")
+
+    condition = Key("resourceName").eq(resource_name)
+    prefix, time_from, time_to = params.get("timePrefix"), params.get("from"), params.get("to")
+    if prefix and (time_from or time_to):
+        raise ValueError("timePrefix cannot be combined with from/to")
+    if prefix:
+        condition &= Key("time").begins_with(prefix)
+    elif time_from and time_to:
+        if time_from > time_to:
+            raise ValueError("from must not be later than to")
+        condition &= Key("time").between(time_from, time_to)
+    elif time_from:
+        condition &= Key("time").gte(time_from)
+    elif time_to:
+        condition &= Key("time").lte(time_to)
+    return condition
+
+
+def lambda_handler(event, context):
+    # 環境変数チェック
+    if not reservations_db.table_name():
+        return _error(500, {"error": "TABLE_NAME environment variable is not set"})
+
+    # 検索条件（?resourceName=一番館&from=...&to=...&order=desc&limit=50&nextToken=...）
+    params = event.get("queryStringParameters") or {}
+    try:
+        query_kwargs = {"IndexName": INDEX_NAME, "KeyConditionExpression": build_key_condition(params)}
+    except ValueError as e:
+        return _error(400, {"error": str(e)})
+
+    order = params.get("order", "asc")
+    if order not in ("asc", "desc"):
+        return _error(400, {"error": "order must be 'asc' or 'desc'"})
+    query_kwargs["ScanIndexForward"] = order == "asc"
+
+    try:
+        limit = int(params.get("limit") or DEFAULT_LIMIT)
+    except ValueError:
+        return _error(400, {"error": "limit must be an integer"})
+    if not 1 <= limit <= MAX_LIMIT:
+        return _error(400, {"error": f"limit must be between 1 and {MAX_LIMIT}"})
+    query_kwargs["Limit"] = limit
+
+    if params.get("nextToken"):
+        try:
+            start_key = decode_token(params["nextToken"], INDEX_KEY_ATTRIBUTES)
+        except ValueError as e:
+            return _error(400, {"error": str(e)})
+        # 別の検索条件で発行された nextToken は使えない
+        if start_key.get("resourceName") != params["resourceName"]:
+            return _error(400, {"error": "Invalid nextToken"})
+        query_kwargs["ExclusiveStartKey"] = start_key
+
+    # インデックスから条件に合う分だけ読む（テーブル全体はスキャンしない）
+    try:
+        resp = reservations_db.get_table().query(**query_kwargs)
+    except ClientError as e:
+        # DynamoDBアクセスエラー時
+        return _error(500, {"error": "Failed to search reservations", "details": str(e)})
+
+    last_key = resp.get("LastEvaluatedKey")
+    next_token = encode_token(last_key) if last_key else None
+
+    # 正常終了
+    return {
+        "statusCode": 200,
+        "headers": {
+            "Content-Type": "application/json",
+            "Access-Control-Allow-Origin": "*"
+        },
+        "body": page_json(resp.get("Items", []), next_token)
+    }
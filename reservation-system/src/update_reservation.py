@@ -1,21 +1,21 @@
-import os
 import json
-import boto3
 from botocore.exceptions import ClientError
 
+import reservations_db
+
+# 書き換えられない属性（キーと版番号）
+PROTECTED_ATTRIBUTES = ("reservationId", reservations_db.VERSION_ATTRIBUTE)
+
+
 def lambda_handler(event, context):
     # TABLE_NAME環境変数の有無をチェック
-    TABLE_NAME = os.environ.get("TABLE_NAME")
-    if not TABLE_NAME:
+    if not reservations_db.table_name():
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
             "body": json.dumps({"error": "TABLE_NAME environment variable is not set"})
         }
 
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(TABLE_NAME)
-
     # pathParametersのチェック
     if "pathParameters" not in event or "id" not in event["pathParameters"]:
         return {
@@ -28,20 +28,39 @@ def lambda_handler(event, context):
 
     # リクエストボディのJSONパースとエラーハンドリング
     try:
-        body = json.loads(event.get("body", "{}"))
-    except json.JSONDecodeError:
+        body = json.loads(event.get("body") or "{}")
+        if not isinstance(body, dict):
+            raise ValueError("Request body must be a JSON object")
+        version = reservations_db.expected_version(event, body)
+    except ValueError as e:
+        # json.JSONDecodeError も ValueError
         return {
             "statusCode": 400,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({"error": "Invalid JSON in request body"})
+            "body": json.dumps({"error": "Invalid JSON in request body" if isinstance(e, json.JSONDecodeError)
+                                else str(e)})
         }
 
-    # 必須フィールドチェック
-    body["reservationId"] = reservation_id
+    # 送られてきた属性だけを書き換える（キーと版番号は除く）
+    attributes = {k: v for k, v in body.items() if k not in PROTECTED_ATTRIBUTES}
+    if not attributes:
+        return {
+            "statusCode": 400,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps({"error": "No attributes to update"})
+        }
 
-    # DynamoDB更新処理のエラーハンドリング
+    # 予約があること（と版番号）を条件に1回で更新する
     try:
-        table.put_item(Item=body)
+        item = reservations_db.update_reservation(reservation_id, attributes, version)
+    except reservations_db.ReservationNotFound:
+        return {
+            "statusCode": 404,
+            "headers": {"Content-Type": "application/json", "Access-Control-Allow-Origin": "*"},
+            "body": json.dumps({"message": "Reservation not found"})
+        }
+    except reservations_db.VersionConflict as e:
+        return reservations_db.conflict_response(e)
     except ClientError as e:
         return {
             "statusCode": 500,
@@ -56,5 +75,6 @@ def lambda_handler(event, context):
             "Content-Type": "application/json",
             "Access-Control-Allow-Origin": "*"
         },
-        "body": json.dumps({"message": "Reservation updated", "reservationId": reservation_id})
+        "body": json.dumps({"message": "Reservation updated", "reservationId": reservation_id,
+                            "reservation": item}, default=reservations_db.json_default)
     }
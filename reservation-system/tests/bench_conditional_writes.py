@@ -0,0 +1,82 @@
+"""
+予約の更新・削除の呼び出しごとのレイテンシを、DynamoDB の呼び出し回数で比べるベンチマーク。
+bench_reservation_clients.py の DynamoDB もどきに --latency-ms の往復時間を足して向ける
+（クライアントはどちらも reservations_db の使い回しなので、差は呼び出し回数だけ）。
+
+- 従来の削除: get_item で存在確認 → delete_item（2往復。確認と削除の間に変わりうる）
+- 従来の更新: 存在確認の get_item → put_item で全体を置き換え（2往復。版番号の確認なし）
+- 現在: 条件付きの delete_item / update_item（1往復）
+
+    python tests/bench_conditional_writes.py --latency-ms 5 --invocations 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import delete_reservation  # noqa: E402
+import reservations_db  # noqa: E402
+import update_reservation  # noqa: E402
+from bench_reservation_clients import start_stub  # noqa: E402
+
+
+def legacy_delete_handler(event, context):
+    """変更前の delete_reservation（存在確認してから消す）"""
+    reservation_id = event["pathParameters"]["id"]
+    if reservations_db.get_reservation(reservation_id) is None:
+        return {"statusCode": 404, "body": json.dumps({"message": "Reservation not found"})}
+    reservations_db.get_client().delete_item(TableName=reservations_db.table_name(),
+                                             Key={"reservationId": {"S": reservation_id}})
+    return {"statusCode": 200, "body": json.dumps({"message": "Reservation deleted"})}
+
+
+def legacy_update_handler(event, context):
+    """存在確認つきの put_item による更新（従来の put_item に 404 を足したもの）"""
+    reservation_id = event["pathParameters"]["id"]
+    if reservations_db.get_reservation(reservation_id) is None:
+        return {"statusCode": 404, "body": json.dumps({"message": "Reservation not found"})}
+    body = json.loads(event["body"])
+    body["reservationId"] = reservation_id
+    reservations_db.put_reservation(body)
+    return {"statusCode": 200, "body": json.dumps({"message": "Reservation updated"})}
+
+
+def _measure(handler, event, invocations):
+    assert handler(event, None)["statusCode"] == 200
+    times = []
+    for _ in range(invocations):
+        start = time.perf_counter()
+        handler(event, None)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="DynamoDB もどきの1往復あたりの待ち時間")
+    parser.add_argument("--invocations", type=int, default=200)
+    args = parser.parse_args()
+
+    server = start_stub(args.latency_ms)
+    delete_event = {"pathParameters": {"id": "r-0000001"}}
+    update_event = {"pathParameters": {"id": "r-0000001"},
+                    "body": json.dumps({"resourceName": "会議室-2", "time": "2024-12-12T10:00"})}
+
+    print(f"latency per round trip: {args.latency_ms} ms")
+    print(f"{'handler':<26}{'median ms':>12}{'p95 ms':>10}")
+    for name, handler, event in [("legacy delete (2 calls)", legacy_delete_handler, delete_event),
+                                 ("conditional delete", delete_reservation.lambda_handler, delete_event),
+                                 ("legacy update (2 calls)", legacy_update_handler, update_event),
+                                 ("conditional update", update_reservation.lambda_handler, update_event)]:
+        median, p95 = _measure(handler, event, args.invocations)
+        print(f"{name:<26}{median:>12.2f}{p95:>10.2f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
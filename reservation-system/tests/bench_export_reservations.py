@@ -0,0 +1,87 @@
+"""
+並列スキャンによるエクスポート（export_reservations）のスループットを、セグメント数を変えて計測するベンチマーク。
+DynamoDB の代わりに、Segment / TotalSegments / Limit / ExclusiveStartKey だけを実装したメモリ上のテーブルを使い、
+1ページごとに --latency 秒待たせる（DynamoDB との往復の代わり）。
+moto はスキャンのたびにテーブル全体を CPU でなめるので、並列度を測るには向かない（正しさは unit テストで moto を使って確認している）。
+
+    python tests/bench_export_reservations.py --items 100000 --segments 1 2 4 8 16
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import export_reservations  # noqa: E402
+
+
+class StandInTable:
+    """並列スキャンだけできるメモリ上のテーブル"""
+
+    def __init__(self, items, latency):
+        self.name = "ReservationsTable"
+        self.items = items
+        self.latency = latency
+        self._segments = {}
+
+    def _segment(self, segment, total):
+        key = (segment, total)
+        if key not in self._segments:
+            # DynamoDB と同じく、パーティションキーのハッシュでセグメントに振り分ける
+            self._segments[key] = [item for item in self.items
+                                   if zlib.crc32(item["reservationId"].encode()) % total == segment]
+        return self._segments[key]
+
+    def scan(self, Segment, TotalSegments, Limit=1000, ExclusiveStartKey=None):
+        time.sleep(self.latency)
+        items = self._segment(Segment, TotalSegments)
+        start = ExclusiveStartKey["_index"] + 1 if ExclusiveStartKey else 0
+        page = items[start:start + Limit]
+        resp = {"Items": page}
+        if start + Limit < len(items):
+            resp["LastEvaluatedKey"] = {"reservationId": page[-1]["reservationId"], "_index": start + Limit - 1}
+        return resp
+
+
+def _size(out_dir: str) -> int:
+    return sum(os.path.getsize(os.path.join(out_dir, name)) for name in os.listdir(out_dir)
+               if name.startswith("segment-"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.05, help="1ページあたりの擬似レイテンシ（秒）")
+    args = parser.parse_args()
+
+    items = [{
+        "reservationId": f"r-{i:07d}",
+        "resourceName": f"会議室-{i % 50}",
+        "time": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T{i % 24:02d}:00",
+        "owner": f"user-{i % 1000}@example.com",
+    } for i in range(args.items)]
+    table = StandInTable(items, args.latency)
+    export_reservations._get_table = lambda table_name, endpoint_url=None: table
+
+    print(f"items={args.items} page_size={args.page_size} latency={args.latency}s")
+    print(f"{'segments':>8} {'format':<7} {'seconds':>8} {'items/s':>9} {'speedup':>8} {'KiB':>8}")
+    for compress in (False, True):
+        baseline = None
+        for segments in args.segments:
+            with tempfile.TemporaryDirectory() as out_dir:
+                result = export_reservations.export_table(table.name, out_dir, segments=segments,
+                                                          compress=compress, page_size=args.page_size)
+                assert result["items"] == args.items
+                size = _size(out_dir)
+            elapsed = result["elapsed_seconds"]
+            baseline = baseline or elapsed
+            print(f"{segments:>8} {'gzip' if compress else 'ndjson':<7} {elapsed:>8.2f} "
+                  f"{args.items / elapsed:>9.0f} {baseline / elapsed:>7.1f}x {size / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+予約一覧 API（list_reservations）のページごとのレイテンシとピークメモリを計測するベンチマーク。
+moto の DynamoDB に --items 件の予約を入れ、従来（scan 1回 + json.dumps。1MB で打ち切られる）と
+ページング（limit / nextToken、属性の射影）を比べる。
+
+    python tests/bench_list_reservations.py --items 100000 --limits 100 1000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import list_reservations  # noqa: E402
+
+TABLE_NAME = "ReservationsTable"
+
+
+def legacy_handler(event, context):
+    """変更前の一覧取得（scan 1回分を全属性のまま json.dumps）"""
+    table = boto3.resource("dynamodb").Table(os.environ["TABLE_NAME"])
+    items = table.scan().get("Items", [])
+    return {"statusCode": 200, "body": json.dumps(items)}
+
+
+def _load(items: int) -> None:
+    dynamodb = boto3.resource("dynamodb")
+    table = dynamodb.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[{"AttributeName": "reservationId", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "reservationId", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    with table.batch_writer() as batch:
+        for i in range(items):
+            batch.put_item(Item={
+                "reservationId": f"r-{i:07d}",
+                "resourceName": f"会議室-{i % 50}",
+                "time": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T{i % 24:02d}:00",
+                "owner": f"user-{i % 1000}@example.com",
+                "note": "定例ミーティング" * 8,
+            })
+
+
+def _measure(handler, event) -> tuple[dict, float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    resp = handler(event, None)
+    elapsed = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resp, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--limits", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--pages", type=int, default=20, help="ページングで計測するページ数（全件たどる場合は 0）")
+    args = parser.parse_args()
+
+    os.environ.update({"TABLE_NAME": TABLE_NAME, "AWS_DEFAULT_REGION": "ap-northeast-1"})
+    with mock_aws():
+        start = time.perf_counter()
+        _load(args.items)
+        print(f"items={args.items} (loaded in {time.perf_counter() - start:.1f}s)")
+        print(f"{'mode':<12} {'pages':>6} {'items/page':>11} {'ms/page':>9} {'peak KiB/page':>14} {'body KiB/page':>14}")
+
+        resp, elapsed, peak = _measure(legacy_handler, {})
+        returned = len(json.loads(resp["body"]))
+        print(f"{'legacy':<12} {1:>6} {returned:>11} {elapsed:>9.1f} {peak / 1024:>14.0f} "
+              f"{len(resp['body'].encode()) / 1024:>14.0f}   ({args.items - returned} item(s) silently dropped)")
+
+        for limit in args.limits:
+            latencies, peaks, sizes, counts = [], [], [], []
+            token = None
+            while True:
+                params = {"limit": str(limit), **({"nextToken": token} if token else {})}
+                resp, elapsed, peak = _measure(list_reservations.lambda_handler, {"queryStringParameters": params})
+                body = json.loads(resp["body"])
+                latencies.append(elapsed)
+                peaks.append(peak)
+                sizes.append(len(resp["body"].encode()))
+                counts.append(len(body["items"]))
+                token = body["nextToken"]
+                if token is None or (args.pages and len(latencies) >= args.pages):
+                    break
+            print(f"{f'limit={limit}':<12} {len(latencies):>6} {statistics.mean(counts):>11.0f} "
+                  f"{statistics.median(latencies):>9.1f} {max(peaks) / 1024:>14.0f} "
+                  f"{statistics.mean(sizes) / 1024:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+1件取得（get_reservation）の呼び出しごとのレイテンシを、DynamoDB のクライアントの持ち方で比べるベンチマーク。
+ローカルに立てた DynamoDB もどき（操作ごとに決まった応答を返すだけ）に向けるので、ネットワークや
+DynamoDB 側の時間はほぼ含まれず、Lambda 内での client / resource の作成・リクエスト処理の差だけが出る。
+
+- 従来: 呼び出しのたびに boto3.resource + Table を作って get_item
+- resource 使い回し: 作成済みの Table で get_item
+- 現在: reservations_db（作成済みの低レベル client）で get_item
+
+    python tests/bench_reservation_clients.py --invocations 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import boto3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import get_reservation  # noqa: E402
+import reservations_db  # noqa: E402
+
+ITEM = {
+    "reservationId": {"S": "r-0000001"},
+    "resourceName": {"S": "会議室-1"},
+    "time": {"S": "2024-12-11T10:00"},
+    "owner": {"S": "user-1@example.com"},
+}
+
+
+# 操作（X-Amz-Target の後ろ）ごとの応答
+RESPONSES = {
+    "GetItem": {"Item": ITEM},
+    "PutItem": {},
+    "UpdateItem": {"Attributes": ITEM},
+    "DeleteItem": {"Attributes": ITEM},
+}
+
+
+class StubDynamoDB(BaseHTTPRequestHandler):
+    """RESPONSES の決まった応答を返すだけの DynamoDB エンドポイント（latency 秒待ってから返す）"""
+    protocol_version = "HTTP/1.1"
+    # ヘッダーと本文を別々に送るので、Nagle が有効だと keep-alive の接続で 40ms 待たされる
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        operation = self.headers.get("X-Amz-Target", "").rpartition(".")[2]
+        time.sleep(self.latency)
+        body = json.dumps(RESPONSES[operation]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-amz-json-1.0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_handler(event, context):
+    """変更前の get_reservation（呼び出しのたびに resource と Table を作る）"""
+    dynamodb = boto3.resource("dynamodb")
+    table = dynamodb.Table(os.environ["TABLE_NAME"])
+    item = table.get_item(Key={"reservationId": event["pathParameters"]["id"]}).get("Item")
+    return {"statusCode": 200 if item else 404, "body": json.dumps(item)}
+
+
+_TABLE = None
+
+
+def cached_resource_handler(event, context):
+    """resource の Table を使い回す版（低レベル client との差を見るため）"""
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = boto3.resource("dynamodb").Table(os.environ["TABLE_NAME"])
+    item = _TABLE.get_item(Key={"reservationId": event["pathParameters"]["id"]}).get("Item")
+    return {"statusCode": 200 if item else 404, "body": json.dumps(item)}
+
+
+def _measure(handler, invocations):
+    event = {"pathParameters": {"id": "r-0000001"}}
+    assert handler(event, None)["statusCode"] == 200  # 1回目（コールドスタート相当）は除く
+    times = []
+    for _ in range(invocations):
+        start = time.perf_counter()
+        handler(event, None)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95) - 1]
+
+
+def start_stub(latency_ms=0.0):
+    """DynamoDB もどきを別スレッドで立て、boto3 がそこを向くように環境変数を設定する"""
+    StubDynamoDB.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubDynamoDB)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ.update({
+        "TABLE_NAME": "ReservationsTable",
+        "AWS_DEFAULT_REGION": "ap-northeast-1",
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_ENDPOINT_URL_DYNAMODB": f"http://127.0.0.1:{server.server_port}",
+    })
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invocations", type=int, default=200)
+    args = parser.parse_args()
+
+    server = start_stub()
+
+    print(f"{'handler':<22}{'median ms':>12}{'p95 ms':>10}")
+    for name, handler in [("legacy (per call)", legacy_handler),
+                          ("cached resource", cached_resource_handler),
+                          ("reservations_db", get_reservation.lambda_handler)]:
+        reservations_db.reset()
+        median, p95 = _measure(handler, args.invocations)
+        print(f"{name:<22}{median:>12.2f}{p95:>10.2f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+リソース名・日時での絞り込みを、従来（一覧 API で全件取得してクライアント側で絞り込み・並び替え）と
+検索 API（ResourceTimeIndex の Query）で比べるベンチマーク。
+テーブルの件数を変えて、レイテンシと読んだ件数（= 消費する読み込みキャパシティの目安）がどう増えるかを見る。
+各リソースの予約は --per-resource 件で固定（結果の件数はテーブルの大きさによらない）。
+
+    python tests/bench_search_reservations.py --sizes 2000 10000 40000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import list_reservations  # noqa: E402
+import search_reservations  # noqa: E402
+from conftest import TABLE_NAME, create_reservations_table  # noqa: E402
+
+TIME_FROM, TIME_TO = "2024-06-01T00:00", "2024-08-31T23:59"
+
+
+def _load(items: int, per_resource: int) -> None:
+    table = create_reservations_table(boto3.resource("dynamodb"))
+    with table.batch_writer() as batch:
+        for i in range(items):
+            batch.put_item(Item={
+                "reservationId": f"r-{i:07d}",
+                "resourceName": f"会議室-{i // per_resource}",
+                "time": f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}T{i % 24:02d}:00",
+            })
+
+
+def client_side(resource_name: str) -> tuple[list, int]:
+    """変更前の画面の動き: 全ページを取得してから絞り込み・並び替え"""
+    items, token = [], None
+    while True:
+        params = {"limit": "1000", **({"nextToken": token} if token else {})}
+        body = json.loads(list_reservations.lambda_handler({"queryStringParameters": params}, None)["body"])
+        items += body["items"]
+        token = body["nextToken"]
+        if token is None:
+            break
+    matched = [item for item in items
+               if item["resourceName"] == resource_name and TIME_FROM <= item["time"] <= TIME_TO]
+    return sorted(matched, key=lambda item: item["time"]), len(items)
+
+
+def server_side(resource_name: str) -> tuple[list, int]:
+    items, token = [], None
+    while True:
+        params = {"resourceName": resource_name, "from": TIME_FROM, "to": TIME_TO, "limit": "100",
+                  **({"nextToken": token} if token else {})}
+        body = json.loads(search_reservations.lambda_handler({"queryStringParameters": params}, None)["body"])
+        items += body["items"]
+        token = body["nextToken"]
+        if token is None:
+            break
+    return items, len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 10000, 40000])
+    parser.add_argument("--per-resource", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.update({"TABLE_NAME": TABLE_NAME, "AWS_DEFAULT_REGION": "ap-northeast-1"})
+    print(f"per_resource={args.per_resource} range={TIME_FROM}..{TIME_TO} (best of {args.repeat})")
+    print(f"{'items':>7} {'mode':<12} {'results':>8} {'items read':>11} {'ms':>9}")
+    for size in args.sizes:
+        with mock_aws():
+            _load(size, args.per_resource)
+            resource_name = f"会議室-{size // args.per_resource // 2}"
+            expected = None
+            for name, search in (("client-side", client_side), ("query", server_side)):
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    results, read = search(resource_name)
+                    best = min(best, (time.perf_counter() - start) * 1000)
+                expected = expected or results
+                assert results == expected, "検索結果が一致しない"
+                print(f"{size:>7} {name:<12} {len(results):>8} {read:>11} {best:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
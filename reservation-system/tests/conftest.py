@@ -0,0 +1,49 @@
+import os
+import sys
+
+import boto3
+import pytest
+from moto import mock_aws
+
+# Lambda では CodeUri（src/）が /var/task に展開され、ハンドラ同士を直接 import できる
+# テスト・ベンチマークからも同じように import できるようにしておく
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+TABLE_NAME = "ReservationsTable"
+
+
+def create_reservations_table(dynamodb):
+    """template.yaml と同じキー・インデックスのテーブルを作る"""
+    return dynamodb.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[{"AttributeName": "reservationId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "reservationId", "AttributeType": "S"},
+            {"AttributeName": "resourceName", "AttributeType": "S"},
+            {"AttributeName": "time", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": "ResourceTimeIndex",
+            "KeySchema": [
+                {"AttributeName": "resourceName", "KeyType": "HASH"},
+                {"AttributeName": "time", "KeyType": "RANGE"},
+            ],
+            "Projection": {"ProjectionType": "INCLUDE", "NonKeyAttributes": ["version"]},
+        }],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+@pytest.fixture()
+def table(monkeypatch):
+    """moto の DynamoDB に作った空の予約テーブル"""
+    monkeypatch.setenv("TABLE_NAME", TABLE_NAME)
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "ap-northeast-1")
+    # 前のテストで作ったクライアントを引き継がないように捨てておく
+    import reservations_db
+    reservations_db.reset()
+    with mock_aws():
+        yield create_reservations_table(boto3.resource("dynamodb", region_name="ap-northeast-1"))
+    reservations_db.reset()
@@ -0,0 +1,97 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import export_reservations
+
+
+@pytest.fixture()
+def table(table):
+    with table.batch_writer() as batch:
+        for i in range(60):
+            batch.put_item(Item={
+                "reservationId": f"r-{i:03d}",
+                "resourceName": f"room-{i % 4}",
+                "time": f"2024-12-{i % 28 + 1:02d}T10:00",
+                "seats": i,
+            })
+    return table
+
+
+def _read_items(out_dir, manifest):
+    items = []
+    for entry in manifest["files"]:
+        path = os.path.join(out_dir, entry["file"])
+        opener = gzip.open if manifest["compress"] else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f]
+        assert len(lines) == entry["items"]
+        items += lines
+    return items
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_exports_every_item_once(table, tmp_path, compress):
+    result = export_reservations.export_table("ReservationsTable", str(tmp_path), segments=4,
+                                              compress=compress, page_size=7)
+
+    items = _read_items(str(tmp_path), result)
+    assert sorted(item["reservationId"] for item in items) == [f"r-{i:03d}" for i in range(60)]
+    assert result["items"] == 60
+    assert len(result["files"]) == 4
+    assert {item["seats"] for item in items} == set(range(60))
+    assert not os.path.exists(tmp_path / export_reservations.CHECKPOINT_FILE)
+    assert json.loads((tmp_path / export_reservations.MANIFEST_FILE).read_text())["items"] == 60
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_resumes_from_checkpoint_after_failure(table, tmp_path, monkeypatch, compress):
+    scan_page = export_reservations._scan_page
+    calls = []
+
+    def counting_scan_page(table, scan_kwargs):
+        calls.append(scan_kwargs["Segment"])
+        if fail_at and len(calls) == fail_at:
+            raise ConnectionError("network down")
+        return scan_page(table, scan_kwargs)
+
+    monkeypatch.setattr(export_reservations, "_scan_page", counting_scan_page)
+    fail_at = 3
+    with pytest.raises(ConnectionError):
+        export_reservations.export_table("ReservationsTable", str(tmp_path), segments=3, workers=1,
+                                         compress=compress, page_size=5)
+    checkpoint = json.loads((tmp_path / export_reservations.CHECKPOINT_FILE).read_text())
+    assert not all(s["done"] for s in checkpoint["segments"].values())
+    # 失敗したページ以外は書き出し済み（他のセグメントは最後まで進む）
+    exported_pages = len(calls) - 1
+    # チェックポイントを書く前に止まった場合の書きかけ
+    [pending] = [s for s, state in checkpoint["segments"].items() if not state["done"]]
+    with open(tmp_path / export_reservations.segment_file_name(int(pending), compress), "ab") as f:
+        f.write(b'{"reservationId":"half-writ')
+
+    fail_at = None
+    calls.clear()
+    result = export_reservations.export_table("ReservationsTable", str(tmp_path), segments=3, workers=1,
+                                              compress=compress, page_size=5)
+    resumed_calls = len(calls)
+
+    items = _read_items(str(tmp_path), result)
+    assert sorted(item["reservationId"] for item in items) == [f"r-{i:03d}" for i in range(60)]
+
+    # 書き出し済みのページは読み直さない
+    calls.clear()
+    export_reservations.export_table("ReservationsTable", str(tmp_path / "fresh"), segments=3, workers=1,
+                                     compress=compress, page_size=5)
+    assert resumed_calls == len(calls) - exported_pages
+
+
+def test_resume_with_different_options_is_rejected(table, tmp_path):
+    (tmp_path / export_reservations.CHECKPOINT_FILE).write_text(json.dumps({
+        "params": {"table": "ReservationsTable", "segments": 8, "compress": False},
+        "segments": {},
+    }))
+
+    with pytest.raises(ValueError):
+        export_reservations.export_table("ReservationsTable", str(tmp_path), segments=4)
@@ -0,0 +1,88 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+import list_reservations
+
+
+@pytest.fixture()
+def table(table):
+    with table.batch_writer() as batch:
+        for i in range(25):
+            batch.put_item(Item={
+                "reservationId": f"r-{i:03d}",
+                "resourceName": f"room-{i % 3}",
+                "time": f"2024-12-{i % 28 + 1:02d}T10:00",
+                "note": "x" * 100,
+            })
+    return table
+
+
+def _list(**params):
+    resp = list_reservations.lambda_handler({"queryStringParameters": params or None}, None)
+    return resp["statusCode"], json.loads(resp["body"])
+
+
+def test_pages_cover_all_items_once(table):
+    ids = []
+    token = None
+    pages = 0
+    while True:
+        status, body = _list(limit="10", **({"nextToken": token} if token else {}))
+        assert status == 200
+        assert len(body["items"]) <= 10
+        ids += [item["reservationId"] for item in body["items"]]
+        pages += 1
+        token = body["nextToken"]
+        if token is None:
+            break
+
+    assert sorted(ids) == [f"r-{i:03d}" for i in range(25)]
+    assert pages >= 3
+
+
+def test_only_projected_attributes_are_returned(table):
+    _, body = _list()
+
+    assert len(body["items"]) == 25
+    assert all(set(item) == {"reservationId", "resourceName", "time"} for item in body["items"])
+
+
+@pytest.mark.parametrize("params", [{"limit": "0"}, {"limit": "abc"}, {"limit": "100000"},
+                                    {"nextToken": "not-a-token"}, {"nextToken": "e30"}])
+def test_invalid_parameters_are_rejected(table, params):
+    status, body = _list(**params)
+
+    assert status == 400
+    assert "error" in body
+
+
+@pytest.mark.parametrize("key", [
+    {"reservationId": "r-001", "extra": "x"},
+    {"reservationId": 1},
+    {"reservationId": ""},
+    {"id": "r-001"},
+])
+def test_tampered_token_is_rejected(table, key):
+    status, body = _list(nextToken=list_reservations.encode_token(key))
+
+    assert status == 400
+    assert body == {"error": "Invalid nextToken"}
+
+
+def test_token_round_trip():
+    key = {"reservationId": "r-001"}
+
+    assert list_reservations.decode_token(list_reservations.encode_token(key)) == key
+
+
+def test_page_json_converts_decimal():
+    items = [{"reservationId": "r-1", "count": Decimal("3")},
+             {"reservationId": "r-2", "price": Decimal("1.5"), "name": "会議室"}]
+
+    body = list_reservations.page_json(items, "tok")
+
+    assert json.loads(body) == {"items": [{"reservationId": "r-1", "count": 3},
+                                          {"reservationId": "r-2", "price": 1.5, "name": "会議室"}],
+                                "nextToken": "tok"}
@@ -0,0 +1,72 @@
+import json
+from decimal import Decimal
+
+import boto3
+import pytest
+
+import create_reservation
+import delete_reservation
+import get_reservation
+import reservations_db
+import update_reservation
+
+
+def _event(reservation_id=None, body=None):
+    event = {}
+    if reservation_id is not None:
+        event["pathParameters"] = {"id": reservation_id}
+    if body is not None:
+        event["body"] = json.dumps(body)
+    return event
+
+
+def test_clients_are_created_once(table, monkeypatch):
+    created = []
+    real_client, real_resource = boto3.client, boto3.resource
+    monkeypatch.setattr(boto3, "client", lambda *a, **kw: created.append(a) or real_client(*a, **kw))
+    monkeypatch.setattr(boto3, "resource", lambda *a, **kw: created.append(a) or real_resource(*a, **kw))
+
+    for _ in range(3):
+        create_reservation.lambda_handler(_event(body={"resourceName": "room-1", "time": "2024-12-01T10:00"}), None)
+        reservations_db.get_table().scan()
+
+    assert created == [("dynamodb",), ("dynamodb",)]
+    assert reservations_db.get_client() is reservations_db.get_client()
+    assert reservations_db.get_table() is reservations_db.get_table()
+
+
+def test_crud_round_trip(table):
+    resp = create_reservation.lambda_handler(
+        _event(body={"resourceName": "room-1", "time": "2024-12-01T10:00", "people": 3}), None)
+    assert resp["statusCode"] == 201
+    reservation_id = json.loads(resp["body"])["reservationId"]
+
+    resp = get_reservation.lambda_handler(_event(reservation_id), None)
+    assert resp["statusCode"] == 200
+    assert json.loads(resp["body"]) == {
+        "reservationId": reservation_id, "resourceName": "room-1", "time": "2024-12-01T10:00", "people": 3,
+        "version": 1}
+
+    resp = update_reservation.lambda_handler(
+        _event(reservation_id, {"resourceName": "room-2", "time": "2024-12-02T10:00"}), None)
+    assert resp["statusCode"] == 200
+    assert table.get_item(Key={"reservationId": reservation_id})["Item"]["resourceName"] == "room-2"
+
+    assert delete_reservation.lambda_handler(_event(reservation_id), None)["statusCode"] == 200
+    assert "Item" not in table.get_item(Key={"reservationId": reservation_id})
+    assert get_reservation.lambda_handler(_event(reservation_id), None)["statusCode"] == 404
+    assert delete_reservation.lambda_handler(_event(reservation_id), None)["statusCode"] == 404
+
+
+def test_get_reservation_converts_decimal(table):
+    table.put_item(Item={"reservationId": "r-1", "price": Decimal("1.5"), "count": Decimal("2")})
+    assert reservations_db.get_reservation("r-1") == {"reservationId": "r-1", "price": Decimal("1.5"),
+                                                      "count": Decimal("2")}
+    body = json.loads(get_reservation.lambda_handler(_event("r-1"), None)["body"])
+    assert body == {"reservationId": "r-1", "price": 1.5, "count": 2}
+
+
+@pytest.mark.parametrize("handler", [create_reservation, get_reservation, update_reservation, delete_reservation])
+def test_missing_table_name(handler, monkeypatch):
+    monkeypatch.delenv("TABLE_NAME", raising=False)
+    assert handler.lambda_handler(_event("r-1", {}), None)["statusCode"] == 500
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+
+import list_reservations
+import search_reservations
+
+
+@pytest.fixture()
+def table(table):
+    with table.batch_writer() as batch:
+        for i in range(30):
+            batch.put_item(Item={
+                "reservationId": f"r-{i:03d}",
+                "resourceName": ["一番館", "弐番館", "参番館"][i % 3],
+                "time": f"2024-{11 + i % 2}-{i // 2 + 1:02d}T10:00",
+            })
+    return table
+
+
+def _search(**params):
+    resp = search_reservations.lambda_handler({"queryStringParameters": params or None}, None)
+    return resp["statusCode"], json.loads(resp["body"])
+
+
+def _times(body):
+    return [item["time"] for item in body["items"]]
+
+
+def test_returns_only_the_resource_sorted_by_time(table):
+    status, body = _search(resourceName="一番館")
+
+    assert status == 200
+    assert len(body["items"]) == 10
+    assert {item["resourceName"] for item in body["items"]} == {"一番館"}
+    assert _times(body) == sorted(_times(body))
+    assert body["nextToken"] is None
+
+
+def test_descending_order(table):
+    _, body = _search(resourceName="一番館", order="desc")
+
+    assert _times(body) == sorted(_times(body), reverse=True)
+
+
+def test_time_prefix(table):
+    _, body = _search(resourceName="弐番館", timePrefix="2024-12")
+
+    assert _times(body) and all(t.startswith("2024-12") for t in _times(body))
+
+
+def test_time_range_is_inclusive(table):
+    _, body = _search(resourceName="一番館", **{"from": "2024-11-04T10:00", "to": "2024-12-08T10:00"})
+
+    assert _times(body) == ["2024-11-04T10:00", "2024-11-07T10:00", "2024-11-10T10:00", "2024-11-13T10:00",
+                            "2024-12-02T10:00", "2024-12-05T10:00", "2024-12-08T10:00"]
+
+
+def test_pagination_continues_in_order(table):
+    times = []
+    token = None
+    while True:
+        status, body = _search(resourceName="参番館", order="desc", limit="3",
+                               **({"nextToken": token} if token else {}))
+        assert status == 200
+        times += _times(body)
+        token = body["nextToken"]
+        if token is None:
+            break
+
+    assert len(times) == 10
+    assert times == sorted(times, reverse=True)
+
+
+def test_token_from_another_resource_is_rejected(table):
+    _, body = _search(resourceName="一番館", limit="3")
+
+    status, _ = _search(resourceName="弐番館", nextToken=body["nextToken"])
+
+    assert status == 400
+
+
+@pytest.mark.parametrize("key", [
+    {"resourceName": "一番館", "time": "2024-12-01T10:00"},
+    {"resourceName": "一番館", "time": 1, "reservationId": "r-1"},
+    {"resourceName": "一番館", "time": "2024-12-01T10:00", "reservationId": "r-1", "extra": "x"},
+])
+def test_tampered_token_is_rejected(table, key):
+    status, body = _search(resourceName="一番館", nextToken=list_reservations.encode_token(key))
+
+    assert status == 400
+    assert body == {"error": "Invalid nextToken"}
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"resourceName": "一番館", "timePrefix": "2024", "from": "2024-01-01"},
+    {"resourceName": "一番館", "from": "2024-12-31", "to": "2024-01-01"},
+    {"resourceName": "一番館", "order": "random"},
+    {"resourceName": "一番館", "limit": "0"},
+])
+def test_invalid_parameters_are_rejected(table, params):
+    status, body = _search(**params)
+
+    assert status == 400
+    assert "error" in body
+
+
+def test_results_carry_version_for_if_match(table):
+    table.put_item(Item={"reservationId": "r-v", "resourceName": "四番館", "time": "2024-12-01T10:00",
+                         "note": "x", "version": 3})
+    _, body = _search(resourceName="四番館")
+    assert body["items"] == [{"reservationId": "r-v", "resourceName": "四番館", "time": "2024-12-01T10:00",
+                              "version": 3}]
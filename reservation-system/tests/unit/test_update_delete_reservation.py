@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+import delete_reservation
+import reservations_db
+import update_reservation
+
+
+@pytest.fixture()
+def table(table):
+    table.put_item(Item={"reservationId": "r-1", "resourceName": "一番館", "time": "2024-12-11T10:00",
+                         "owner": "alice", "version": 3})
+    # 版番号を持たない（この変更より前に作られた）予約
+    table.put_item(Item={"reservationId": "r-old", "resourceName": "弐番館", "time": "2024-12-12T10:00"})
+    return table
+
+
+@pytest.fixture()
+def calls(monkeypatch):
+    """DynamoDB への呼び出し（操作名）を記録する"""
+    made = []
+    client = reservations_db.get_client()
+    client.meta.events.register("before-call.dynamodb", lambda model, **kw: made.append(model.name))
+    yield made
+    client.meta.events.unregister("before-call.dynamodb")
+
+
+def _update(reservation_id, body, if_match=None):
+    event = {"pathParameters": {"id": reservation_id}, "body": json.dumps(body)}
+    if if_match is not None:
+        event["headers"] = {"If-Match": if_match}
+    resp = update_reservation.lambda_handler(event, None)
+    return resp["statusCode"], json.loads(resp["body"])
+
+
+def _delete(reservation_id, if_match=None):
+    event = {"pathParameters": {"id": reservation_id}}
+    if if_match is not None:
+        event["headers"] = {"if-match": if_match}
+    resp = delete_reservation.lambda_handler(event, None)
+    return resp["statusCode"], json.loads(resp["body"])
+
+
+def test_update_changes_only_given_attributes(table, calls):
+    status, body = _update("r-1", {"time": "2024-12-11T11:00"})
+    assert status == 200
+    assert body["reservation"] == {"reservationId": "r-1", "resourceName": "一番館", "time": "2024-12-11T11:00",
+                                   "owner": "alice", "version": 4}
+    assert table.get_item(Key={"reservationId": "r-1"})["Item"]["version"] == 4
+    assert calls == ["UpdateItem"]
+
+
+def test_update_with_matching_version(table):
+    status, body = _update("r-1", {"resourceName": "参番館"}, if_match='"3"')
+    assert status == 200
+    assert body["reservation"]["version"] == 4
+    # 本文の version でも指定できる
+    status, body = _update("r-1", {"resourceName": "四番館", "version": 4})
+    assert status == 200
+    assert body["reservation"]["version"] == 5
+
+
+def test_update_with_stale_version_is_conflict(table, calls):
+    status, body = _update("r-1", {"resourceName": "参番館"}, if_match="2")
+    assert status == 409
+    assert body["currentVersion"] == 3
+    assert table.get_item(Key={"reservationId": "r-1"})["Item"]["resourceName"] == "一番館"
+    assert calls == ["UpdateItem"]
+
+
+def test_update_missing_reservation_is_not_created(table, calls):
+    status, _ = _update("r-missing", {"resourceName": "参番館"})
+    assert status == 404
+    assert "Item" not in table.get_item(Key={"reservationId": "r-missing"})
+    assert calls == ["UpdateItem"]
+
+
+def test_update_reservation_without_version(table):
+    status, body = _update("r-old", {"time": "2024-12-12T11:00"})
+    assert status == 200
+    assert body["reservation"]["version"] == 1
+
+
+def test_update_ignores_key_and_rejects_empty_or_invalid(table):
+    assert _update("r-1", {"reservationId": "r-2"})[0] == 400
+    assert _update("r-1", {})[0] == 400
+    assert _update("r-1", {"time": "x"}, if_match="abc")[0] == 400
+    assert _update("r-1", {"time": "x"}, if_match="0")[0] == 400
+    resp = update_reservation.lambda_handler({"pathParameters": {"id": "r-1"}, "body": "{broken"}, None)
+    assert resp["statusCode"] == 400
+    assert json.loads(resp["body"])["error"] == "Invalid JSON in request body"
+
+
+def test_delete_returns_deleted_item_in_one_call(table, calls):
+    status, body = _delete("r-1")
+    assert status == 200
+    assert body["reservation"]["owner"] == "alice"
+    assert "Item" not in table.get_item(Key={"reservationId": "r-1"})
+    assert calls == ["DeleteItem"]
+
+
+def test_delete_missing_reservation(table, calls):
+    status, body = _delete("r-missing")
+    assert status == 404
+    assert body == {"message": "Reservation not found"}
+    assert calls == ["DeleteItem"]
+
+
+def test_delete_with_version(table):
+    status, body = _delete("r-1", if_match="2")
+    assert status == 409
+    assert body["currentVersion"] == 3
+    assert "Item" in table.get_item(Key={"reservationId": "r-1"})
+    assert _delete("r-1", if_match="3")[0] == 200
+    assert _delete("r-1", if_match="3")[0] == 404